@@ -0,0 +1,127 @@
+"""
+Benchmark chat search against a throwaway SQLite database.
+
+Compares the indexed search in `Chats.get_chats_by_user_id_and_search_text`
+with the JSON scan it replaced, over synthetic chats spread across users.
+
+    python benchmarks/chat_search.py --chats 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+SYLLABLES = "ka lo mi ne ru sa ti vo ze pa do fi gu he ja".split()
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list[str]:
+    return [
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        for _ in range(size)
+    ]
+
+
+def random_text(rng: random.Random, vocabulary: list[str], n: int) -> str:
+    # Zipf-like word frequencies, like natural language
+    return " ".join(
+        vocabulary[min(int(rng.paretovariate(1.0)) - 1, len(vocabulary) - 1)]
+        for _ in range(n)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="chat-search-bench-")
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import text
+
+    from open_webui.env import OPEN_WEBUI_DIR
+    from open_webui.internal.db import get_db
+    from open_webui.models.chats import ChatImportForm, Chats
+
+    alembic_cfg = Config(OPEN_WEBUI_DIR / "alembic.ini")
+    alembic_cfg.set_main_option("script_location", str(OPEN_WEBUI_DIR / "migrations"))
+    command.upgrade(alembic_cfg, "head")
+
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng, 20_000)
+
+    start = time.perf_counter()
+    for offset in range(0, args.chats, 1000):
+        for user_idx in range(args.users):
+            forms = []
+            for _ in range(offset // args.users, (offset + 1000) // args.users):
+                messages = {
+                    f"m{i}": {
+                        "id": f"m{i}",
+                        "content": random_text(rng, vocabulary, 40),
+                    }
+                    for i in range(args.messages)
+                }
+                forms.append(
+                    ChatImportForm(
+                        chat={
+                            "title": random_text(rng, vocabulary, 4),
+                            "history": {"messages": messages},
+                            "messages": list(messages.values()),
+                        }
+                    )
+                )
+            Chats.import_chats(f"user-{user_idx}", forms)
+    print(f"Inserted {args.chats} chats in {time.perf_counter() - start:.1f}s")
+
+    queries = [
+        (
+            f"user-{rng.randrange(args.users)}",
+            " ".join(rng.sample(vocabulary[10:1000], 2)),
+        )
+        for _ in range(args.queries)
+    ]
+
+    start = time.perf_counter()
+    for user_id, query in queries:
+        Chats.get_chats_by_user_id_and_search_text(user_id, query)
+    indexed = (time.perf_counter() - start) / len(queries)
+
+    # The JSON scan previously used on SQLite
+    start = time.perf_counter()
+    with get_db() as db:
+        for user_id, query in queries:
+            db.execute(
+                text(
+                    """
+                    SELECT id FROM chat
+                    WHERE user_id = :user_id AND archived = 0
+                    AND (title LIKE :title_key OR EXISTS (
+                        SELECT 1 FROM json_each(chat.chat, '$.messages') AS message
+                        WHERE LOWER(message.value->>'content') LIKE '%' || :content_key || '%'
+                    ))
+                    ORDER BY updated_at DESC LIMIT 60
+                    """
+                ),
+                {
+                    "user_id": user_id,
+                    "title_key": f"%{query}%",
+                    "content_key": query,
+                },
+            ).all()
+    scan = (time.perf_counter() - start) / len(queries)
+
+    print(f"indexed search: {indexed * 1000:.1f} ms/query")
+    print(f"json scan:      {scan * 1000:.1f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
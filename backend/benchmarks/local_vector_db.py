@@ -0,0 +1,156 @@
+"""
+Benchmark the local vector store against a throwaway data directory.
+
+Inserts synthetic clustered embeddings into one collection and measures
+insert throughput, search latency and the recall of the IVF index against
+exact search. When chromadb is installed, the same data is indexed in an
+embedded Chroma client for comparison.
+
+    python benchmarks/local_vector_db.py --vectors 100000 --dimension 384
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+def make_vectors(rng: np.random.Generator, n: int, dimension: int) -> np.ndarray:
+    # Embeddings of related chunks are close to each other
+    centers = rng.normal(size=(max(n // 200, 1), dimension))
+    vectors = centers[rng.integers(len(centers), size=n)]
+    vectors = vectors + 0.5 * rng.normal(size=(n, dimension))
+    return vectors.astype(np.float32)
+
+
+def get_recall(results: list[list[str]], expected: list[list[str]]) -> float:
+    hits = sum(len(set(r) & set(e)) for r, e in zip(results, expected))
+    return hits / sum(len(e) for e in expected)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="local-vector-db-bench-")
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+    from open_webui.retrieval.vector.dbs.local import LocalClient, normalize
+
+    rng = np.random.default_rng(0)
+    vectors = make_vectors(rng, args.vectors, args.dimension)
+    queries = make_vectors(rng, args.queries, args.dimension)
+    ids = [f"chunk-{i}" for i in range(args.vectors)]
+    metadatas = [{"file_id": f"file-{i // 100}"} for i in range(args.vectors)]
+
+    normalized = normalize(vectors)
+    expected = [
+        [ids[idx] for idx in np.argsort(-(normalized @ query))[: args.limit]]
+        for query in normalize(queries)
+    ]
+
+    client = LocalClient()
+    start = time.perf_counter()
+    for offset in range(0, args.vectors, args.batch):
+        client.insert(
+            "bench",
+            [
+                {
+                    "id": ids[i],
+                    "text": f"text {i}",
+                    "vector": vectors[i].tolist(),
+                    "metadata": metadatas[i],
+                }
+                for i in range(offset, min(offset + args.batch, args.vectors))
+            ],
+        )
+    print(
+        f"local:  inserted {args.vectors} vectors in {time.perf_counter() - start:.1f}s"
+    )
+
+    # The first search builds the IVF index
+    start = time.perf_counter()
+    client.search("bench", [queries[0].tolist()], limit=args.limit)
+    print(f"local:  first search {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    results = [
+        client.search("bench", [query.tolist()], limit=args.limit).ids[0]
+        for query in queries
+    ]
+    elapsed = (time.perf_counter() - start) / len(queries)
+    print(
+        f"local:  {elapsed * 1000:.2f} ms/query, "
+        f"recall@{args.limit} {get_recall(results, expected):.3f}"
+    )
+
+    start = time.perf_counter()
+    for i in range(len(queries)):
+        client.search(
+            "bench",
+            [queries[i].tolist()],
+            filter={"file_id": f"file-{i}"},
+            limit=args.limit,
+        )
+    elapsed = (time.perf_counter() - start) / len(queries)
+    print(f"local:  {elapsed * 1000:.2f} ms/query filtered by file_id")
+
+    try:
+        import chromadb
+    except ImportError:
+        print("chromadb isn't installed, skipping the comparison")
+        return
+
+    chroma = chromadb.PersistentClient(
+        path=os.path.join(os.environ["DATA_DIR"], "chroma")
+    )
+    collection = chroma.create_collection(
+        name="bench", metadata={"hnsw:space": "cosine"}
+    )
+    start = time.perf_counter()
+    for offset in range(0, args.vectors, args.batch):
+        end = min(offset + args.batch, args.vectors)
+        collection.add(
+            ids=ids[offset:end],
+            documents=[f"text {i}" for i in range(offset, end)],
+            embeddings=vectors[offset:end].tolist(),
+            metadatas=metadatas[offset:end],
+        )
+    print(
+        f"chroma: inserted {args.vectors} vectors in {time.perf_counter() - start:.1f}s"
+    )
+
+    start = time.perf_counter()
+    results = [
+        collection.query(query_embeddings=[query.tolist()], n_results=args.limit)[
+            "ids"
+        ][0]
+        for query in queries
+    ]
+    elapsed = (time.perf_counter() - start) / len(queries)
+    print(
+        f"chroma: {elapsed * 1000:.2f} ms/query, "
+        f"recall@{args.limit} {get_recall(results, expected):.3f}"
+    )
+
+    start = time.perf_counter()
+    for i in range(len(queries)):
+        collection.query(
+            query_embeddings=[queries[i].tolist()],
+            n_results=args.limit,
+            where={"file_id": f"file-{i}"},
+        )
+    elapsed = (time.perf_counter() - start) / len(queries)
+    print(f"chroma: {elapsed * 1000:.2f} ms/query filtered by file_id")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark the memory used by file uploads against a throwaway data directory.
+
+Writes a file of random bytes to disk and uploads it to local storage with
+`upload_file`, which holds the whole file in memory, and `upload_file_stream`,
+which reads it in chunks, reporting the peak of Python allocations of each.
+When S3_BUCKET_NAME is set, the same is measured for S3 storage against that
+bucket, configured with the usual S3_* variables.
+
+    python benchmarks/storage_upload.py --size 1024
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def make_file(path: str, size: int):
+    with open(path, "wb") as f:
+        for _ in range(size):
+            f.write(os.urandom(1024 * 1024))
+
+
+def measure(name: str, upload, source: str):
+    with open(source, "rb") as file:
+        tracemalloc.start()
+        start = time.perf_counter()
+        upload(file)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"{name:<28} {elapsed:6.2f}s  peak {peak / 1024 / 1024:8.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=256, help="file size in MiB")
+    args = parser.parse_args()
+
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="storage-upload-bench-")
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+    from open_webui.storage import provider
+
+    source = os.path.join(os.environ["DATA_DIR"], "source.bin")
+    make_file(source, args.size)
+    print(f"uploading {args.size} MiB in chunks of {provider.UPLOAD_CHUNK_SIZE} bytes")
+
+    local = provider.LocalStorageProvider()
+    measure(
+        "local: upload_file",
+        lambda file: local.upload_file(file, "local.bin", {}),
+        source,
+    )
+    measure(
+        "local: upload_file_stream",
+        lambda file: local.upload_file_stream(file, "local-stream.bin", {}),
+        source,
+    )
+
+    # Mocked S3 servers hold the uploaded parts in memory, so S3 is only
+    # measured against a real bucket
+    if not os.environ.get("S3_BUCKET_NAME"):
+        print("S3_BUCKET_NAME isn't set, skipping S3")
+        return
+
+    s3 = provider.S3StorageProvider()
+    for name, upload in [
+        ("s3: upload_file", s3.upload_file),
+        ("s3: upload_file_stream", s3.upload_file_stream),
+    ]:
+        filename = f"storage-upload-bench-{name.split()[-1]}.bin"
+        measure(name, lambda file: upload(file, filename, {}), source)
+        s3.delete_file(f"s3://{s3.bucket_name}/{os.path.join(s3.key_prefix, filename)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -99,5 +99,23 @@ def dev(
     )
 
 
+@app.command()
+def backfill_chat_messages(batch_size: int = 100):
+    """Populate the chat_message table from existing chat histories."""
+    from open_webui.models.chats import Chats
+
+    created = Chats.backfill_message_rows(batch_size=batch_size)
+    typer.echo(f"Created {created} chat message rows")
+
+
+@app.command()
+def reindex_chat_search(batch_size: int = 100):
+    """Rebuild the full-text chat search index."""
+    from open_webui.models.chats import Chats
+
+    count = Chats.reindex_search(batch_size=batch_size)
+    typer.echo(f"Reindexed {count} chats")
+
+
 if __name__ == "__main__":
     app()
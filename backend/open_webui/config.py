@@ -3,6 +3,8 @@ import logging
 import os
 import shutil
 import base64
+import threading
+import time
 import redis
 
 from datetime import datetime
@@ -22,6 +24,7 @@ from open_webui.env import (
     ENABLE_DB_MIGRATIONS,
     ENV,
     REDIS_URL,
+    REDIS_CONFIG_CHECK_INTERVAL,
     REDIS_KEY_PREFIX,
     REDIS_SENTINEL_HOSTS,
     REDIS_SENTINEL_PORT,
@@ -224,6 +227,17 @@ class PersistentConfig(Generic[T]):
 
 
 class AppConfig:
+    """
+    Config values, shared by the workers through Redis when it is configured.
+
+    Reads are served from the in-process snapshot in `_state`. Updates bump a
+    version in Redis and are announced on a pub/sub channel, on which a
+    listener thread marks the snapshot stale. A stale snapshot, or one whose
+    version wasn't checked for REDIS_CONFIG_CHECK_INTERVAL seconds in case a
+    notification was missed, is reloaded from Redis on the next read if the
+    version changed.
+    """
+
     _redis: Union[redis.Redis, redis.cluster.RedisCluster] = None
     _redis_key_prefix: str
 
@@ -236,6 +250,14 @@ class AppConfig:
         redis_cluster: Optional[bool] = False,
         redis_key_prefix: str = "open-webui",
     ):
+        super().__setattr__("_state", {})
+
+        # A version no Redis value matches, to load the snapshot on first read
+        super().__setattr__("_version", object())
+        super().__setattr__("_stale", True)
+        super().__setattr__("_checked_at", 0.0)
+        super().__setattr__("_lock", threading.Lock())
+
         if redis_url:
             super().__setattr__("_redis_key_prefix", redis_key_prefix)
             super().__setattr__(
@@ -248,7 +270,66 @@ class AppConfig:
                 ),
             )
 
-        super().__setattr__("_state", {})
+            threading.Thread(
+                target=self._listen, name="config-listener", daemon=True
+            ).start()
+
+    def _listen(self):
+        channel = f"{self._redis_key_prefix}:config:updates"
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                pubsub.subscribe(channel)
+                # Updates may have been missed while not subscribed
+                super().__setattr__("_stale", True)
+
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        super().__setattr__("_stale", True)
+            except Exception as e:
+                log.warning(f"Config update listener failed, resubscribing: {e}")
+                time.sleep(REDIS_CONFIG_CHECK_INTERVAL)
+
+    def _refresh(self):
+        if not self._lock.acquire(blocking=False):
+            # Another thread is refreshing, serve the current snapshot
+            return
+
+        try:
+            super().__setattr__("_stale", False)
+            super().__setattr__("_checked_at", time.time())
+
+            version = self._redis.get(f"{self._redis_key_prefix}:config:version")
+            if version == self._version:
+                return
+
+            # Pipelined rather than MGET, which a cluster refuses across slots
+            keys = list(self._state)
+            pipe = self._redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.get(f"{self._redis_key_prefix}:config:{key}")
+            redis_values = pipe.execute()
+            for key, redis_value in zip(keys, redis_values):
+                if redis_value is None:
+                    continue
+
+                try:
+                    decoded_value = json.loads(redis_value)
+
+                    # Update the in-memory value if different
+                    if self._state[key].value != decoded_value:
+                        self._state[key].value = decoded_value
+                        log.info(f"Updated {key} from Redis: {decoded_value}")
+
+                except json.JSONDecodeError:
+                    log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+
+            super().__setattr__("_version", version)
+        except Exception as e:
+            super().__setattr__("_stale", True)
+            log.error(f"Failed to refresh the config from Redis: {e}")
+        finally:
+            self._lock.release()
 
     def __setattr__(self, key, value):
         if isinstance(value, PersistentConfig):
@@ -260,27 +341,19 @@ class AppConfig:
             if self._redis:
                 redis_key = f"{self._redis_key_prefix}:config:{key}"
                 self._redis.set(redis_key, json.dumps(self._state[key].value))
+                self._redis.incr(f"{self._redis_key_prefix}:config:version")
+                self._redis.publish(f"{self._redis_key_prefix}:config:updates", key)
 
     def __getattr__(self, key):
         if key not in self._state:
             raise AttributeError(f"Config key '{key}' not found")
 
-        # If Redis is available, check for an updated value
-        if self._redis:
-            redis_key = f"{self._redis_key_prefix}:config:{key}"
-            redis_value = self._redis.get(redis_key)
-
-            if redis_value is not None:
-                try:
-                    decoded_value = json.loads(redis_value)
-
-                    # Update the in-memory value if different
-                    if self._state[key].value != decoded_value:
-                        self._state[key].value = decoded_value
-                        log.info(f"Updated {key} from Redis: {decoded_value}")
-
-                except json.JSONDecodeError:
-                    log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+        # If Redis is available and the snapshot may be outdated, reload it
+        if self._redis and (
+            self._stale
+            or time.time() - self._checked_at > REDIS_CONFIG_CHECK_INTERVAL
+        ):
+            self._refresh()
 
         return self._state[key].value
 
@@ -1777,6 +1850,30 @@ ENABLE_MEMORIES = PersistentConfig(
 
 VECTOR_DB = os.environ.get("VECTOR_DB", "chroma")
 
+# Threads shared by the async methods of vector database clients without a
+# native async implementation
+VECTOR_DB_THREAD_POOL_SIZE = int(os.environ.get("VECTOR_DB_THREAD_POOL_SIZE", "16"))
+
+# Local
+LOCAL_VECTOR_DB_PATH = os.environ.get(
+    "LOCAL_VECTOR_DB_PATH", f"{DATA_DIR}/vector_db_local"
+)
+# Collections with fewer vectors are searched exhaustively
+LOCAL_VECTOR_DB_IVF_MIN_ROWS = int(
+    os.environ.get("LOCAL_VECTOR_DB_IVF_MIN_ROWS", "20000")
+)
+# Share of the IVF clusters searched per query. The index has sqrt(rows)
+# clusters, a fixed number of them would search less of a collection as it
+# grows. At 0.3 the recall@10 is about 0.95 up to 100k vectors, falling to
+# about 0.9 at 200k, and a search takes about as long as an exhaustive one:
+# lower it for faster searches with a lower recall
+LOCAL_VECTOR_DB_IVF_PROBE_RATIO = float(
+    os.environ.get("LOCAL_VECTOR_DB_IVF_PROBE_RATIO", "0.3")
+)
+LOCAL_VECTOR_DB_MAX_OPEN_COLLECTIONS = int(
+    os.environ.get("LOCAL_VECTOR_DB_MAX_OPEN_COLLECTIONS", "64")
+)
+
 # Chroma
 CHROMA_DATA_PATH = f"{DATA_DIR}/vector_db"
 
@@ -2433,6 +2530,33 @@ RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
 
+# Documents are embedded and inserted in batches of this many chunks, with at
+# most RAG_EMBEDDING_PIPELINE_MAX_IN_FLIGHT batches held in memory at once
+RAG_EMBEDDING_PIPELINE_BATCH_SIZE = int(
+    os.environ.get("RAG_EMBEDDING_PIPELINE_BATCH_SIZE", "256")
+)
+
+RAG_EMBEDDING_PIPELINE_MAX_IN_FLIGHT = int(
+    os.environ.get("RAG_EMBEDDING_PIPELINE_MAX_IN_FLIGHT", "4")
+)
+
+# Split large documents across this many worker processes, 0 splits in-process
+RAG_TEXT_SPLITTER_PROCESSES = int(os.environ.get("RAG_TEXT_SPLITTER_PROCESSES", "0"))
+
+# Cache embeddings by engine, model, prefix and text: "disk", "redis" or "" (disabled)
+RAG_EMBEDDING_CACHE = os.environ.get("RAG_EMBEDDING_CACHE", "").lower()
+
+RAG_EMBEDDING_CACHE_MAX_ENTRIES = int(
+    os.environ.get("RAG_EMBEDDING_CACHE_MAX_ENTRIES", "100000")
+)
+
+RAG_EMBEDDING_CACHE_TTL = int(
+    os.environ.get("RAG_EMBEDDING_CACHE_TTL", str(7 * 24 * 60 * 60))
+)
+
+# Number of collection BM25 indexes kept in memory for hybrid search
+RAG_BM25_INDEX_CACHE_SIZE = int(os.environ.get("RAG_BM25_INDEX_CACHE_SIZE", "8"))
+
 RAG_RERANKING_ENGINE = PersistentConfig(
     "RAG_RERANKING_ENGINE",
     "rag.reranking_engine",
@@ -2697,6 +2821,17 @@ WEB_LOADER_TIMEOUT = PersistentConfig(
     os.getenv("WEB_LOADER_TIMEOUT", ""),
 )
 
+# Seconds web search results are cached by engine, query, result count and domain filters, 0 disables
+WEB_SEARCH_CACHE_TTL = int(os.environ.get("WEB_SEARCH_CACHE_TTL", "300"))
+
+# Seconds fetched web pages are served from the cache without a request, 0 disables
+WEB_LOADER_CACHE_TTL = int(os.environ.get("WEB_LOADER_CACHE_TTL", "300"))
+
+# Seconds pages with an ETag or Last-Modified header are kept to be revalidated once stale
+WEB_LOADER_CACHE_REVALIDATE_TTL = int(
+    os.environ.get("WEB_LOADER_CACHE_REVALIDATE_TTL", str(24 * 60 * 60))
+)
+
 
 ENABLE_WEB_LOADER_SSL_VERIFICATION = PersistentConfig(
     "ENABLE_WEB_LOADER_SSL_VERIFICATION",
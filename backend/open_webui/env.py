@@ -347,6 +347,19 @@ if DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL is not None:
     except Exception:
         DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL = 0.0
 
+# Users' activity is recorded in memory and their last active times written in
+# bulk every interval (seconds). Set to 0 to write on every request.
+DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL = os.environ.get(
+    "DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL", "10"
+)
+
+try:
+    DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL = float(
+        DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL
+    )
+except Exception:
+    DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL = 10.0
+
 # When enabled, get_db_context reuses existing sessions; set to False to always create new sessions
 DATABASE_ENABLE_SESSION_SHARING = (
     os.environ.get("DATABASE_ENABLE_SESSION_SHARING", "False").lower() == "true"
@@ -397,6 +410,14 @@ try:
 except ValueError:
     REDIS_SOCKET_CONNECT_TIMEOUT = None
 
+# Seconds between checks of the config version in Redis, in case an update
+# notification was missed
+REDIS_CONFIG_CHECK_INTERVAL = os.environ.get("REDIS_CONFIG_CHECK_INTERVAL", "10")
+try:
+    REDIS_CONFIG_CHECK_INTERVAL = float(REDIS_CONFIG_CHECK_INTERVAL)
+except ValueError:
+    REDIS_CONFIG_CHECK_INTERVAL = 10
+
 ####################################
 # UVICORN WORKERS
 ####################################
@@ -470,6 +491,20 @@ WEBUI_AUTH_SIGNOUT_REDIRECT_URL = os.environ.get(
     "WEBUI_AUTH_SIGNOUT_REDIRECT_URL", None
 )
 
+# Seconds the user authenticated by a token or an API key is cached for, 0 to
+# disable the cache
+AUTH_CACHE_TTL = os.environ.get("AUTH_CACHE_TTL", "10")
+try:
+    AUTH_CACHE_TTL = float(AUTH_CACHE_TTL)
+except ValueError:
+    AUTH_CACHE_TTL = 10
+
+AUTH_CACHE_MAX_SIZE = os.environ.get("AUTH_CACHE_MAX_SIZE", "10000")
+try:
+    AUTH_CACHE_MAX_SIZE = int(AUTH_CACHE_MAX_SIZE)
+except ValueError:
+    AUTH_CACHE_MAX_SIZE = 10000
+
 ####################################
 # WEBUI_SECRET_KEY
 ####################################
@@ -603,6 +638,26 @@ else:
     except Exception:
         CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE = 1
 
+# Streamed message updates are merged in memory and persisted at most once per
+# interval (seconds) or every N updates. Set the interval to 0 to write through.
+CHAT_MESSAGE_WRITE_BUFFER_INTERVAL = os.environ.get(
+    "CHAT_MESSAGE_WRITE_BUFFER_INTERVAL", "1"
+)
+
+try:
+    CHAT_MESSAGE_WRITE_BUFFER_INTERVAL = float(CHAT_MESSAGE_WRITE_BUFFER_INTERVAL)
+except Exception:
+    CHAT_MESSAGE_WRITE_BUFFER_INTERVAL = 1.0
+
+CHAT_MESSAGE_WRITE_BUFFER_MAX_UPDATES = os.environ.get(
+    "CHAT_MESSAGE_WRITE_BUFFER_MAX_UPDATES", "50"
+)
+
+try:
+    CHAT_MESSAGE_WRITE_BUFFER_MAX_UPDATES = int(CHAT_MESSAGE_WRITE_BUFFER_MAX_UPDATES)
+except Exception:
+    CHAT_MESSAGE_WRITE_BUFFER_MAX_UPDATES = 50
+
 
 CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES = os.environ.get(
     "CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES", "30"
@@ -693,6 +748,14 @@ try:
 except ValueError:
     WEBSOCKET_SERVER_PING_INTERVAL = 25
 
+# Window in milliseconds within which streamed chat completion events are
+# coalesced into a single socket event, 0 to send each one as it comes
+WEBSOCKET_EVENT_BATCH_INTERVAL = os.environ.get("WEBSOCKET_EVENT_BATCH_INTERVAL", "30")
+try:
+    WEBSOCKET_EVENT_BATCH_INTERVAL = max(int(WEBSOCKET_EVENT_BATCH_INTERVAL), 0)
+except ValueError:
+    WEBSOCKET_EVENT_BATCH_INTERVAL = 30
+
 
 REQUESTS_VERIFY = os.environ.get("REQUESTS_VERIFY", "True").lower() == "true"
 
@@ -724,6 +787,95 @@ else:
     except Exception:
         AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST = 10
 
+# Connections kept to each upstream API (OpenAI, Ollama), 0 for no limit
+AIOHTTP_CLIENT_POOL_SIZE = os.environ.get("AIOHTTP_CLIENT_POOL_SIZE", "100")
+try:
+    AIOHTTP_CLIENT_POOL_SIZE = max(int(AIOHTTP_CLIENT_POOL_SIZE), 0)
+except ValueError:
+    AIOHTTP_CLIENT_POOL_SIZE = 100
+
+# Seconds an idle upstream connection is kept open for reuse
+AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = os.environ.get(
+    "AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT", "30"
+)
+try:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = float(AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT)
+except ValueError:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = 30
+
+# Seconds resolved upstream host names are cached
+AIOHTTP_CLIENT_DNS_CACHE_TTL = os.environ.get("AIOHTTP_CLIENT_DNS_CACHE_TTL", "300")
+try:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = int(AIOHTTP_CLIENT_DNS_CACHE_TTL)
+except ValueError:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = 300
+
+
+####################################
+# LOAD BALANCING
+####################################
+
+# Strategy to pick one of the Ollama servers serving a model: least_load or random
+OLLAMA_LOAD_BALANCER = os.environ.get("OLLAMA_LOAD_BALANCER", "least_load").lower()
+
+# Requests in flight above which a server that has the model loaded isn't preferred, 0 for no limit
+OLLAMA_LOAD_BALANCER_MAX_IN_FLIGHT = os.environ.get(
+    "OLLAMA_LOAD_BALANCER_MAX_IN_FLIGHT", "4"
+)
+try:
+    OLLAMA_LOAD_BALANCER_MAX_IN_FLIGHT = max(int(OLLAMA_LOAD_BALANCER_MAX_IN_FLIGHT), 0)
+except ValueError:
+    OLLAMA_LOAD_BALANCER_MAX_IN_FLIGHT = 4
+
+# Consecutive failures after which a server is skipped
+OLLAMA_LOAD_BALANCER_FAILURE_THRESHOLD = os.environ.get(
+    "OLLAMA_LOAD_BALANCER_FAILURE_THRESHOLD", "3"
+)
+try:
+    OLLAMA_LOAD_BALANCER_FAILURE_THRESHOLD = max(
+        int(OLLAMA_LOAD_BALANCER_FAILURE_THRESHOLD), 1
+    )
+except ValueError:
+    OLLAMA_LOAD_BALANCER_FAILURE_THRESHOLD = 3
+
+# Seconds a failing server is skipped for
+OLLAMA_LOAD_BALANCER_EJECTION_TIME = os.environ.get(
+    "OLLAMA_LOAD_BALANCER_EJECTION_TIME", "30"
+)
+try:
+    OLLAMA_LOAD_BALANCER_EJECTION_TIME = float(OLLAMA_LOAD_BALANCER_EJECTION_TIME)
+except ValueError:
+    OLLAMA_LOAD_BALANCER_EJECTION_TIME = 30
+
+# Seconds between two polls of the models loaded on each server (/api/ps)
+OLLAMA_LOADED_MODELS_POLL_INTERVAL = os.environ.get(
+    "OLLAMA_LOADED_MODELS_POLL_INTERVAL", "10"
+)
+try:
+    OLLAMA_LOADED_MODELS_POLL_INTERVAL = float(OLLAMA_LOADED_MODELS_POLL_INTERVAL)
+except ValueError:
+    OLLAMA_LOADED_MODELS_POLL_INTERVAL = 10
+
+# Balance the requests for a model between all the OpenAI-compatible connections listing it,
+# rather than sending them to the first one. Off by default as these may be different providers
+ENABLE_OPENAI_LOAD_BALANCING = (
+    os.environ.get("ENABLE_OPENAI_LOAD_BALANCING", "False").lower() == "true"
+)
+
+# Requests in flight above which an OpenAI-compatible connection is considered overloaded, 0 for no limit
+OPENAI_LOAD_BALANCER_MAX_IN_FLIGHT = os.environ.get(
+    "OPENAI_LOAD_BALANCER_MAX_IN_FLIGHT", "16"
+)
+try:
+    OPENAI_LOAD_BALANCER_MAX_IN_FLIGHT = max(int(OPENAI_LOAD_BALANCER_MAX_IN_FLIGHT), 0)
+except ValueError:
+    OPENAI_LOAD_BALANCER_MAX_IN_FLIGHT = 16
+
+# Send the turns of a conversation to the same server while it isn't overloaded, to reuse its prompt cache
+ENABLE_PROMPT_AFFINITY_ROUTING = (
+    os.environ.get("ENABLE_PROMPT_AFFINITY_ROUTING", "True").lower() == "true"
+)
+
 
 ####################################
 # SENTENCE TRANSFORMERS
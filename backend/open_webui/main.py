@@ -67,6 +67,7 @@ from open_webui.socket.main import (
     get_event_emitter,
     get_models_in_use,
 )
+from open_webui.socket.utils import RedisDict
 from open_webui.routers import (
     audio,
     images,
@@ -475,6 +476,9 @@ from open_webui.utils.chat import (
 )
 from open_webui.utils.embeddings import generate_embeddings
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
+from open_webui.utils.message_buffer import MESSAGE_WRITE_BUFFER
+from open_webui.utils.presence import PRESENCE_TRACKER
+from open_webui.utils.http_client import CLIENT_SESSION_POOL, WEB_CLIENT_SESSION_POOL
 from open_webui.utils.access_control import has_access
 
 from open_webui.utils.auth import (
@@ -611,6 +615,13 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    # Persist buffered message updates before shutting down
+    MESSAGE_WRITE_BUFFER.flush_all()
+    PRESENCE_TRACKER.flush()
+
+    await CLIENT_SESSION_POOL.close()
+    await WEB_CLIENT_SESSION_POOL.close()
+
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
@@ -1387,9 +1398,19 @@ async def get_models(
 
     models = []
     for model in all_models:
+        # Entries are shared with the model cache, copy before modifying
+        model = {**model}
+
         # Remove profile image URL to reduce payload size
         if model.get("info", {}).get("meta", {}).get("profile_image_url"):
-            model["info"]["meta"].pop("profile_image_url", None)
+            model["info"] = {
+                **model["info"],
+                "meta": {
+                    key: value
+                    for key, value in model["info"]["meta"].items()
+                    if key != "profile_image_url"
+                },
+            }
 
         try:
             model_tags = [
@@ -1482,10 +1503,14 @@ async def chat_completion(
     try:
         model_info = None
         if not model_item.get("direct", False):
-            if model_id not in request.app.state.MODELS:
+            if isinstance(request.app.state.MODELS, RedisDict):
+                model = await request.app.state.MODELS.aget(model_id)
+            else:
+                model = request.app.state.MODELS.get(model_id)
+
+            if model is None:
                 raise Exception("Model not found")
 
-            model = request.app.state.MODELS[model_id]
             model_info = Models.get_model_by_id(model_id)
 
             # Check if user has access to the model
@@ -1509,7 +1534,14 @@ async def chat_completion(
         # Check base model existence for custom models
         if model_info_params.get("base_model_id"):
             base_model_id = model_info_params.get("base_model_id")
-            if base_model_id not in request.app.state.MODELS:
+            if isinstance(request.app.state.MODELS, RedisDict):
+                base_model_exists = await request.app.state.MODELS.acontains(
+                    base_model_id
+                )
+            else:
+                base_model_exists = base_model_id in request.app.state.MODELS
+
+            if not base_model_exists:
                 if ENABLE_CUSTOM_MODEL_FALLBACK:
                     default_models = (
                         request.app.state.config.DEFAULT_MODELS or ""
@@ -1622,7 +1654,7 @@ async def chat_completion(
             if metadata.get("chat_id") and metadata.get("message_id"):
                 try:
                     if not metadata["chat_id"].startswith("local:"):
-                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                        Chats.upsert_message_by_id_and_message_id(
                             metadata["chat_id"],
                             metadata["message_id"],
                             {
@@ -1655,7 +1687,7 @@ async def chat_completion(
                 # Update the chat message with the error
                 try:
                     if not metadata["chat_id"].startswith("local:"):
-                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                        Chats.upsert_message_by_id_and_message_id(
                             metadata["chat_id"],
                             metadata["message_id"],
                             {
@@ -1953,7 +1985,6 @@ async def get_app_version():
     }
 
 
-
 @app.get("/api/changelog")
 async def get_app_changelog():
     return {key: CHANGELOG[key] for idx, key in enumerate(CHANGELOG) if idx < 5}
@@ -0,0 +1,43 @@
+"""Add vector_document and vector_collection tables
+
+Revision ID: a7c4e9f2d318
+Revises: f5b8c3d1a926
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c4e9f2d318"
+down_revision: Union[str, None] = "f5b8c3d1a926"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing collections aren't indexed, duplicate checks fall back to the
+    # vector database for them until they are recreated.
+    op.create_table(
+        "vector_document",
+        sa.Column("collection_name", sa.Text(), primary_key=True),
+        sa.Column("vector_id", sa.Text(), primary_key=True),
+        sa.Column("hash", sa.Text(), nullable=True),
+        sa.Column("file_id", sa.Text(), nullable=True),
+        sa.Index("ix_vector_document_collection_hash", "collection_name", "hash"),
+        sa.Index("ix_vector_document_collection_file_id", "collection_name", "file_id"),
+    )
+    op.create_table(
+        "vector_collection",
+        sa.Column("name", sa.Text(), primary_key=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("vector_collection")
+    op.drop_table("vector_document")
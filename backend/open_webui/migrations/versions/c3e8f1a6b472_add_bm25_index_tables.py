@@ -0,0 +1,45 @@
+"""Add bm25_document and bm25_collection tables
+
+Revision ID: c3e8f1a6b472
+Revises: a7c4e9f2d318
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3e8f1a6b472"
+down_revision: Union[str, None] = "a7c4e9f2d318"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Collections are added the first time they are searched with hybrid search
+    op.create_table(
+        "bm25_document",
+        sa.Column("collection_name", sa.Text(), primary_key=True),
+        sa.Column("vector_id", sa.Text(), primary_key=True),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("meta", sa.JSON(), nullable=True),
+        sa.Column("hash", sa.Text(), nullable=True),
+        sa.Column("file_id", sa.Text(), nullable=True),
+        sa.Index("ix_bm25_document_collection_hash", "collection_name", "hash"),
+        sa.Index("ix_bm25_document_collection_file_id", "collection_name", "file_id"),
+    )
+    op.create_table(
+        "bm25_collection",
+        sa.Column("name", sa.Text(), primary_key=True),
+        sa.Column("version", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bm25_collection")
+    op.drop_table("bm25_document")
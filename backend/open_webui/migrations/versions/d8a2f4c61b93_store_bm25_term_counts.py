@@ -0,0 +1,72 @@
+"""Store BM25 term counts and a change log instead of document copies
+
+Revision ID: d8a2f4c61b93
+Revises: c3e8f1a6b472
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d8a2f4c61b93"
+down_revision: Union[str, None] = "c3e8f1a6b472"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The stored documents are copies of the vector database, collections are
+    # copied again the next time they are searched with hybrid search
+    op.drop_table("bm25_collection")
+    op.drop_table("bm25_document")
+
+    op.create_table(
+        "bm25_document",
+        sa.Column("collection_name", sa.Text(), primary_key=True),
+        sa.Column("vector_id", sa.Text(), primary_key=True),
+        sa.Column("terms", sa.JSON(), nullable=False),
+        sa.Column("metadata_terms", sa.JSON(), nullable=True),
+    )
+    op.create_table(
+        "bm25_collection",
+        sa.Column("name", sa.Text(), primary_key=True),
+        sa.Column("generation", sa.Text(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+    )
+    op.create_table(
+        "bm25_change",
+        sa.Column("collection_name", sa.Text(), primary_key=True),
+        sa.Column("version", sa.BigInteger(), primary_key=True),
+        sa.Column("vector_ids", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bm25_change")
+    op.drop_table("bm25_collection")
+    op.drop_table("bm25_document")
+
+    op.create_table(
+        "bm25_document",
+        sa.Column("collection_name", sa.Text(), primary_key=True),
+        sa.Column("vector_id", sa.Text(), primary_key=True),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("meta", sa.JSON(), nullable=True),
+        sa.Column("hash", sa.Text(), nullable=True),
+        sa.Column("file_id", sa.Text(), nullable=True),
+        sa.Index("ix_bm25_document_collection_hash", "collection_name", "hash"),
+        sa.Index("ix_bm25_document_collection_file_id", "collection_name", "file_id"),
+    )
+    op.create_table(
+        "bm25_collection",
+        sa.Column("name", sa.Text(), primary_key=True),
+        sa.Column("version", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+    )
@@ -0,0 +1,36 @@
+"""Add indexed column to bm25_collection
+
+Revision ID: e2b9c7a4d105
+Revises: d8a2f4c61b93
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b9c7a4d105"
+down_revision: Union[str, None] = "d8a2f4c61b93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A collection was stored before its documents, so if copying them failed
+    # it stayed empty. Collections are copied again on their next search.
+    op.execute("DELETE FROM bm25_change")
+    op.execute("DELETE FROM bm25_document")
+    op.execute("DELETE FROM bm25_collection")
+    op.add_column(
+        "bm25_collection",
+        sa.Column("indexed", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("bm25_collection") as batch_op:
+        batch_op.drop_column("indexed")
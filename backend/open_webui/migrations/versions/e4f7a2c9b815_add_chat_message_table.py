@@ -0,0 +1,70 @@
+"""Add chat_message table
+
+Revision ID: e4f7a2c9b815
+Revises: b1c2d3e4f5a6
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4f7a2c9b815"
+down_revision: Union[str, None] = "b1c2d3e4f5a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are populated lazily by message updates, or up front with
+    # `open-webui backfill-chat-messages`.
+    op.create_table(
+        "chat_message",
+        sa.Column(
+            "chat_id",
+            sa.Text(),
+            sa.ForeignKey("chat.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("message_id", sa.Text(), primary_key=True),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    # Fold message rows back into the chat JSON history before dropping them
+    conn = op.get_bind()
+    chat = sa.table("chat", sa.column("id", sa.Text()), sa.column("chat", sa.JSON()))
+    chat_message = sa.table(
+        "chat_message",
+        sa.column("chat_id", sa.Text()),
+        sa.column("message_id", sa.Text()),
+        sa.column("data", sa.JSON()),
+    )
+
+    messages_by_chat_id = {}
+    for chat_id, message_id, data in conn.execute(
+        sa.select(
+            chat_message.c.chat_id, chat_message.c.message_id, chat_message.c.data
+        )
+    ):
+        messages_by_chat_id.setdefault(chat_id, {})[message_id] = data
+
+    for chat_id, messages in messages_by_chat_id.items():
+        row = conn.execute(sa.select(chat.c.chat).where(chat.c.id == chat_id)).first()
+        if row is None or row[0] is None:
+            continue
+
+        data = row[0]
+        history = data.get("history", {})
+        history["messages"] = {**history.get("messages", {}), **messages}
+        data["history"] = history
+        conn.execute(chat.update().where(chat.c.id == chat_id).values(chat=data))
+
+    op.drop_table("chat_message")
@@ -0,0 +1,172 @@
+"""Add chat_search table
+
+Revision ID: f5b8c3d1a926
+Revises: e4f7a2c9b815
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f5b8c3d1a926"
+down_revision: Union[str, None] = "e4f7a2c9b815"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_search",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("chat_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("message_id", sa.Text(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.UniqueConstraint(
+            "chat_id", "message_id", name="uq_chat_search_chat_message"
+        ),
+        sa.Index("ix_chat_search_user_id", "user_id"),
+    )
+
+    dialect_name = op.get_bind().dialect.name
+
+    if dialect_name == "sqlite":
+        # Titles, then message contents (message rows override the JSON history)
+        op.execute(
+            """
+            INSERT INTO chat_search (chat_id, user_id, message_id, content)
+            SELECT id, user_id, '', title FROM chat
+            WHERE user_id NOT LIKE 'shared-%'
+            """
+        )
+        op.execute(
+            """
+            INSERT INTO chat_search (chat_id, user_id, message_id, content)
+            SELECT chat.id, chat.user_id, message.key,
+                json_extract(message.value, '$.content')
+            FROM chat, json_each(chat.chat, '$.history.messages') AS message
+            WHERE chat.user_id NOT LIKE 'shared-%'
+            AND json_type(message.value, '$.content') = 'text'
+            AND NOT EXISTS (
+                SELECT 1 FROM chat_message
+                WHERE chat_message.chat_id = chat.id
+                AND chat_message.message_id = message.key
+            )
+            """
+        )
+        op.execute(
+            """
+            INSERT INTO chat_search (chat_id, user_id, message_id, content)
+            SELECT chat.id, chat.user_id, chat_message.message_id,
+                json_extract(chat_message.data, '$.content')
+            FROM chat_message JOIN chat ON chat.id = chat_message.chat_id
+            WHERE chat.user_id NOT LIKE 'shared-%'
+            AND json_type(chat_message.data, '$.content') = 'text'
+            """
+        )
+
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE chat_search_fts USING fts5(
+                user_id,
+                content,
+                content='chat_search',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            """
+        )
+        op.execute("INSERT INTO chat_search_fts(chat_search_fts) VALUES ('rebuild')")
+
+        # Keep the FTS index in sync with chat_search
+        op.execute(
+            """
+            CREATE TRIGGER chat_search_ai AFTER INSERT ON chat_search BEGIN
+                INSERT INTO chat_search_fts(rowid, user_id, content)
+                VALUES (new.id, new.user_id, new.content);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER chat_search_ad AFTER DELETE ON chat_search BEGIN
+                INSERT INTO chat_search_fts(chat_search_fts, rowid, user_id, content)
+                VALUES ('delete', old.id, old.user_id, old.content);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER chat_search_au AFTER UPDATE ON chat_search BEGIN
+                INSERT INTO chat_search_fts(chat_search_fts, rowid, user_id, content)
+                VALUES ('delete', old.id, old.user_id, old.content);
+                INSERT INTO chat_search_fts(rowid, user_id, content)
+                VALUES (new.id, new.user_id, new.content);
+            END
+            """
+        )
+
+    elif dialect_name == "postgresql":
+        op.execute(
+            """
+            ALTER TABLE chat_search ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED
+            """
+        )
+        op.execute(
+            "CREATE INDEX ix_chat_search_vector ON chat_search USING GIN (search_vector)"
+        )
+
+        # PostgreSQL doesn't allow null bytes in text, skip chats containing them
+        op.execute(
+            """
+            INSERT INTO chat_search (chat_id, user_id, message_id, content)
+            SELECT id, user_id, '', title FROM chat
+            WHERE user_id NOT LIKE 'shared-%'
+            AND title::text NOT LIKE '%\\x00%'
+            """
+        )
+        op.execute(
+            """
+            INSERT INTO chat_search (chat_id, user_id, message_id, content)
+            SELECT chat.id, chat.user_id, message.key, message.value->>'content'
+            FROM chat, json_each(
+                CASE WHEN json_typeof(chat.chat->'history'->'messages') = 'object'
+                THEN chat.chat->'history'->'messages' END
+            ) AS message
+            WHERE chat.user_id NOT LIKE 'shared-%'
+            AND chat.chat::text NOT LIKE '%\\\\u0000%'
+            AND json_typeof(message.value->'content') = 'string'
+            AND NOT EXISTS (
+                SELECT 1 FROM chat_message
+                WHERE chat_message.chat_id = chat.id
+                AND chat_message.message_id = message.key
+            )
+            """
+        )
+        op.execute(
+            """
+            INSERT INTO chat_search (chat_id, user_id, message_id, content)
+            SELECT chat.id, chat.user_id, chat_message.message_id,
+                chat_message.data->>'content'
+            FROM chat_message JOIN chat ON chat.id = chat_message.chat_id
+            WHERE chat.user_id NOT LIKE 'shared-%'
+            AND chat_message.data::text NOT LIKE '%\\\\u0000%'
+            AND json_typeof(chat_message.data->'content') = 'string'
+            """
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS chat_search_au")
+        op.execute("DROP TRIGGER IF EXISTS chat_search_ad")
+        op.execute("DROP TRIGGER IF EXISTS chat_search_ai")
+        op.execute("DROP TABLE IF EXISTS chat_search_fts")
+
+    op.drop_table("chat_search")
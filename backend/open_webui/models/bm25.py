@@ -0,0 +1,340 @@
+import logging
+import time
+import uuid
+from typing import Iterator, Optional
+
+from sqlalchemy.orm import Session
+from open_webui.internal.db import Base, get_db_context
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    Column,
+    Text,
+    delete,
+    insert,
+    select,
+)
+from sqlalchemy.exc import IntegrityError
+
+log = logging.getLogger(__name__)
+
+# Changes kept per collection for workers to catch up with, those further
+# behind reload the whole index
+MAX_LOGGED_CHANGES = 1000
+
+####################
+# BM25 Index DB Schema
+####################
+
+
+class BM25Document(Base):
+    """
+    Term counts of the chunks of the collections searched with hybrid search,
+    from which their BM25 index is built without reading and tokenizing the
+    whole collection again. `metadata_terms` are the extra terms of the
+    enriched text, from the file name, title, headings and source.
+    """
+
+    __tablename__ = "bm25_document"
+
+    collection_name = Column(Text, primary_key=True)
+    vector_id = Column(Text, primary_key=True)
+
+    terms = Column(JSON, nullable=False)
+    metadata_terms = Column(JSON, nullable=True)
+
+
+class BM25Collection(Base):
+    """
+    Collections stored in `bm25_document`, `indexed` once all their chunks
+    have been copied from the vector database.
+    Every write increments the version and logs the ids it changed in
+    `bm25_change`, so workers bring their in-memory index up to date by
+    reloading only those. A collection copied again gets a new generation.
+    """
+
+    __tablename__ = "bm25_collection"
+
+    name = Column(Text, primary_key=True)
+    generation = Column(Text, nullable=False)
+    version = Column(BigInteger, nullable=False)
+    indexed = Column(Boolean, nullable=False)
+    created_at = Column(BigInteger, nullable=False)
+
+
+class BM25Change(Base):
+    __tablename__ = "bm25_change"
+
+    collection_name = Column(Text, primary_key=True)
+    version = Column(BigInteger, primary_key=True)
+
+    vector_ids = Column(JSON, nullable=False)
+    created_at = Column(BigInteger, nullable=False)
+
+
+class BM25DocumentsTable:
+    def get_collection(
+        self, collection_name: str, db: Optional[Session] = None
+    ) -> Optional[tuple[str, int]]:
+        """Return the generation and version of a collection, if it is indexed."""
+        with get_db_context(db) as db:
+            collection = db.get(BM25Collection, collection_name)
+            if collection is None or not collection.indexed:
+                return None
+            return collection.generation, collection.version
+
+    def start_copy(self, collection_name: str, db: Optional[Session] = None) -> int:
+        """
+        Log the writes to a collection from here on, while it is copied from
+        the vector database, and return its version.
+        """
+        with get_db_context(db) as db:
+            collection = db.get(BM25Collection, collection_name)
+            if collection is None:
+                try:
+                    collection = BM25Collection(
+                        name=collection_name,
+                        generation=str(uuid.uuid4()),
+                        version=0,
+                        indexed=False,
+                        created_at=int(time.time()),
+                    )
+                    db.add(collection)
+                    db.commit()
+                except IntegrityError:
+                    # Started by a concurrent query
+                    db.rollback()
+                    collection = db.get(BM25Collection, collection_name)
+            return collection.version if collection else 0
+
+    def finish_copy(
+        self,
+        collection_name: str,
+        version: int,
+        documents: dict[str, tuple[dict, Optional[dict]]],
+        db: Optional[Session] = None,
+    ) -> bool:
+        """
+        Store the documents of a collection read since `version` and mark it
+        indexed, in one transaction. Documents written since then are kept as
+        written. Returns False if the collection was deleted, or written to
+        more than the log keeps, while it was read.
+        """
+        with get_db_context(db) as db:
+            collection = db.execute(
+                select(BM25Collection)
+                .where(BM25Collection.name == collection_name)
+                .with_for_update()
+            ).scalar_one_or_none()
+            if collection is None or collection.indexed:
+                # Deleted, or copied by a concurrent query
+                db.rollback()
+                return collection is not None
+
+            changes = self._get_changed_ids(db, collection_name, version)
+            if changes is None:
+                db.rollback()
+                return False
+
+            _, changed_ids = changes
+            ids = [vector_id for vector_id in documents if vector_id not in changed_ids]
+            self._delete_rows(db, collection_name, ids)
+            if ids:
+                db.execute(
+                    insert(BM25Document),
+                    [
+                        {
+                            "collection_name": collection_name,
+                            "vector_id": vector_id,
+                            "terms": documents[vector_id][0],
+                            "metadata_terms": documents[vector_id][1],
+                        }
+                        for vector_id in ids
+                    ],
+                )
+            collection.indexed = True
+            db.commit()
+            return True
+
+    def _log_change(
+        self, db: Session, collection_name: str, ids: list[str]
+    ) -> Optional[tuple[str, int, int]]:
+        # Locked until the write commits, so concurrent writes get consecutive
+        # versions
+        collection = db.execute(
+            select(BM25Collection)
+            .where(BM25Collection.name == collection_name)
+            .with_for_update()
+        ).scalar_one_or_none()
+        if collection is None:
+            return None
+
+        version = collection.version
+        collection.version = version + 1
+        db.add(
+            BM25Change(
+                collection_name=collection_name,
+                version=collection.version,
+                vector_ids=ids,
+                created_at=int(time.time()),
+            )
+        )
+        db.execute(
+            delete(BM25Change).where(
+                BM25Change.collection_name == collection_name,
+                BM25Change.version <= collection.version - MAX_LOGGED_CHANGES,
+            )
+        )
+        return collection.generation, version, collection.version
+
+    def _delete_rows(self, db: Session, collection_name: str, ids: list[str]):
+        for i in range(0, len(ids), 500):
+            db.execute(
+                delete(BM25Document).where(
+                    BM25Document.collection_name == collection_name,
+                    BM25Document.vector_id.in_(ids[i : i + 500]),
+                )
+            )
+
+    def insert_documents(
+        self,
+        collection_name: str,
+        documents: dict[str, tuple[dict, Optional[dict]]],
+        db: Optional[Session] = None,
+    ) -> Optional[tuple[str, int, int]]:
+        """
+        Store the term and metadata term counts of the documents of a stored
+        collection by id, replacing existing ones. Returns the generation and
+        the previous and new versions, or None if the collection isn't stored.
+        """
+        if not documents:
+            return None
+
+        with get_db_context(db) as db:
+            ids = list(documents)
+            versions = self._log_change(db, collection_name, ids)
+            if versions is None:
+                db.rollback()
+                return None
+
+            self._delete_rows(db, collection_name, ids)
+            db.execute(
+                insert(BM25Document),
+                [
+                    {
+                        "collection_name": collection_name,
+                        "vector_id": vector_id,
+                        "terms": terms,
+                        "metadata_terms": metadata_terms,
+                    }
+                    for vector_id, (terms, metadata_terms) in documents.items()
+                ],
+            )
+            db.commit()
+            return versions
+
+    def delete_by_ids(
+        self, collection_name: str, ids: list[str], db: Optional[Session] = None
+    ) -> Optional[tuple[str, int, int]]:
+        if not ids:
+            return None
+
+        with get_db_context(db) as db:
+            ids = list(dict.fromkeys(ids))
+            versions = self._log_change(db, collection_name, ids)
+            if versions is None:
+                db.rollback()
+                return None
+
+            self._delete_rows(db, collection_name, ids)
+            db.commit()
+            return versions
+
+    def _get_changed_ids(
+        self, db: Session, collection_name: str, version: int
+    ) -> Optional[tuple[int, set[str]]]:
+        ids = set()
+        for change_version, vector_ids in db.execute(
+            select(BM25Change.version, BM25Change.vector_ids)
+            .where(
+                BM25Change.collection_name == collection_name,
+                BM25Change.version > version,
+            )
+            .order_by(BM25Change.version)
+        ):
+            if change_version != version + 1:
+                return None
+            version = change_version
+            ids.update(vector_ids)
+        return version, ids
+
+    def get_changed_ids(
+        self, collection_name: str, version: int, db: Optional[Session] = None
+    ) -> Optional[tuple[int, set[str]]]:
+        """
+        Return the latest version of a collection and the ids written since
+        `version`, or None if the log no longer goes back that far.
+        """
+        with get_db_context(db) as db:
+            return self._get_changed_ids(db, collection_name, version)
+
+    def get_documents(
+        self, collection_name: str, db: Optional[Session] = None
+    ) -> Iterator[tuple[str, dict, Optional[dict]]]:
+        with get_db_context(db) as db:
+            yield from db.execute(
+                select(
+                    BM25Document.vector_id,
+                    BM25Document.terms,
+                    BM25Document.metadata_terms,
+                )
+                .where(BM25Document.collection_name == collection_name)
+                .execution_options(yield_per=1000)
+            )
+
+    def get_documents_by_ids(
+        self, collection_name: str, ids: list[str], db: Optional[Session] = None
+    ) -> dict[str, tuple[dict, Optional[dict]]]:
+        result = {}
+        with get_db_context(db) as db:
+            for i in range(0, len(ids), 500):
+                for vector_id, terms, metadata_terms in db.execute(
+                    select(
+                        BM25Document.vector_id,
+                        BM25Document.terms,
+                        BM25Document.metadata_terms,
+                    ).where(
+                        BM25Document.collection_name == collection_name,
+                        BM25Document.vector_id.in_(ids[i : i + 500]),
+                    )
+                ):
+                    result[vector_id] = (terms, metadata_terms)
+        return result
+
+    def delete_collection(
+        self, collection_name: str, db: Optional[Session] = None
+    ) -> None:
+        with get_db_context(db) as db:
+            db.execute(
+                delete(BM25Document).where(
+                    BM25Document.collection_name == collection_name
+                )
+            )
+            db.execute(
+                delete(BM25Change).where(BM25Change.collection_name == collection_name)
+            )
+            db.execute(
+                delete(BM25Collection).where(BM25Collection.name == collection_name)
+            )
+            db.commit()
+
+    def reset(self, db: Optional[Session] = None) -> None:
+        with get_db_context(db) as db:
+            db.execute(delete(BM25Document))
+            db.execute(delete(BM25Change))
+            db.execute(delete(BM25Collection))
+            db.commit()
+
+
+BM25Documents = BM25DocumentsTable()
@@ -1,5 +1,6 @@
 import logging
 import json
+import re
 import time
 import uuid
 from typing import Optional
@@ -15,7 +16,9 @@ from sqlalchemy import (
     BigInteger,
     Boolean,
     Column,
+    Float,
     ForeignKey,
+    Integer,
     String,
     Text,
     JSON,
@@ -32,6 +35,11 @@ from sqlalchemy.sql.expression import bindparam
 
 log = logging.getLogger(__name__)
 
+# Scripts written without spaces between words (Han, kana, Hangul)
+CJK_PATTERN = re.compile(
+    r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]"
+)
+
 
 class Chat(Base):
     __tablename__ = "chat"
@@ -117,6 +125,50 @@ class ChatFileModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ChatMessage(Base):
+    """
+    Per-message storage for chat histories.
+
+    Rows overlay `chat.history.messages`: streamed updates write a single row
+    instead of rewriting the whole `chat.chat` JSON document, and readers get
+    the merged history. Full chat writes keep existing rows in sync.
+    """
+
+    __tablename__ = "chat_message"
+
+    chat_id = Column(Text, ForeignKey("chat.id", ondelete="CASCADE"), primary_key=True)
+    message_id = Column(Text, primary_key=True)
+
+    data = Column(JSON, nullable=False)
+
+    created_at = Column(BigInteger, nullable=False)
+    updated_at = Column(BigInteger, nullable=False)
+
+
+class ChatSearch(Base):
+    """
+    Full-text search index over chat titles and message contents.
+
+    One row per message (and one with an empty message_id for the title). The
+    rows are indexed by the `chat_search_fts` FTS5 table (user_id, content) on
+    SQLite and by the `search_vector` tsvector column on PostgreSQL, both
+    created in migrations.
+    """
+
+    __tablename__ = "chat_search"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chat_id = Column(Text, nullable=False)
+    user_id = Column(Text, nullable=False)
+    message_id = Column(Text, nullable=False)
+    content = Column(Text)
+
+    __table_args__ = (
+        UniqueConstraint("chat_id", "message_id", name="uq_chat_search_chat_message"),
+        Index("ix_chat_search_user_id", "user_id"),
+    )
+
+
 ####################
 # Forms
 ####################
@@ -281,6 +333,197 @@ class ChatTable:
 
         return changed
 
+    def _get_message_rows_by_chat_ids(
+        self, db: Session, chat_ids: list[str], batch_size: int = 500
+    ) -> dict[str, dict[str, dict]]:
+        """Return {chat_id: {message_id: message}} for chats with message rows."""
+        messages_by_chat_id = {}
+        for i in range(0, len(chat_ids), batch_size):
+            rows = (
+                db.query(ChatMessage)
+                .filter(ChatMessage.chat_id.in_(chat_ids[i : i + batch_size]))
+                .all()
+            )
+            for row in rows:
+                messages_by_chat_id.setdefault(row.chat_id, {})[
+                    row.message_id
+                ] = row.data
+        return messages_by_chat_id
+
+    def _to_chat_model(self, chat_item, messages: Optional[dict] = None) -> ChatModel:
+        """
+        Build a ChatModel, overlaying message rows onto `chat.history.messages`
+        so legacy readers see the full history.
+        """
+        chat = ChatModel.model_validate(chat_item)
+        if messages:
+            history = chat.chat.get("history", {})
+            chat.chat = {
+                **chat.chat,
+                "history": {
+                    **history,
+                    "messages": {**history.get("messages", {}), **messages},
+                },
+            }
+        return chat
+
+    def _to_chat_models(self, db: Session, chat_items) -> list[ChatModel]:
+        chat_items = list(chat_items)
+        messages_by_chat_id = self._get_message_rows_by_chat_ids(
+            db, [chat_item.id for chat_item in chat_items]
+        )
+        return [
+            self._to_chat_model(chat_item, messages_by_chat_id.get(chat_item.id))
+            for chat_item in chat_items
+        ]
+
+    def _delete_chat_rows(self, db: Session, chat_ids) -> None:
+        """Delete the message and search rows belonging to chats."""
+        db.query(ChatMessage).filter(ChatMessage.chat_id.in_(chat_ids)).delete(
+            synchronize_session=False
+        )
+        db.query(ChatSearch).filter(ChatSearch.chat_id.in_(chat_ids)).delete(
+            synchronize_session=False
+        )
+
+    def _get_message_search_text(self, message: dict) -> str:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(
+                item.get("text", "")
+                for item in content
+                if isinstance(item, dict) and item.get("type") == "text"
+            )
+        return sanitize_text_for_db(content) if isinstance(content, str) else ""
+
+    def _index_chat(
+        self, db: Session, id: str, user_id: str, title: str, messages: dict
+    ) -> None:
+        """Sync the chat_search rows of a chat with its title and messages."""
+        if user_id.startswith("shared-"):
+            return
+
+        documents = {"": sanitize_text_for_db(title or "")}
+        for message_id, message in (messages or {}).items():
+            documents[message_id] = self._get_message_search_text(message)
+
+        rows = {
+            row.message_id: row
+            for row in db.query(ChatSearch).filter_by(chat_id=id).all()
+        }
+
+        for message_id, row in rows.items():
+            if message_id not in documents:
+                db.delete(row)
+            elif row.content != documents[message_id]:
+                row.content = documents[message_id]
+
+        for message_id, content in documents.items():
+            if message_id not in rows:
+                db.add(
+                    ChatSearch(
+                        chat_id=id,
+                        user_id=user_id,
+                        message_id=message_id,
+                        content=content,
+                    )
+                )
+
+    def _index_message(
+        self, db: Session, id: str, message_id: str, message: dict
+    ) -> None:
+        content = self._get_message_search_text(message)
+
+        row = db.query(ChatSearch).filter_by(chat_id=id, message_id=message_id).first()
+        if row is None:
+            user_id = db.query(Chat.user_id).filter_by(id=id).scalar()
+            if user_id is None or user_id.startswith("shared-"):
+                return
+
+            db.add(
+                ChatSearch(
+                    chat_id=id, user_id=user_id, message_id=message_id, content=content
+                )
+            )
+        elif row.content != content:
+            row.content = content
+
+    def _get_search_matches_subquery(
+        self, db: Session, user_id: str, search_text_words: list[str]
+    ):
+        """
+        Build a (chat_id, rank) subquery of the user's chats matching every
+        search word as a prefix, ordered best first by ascending rank.
+
+        Neither index splits CJK text into words, so queries containing it, or
+        without any word characters, fall back to a substring match of the
+        whole search text against the indexed contents.
+        """
+        search_text = " ".join(search_text_words)
+        tokens = re.findall(r"\w+", search_text)
+
+        dialect_name = db.bind.dialect.name
+        if not tokens or CJK_PATTERN.search(search_text):
+            search_query = "%{}%".format(
+                search_text.replace("\\", "\\\\")
+                .replace("%", "\\%")
+                .replace("_", "\\_")
+            )
+            sql = """
+                SELECT chat_search.chat_id AS chat_id, 0.0 AS rank
+                FROM chat_search
+                WHERE chat_search.user_id = :search_user_id
+                AND LOWER(chat_search.content) LIKE :search_query ESCAPE '\\'
+                GROUP BY chat_search.chat_id
+            """
+        elif dialect_name == "sqlite":
+            # Scope the match to the user's rows inside the FTS index itself
+            search_query = 'user_id : "{}" AND content : ({})'.format(
+                user_id.replace('"', '""'),
+                " AND ".join(f'"{token}"*' for token in tokens),
+            )
+            sql = """
+                SELECT chat_search.chat_id AS chat_id, MIN(fts.rank) AS rank
+                FROM (
+                    SELECT rowid, rank FROM chat_search_fts
+                    WHERE chat_search_fts MATCH :search_query
+                ) AS fts
+                JOIN chat_search ON chat_search.id = fts.rowid
+                WHERE chat_search.user_id = :search_user_id
+                GROUP BY chat_search.chat_id
+            """
+        elif dialect_name == "postgresql":
+            search_query = " & ".join(f"{token}:*" for token in tokens)
+            sql = """
+                SELECT chat_search.chat_id AS chat_id, -MAX(ts_rank(search_vector, query)) AS rank
+                FROM chat_search, to_tsquery('simple', :search_query) AS query
+                WHERE search_vector @@ query
+                AND chat_search.user_id = :search_user_id
+                GROUP BY chat_search.chat_id
+            """
+        else:
+            raise NotImplementedError(f"Unsupported dialect: {dialect_name}")
+
+        return (
+            text(sql)
+            .bindparams(search_query=search_query, search_user_id=user_id)
+            .columns(chat_id=Text, rank=Float)
+            .subquery("chat_search_matches")
+        )
+
+    def _sync_message_rows(self, db: Session, id: str, chat: dict) -> None:
+        """Bring existing message rows in line with a full history write."""
+        messages = chat.get("history", {}).get("messages", {})
+        now = int(time.time())
+
+        for row in db.query(ChatMessage).filter_by(chat_id=id).all():
+            message = messages.get(row.message_id)
+            if message is None:
+                db.delete(row)
+            elif message != row.data:
+                row.data = message
+                row.updated_at = now
+
     def insert_new_chat(
         self, user_id: str, form_data: ChatForm, db: Optional[Session] = None
     ) -> Optional[ChatModel]:
@@ -304,6 +547,13 @@ class ChatTable:
 
             chat_item = Chat(**chat.model_dump())
             db.add(chat_item)
+            self._index_chat(
+                db,
+                chat.id,
+                chat.user_id,
+                chat.title,
+                chat.chat.get("history", {}).get("messages", {}),
+            )
             db.commit()
             db.refresh(chat_item)
             return ChatModel.model_validate(chat_item) if chat_item else None
@@ -345,6 +595,13 @@ class ChatTable:
             for form_data in chat_import_forms:
                 chat = self._chat_import_form_to_chat_model(user_id, form_data)
                 chats.append(Chat(**chat.model_dump()))
+                self._index_chat(
+                    db,
+                    chat.id,
+                    chat.user_id,
+                    chat.title,
+                    chat.chat.get("history", {}).get("messages", {}),
+                )
 
             db.add_all(chats)
             db.commit()
@@ -364,6 +621,14 @@ class ChatTable:
                 )
 
                 chat_item.updated_at = int(time.time())
+                self._sync_message_rows(db, id, chat_item.chat)
+                self._index_chat(
+                    db,
+                    id,
+                    chat_item.user_id,
+                    chat_item.title,
+                    chat_item.chat.get("history", {}).get("messages", {}),
+                )
 
                 db.commit()
                 db.refresh(chat_item)
@@ -417,79 +682,122 @@ class ChatTable:
         return chat.chat.get("history", {}).get("messages", {}) or {}
 
     def get_message_by_id_and_message_id(
-        self, id: str, message_id: str
+        self, id: str, message_id: str, db: Optional[Session] = None
     ) -> Optional[dict]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        with get_db_context(db) as db:
+            row = db.get(ChatMessage, (id, message_id))
+            if row is not None:
+                return row.data
 
-        return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
+            chat = self.get_chat_by_id(id, db=db)
+            if chat is None:
+                return None
 
-    def upsert_message_to_chat_by_id_and_message_id(
-        self, id: str, message_id: str, message: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+            return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
+
+    def upsert_message_by_id_and_message_id(
+        self, id: str, message_id: str, message: dict, db: Optional[Session] = None
+    ) -> Optional[dict]:
+        """
+        Merge `message` into a single chat message and return the merged message.
 
+        Updates to an existing message only touch its `chat_message` row (and
+        the chat's `updated_at`), so streamed updates do not rewrite the whole
+        chat document. New messages go through a full history write so that
+        `history.currentId` follows them.
+        """
         # Sanitize message content for null characters before upserting
         if isinstance(message.get("content"), str):
             message["content"] = sanitize_text_for_db(message["content"])
 
-        chat = chat.chat
-        history = chat.get("history", {})
+        try:
+            with get_db_context(db) as db:
+                now = int(time.time())
 
-        if message_id in history.get("messages", {}):
-            history["messages"][message_id] = {
-                **history["messages"][message_id],
-                **message,
-            }
-        else:
-            history["messages"][message_id] = message
+                row = db.get(ChatMessage, (id, message_id))
+                if row is not None:
+                    row.data = {**row.data, **message}
+                    row.updated_at = now
+                    self._index_message(db, id, message_id, row.data)
+                    db.query(Chat).filter_by(id=id).update({"updated_at": now})
+                    db.commit()
+                    return row.data
 
-        history["currentId"] = message_id
+                chat = self.get_chat_by_id(id, db=db)
+                if chat is None:
+                    return None
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+                chat = chat.chat
+                history = chat.get("history", {})
+                messages = history.get("messages", {})
+
+                if message_id in messages:
+                    data = {**messages[message_id], **message}
+                    db.add(
+                        ChatMessage(
+                            chat_id=id,
+                            message_id=message_id,
+                            data=data,
+                            created_at=now,
+                            updated_at=now,
+                        )
+                    )
+                    self._index_message(db, id, message_id, data)
+                    db.query(Chat).filter_by(id=id).update({"updated_at": now})
+                    db.commit()
+                    return data
 
-    def add_message_status_to_chat_by_id_and_message_id(
-        self, id: str, message_id: str, status: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
+                history["messages"] = {**messages, message_id: message}
+                history["currentId"] = message_id
+
+                chat["history"] = history
+                if self.update_chat_by_id(id, chat, db=db) is None:
+                    return None
+                return message
+        except Exception as e:
+            log.exception(f"Error upserting message {message_id} of chat {id}: {e}")
             return None
 
-        chat = chat.chat
-        history = chat.get("history", {})
+    def upsert_message_to_chat_by_id_and_message_id(
+        self, id: str, message_id: str, message: dict, db: Optional[Session] = None
+    ) -> Optional[ChatModel]:
+        if (
+            self.upsert_message_by_id_and_message_id(id, message_id, message, db=db)
+            is None
+        ):
+            return None
+        return self.get_chat_by_id(id, db=db)
 
-        if message_id in history.get("messages", {}):
-            status_history = history["messages"][message_id].get("statusHistory", [])
-            status_history.append(status)
-            history["messages"][message_id]["statusHistory"] = status_history
+    def add_message_status_to_chat_by_id_and_message_id(
+        self, id: str, message_id: str, status: dict, db: Optional[Session] = None
+    ) -> Optional[dict]:
+        message = self.get_message_by_id_and_message_id(id, message_id, db=db)
+        if not message:
+            return None
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+        return self.upsert_message_by_id_and_message_id(
+            id,
+            message_id,
+            {"statusHistory": [*message.get("statusHistory", []), status]},
+            db=db,
+        )
 
     def add_message_files_by_id_and_message_id(
         self, id: str, message_id: str, files: list[dict]
     ) -> list[dict]:
         with get_db_context() as db:
-            chat = self.get_chat_by_id(id, db=db)
-            if chat is None:
+            message = self.get_message_by_id_and_message_id(id, message_id, db=db)
+            if message is None:
                 return None
 
-            chat = chat.chat
-            history = chat.get("history", {})
-
             message_files = []
 
-            if message_id in history.get("messages", {}):
-                message_files = history["messages"][message_id].get("files", [])
-                message_files = message_files + files
-                history["messages"][message_id]["files"] = message_files
+            if message:
+                message_files = message.get("files", []) + files
+                self.upsert_message_by_id_and_message_id(
+                    id, message_id, {"files": message_files}, db=db
+                )
 
-            chat["history"] = history
-            self.update_chat_by_id(id, chat, db=db)
             return message_files
 
     def insert_shared_chat_by_chat_id(
@@ -510,7 +818,7 @@ class ChatTable:
                     "id": str(uuid.uuid4()),
                     "user_id": f"shared-{chat_id}",
                     "title": chat.title,
-                    "chat": chat.chat,
+                    "chat": self._to_chat_models(db, [chat])[0].chat,
                     "meta": chat.meta,
                     "pinned": chat.pinned,
                     "folder_id": chat.folder_id,
@@ -546,7 +854,7 @@ class ChatTable:
                     return self.insert_shared_chat_by_chat_id(chat_id, db=db)
 
                 shared_chat.title = chat.title
-                shared_chat.chat = chat.chat
+                shared_chat.chat = self._to_chat_models(db, [chat])[0].chat
                 shared_chat.meta = chat.meta
                 shared_chat.pinned = chat.pinned
                 shared_chat.folder_id = chat.folder_id
@@ -590,7 +898,7 @@ class ChatTable:
                 chat.share_id = share_id
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_models(db, [chat])[0]
         except Exception:
             return None
 
@@ -604,7 +912,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_models(db, [chat])[0]
         except Exception:
             return None
 
@@ -619,7 +927,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_models(db, [chat])[0]
         except Exception:
             return None
 
@@ -673,7 +981,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chat_list_by_user_id(
         self,
@@ -713,7 +1021,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chat_title_id_list_by_user_id(
         self,
@@ -776,7 +1084,7 @@ class ChatTable:
                 .order_by(Chat.updated_at.desc())
                 .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chat_by_id(
         self, id: str, db: Optional[Session] = None
@@ -791,7 +1099,7 @@ class ChatTable:
                     db.commit()
                     db.refresh(chat_item)
 
-                return ChatModel.model_validate(chat_item)
+                return self._to_chat_models(db, [chat_item])[0]
         except Exception:
             return None
 
@@ -817,7 +1125,7 @@ class ChatTable:
         try:
             with get_db_context(db) as db:
                 chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
-                return ChatModel.model_validate(chat)
+                return self._to_chat_models(db, [chat])[0]
         except Exception:
             return None
 
@@ -830,7 +1138,7 @@ class ChatTable:
                 # .limit(limit).offset(skip)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chats_by_user_id(
         self,
@@ -873,7 +1181,7 @@ class ChatTable:
 
             return ChatListResponse(
                 **{
-                    "items": [ChatModel.model_validate(chat) for chat in all_chats],
+                    "items": self._to_chat_models(db, all_chats),
                     "total": total,
                 }
             )
@@ -887,7 +1195,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, pinned=True, archived=False)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_archived_chats_by_user_id(
         self, user_id: str, db: Optional[Session] = None
@@ -898,7 +1206,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, archived=True)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chats_by_user_id_and_search_text(
         self,
@@ -910,7 +1218,7 @@ class ChatTable:
         db: Optional[Session] = None,
     ) -> list[ChatModel]:
         """
-        Filters chats based on a search query using Python, allowing pagination using skip and limit.
+        Filters chats based on a search query using the chat_search index, allowing pagination using skip and limit.
         """
         search_text = sanitize_text_for_db(search_text).lower().strip()
 
@@ -991,26 +1299,21 @@ class ChatTable:
             if folder_ids:
                 query = query.filter(Chat.folder_id.in_(folder_ids))
 
-            query = query.order_by(Chat.updated_at.desc())
-
             # Check if the database dialect is either 'sqlite' or 'postgresql'
             dialect_name = db.bind.dialect.name
-            if dialect_name == "sqlite":
-                # SQLite case: using JSON1 extension for JSON searching
-                sqlite_content_sql = (
-                    "EXISTS ("
-                    "    SELECT 1 "
-                    "    FROM json_each(Chat.chat, '$.messages') AS message "
-                    "    WHERE LOWER(message.value->>'content') LIKE '%' || :content_key || '%'"
-                    ")"
+
+            # Titles and message contents are matched through the chat_search index
+            if search_text:
+                matches = self._get_search_matches_subquery(
+                    db, user_id, search_text_words
                 )
-                sqlite_content_clause = text(sqlite_content_sql)
-                query = query.filter(
-                    or_(
-                        Chat.title.ilike(bindparam("title_key")), sqlite_content_clause
-                    ).params(title_key=f"%{search_text}%", content_key=search_text)
+                query = query.join(matches, matches.c.chat_id == Chat.id).order_by(
+                    matches.c.rank.asc(), Chat.updated_at.desc()
                 )
+            else:
+                query = query.order_by(Chat.updated_at.desc())
 
+            if dialect_name == "sqlite":
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
                     query = query.filter(
@@ -1042,33 +1345,6 @@ class ChatTable:
                     )
 
             elif dialect_name == "postgresql":
-                # PostgreSQL doesn't allow null bytes in text. We filter those out by checking
-                # the JSON representation for \u0000 before attempting text extraction
-
-                # Safety filter: JSON field must not contain \u0000
-                query = query.filter(text("Chat.chat::text NOT LIKE '%\\\\u0000%'"))
-
-                # Safety filter: title must not contain actual null bytes
-                query = query.filter(text("Chat.title::text NOT LIKE '%\\x00%'"))
-
-                postgres_content_sql = """
-                EXISTS (
-                    SELECT 1
-                    FROM json_array_elements(Chat.chat->'messages') AS message
-                    WHERE json_typeof(message->'content') = 'string'
-                    AND LOWER(message->>'content') LIKE '%' || :content_key || '%'
-                )
-                """
-
-                postgres_content_clause = text(postgres_content_sql)
-
-                query = query.filter(
-                    or_(
-                        Chat.title.ilike(bindparam("title_key")),
-                        postgres_content_clause,
-                    )
-                ).params(title_key=f"%{search_text}%", content_key=search_text.lower())
-
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
                     query = query.filter(
@@ -1109,7 +1385,7 @@ class ChatTable:
             log.info(f"The number of chats: {len(all_chats)}")
 
             # Validate and return chats
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chats_by_folder_id_and_user_id(
         self,
@@ -1132,7 +1408,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chats_by_folder_ids_and_user_id(
         self, folder_ids: list[str], user_id: str, db: Optional[Session] = None
@@ -1147,7 +1423,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def update_chat_folder_id_by_id_and_user_id(
         self, id: str, user_id: str, folder_id: str, db: Optional[Session] = None
@@ -1160,7 +1436,7 @@ class ChatTable:
                 chat.pinned = False
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_models(db, [chat])[0]
         except Exception:
             return None
 
@@ -1206,7 +1482,7 @@ class ChatTable:
 
             all_chats = query.all()
             log.debug(f"all_chats: {all_chats}")
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def add_chat_tag_by_id_and_user_id_and_tag_name(
         self, id: str, user_id: str, tag_name: str, db: Optional[Session] = None
@@ -1227,7 +1503,7 @@ class ChatTable:
 
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_models(db, [chat])[0]
         except Exception:
             return None
 
@@ -1319,6 +1595,7 @@ class ChatTable:
     def delete_chat_by_id(self, id: str, db: Optional[Session] = None) -> bool:
         try:
             with get_db_context(db) as db:
+                self._delete_chat_rows(db, [id])
                 db.query(Chat).filter_by(id=id).delete()
                 db.commit()
 
@@ -1331,7 +1608,8 @@ class ChatTable:
     ) -> bool:
         try:
             with get_db_context(db) as db:
-                db.query(Chat).filter_by(id=id, user_id=user_id).delete()
+                if db.query(Chat).filter_by(id=id, user_id=user_id).delete():
+                    self._delete_chat_rows(db, [id])
                 db.commit()
 
                 return True and self.delete_shared_chat_by_chat_id(id, db=db)
@@ -1345,6 +1623,9 @@ class ChatTable:
             with get_db_context(db) as db:
                 self.delete_shared_chats_by_user_id(user_id, db=db)
 
+                self._delete_chat_rows(
+                    db, select(Chat.id).where(Chat.user_id == user_id)
+                )
                 db.query(Chat).filter_by(user_id=user_id).delete()
                 db.commit()
 
@@ -1357,6 +1638,12 @@ class ChatTable:
     ) -> bool:
         try:
             with get_db_context(db) as db:
+                self._delete_chat_rows(
+                    db,
+                    select(Chat.id).where(
+                        Chat.user_id == user_id, Chat.folder_id == folder_id
+                    ),
+                )
                 db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id).delete()
                 db.commit()
 
@@ -1492,7 +1779,88 @@ class ChatTable:
                 .all()
             )
 
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
+
+    def reindex_search(self, batch_size: int = 100) -> int:
+        """Rebuild the chat_search rows of every chat. Returns the number of chats."""
+        count = 0
+        last_id = ""
+
+        while True:
+            with get_db() as db:
+                chat_items = (
+                    db.query(Chat)
+                    .filter(Chat.id > last_id, ~Chat.user_id.like("shared-%"))
+                    .order_by(Chat.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not chat_items:
+                    break
+
+                for chat in self._to_chat_models(db, chat_items):
+                    self._index_chat(
+                        db,
+                        chat.id,
+                        chat.user_id,
+                        chat.title,
+                        chat.chat.get("history", {}).get("messages", {}),
+                    )
+
+                db.commit()
+                count += len(chat_items)
+                last_id = chat_items[-1].id
+                log.info(f"Reindexed {count} chats")
+
+        return count
+
+    def backfill_message_rows(self, batch_size: int = 100) -> int:
+        """
+        Create `chat_message` rows for messages that only exist in the
+        `chat.chat` JSON history, so later message updates never need to load
+        the full chat document. Returns the number of rows created.
+        """
+        created = 0
+        last_id = ""
+
+        while True:
+            with get_db() as db:
+                chats = (
+                    db.query(Chat.id, Chat.chat)
+                    .filter(Chat.id > last_id, ~Chat.user_id.like("shared-%"))
+                    .order_by(Chat.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not chats:
+                    break
+
+                existing = self._get_message_rows_by_chat_ids(
+                    db, [chat_id for chat_id, _ in chats]
+                )
+                now = int(time.time())
+
+                for chat_id, chat in chats:
+                    messages = (chat or {}).get("history", {}).get("messages", {})
+                    for message_id, message in messages.items():
+                        if message_id in existing.get(chat_id, {}):
+                            continue
+                        db.add(
+                            ChatMessage(
+                                chat_id=chat_id,
+                                message_id=message_id,
+                                data=self._clean_null_bytes(message),
+                                created_at=now,
+                                updated_at=now,
+                            )
+                        )
+                        created += 1
+
+                db.commit()
+                last_id = chats[-1][0]
+                log.info(f"Backfilled chat messages up to chat {last_id}")
+
+        return created
 
 
 Chats = ChatTable()
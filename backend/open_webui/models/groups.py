@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from open_webui.internal.db import Base, JSONField, get_db, get_db_context
 
 from open_webui.models.files import FileMetadataResponse
+from open_webui.utils.model_access import MODEL_ACCESS_CACHE
 
 
 from pydantic import BaseModel, ConfigDict
@@ -307,6 +308,7 @@ class GroupTable:
 
             db.add_all(new_members)
             db.commit()
+            MODEL_ACCESS_CACHE.invalidate()
 
     def get_group_member_count_by_id(
         self, id: str, db: Optional[Session] = None
@@ -345,6 +347,7 @@ class GroupTable:
             with get_db_context(db) as db:
                 db.query(Group).filter_by(id=id).delete()
                 db.commit()
+                MODEL_ACCESS_CACHE.invalidate()
                 return True
         except Exception:
             return False
@@ -354,6 +357,7 @@ class GroupTable:
             try:
                 db.query(Group).delete()
                 db.commit()
+                MODEL_ACCESS_CACHE.invalidate()
 
                 return True
             except Exception:
@@ -383,6 +387,7 @@ class GroupTable:
                     )
 
                 db.commit()
+                MODEL_ACCESS_CACHE.invalidate()
                 return True
 
             except Exception:
@@ -476,6 +481,8 @@ class GroupTable:
                     )
 
                 db.commit()
+                if groups_to_add or groups_to_remove:
+                    MODEL_ACCESS_CACHE.invalidate()
                 return True
 
             except Exception as e:
@@ -516,6 +523,7 @@ class GroupTable:
 
                 group.updated_at = now
                 db.commit()
+                MODEL_ACCESS_CACHE.invalidate()
                 db.refresh(group)
 
                 return GroupModel.model_validate(group)
@@ -549,6 +557,7 @@ class GroupTable:
                 group.updated_at = int(time.time())
 
                 db.commit()
+                MODEL_ACCESS_CACHE.invalidate()
                 db.refresh(group)
                 return GroupModel.model_validate(group)
 
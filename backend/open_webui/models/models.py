@@ -19,6 +19,7 @@ from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
 
 
 from open_webui.utils.access_control import has_access
+from open_webui.utils.model_access import MODEL_ACCESS_CACHE
 
 
 log = logging.getLogger(__name__)
@@ -175,6 +176,7 @@ class ModelsTable:
                 result = Model(**model.model_dump())
                 db.add(result)
                 db.commit()
+                MODEL_ACCESS_CACHE.invalidate()
                 db.refresh(result)
 
                 if result:
@@ -400,6 +402,7 @@ class ModelsTable:
                     }
                 )
                 db.commit()
+                MODEL_ACCESS_CACHE.invalidate()
 
                 return self.get_model_by_id(id, db=db)
             except Exception:
@@ -415,6 +418,7 @@ class ModelsTable:
                 result = db.query(Model).filter_by(id=id).update(data)
 
                 db.commit()
+                MODEL_ACCESS_CACHE.invalidate()
 
                 model = db.get(Model, id)
                 db.refresh(model)
@@ -428,6 +432,7 @@ class ModelsTable:
             with get_db_context(db) as db:
                 db.query(Model).filter_by(id=id).delete()
                 db.commit()
+                MODEL_ACCESS_CACHE.invalidate()
 
                 return True
         except Exception:
@@ -438,6 +443,7 @@ class ModelsTable:
             with get_db_context(db) as db:
                 db.query(Model).delete()
                 db.commit()
+                MODEL_ACCESS_CACHE.invalidate()
 
                 return True
         except Exception:
@@ -481,6 +487,7 @@ class ModelsTable:
                         db.delete(model)
 
                 db.commit()
+                MODEL_ACCESS_CACHE.invalidate()
 
                 return [
                     ModelModel.model_validate(model) for model in db.query(Model).all()
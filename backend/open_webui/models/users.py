@@ -10,6 +10,7 @@ from open_webui.env import DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL
 from open_webui.models.chats import Chats
 from open_webui.models.groups import Groups, GroupMember
 
+from open_webui.utils.auth_cache import AUTH_CACHE
 from open_webui.utils.misc import throttle
 
 
@@ -514,6 +515,7 @@ class UsersTable:
             with get_db_context(db) as db:
                 db.query(User).filter_by(id=id).update({"role": role})
                 db.commit()
+                AUTH_CACHE.invalidate_user(id)
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
@@ -528,6 +530,7 @@ class UsersTable:
                     {"profile_image_url": profile_image_url}
                 )
                 db.commit()
+                AUTH_CACHE.invalidate_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -550,6 +553,27 @@ class UsersTable:
         except Exception:
             return None
 
+    def update_last_active_by_ids(
+        self, last_active: dict[str, int], db: Optional[Session] = None
+    ) -> bool:
+        """Set the last active times of several users, a batch per UPDATE."""
+        try:
+            with get_db_context(db) as db:
+                user_ids = list(last_active)
+                for i in range(0, len(user_ids), 500):
+                    batch = {
+                        user_id: last_active[user_id]
+                        for user_id in user_ids[i : i + 500]
+                    }
+                    db.query(User).filter(User.id.in_(list(batch))).update(
+                        {"last_active_at": case(batch, value=User.id)},
+                        synchronize_session=False,
+                    )
+                db.commit()
+                return True
+        except Exception:
+            return False
+
     def update_user_oauth_by_id(
         self, id: str, provider: str, sub: str, db: Optional[Session] = None
     ) -> Optional[UserModel]:
@@ -576,6 +600,7 @@ class UsersTable:
                 # Persist updated JSON
                 db.query(User).filter_by(id=id).update({"oauth": oauth})
                 db.commit()
+                AUTH_CACHE.invalidate_user(id)
 
                 return UserModel.model_validate(user)
 
@@ -589,6 +614,7 @@ class UsersTable:
             with get_db_context(db) as db:
                 db.query(User).filter_by(id=id).update(updated)
                 db.commit()
+                AUTH_CACHE.invalidate_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -615,6 +641,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                AUTH_CACHE.invalidate_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -633,6 +660,7 @@ class UsersTable:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                    AUTH_CACHE.invalidate_user(id)
 
                 return True
             else:
@@ -657,6 +685,7 @@ class UsersTable:
             with get_db_context(db) as db:
                 db.query(ApiKey).filter_by(user_id=id).delete()
                 db.commit()
+                AUTH_CACHE.invalidate_user(id)
 
                 now = int(time.time())
                 new_api_key = ApiKey(
@@ -679,6 +708,7 @@ class UsersTable:
             with get_db_context(db) as db:
                 db.query(ApiKey).filter_by(user_id=id).delete()
                 db.commit()
+                AUTH_CACHE.invalidate_user(id)
                 return True
         except Exception:
             return False
@@ -0,0 +1,197 @@
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from open_webui.internal.db import Base, get_db_context
+from sqlalchemy import BigInteger, Column, Index, Text, delete, insert, select
+from sqlalchemy.exc import IntegrityError
+
+log = logging.getLogger(__name__)
+
+####################
+# Vector Index DB Schema
+####################
+
+
+class VectorDocument(Base):
+    """
+    Relational index of the vectors stored in the vector database, by content
+    hash and file, so duplicate checks are a single indexed lookup instead of
+    a metadata scan of the vector store.
+    """
+
+    __tablename__ = "vector_document"
+
+    collection_name = Column(Text, primary_key=True)
+    vector_id = Column(Text, primary_key=True)
+
+    hash = Column(Text, nullable=True)
+    file_id = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_vector_document_collection_hash", "collection_name", "hash"),
+        Index("ix_vector_document_collection_file_id", "collection_name", "file_id"),
+    )
+
+
+class VectorCollection(Base):
+    """
+    Collections whose vectors have all been indexed since they were created.
+    Only for these does a missing hash mean the content isn't stored.
+    """
+
+    __tablename__ = "vector_collection"
+
+    name = Column(Text, primary_key=True)
+    created_at = Column(BigInteger, nullable=False)
+
+
+class VectorIndexTable:
+    def is_collection_indexed(
+        self, collection_name: str, db: Optional[Session] = None
+    ) -> bool:
+        with get_db_context(db) as db:
+            return db.get(VectorCollection, collection_name) is not None
+
+    def set_collection_indexed(
+        self, collection_name: str, db: Optional[Session] = None
+    ) -> None:
+        with get_db_context(db) as db:
+            try:
+                db.add(
+                    VectorCollection(name=collection_name, created_at=int(time.time()))
+                )
+                db.commit()
+            except IntegrityError:
+                # Already marked by a concurrent insert
+                db.rollback()
+
+    def insert_items(
+        self,
+        collection_name: str,
+        items: list,
+        db: Optional[Session] = None,
+    ) -> None:
+        rows = []
+        for item in items:
+            if not isinstance(item, dict):
+                item = item.model_dump()
+
+            metadata = item.get("metadata") or {}
+            rows.append(
+                {
+                    "collection_name": collection_name,
+                    "vector_id": item["id"],
+                    "hash": metadata.get("hash"),
+                    "file_id": metadata.get("file_id"),
+                }
+            )
+
+        if not rows:
+            return
+
+        with get_db_context(db) as db:
+            # Upserts may replace vectors that are already indexed
+            ids = [row["vector_id"] for row in rows]
+            for i in range(0, len(ids), 500):
+                db.execute(
+                    delete(VectorDocument).where(
+                        VectorDocument.collection_name == collection_name,
+                        VectorDocument.vector_id.in_(ids[i : i + 500]),
+                    )
+                )
+            db.execute(insert(VectorDocument), rows)
+            db.commit()
+
+    def get_ids_by_hashes(
+        self,
+        collection_name: str,
+        hashes: list[str],
+        db: Optional[Session] = None,
+    ) -> dict[str, list[str]]:
+        result = {}
+        with get_db_context(db) as db:
+            for i in range(0, len(hashes), 500):
+                for hash, vector_id in db.execute(
+                    select(VectorDocument.hash, VectorDocument.vector_id).where(
+                        VectorDocument.collection_name == collection_name,
+                        VectorDocument.hash.in_(hashes[i : i + 500]),
+                    )
+                ):
+                    result.setdefault(hash, []).append(vector_id)
+        return result
+
+    def get_ids_by_filter(
+        self, collection_name: str, filter: dict, db: Optional[Session] = None
+    ) -> Optional[list[str]]:
+        """
+        Return the ids of the rows matching a metadata filter, or None if the
+        filter can't be applied here or the collection isn't fully indexed.
+        """
+        if not filter or not set(filter.keys()) <= {"hash", "file_id"}:
+            return None
+
+        with get_db_context(db) as db:
+            if db.get(VectorCollection, collection_name) is None:
+                return None
+
+            query = select(VectorDocument.vector_id).where(
+                VectorDocument.collection_name == collection_name
+            )
+            for key, value in filter.items():
+                query = query.where(getattr(VectorDocument, key) == value)
+            return list(db.scalars(query))
+
+    def delete_by_ids(
+        self, collection_name: str, ids: list[str], db: Optional[Session] = None
+    ) -> None:
+        with get_db_context(db) as db:
+            for i in range(0, len(ids), 500):
+                db.execute(
+                    delete(VectorDocument).where(
+                        VectorDocument.collection_name == collection_name,
+                        VectorDocument.vector_id.in_(ids[i : i + 500]),
+                    )
+                )
+            db.commit()
+
+    def delete_by_filter(
+        self, collection_name: str, filter: dict, db: Optional[Session] = None
+    ) -> bool:
+        """Delete the rows matching a metadata filter, if it can be applied here."""
+        if not filter or not set(filter.keys()) <= {"hash", "file_id"}:
+            return False
+
+        with get_db_context(db) as db:
+            query = delete(VectorDocument).where(
+                VectorDocument.collection_name == collection_name
+            )
+            for key, value in filter.items():
+                query = query.where(getattr(VectorDocument, key) == value)
+            db.execute(query)
+            db.commit()
+        return True
+
+    def delete_collection(
+        self, collection_name: str, db: Optional[Session] = None
+    ) -> None:
+        with get_db_context(db) as db:
+            db.execute(
+                delete(VectorDocument).where(
+                    VectorDocument.collection_name == collection_name
+                )
+            )
+            db.execute(
+                delete(VectorCollection).where(VectorCollection.name == collection_name)
+            )
+            db.commit()
+
+    def reset(self, db: Optional[Session] = None) -> None:
+        with get_db_context(db) as db:
+            db.execute(delete(VectorDocument))
+            db.execute(delete(VectorCollection))
+            db.commit()
+
+
+VectorIndex = VectorIndexTable()
@@ -0,0 +1,383 @@
+import heapq
+import logging
+import math
+import threading
+from collections import Counter, OrderedDict
+from typing import Optional
+
+from open_webui.config import RAG_BM25_INDEX_CACHE_SIZE
+from open_webui.models.bm25 import BM25Documents
+
+log = logging.getLogger(__name__)
+
+
+def get_metadata_text(metadata: dict) -> str:
+    metadata_parts = []
+
+    # Add filename (repeat twice for extra weight in BM25 scoring)
+    if metadata.get("name"):
+        filename = metadata["name"]
+        filename_tokens = filename.replace("_", " ").replace("-", " ").replace(".", " ")
+        metadata_parts.append(
+            f"Filename: {filename} {filename_tokens} {filename_tokens}"
+        )
+
+    # Add title if available
+    if metadata.get("title"):
+        metadata_parts.append(f"Title: {metadata['title']}")
+
+    # Add document section headings if available (from markdown splitter)
+    if metadata.get("headings") and isinstance(metadata["headings"], list):
+        headings = " > ".join(str(h) for h in metadata["headings"])
+        metadata_parts.append(f"Section: {headings}")
+
+    # Add source URL/path if available
+    if metadata.get("source"):
+        metadata_parts.append(f"Source: {metadata['source']}")
+
+    # Add snippet for web search results
+    if metadata.get("snippet"):
+        metadata_parts.append(f"Snippet: {metadata['snippet']}")
+
+    return " ".join(metadata_parts)
+
+
+def get_enriched_text(text: str, metadata: dict) -> str:
+    metadata_text = get_metadata_text(metadata)
+    return f"{text} {metadata_text}" if metadata_text else text
+
+
+def tokenize(text: str) -> list[str]:
+    # Same as the default preprocessing of langchain's BM25Retriever
+    return text.split()
+
+
+def get_document_terms(text: str, metadata: Optional[dict]) -> tuple[dict, dict]:
+    """
+    Return the term counts of a document's text and the extra ones of its
+    enriched text, which are the terms of its metadata since whitespace
+    separates the two.
+    """
+    return (
+        dict(Counter(tokenize(text or ""))),
+        dict(Counter(tokenize(get_metadata_text(metadata or {})))),
+    )
+
+
+class BM25Index:
+    """
+    In-memory Okapi BM25 index of a collection, with the same parameters as
+    rank_bm25's BM25Okapi. Documents can be added and removed in place, and a
+    search only scores the postings of the query terms.
+
+    `generation` and `version` are those of the stored collection the index
+    is up to date with.
+    """
+
+    def __init__(
+        self,
+        generation: str,
+        version: int,
+        enriched: bool = False,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ):
+        self.generation = generation
+        self.version = version
+        self.enriched = enriched
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        self.lock = threading.Lock()
+
+        self._ids: list[Optional[str]] = []
+        self._lengths: list[int] = []
+        self._terms: list[Optional[list[str]]] = []
+        self._positions: dict[str, int] = {}
+        self._free: list[int] = []
+        self._postings: dict[str, dict[int, int]] = {}
+        self._total_length = 0
+        self._average_idf: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add(
+        self,
+        vector_id: str,
+        terms: dict[str, int],
+        metadata_terms: Optional[dict[str, int]] = None,
+    ):
+        """Add a document by its term counts, replacing one with the same id."""
+        self.remove(vector_id)
+
+        if self.enriched and metadata_terms:
+            terms = Counter(terms)
+            terms.update(metadata_terms)
+        length = sum(terms.values())
+
+        if self._free:
+            position = self._free.pop()
+            self._ids[position] = vector_id
+            self._lengths[position] = length
+            self._terms[position] = list(terms)
+        else:
+            position = len(self._ids)
+            self._ids.append(vector_id)
+            self._lengths.append(length)
+            self._terms.append(list(terms))
+
+        self._positions[vector_id] = position
+        self._total_length += length
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[position] = frequency
+        self._average_idf = None
+
+    def remove(self, vector_id: str):
+        position = self._positions.pop(vector_id, None)
+        if position is None:
+            return
+
+        for term in self._terms[position]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(position, None)
+                if not postings:
+                    del self._postings[term]
+
+        self._total_length -= self._lengths[position]
+        self._ids[position] = None
+        self._lengths[position] = 0
+        self._terms[position] = None
+        self._free.append(position)
+        self._average_idf = None
+
+    def _idf(self, document_frequency: int) -> float:
+        count = len(self._positions)
+        return math.log(count - document_frequency + 0.5) - math.log(
+            document_frequency + 0.5
+        )
+
+    def _get_average_idf(self) -> float:
+        if self._average_idf is None:
+            self._average_idf = (
+                sum(self._idf(len(postings)) for postings in self._postings.values())
+                / len(self._postings)
+                if self._postings
+                else 0.0
+            )
+        return self._average_idf
+
+    def search(self, query: str, k: int) -> list[tuple[str, float]]:
+        """Return the ids and scores of the `k` best matching documents."""
+        with self.lock:
+            return self._search(query, k)
+
+    def _search(self, query: str, k: int) -> list[tuple[str, float]]:
+        if not self._positions:
+            return []
+
+        average_length = self._total_length / len(self._positions)
+
+        scores: dict[int, float] = {}
+        for term in tokenize(query):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+
+            idf = self._idf(len(postings))
+            if idf < 0:
+                idf = self.epsilon * self._get_average_idf()
+
+            for position, frequency in postings.items():
+                length_norm = self.k1 * (
+                    1 - self.b + self.b * self._lengths[position] / average_length
+                )
+                scores[position] = scores.get(position, 0.0) + idf * (
+                    frequency * (self.k1 + 1) / (frequency + length_norm)
+                )
+
+        return [
+            (self._ids[position], score)
+            for position, score in heapq.nlargest(
+                k, scores.items(), key=lambda item: item[1]
+            )
+        ]
+
+
+class BM25IndexCache:
+    """LRU of the BM25 indexes of the most recently searched collections."""
+
+    def __init__(self, max_size: int = 8):
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._indexes: OrderedDict[tuple[str, bool], BM25Index] = OrderedDict()
+
+    def get(self, collection_name: str, enriched: bool) -> Optional[BM25Index]:
+        with self._lock:
+            index = self._indexes.get((collection_name, enriched))
+            if index is not None:
+                self._indexes.move_to_end((collection_name, enriched))
+            return index
+
+    def set(self, collection_name: str, index: BM25Index):
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._indexes[(collection_name, index.enriched)] = index
+            self._indexes.move_to_end((collection_name, index.enriched))
+            while len(self._indexes) > self.max_size:
+                self._indexes.popitem(last=False)
+
+    def get_all(self, collection_name: str) -> list[BM25Index]:
+        with self._lock:
+            return [
+                index
+                for (name, _), index in self._indexes.items()
+                if name == collection_name
+            ]
+
+    def remove(self, collection_name: str, index: Optional[BM25Index] = None):
+        with self._lock:
+            for key in [
+                key
+                for key, cached in self._indexes.items()
+                if key[0] == collection_name and index in (None, cached)
+            ]:
+                del self._indexes[key]
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+BM25_INDEX_CACHE = BM25IndexCache(max_size=RAG_BM25_INDEX_CACHE_SIZE)
+
+
+def get_documents_terms(items: list) -> dict[str, tuple[dict, dict]]:
+    documents = {}
+    for item in items:
+        if not isinstance(item, dict):
+            item = item.model_dump()
+        documents[item["id"]] = get_document_terms(
+            item.get("text"), item.get("metadata")
+        )
+    return documents
+
+
+def catch_up_bm25_index(index: BM25Index, collection_name: str) -> bool:
+    """
+    Apply the writes of any worker logged since the version of an index,
+    reloading only the documents they changed. Returns False if the log no
+    longer goes back that far.
+    """
+    version = index.version
+    changes = BM25Documents.get_changed_ids(collection_name, version)
+    if changes is None:
+        return False
+
+    latest_version, ids = changes
+    documents = BM25Documents.get_documents_by_ids(collection_name, list(ids))
+    with index.lock:
+        # Unless another search or a write of this worker got there first
+        if index.version == version:
+            for vector_id in ids:
+                if vector_id in documents:
+                    index.add(vector_id, *documents[vector_id])
+                else:
+                    index.remove(vector_id)
+            index.version = latest_version
+    return True
+
+
+def load_bm25_index(client, collection_name: str, enriched: bool = False):
+    """
+    Return the BM25 index of a collection, from the cache, caught up with the
+    writes since it was loaded, or else built from the stored term counts. The
+    first time a collection is searched, its documents are read from the
+    vector database `client`, and from then on kept in sync as it changes.
+    """
+    collection = BM25Documents.get_collection(collection_name)
+    if collection is None:
+        if not client.has_collection(collection_name):
+            return None
+
+        # Writes from here on are logged, so that those the read below misses
+        # are kept when the copy is stored
+        version = BM25Documents.start_copy(collection_name)
+
+        log.info(f"Storing the documents of {collection_name} for BM25 search")
+        documents = {}
+        result = client.get(collection_name=collection_name)
+        if result and result.ids and result.ids[0]:
+            documents = {
+                vector_id: get_document_terms(text, metadata)
+                for vector_id, text, metadata in zip(
+                    result.ids[0], result.documents[0], result.metadatas[0]
+                )
+            }
+
+        if not BM25Documents.finish_copy(collection_name, version, documents):
+            # Deleted or rewritten while read, copied again on the next search
+            index = BM25Index("", version, enriched=enriched)
+            for vector_id, (terms, metadata_terms) in documents.items():
+                index.add(vector_id, terms, metadata_terms)
+            return index
+
+        collection = BM25Documents.get_collection(collection_name)
+        if collection is None:
+            return None
+
+    generation, version = collection
+
+    index = BM25_INDEX_CACHE.get(collection_name, enriched)
+    if index is not None and index.generation == generation:
+        if index.version >= version or catch_up_bm25_index(index, collection_name):
+            return index
+
+    log.debug(f"Loading the BM25 index of {collection_name}")
+    index = BM25Index(generation, version, enriched=enriched)
+    for vector_id, terms, metadata_terms in BM25Documents.get_documents(
+        collection_name
+    ):
+        index.add(vector_id, terms, metadata_terms)
+
+    # Writes committed while loading are logged after `version`, so catching
+    # up applies them again whether or not they were read
+    BM25_INDEX_CACHE.set(collection_name, index)
+    return index
+
+
+def update_bm25_indexes(
+    collection_name: str,
+    result: Optional[tuple[str, int, int]],
+    documents: Optional[dict[str, tuple[dict, dict]]] = None,
+    removed: Optional[list[str]] = None,
+):
+    """
+    Apply a write of this worker to the cached indexes of a collection: remove
+    the `removed` ids and add the term counts of `documents`. Indexes that
+    missed an earlier write catch up from the change log on their next search
+    instead.
+    """
+    if result is None:
+        return
+
+    generation, previous_version, version = result
+    for index in BM25_INDEX_CACHE.get_all(collection_name):
+        with index.lock:
+            if index.generation != generation:
+                BM25_INDEX_CACHE.remove(collection_name, index)
+                continue
+            if index.version != previous_version:
+                continue
+
+            for vector_id in removed or []:
+                index.remove(vector_id)
+            for vector_id, (terms, metadata_terms) in (documents or {}).items():
+                index.add(vector_id, terms, metadata_terms)
+            index.version = version
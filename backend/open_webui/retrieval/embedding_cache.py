@@ -0,0 +1,224 @@
+import array
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+from open_webui.config import (
+    CACHE_DIR,
+    RAG_EMBEDDING_CACHE,
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES,
+    RAG_EMBEDDING_CACHE_TTL,
+)
+from open_webui.env import (
+    REDIS_CLUSTER,
+    REDIS_KEY_PREFIX,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+
+
+def get_embedding_cache_key(
+    engine: str, model: str, prefix: Optional[str], text: str
+) -> str:
+    return hashlib.sha256(
+        "\0".join([engine or "", model or "", prefix or "", text]).encode("utf-8")
+    ).hexdigest()
+
+
+def pack_embedding(embedding: list[float]) -> bytes:
+    return array.array("f", embedding).tobytes()
+
+
+def unpack_embedding(data: bytes) -> list[float]:
+    embedding = array.array("f")
+    embedding.frombytes(data)
+    return embedding.tolist()
+
+
+class DiskEmbeddingCache:
+    """
+    SQLite-backed embedding cache, evicting the least recently used entries
+    once it holds more than `max_entries`.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 100_000):
+        self.path = path
+        self.max_entries = max_entries
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embedding (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_embedding_last_used_at ON embedding (last_used_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        result = {}
+        with self._connect() as conn:
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embedding WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                if rows:
+                    conn.execute(
+                        f"UPDATE embedding SET last_used_at = ? WHERE key IN ({placeholders})",
+                        [time.time(), *batch],
+                    )
+                result.update({key: unpack_embedding(vector) for key, vector in rows})
+        return result
+
+    def set_many(self, embeddings: dict[str, list[float]]):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding (key, vector, last_used_at) VALUES (?, ?, ?)",
+                [
+                    (key, pack_embedding(embedding), now)
+                    for key, embedding in embeddings.items()
+                ],
+            )
+
+            count = conn.execute("SELECT COUNT(*) FROM embedding").fetchone()[0]
+            if count > self.max_entries:
+                # Evict down to 90% so eviction doesn't run on every write
+                conn.execute(
+                    """
+                    DELETE FROM embedding WHERE key IN (
+                        SELECT key FROM embedding ORDER BY last_used_at LIMIT ?
+                    )
+                    """,
+                    (count - int(self.max_entries * 0.9),),
+                )
+
+
+class RedisEmbeddingCache:
+    """
+    Redis-backed embedding cache. Entries expire `ttl` seconds after they were
+    last used, so the cache is bounded by what is used within that window.
+    """
+
+    def __init__(self, redis, prefix: str, ttl: int = 7 * 24 * 3600):
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        pipe = self.redis.pipeline()
+        for key in keys:
+            pipe.getex(f"{self.prefix}:{key}", ex=self.ttl)
+        values = pipe.execute()
+
+        return {
+            key: unpack_embedding(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def set_many(self, embeddings: dict[str, list[float]]):
+        pipe = self.redis.pipeline()
+        for key, embedding in embeddings.items():
+            pipe.set(f"{self.prefix}:{key}", pack_embedding(embedding), ex=self.ttl)
+        pipe.execute()
+
+
+def get_embedding_cache():
+    if RAG_EMBEDDING_CACHE == "disk":
+        return DiskEmbeddingCache(
+            CACHE_DIR / "embeddings.db", max_entries=RAG_EMBEDDING_CACHE_MAX_ENTRIES
+        )
+    elif RAG_EMBEDDING_CACHE == "redis":
+        return RedisEmbeddingCache(
+            get_redis_connection(
+                REDIS_URL,
+                get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+                redis_cluster=REDIS_CLUSTER,
+                # Embeddings are stored as packed floats, not text
+                decode_responses=False,
+            ),
+            f"{REDIS_KEY_PREFIX}:embedding",
+            ttl=RAG_EMBEDDING_CACHE_TTL,
+        )
+    return None
+
+
+EMBEDDING_CACHE = get_embedding_cache()
+
+
+def get_cached_embedding_function(embedding_function, engine: str, model: str):
+    """
+    Wrap an embedding function so that texts already embedded with the same
+    engine, model and prefix are served from the cache, and only the rest are
+    sent to the embedding engine.
+    """
+    if EMBEDDING_CACHE is None:
+        return embedding_function
+
+    async def cached_embedding_function(query, prefix=None, user=None):
+        texts = query if isinstance(query, list) else [query]
+        keys = [get_embedding_cache_key(engine, model, prefix, text) for text in texts]
+
+        try:
+            embeddings = await asyncio.to_thread(EMBEDDING_CACHE.get_many, keys)
+        except Exception as e:
+            log.warning(f"Failed to read the embedding cache: {e}")
+            return await embedding_function(query, prefix=prefix, user=user)
+
+        # Embed each missing text once, even if it appears more than once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in embeddings:
+                missing.setdefault(key, text)
+
+        if missing:
+            new_embeddings = await embedding_function(
+                list(missing.values()), prefix=prefix, user=user
+            )
+            if not new_embeddings or len(new_embeddings) != len(missing):
+                # Partial failure, we can't tell which texts the results belong to
+                log.warning("Embedding results don't match the input, not caching")
+                return await embedding_function(query, prefix=prefix, user=user)
+
+            new_embeddings = dict(zip(missing.keys(), new_embeddings))
+            try:
+                await asyncio.to_thread(
+                    EMBEDDING_CACHE.set_many,
+                    {
+                        key: embedding
+                        for key, embedding in new_embeddings.items()
+                        if embedding is not None
+                    },
+                )
+            except Exception as e:
+                log.warning(f"Failed to write the embedding cache: {e}")
+            embeddings.update(new_embeddings)
+
+        log.debug(
+            f"embedding cache: {len(texts) - len(missing)}/{len(texts)} texts cached"
+        )
+
+        result = [embeddings[key] for key in keys]
+        return result if isinstance(query, list) else result[0]
+
+    return cached_embedding_function
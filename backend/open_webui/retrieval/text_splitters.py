@@ -0,0 +1,280 @@
+import logging
+import math
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import tiktoken
+from langchain_core.documents import Document
+from langchain_text_splitters import (
+    MarkdownHeaderTextSplitter,
+    RecursiveCharacterTextSplitter,
+    TokenTextSplitter,
+)
+
+from open_webui.constants import ERROR_MESSAGES
+
+log = logging.getLogger(__name__)
+
+# Below this many characters, splitting in-process is faster than shipping
+# the documents to another process
+MIN_PARALLEL_SPLIT_CHARS = 100_000
+
+
+def can_merge_chunks(a: Document, b: Document) -> bool:
+    if a.metadata.get("source") != b.metadata.get("source"):
+        return False
+
+    a_file_id = a.metadata.get("file_id")
+    b_file_id = b.metadata.get("file_id")
+
+    if a_file_id is not None and b_file_id is not None:
+        return a_file_id == b_file_id
+
+    return True
+
+
+def merge_docs_to_target_size(
+    chunks: list[Document],
+    min_chunk_size_target: int,
+    max_chunk_size: int,
+    text_splitter: str = "character",
+    tiktoken_encoding_name: str = "cl100k_base",
+) -> list[Document]:
+    """
+    Best-effort normalization of chunk sizes.
+
+    Attempts to grow small chunks up to a desired minimum size,
+    without exceeding the maximum size or crossing source/file
+    boundaries.
+    """
+    if min_chunk_size_target <= 0:
+        return chunks
+
+    measure_chunk_size = len
+    if text_splitter == "token":
+        encoding = tiktoken.get_encoding(str(tiktoken_encoding_name))
+        measure_chunk_size = lambda text: len(encoding.encode(text))
+
+    processed_chunks: list[Document] = []
+
+    current_chunk: Document | None = None
+    current_content: str = ""
+
+    for next_chunk in chunks:
+        if current_chunk is None:
+            current_chunk = next_chunk
+            current_content = next_chunk.page_content
+            continue  # First chunk initialization
+
+        proposed_content = f"{current_content}\n\n{next_chunk.page_content}"
+
+        can_merge = (
+            can_merge_chunks(current_chunk, next_chunk)
+            and measure_chunk_size(current_content) < min_chunk_size_target
+            and measure_chunk_size(proposed_content) <= max_chunk_size
+        )
+
+        if can_merge:
+            current_content = proposed_content
+        else:
+            processed_chunks.append(
+                Document(
+                    page_content=current_content,
+                    metadata={**current_chunk.metadata},
+                )
+            )
+            current_chunk = next_chunk
+            current_content = next_chunk.page_content
+
+    if current_chunk is not None:
+        processed_chunks.append(
+            Document(
+                page_content=current_content,
+                metadata={**current_chunk.metadata},
+            )
+        )
+
+    return processed_chunks
+
+
+def split_docs(
+    docs: list[Document],
+    text_splitter: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    chunk_min_size_target: int = 0,
+    tiktoken_encoding_name: str = "cl100k_base",
+    enable_markdown_header_text_splitter: bool = False,
+) -> list[Document]:
+    if enable_markdown_header_text_splitter:
+        log.info("Using markdown header text splitter")
+
+        # Phase 1: Split by markdown headers first (preserves hierarchy in metadata)
+        markdown_splitter = MarkdownHeaderTextSplitter(
+            headers_to_split_on=[
+                ("#", "Header 1"),
+                ("##", "Header 2"),
+                ("###", "Header 3"),
+                ("####", "Header 4"),
+                ("#####", "Header 5"),
+                ("######", "Header 6"),
+            ],
+            strip_headers=False,  # Keep headers in content for context
+        )
+
+        split_docs = []
+        for doc in docs:
+            md_chunks = markdown_splitter.split_text(doc.page_content)
+            if md_chunks:
+                split_docs.extend(
+                    [
+                        Document(
+                            page_content=split_chunk.page_content,
+                            metadata={**doc.metadata, **split_chunk.metadata},
+                        )
+                        for split_chunk in md_chunks
+                    ]
+                )
+            else:
+                # No headers found, keep original document
+                split_docs.append(doc)
+
+        # Phase 2: Split on horizontal rules (---) within each header section
+        hr_pattern = re.compile(r"^\s*-{3,}\s*$", re.MULTILINE)
+        hr_split_docs = []
+        for doc in split_docs:
+            sections = hr_pattern.split(doc.page_content)
+            if len(sections) > 1:
+                for section in sections:
+                    section = section.strip()
+                    if section:
+                        hr_split_docs.append(
+                            Document(
+                                page_content=section,
+                                metadata={**doc.metadata},
+                            )
+                        )
+            else:
+                hr_split_docs.append(doc)
+
+        docs = hr_split_docs
+        if chunk_min_size_target > 0:
+            docs = merge_docs_to_target_size(
+                docs,
+                chunk_min_size_target,
+                chunk_size,
+                text_splitter=text_splitter,
+                tiktoken_encoding_name=tiktoken_encoding_name,
+            )
+
+    if text_splitter in ["", "character"]:
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            add_start_index=True,
+        )
+        docs = splitter.split_documents(docs)
+    elif text_splitter == "token":
+        log.info(f"Using token text splitter: {tiktoken_encoding_name}")
+
+        tiktoken.get_encoding(str(tiktoken_encoding_name))
+        splitter = TokenTextSplitter(
+            encoding_name=str(tiktoken_encoding_name),
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            add_start_index=True,
+        )
+        docs = splitter.split_documents(docs)
+    else:
+        raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+
+    return docs
+
+
+def get_doc_groups(
+    docs: list[Document], max_group_size: Optional[int] = None
+) -> list[list[Document]]:
+    """
+    Group consecutive documents that can't be split independently, i.e. pages
+    of the same source. Groups are cut further into `max_group_size` pages
+    when each page can be split on its own.
+    """
+    groups = []
+    for doc in docs:
+        if (
+            groups
+            and can_merge_chunks(groups[-1][-1], doc)
+            and (max_group_size is None or len(groups[-1]) < max_group_size)
+        ):
+            groups[-1].append(doc)
+        else:
+            groups.append([doc])
+    return groups
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(processes: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Forking a threaded server process is unsafe, start fresh workers
+            _pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def split_docs_in_parallel(
+    docs: list[Document], processes: int, **kwargs
+) -> list[Document]:
+    """
+    Split documents across a pool of `processes` worker processes, one group
+    of pages at a time, returning the chunks in document order. Falls back to
+    splitting in-process for small inputs or when the pool is unavailable.
+    """
+    if processes <= 1 or sum(len(doc.page_content) for doc in docs) < (
+        MIN_PARALLEL_SPLIT_CHARS
+    ):
+        return split_docs(docs, **kwargs)
+
+    # Chunks of different pages are only merged with the markdown header
+    # splitter, otherwise pages can be spread across processes
+    merges_pages = (
+        kwargs.get("enable_markdown_header_text_splitter")
+        and kwargs.get("chunk_min_size_target", 0) > 0
+    )
+    groups = get_doc_groups(
+        docs,
+        max_group_size=(
+            None if merges_pages else math.ceil(len(docs) / (processes * 4))
+        ),
+    )
+    if len(groups) <= 1:
+        return split_docs(docs, **kwargs)
+
+    log.debug(f"Splitting {len(docs)} documents in {len(groups)} groups")
+
+    try:
+        pool = get_pool(processes)
+        futures = [pool.submit(split_docs, group, **kwargs) for group in groups]
+        return [chunk for future in futures for chunk in future.result()]
+    except BrokenProcessPool as e:
+        log.warning(f"Text splitter pool failed, splitting in-process: {e}")
+        reset_pool()
+        return split_docs(docs, **kwargs)
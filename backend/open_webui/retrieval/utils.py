@@ -6,7 +6,6 @@ import requests
 import aiohttp
 import asyncio
 import hashlib
-from concurrent.futures import ThreadPoolExecutor
 import time
 import re
 
@@ -29,6 +28,8 @@ from open_webui.models.knowledge import Knowledges
 from open_webui.models.document_images import DocumentImages
 
 from open_webui.retrieval.vector.main import GetResult
+from open_webui.retrieval.bm25 import BM25Index, get_enriched_text
+from open_webui.retrieval.embedding_cache import get_cached_embedding_function
 from open_webui.utils.access_control import has_access
 from open_webui.utils.headers import include_user_info_headers
 
@@ -111,7 +112,7 @@ class VectorSearchRetriever(BaseRetriever):
         run_manager: CallbackManagerForRetrieverRun,
     ) -> list[Document]:
         embedding = await self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-        result = VECTOR_DB_CLIENT.search(
+        result = await VECTOR_DB_CLIENT.asearch(
             collection_name=self.collection_name,
             vectors=[embedding],
             limit=self.top_k,
@@ -125,6 +126,7 @@ class VectorSearchRetriever(BaseRetriever):
         for idx in range(len(ids)):
             results.append(
                 Document(
+                    id=ids[idx],
                     metadata=metadatas[idx],
                     page_content=documents[idx],
                 )
@@ -132,6 +134,60 @@ class VectorSearchRetriever(BaseRetriever):
         return results
 
 
+class BM25IndexRetriever(BaseRetriever):
+    collection_name: Any
+    bm25_index: Any
+    top_k: int
+
+    def _to_documents(
+        self, results: list[tuple[str, float]], result: Optional[GetResult]
+    ) -> list[Document]:
+        # The index only has term counts, the texts come from the vector database
+        documents = {}
+        if result and result.ids:
+            for vector_id, text, metadata in zip(
+                result.ids[0], result.documents[0], result.metadatas[0]
+            ):
+                documents[vector_id] = Document(
+                    id=vector_id, metadata={**(metadata or {})}, page_content=text
+                )
+
+        return [
+            documents[vector_id] for vector_id, _ in results if vector_id in documents
+        ]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        results = self.bm25_index.search(query, self.top_k)
+        if not results:
+            return []
+
+        return self._to_documents(
+            results,
+            VECTOR_DB_CLIENT.get_by_ids(
+                self.collection_name, [vector_id for vector_id, _ in results]
+            ),
+        )
+
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        results = await asyncio.to_thread(self.bm25_index.search, query, self.top_k)
+        if not results:
+            return []
+
+        return self._to_documents(
+            results,
+            await VECTOR_DB_CLIENT.aget_by_ids(
+                self.collection_name, [vector_id for vector_id, _ in results]
+            ),
+        )
+
+
 def query_doc(
     collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
 ):
@@ -167,41 +223,10 @@ def get_doc(collection_name: str, user: UserModel = None):
 
 
 def get_enriched_texts(collection_result: GetResult) -> list[str]:
-    enriched_texts = []
-    for idx, text in enumerate(collection_result.documents[0]):
-        metadata = collection_result.metadatas[0][idx]
-        metadata_parts = [text]
-
-        # Add filename (repeat twice for extra weight in BM25 scoring)
-        if metadata.get("name"):
-            filename = metadata["name"]
-            filename_tokens = (
-                filename.replace("_", " ").replace("-", " ").replace(".", " ")
-            )
-            metadata_parts.append(
-                f"Filename: {filename} {filename_tokens} {filename_tokens}"
-            )
-
-        # Add title if available
-        if metadata.get("title"):
-            metadata_parts.append(f"Title: {metadata['title']}")
-
-        # Add document section headings if available (from markdown splitter)
-        if metadata.get("headings") and isinstance(metadata["headings"], list):
-            headings = " > ".join(str(h) for h in metadata["headings"])
-            metadata_parts.append(f"Section: {headings}")
-
-        # Add source URL/path if available
-        if metadata.get("source"):
-            metadata_parts.append(f"Source: {metadata['source']}")
-
-        # Add snippet for web search results
-        if metadata.get("snippet"):
-            metadata_parts.append(f"Snippet: {metadata['snippet']}")
-
-        enriched_texts.append(" ".join(metadata_parts))
-
-    return enriched_texts
+    return [
+        get_enriched_text(text, collection_result.metadatas[0][idx])
+        for idx, text in enumerate(collection_result.documents[0])
+    ]
 
 
 async def query_doc_with_hybrid_search(
@@ -215,10 +240,15 @@ async def query_doc_with_hybrid_search(
     r: float,
     hybrid_bm25_weight: float,
     enable_enriched_texts: bool = False,
+    bm25_index: Optional[BM25Index] = None,
 ) -> dict:
     try:
+        if bm25_index is not None:
+            if len(bm25_index) == 0:
+                log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
+                return {"documents": [], "metadatas": [], "distances": []}
         # First check if collection_result has the required attributes
-        if (
+        elif (
             not collection_result
             or not hasattr(collection_result, "documents")
             or not hasattr(collection_result, "metadatas")
@@ -227,7 +257,7 @@ async def query_doc_with_hybrid_search(
             return {"documents": [], "metadatas": [], "distances": []}
 
         # Now safely check the documents content after confirming attributes exist
-        if (
+        elif (
             not collection_result.documents
             or len(collection_result.documents) == 0
             or not collection_result.documents[0]
@@ -237,17 +267,24 @@ async def query_doc_with_hybrid_search(
 
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
 
-        bm25_texts = (
-            get_enriched_texts(collection_result)
-            if enable_enriched_texts
-            else collection_result.documents[0]
-        )
+        if bm25_index is not None:
+            bm25_retriever = BM25IndexRetriever(
+                collection_name=collection_name,
+                bm25_index=bm25_index,
+                top_k=k,
+            )
+        else:
+            bm25_texts = (
+                get_enriched_texts(collection_result)
+                if enable_enriched_texts
+                else collection_result.documents[0]
+            )
 
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=bm25_texts,
-            metadatas=collection_result.metadatas[0],
-        )
-        bm25_retriever.k = k
+            bm25_retriever = BM25Retriever.from_texts(
+                texts=bm25_texts,
+                metadatas=collection_result.metadatas[0],
+            )
+            bm25_retriever.k = k
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -274,6 +311,7 @@ async def query_doc_with_hybrid_search(
             top_n=k_reranker,
             reranking_function=reranking_function,
             r_score=r,
+            collection_name=collection_name,
         )
 
         compression_retriever = ContextualCompressionRetriever(
@@ -405,23 +443,9 @@ async def query_collection(
     embedding_function,
     k: int,
 ) -> dict:
-    results = []
-    error = False
-
-    def process_query_collection(collection_name, query_embedding):
-        try:
-            if collection_name:
-                result = query_doc(
-                    collection_name=collection_name,
-                    k=k,
-                    query_embedding=query_embedding,
-                )
-                if result is not None:
-                    return result.model_dump(), None
-            return None, None
-        except Exception as e:
-            log.exception(f"Error when querying the collection: {e}")
-            return None, e
+    collection_names = [name for name in collection_names if name]
+    if not collection_names:
+        return merge_and_sort_query_results([], k=k)
 
     # Generate all query embeddings (in one call)
     query_embeddings = await embedding_function(
@@ -431,26 +455,32 @@ async def query_collection(
         f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
     )
 
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
-                )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
-
-    for result, err in task_results:
-        if err is not None:
-            error = True
-        elif result is not None:
-            results.append(result)
+    # Search all the collections for all the queries at once
+    try:
+        result = await VECTOR_DB_CLIENT.asearch_many(
+            collection_names=collection_names,
+            vectors=query_embeddings,
+            limit=k,
+        )
+    except Exception as e:
+        log.exception(f"Error when querying the collections: {e}")
+        result = None
 
-    if error and not results:
+    if result is None:
         log.warning("All collection queries failed. No results returned.")
-
-    return merge_and_sort_query_results(results, k=k)
+        return merge_and_sort_query_results([], k=k)
+
+    return merge_and_sort_query_results(
+        [
+            {
+                "distances": [result.distances[idx]],
+                "documents": [result.documents[idx]],
+                "metadatas": [result.metadatas[idx]],
+            }
+            for idx in range(len(result.ids))
+        ],
+        k=k,
+    )
 
 
 async def query_collection_with_hybrid_search(
@@ -466,20 +496,22 @@ async def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    # Fetch collection data once per collection sequentially
-    # Avoid fetching the same data multiple times later
-    collection_results = {}
+    # Load the BM25 index of each collection once, from memory when it was
+    # searched recently
+    bm25_indexes = {}
     for collection_name in collection_names:
         try:
             log.debug(
-                f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
+                f"query_collection_with_hybrid_search:get_bm25_index:collection {collection_name}"
             )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
+            bm25_indexes[collection_name] = await asyncio.to_thread(
+                VECTOR_DB_CLIENT.get_bm25_index,
+                collection_name,
+                enriched=enable_enriched_texts,
             )
         except Exception as e:
-            log.exception(f"Failed to fetch collection {collection_name}: {e}")
-            collection_results[collection_name] = None
+            log.exception(f"Failed to load collection {collection_name}: {e}")
+            bm25_indexes[collection_name] = None
 
     log.info(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
@@ -489,7 +521,7 @@ async def query_collection_with_hybrid_search(
         try:
             result = await query_doc_with_hybrid_search(
                 collection_name=collection_name,
-                collection_result=collection_results[collection_name],
+                collection_result=None,
                 query=query,
                 embedding_function=embedding_function,
                 k=k,
@@ -498,6 +530,7 @@ async def query_collection_with_hybrid_search(
                 r=r,
                 hybrid_bm25_weight=hybrid_bm25_weight,
                 enable_enriched_texts=enable_enriched_texts,
+                bm25_index=bm25_indexes[collection_name],
             )
             return result, None
         except Exception as e:
@@ -505,11 +538,11 @@ async def query_collection_with_hybrid_search(
             return None, e
 
     # Prepare tasks for all collections and queries
-    # Avoid running any tasks for collections that failed to fetch data (have assigned None)
+    # Avoid running any tasks for collections that failed to load (have assigned None)
     tasks = [
         (collection_name, query)
         for collection_name in collection_names
-        if collection_results[collection_name] is not None
+        if bm25_indexes[collection_name] is not None
         for query in queries
     ]
 
@@ -808,7 +841,9 @@ def get_embedding_function(
                 prefix,
             )
 
-        return async_embedding_function
+        return get_cached_embedding_function(
+            async_embedding_function, embedding_engine, embedding_model
+        )
     elif embedding_engine in ["ollama", "openai", "azure_openai"]:
         embedding_function = lambda query, prefix=None, user=None: generate_embeddings(
             engine=embedding_engine,
@@ -862,7 +897,9 @@ def get_embedding_function(
             else:
                 return await embedding_function(query, prefix, user)
 
-        return async_embedding_function
+        return get_cached_embedding_function(
+            async_embedding_function, embedding_engine, embedding_model
+        )
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
 
@@ -1193,7 +1230,11 @@ async def get_sources_from_items(
                     for m in source.get("metadata", [])
                 )
                 if not has_meta_images:
-                    source_id = source.get("source", {}).get("id") if source.get("source") else None
+                    source_id = (
+                        source.get("source", {}).get("id")
+                        if source.get("source")
+                        else None
+                    )
                     if source_id:
                         source_images = images_by_file.get(source_id, [])
                         if source_images:
@@ -1248,15 +1289,27 @@ def get_model_path(model: str, update_model: bool = False):
 import operator
 from typing import Optional, Sequence
 
+import numpy as np
+
 from langchain_core.callbacks import Callbacks
 from langchain_core.documents import BaseDocumentCompressor, Document
 
 
+def get_cosine_similarities(query_embedding, embeddings) -> np.ndarray:
+    query = np.asarray(query_embedding, dtype=np.float32)
+    matrix = np.asarray(embeddings, dtype=np.float32)
+
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    return (matrix @ query) / np.maximum(norms, 1e-8)
+
+
 class RerankCompressor(BaseDocumentCompressor):
     embedding_function: Any
     top_n: int
     reranking_function: Any
     r_score: float
+    # Where the documents come from, to reuse their stored vectors
+    collection_name: Optional[str] = None
 
     class Config:
         extra = "forbid"
@@ -1287,21 +1340,22 @@ class RerankCompressor(BaseDocumentCompressor):
         query: str,
         callbacks: Optional[Callbacks] = None,
     ) -> Sequence[Document]:
+        if not documents:
+            return []
+
         reranking = self.reranking_function is not None
 
         scores = None
         if reranking:
             scores = await asyncio.to_thread(self.reranking_function, query, documents)
         else:
-            from sentence_transformers import util
-
             query_embedding = await self.embedding_function(
                 query, RAG_EMBEDDING_QUERY_PREFIX
             )
-            document_embedding = await self.embedding_function(
-                [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
+            document_embeddings = await self.get_document_embeddings(
+                documents, len(query_embedding)
             )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
+            scores = get_cosine_similarities(query_embedding, document_embeddings)
 
         if scores is not None:
             docs_with_scores = list(
@@ -1331,3 +1385,40 @@ class RerankCompressor(BaseDocumentCompressor):
                 "No valid scores found, check your reranking function. Returning original documents."
             )
             return documents
+
+    async def get_document_embeddings(
+        self, documents: Sequence[Document], dimensions: int
+    ) -> list:
+        """
+        Return the embeddings of the documents, using the vectors stored for
+        them in the collection and only embedding those that aren't found.
+        """
+        stored = {}
+        ids = [doc.id for doc in documents if doc.id]
+        if self.collection_name and ids:
+            try:
+                stored = await VECTOR_DB_CLIENT.aget_vectors(self.collection_name, ids)
+            except Exception as e:
+                log.warning(f"Failed to get the stored vectors, embedding instead: {e}")
+
+        # Vectors of another embedding model can't be compared to the query
+        embeddings = [
+            (
+                stored[doc.id]
+                if doc.id in stored and len(stored[doc.id]) == dimensions
+                else None
+            )
+            for doc in documents
+        ]
+
+        missing = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            log.debug(f"Embedding {len(missing)}/{len(documents)} documents to rank")
+            missing_embeddings = await self.embedding_function(
+                [documents[idx].page_content for idx in missing],
+                RAG_EMBEDDING_CONTENT_PREFIX,
+            )
+            for idx, embedding in zip(missing, missing_embeddings):
+                embeddings[idx] = embedding
+
+        return embeddings
@@ -10,6 +10,7 @@ from open_webui.retrieval.vector.main import (
     VectorItem,
     SearchResult,
     GetResult,
+    merge_search_results,
 )
 from open_webui.retrieval.vector.utils import process_metadata
 
@@ -103,6 +104,42 @@ class ChromaClient(VectorDBBase):
         except Exception as e:
             return None
 
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        # One query per collection for all the vectors
+        results = []
+        for collection_name in collection_names:
+            try:
+                collection = self.client.get_collection(name=collection_name)
+                result = collection.query(
+                    query_embeddings=vectors,
+                    n_results=limit,
+                    where=filter,
+                )
+            except Exception as e:
+                log.debug(f"Error searching collection {collection_name}: {e}")
+                continue
+
+            results.append(
+                SearchResult(
+                    ids=result["ids"],
+                    # Cosine distance, 2 (worst) -> 0 (best), to a 0 -> 1 score
+                    distances=[
+                        [(2 - dist) / 2 for dist in distances]
+                        for distances in result["distances"]
+                    ],
+                    documents=result["documents"],
+                    metadatas=result["metadatas"],
+                )
+            )
+
+        return merge_search_results(results, len(vectors), limit)
+
     def query(
         self, collection_name: str, filter: dict, limit: Optional[int] = None
     ) -> Optional[GetResult]:
@@ -140,6 +177,28 @@ class ChromaClient(VectorDBBase):
             )
         return None
 
+    def get_by_ids(self, collection_name: str, ids: list[str]) -> Optional[GetResult]:
+        collection = self.client.get_collection(name=collection_name)
+        if collection:
+            result = collection.get(ids=ids)
+            return GetResult(
+                **{
+                    "ids": [result["ids"]],
+                    "documents": [result["documents"]],
+                    "metadatas": [result["metadatas"]],
+                }
+            )
+        return None
+
+    def get_vectors(self, collection_name: str, ids: list[str]) -> dict[str, list]:
+        collection = self.client.get_collection(name=collection_name)
+        result = collection.get(ids=ids, include=["embeddings"])
+        return {
+            id: list(embedding)
+            for id, embedding in zip(result["ids"], result["embeddings"])
+            if embedding is not None
+        }
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         collection = self.client.get_or_create_collection(
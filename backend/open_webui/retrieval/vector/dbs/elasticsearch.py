@@ -1,7 +1,7 @@
-from elasticsearch import Elasticsearch, BadRequestError
+from elasticsearch import AsyncElasticsearch, Elasticsearch, BadRequestError
 from typing import Optional
 import ssl
-from elasticsearch.helpers import bulk, scan
+from elasticsearch.helpers import async_bulk, async_scan, bulk, scan
 
 from open_webui.retrieval.vector.utils import process_metadata
 from open_webui.retrieval.vector.main import (
@@ -32,7 +32,7 @@ class ElasticsearchClient(VectorDBBase):
 
     def __init__(self):
         self.index_prefix = ELASTICSEARCH_INDEX_PREFIX
-        self.client = Elasticsearch(
+        client_kwargs = dict(
             hosts=[ELASTICSEARCH_URL],
             ca_certs=ELASTICSEARCH_CA_CERTS,
             api_key=ELASTICSEARCH_API_KEY,
@@ -44,6 +44,9 @@ class ElasticsearchClient(VectorDBBase):
             ),
             ssl_assert_fingerprint=SSL_ASSERT_FINGERPRINT,
         )
+        self.client = Elasticsearch(**client_kwargs)
+        # Requests from the event loop don't need a thread
+        self.aclient = AsyncElasticsearch(**client_kwargs)
 
     # Status: works
     def _get_index_name(self, dimension: int) -> str:
@@ -100,8 +103,8 @@ class ElasticsearchClient(VectorDBBase):
         )
 
     # Status: works
-    def _create_index(self, dimension: int):
-        body = {
+    def _get_index_body(self, dimension: int) -> dict:
+        return {
             "mappings": {
                 "dynamic_templates": [
                     {
@@ -125,7 +128,11 @@ class ElasticsearchClient(VectorDBBase):
                 },
             }
         }
-        self.client.indices.create(index=self._get_index_name(dimension), body=body)
+
+    def _create_index(self, dimension: int):
+        self.client.indices.create(
+            index=self._get_index_name(dimension), body=self._get_index_body(dimension)
+        )
 
     # Status: works
 
@@ -151,15 +158,10 @@ class ElasticsearchClient(VectorDBBase):
         query = {"query": {"term": {"collection": collection_name}}}
         self.client.delete_by_query(index=f"{self.index_prefix}*", body=query)
 
-    # Status: works
-    def search(
-        self,
-        collection_name: str,
-        vectors: list[list[float]],
-        filter: Optional[dict] = None,
-        limit: int = 10,
-    ) -> Optional[SearchResult]:
-        query = {
+    def _get_search_body(
+        self, collection_name: str, vectors: list[list[float]], limit: int
+    ) -> dict:
+        return {
             "size": limit,
             "_source": ["text", "metadata"],
             "query": {
@@ -177,19 +179,22 @@ class ElasticsearchClient(VectorDBBase):
             },
         }
 
+    # Status: works
+    def search(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        query = self._get_search_body(collection_name, vectors, limit)
         result = self.client.search(
             index=self._get_index_name(len(vectors[0])), body=query
         )
 
         return self._result_to_search_result(result)
 
-    # Status: only tested halfwat
-    def query(
-        self, collection_name: str, filter: dict, limit: Optional[int] = None
-    ) -> Optional[GetResult]:
-        if not self.has_collection(collection_name):
-            return None
-
+    def _get_query_body(self, collection_name: str, filter: dict) -> dict:
         query_body = {
             "query": {"bool": {"filter": []}},
             "_source": ["text", "metadata"],
@@ -200,6 +205,16 @@ class ElasticsearchClient(VectorDBBase):
         query_body["query"]["bool"]["filter"].append(
             {"term": {"collection": collection_name}}
         )
+        return query_body
+
+    # Status: only tested halfwat
+    def query(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if not self.has_collection(collection_name):
+            return None
+
+        query_body = self._get_query_body(collection_name, filter)
         size = limit if limit else 10
 
         try:
@@ -235,57 +250,80 @@ class ElasticsearchClient(VectorDBBase):
 
         return self._scan_result_to_get_result(results)
 
+    def _get_by_ids_body(self, collection_name: str, ids: list[str]) -> dict:
+        return {
+            "query": {
+                "bool": {
+                    "filter": [
+                        {"term": {"collection": collection_name}},
+                        {"ids": {"values": ids}},
+                    ]
+                }
+            },
+            "_source": ["text", "metadata"],
+        }
+
+    def get_by_ids(self, collection_name: str, ids: list[str]) -> Optional[GetResult]:
+        result = self.client.search(
+            index=f"{self.index_prefix}*",
+            body=self._get_by_ids_body(collection_name, ids),
+            size=len(ids),
+        )
+        return self._result_to_get_result(result)
+
+    def _get_insert_actions(self, collection_name: str, items: list[VectorItem]):
+        return [
+            {
+                "_index": self._get_index_name(dimension=len(items[0]["vector"])),
+                "_id": item["id"],
+                "_source": {
+                    "collection": collection_name,
+                    "vector": item["vector"],
+                    "text": item["text"],
+                    "metadata": process_metadata(item["metadata"]),
+                },
+            }
+            for item in items
+        ]
+
+    def _get_upsert_actions(self, collection_name: str, items: list[VectorItem]):
+        return [
+            {
+                "_op_type": "update",
+                "_index": self._get_index_name(dimension=len(item["vector"])),
+                "_id": item["id"],
+                "doc": {
+                    "collection": collection_name,
+                    "vector": item["vector"],
+                    "text": item["text"],
+                    "metadata": process_metadata(item["metadata"]),
+                },
+                "doc_as_upsert": True,
+            }
+            for item in items
+        ]
+
     # Status: works
     def insert(self, collection_name: str, items: list[VectorItem]):
         if not self._has_index(dimension=len(items[0]["vector"])):
             self._create_index(dimension=len(items[0]["vector"]))
 
         for batch in self._create_batches(items):
-            actions = [
-                {
-                    "_index": self._get_index_name(dimension=len(items[0]["vector"])),
-                    "_id": item["id"],
-                    "_source": {
-                        "collection": collection_name,
-                        "vector": item["vector"],
-                        "text": item["text"],
-                        "metadata": process_metadata(item["metadata"]),
-                    },
-                }
-                for item in batch
-            ]
-            bulk(self.client, actions)
+            bulk(self.client, self._get_insert_actions(collection_name, batch))
 
     # Upsert documents using the update API with doc_as_upsert=True.
     def upsert(self, collection_name: str, items: list[VectorItem]):
         if not self._has_index(dimension=len(items[0]["vector"])):
             self._create_index(dimension=len(items[0]["vector"]))
         for batch in self._create_batches(items):
-            actions = [
-                {
-                    "_op_type": "update",
-                    "_index": self._get_index_name(dimension=len(item["vector"])),
-                    "_id": item["id"],
-                    "doc": {
-                        "collection": collection_name,
-                        "vector": item["vector"],
-                        "text": item["text"],
-                        "metadata": process_metadata(item["metadata"]),
-                    },
-                    "doc_as_upsert": True,
-                }
-                for item in batch
-            ]
-            bulk(self.client, actions)
+            bulk(self.client, self._get_upsert_actions(collection_name, batch))
 
-    # Delete specific documents from a collection by filtering on both collection and document IDs.
-    def delete(
+    def _get_delete_body(
         self,
         collection_name: str,
         ids: Optional[list[str]] = None,
         filter: Optional[dict] = None,
-    ):
-
+    ) -> dict:
         query = {
             "query": {"bool": {"filter": [{"term": {"collection": collection_name}}]}}
         }
@@ -297,10 +335,123 @@ class ElasticsearchClient(VectorDBBase):
                 query["query"]["bool"]["filter"].append(
                     {"term": {f"metadata.{field}": value}}
                 )
+        return query
+
+    # Delete specific documents from a collection by filtering on both collection and document IDs.
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
 
+        query = self._get_delete_body(collection_name, ids, filter)
         self.client.delete_by_query(index=f"{self.index_prefix}*", body=query)
 
     def reset(self):
         indices = self.client.indices.get(index=f"{self.index_prefix}*")
         for index in indices:
             self.client.indices.delete(index=index)
+
+    ####################
+    # Async, through AsyncElasticsearch
+    ####################
+
+    async def ahas_collection(self, collection_name: str) -> bool:
+        query_body = {"query": {"term": {"collection": collection_name}}}
+
+        try:
+            result = await self.aclient.count(
+                index=f"{self.index_prefix}*", body=query_body
+            )
+            return result.body["count"] > 0
+        except Exception as e:
+            return None
+
+    async def adelete_collection(self, collection_name: str):
+        query = {"query": {"term": {"collection": collection_name}}}
+        await self.aclient.delete_by_query(index=f"{self.index_prefix}*", body=query)
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        result = await self.aclient.search(
+            index=self._get_index_name(len(vectors[0])),
+            body=self._get_search_body(collection_name, vectors, limit),
+        )
+        return self._result_to_search_result(result)
+
+    async def aquery(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if not await self.ahas_collection(collection_name):
+            return None
+
+        try:
+            result = await self.aclient.search(
+                index=f"{self.index_prefix}*",
+                body=self._get_query_body(collection_name, filter),
+                size=limit if limit else 10,
+            )
+            return self._result_to_get_result(result)
+        except Exception as e:
+            return None
+
+    async def aget(self, collection_name: str) -> Optional[GetResult]:
+        query = {
+            "query": {"bool": {"filter": [{"term": {"collection": collection_name}}]}},
+            "_source": ["text", "metadata"],
+        }
+        results = [
+            hit
+            async for hit in async_scan(
+                self.aclient, index=f"{self.index_prefix}*", query=query
+            )
+        ]
+        return self._scan_result_to_get_result(results)
+
+    async def aget_by_ids(
+        self, collection_name: str, ids: list[str]
+    ) -> Optional[GetResult]:
+        result = await self.aclient.search(
+            index=f"{self.index_prefix}*",
+            body=self._get_by_ids_body(collection_name, ids),
+            size=len(ids),
+        )
+        return self._result_to_get_result(result)
+
+    async def _aget_or_create_index(self, dimension: int):
+        index = self._get_index_name(dimension=dimension)
+        if not await self.aclient.indices.exists(index=index):
+            await self.aclient.indices.create(
+                index=index, body=self._get_index_body(dimension)
+            )
+
+    async def ainsert(self, collection_name: str, items: list[VectorItem]):
+        await self._aget_or_create_index(dimension=len(items[0]["vector"]))
+        for batch in self._create_batches(items):
+            await async_bulk(
+                self.aclient, self._get_insert_actions(collection_name, batch)
+            )
+
+    async def aupsert(self, collection_name: str, items: list[VectorItem]):
+        await self._aget_or_create_index(dimension=len(items[0]["vector"]))
+        for batch in self._create_batches(items):
+            await async_bulk(
+                self.aclient, self._get_upsert_actions(collection_name, batch)
+            )
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        await self.aclient.delete_by_query(
+            index=f"{self.index_prefix}*",
+            body=self._get_delete_body(collection_name, ids, filter),
+        )
@@ -0,0 +1,667 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows, only threads of one process are synchronized
+    fcntl = None
+
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
+from open_webui.retrieval.vector.utils import filter_metadata
+from open_webui.config import (
+    LOCAL_VECTOR_DB_PATH,
+    LOCAL_VECTOR_DB_IVF_MIN_ROWS,
+    LOCAL_VECTOR_DB_IVF_PROBE_RATIO,
+    LOCAL_VECTOR_DB_MAX_OPEN_COLLECTIONS,
+)
+
+log = logging.getLogger(__name__)
+
+# Compact a collection once this share of its rows are deleted
+COMPACTION_RATIO = 0.3
+COMPACTION_MIN_ROWS = 1000
+
+
+def matches_filter(metadata: dict, filter: Optional[dict]) -> bool:
+    for key, value in (filter or {}).items():
+        if isinstance(value, dict) and "$in" in value:
+            if metadata.get(key) not in value["$in"]:
+                return False
+        elif metadata.get(key) != value:
+            return False
+    return True
+
+
+def normalize(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable")
+        clusters, starts = np.unique(assignments[order], return_index=True)
+        # Empty clusters keep their centroid
+        centroids[clusters] = np.add.reduceat(vectors[order], starts, axis=0)
+        centroids = normalize(centroids)
+    return centroids
+
+
+class LocalCollection:
+    """
+    A collection stored in a directory of append-only files:
+
+    - `vectors.<generation>.f32`: the normalized float32 vectors, one row per
+      item, read through a memory map.
+    - `records.<generation>.jsonl`: a log of the inserted items (id, text and
+      metadata, in row order) and deleted ids.
+    - `ivf.<generation>.npy`: the centroids of the IVF index, if any.
+    - `CURRENT`: the generation in use, replaced atomically on compaction.
+
+    Vectors are written before the log entry that refers to them, and partial
+    writes past the last complete entry are cut off by the next write, so a
+    crash never leaves a half-written item. Large collections are searched
+    through an IVF index, the rest exhaustively.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.RLock()
+
+        self.generation: Optional[int] = None
+        self.dimension: Optional[int] = None
+        self._offset = 0
+
+        self.ids: list[Optional[str]] = []
+        self.texts: list[Optional[str]] = []
+        self.metadatas: list[Optional[dict]] = []
+        self.positions: dict[str, int] = {}
+        self.by_file_id: dict[str, set[int]] = {}
+        self.by_hash: dict[str, set[int]] = {}
+
+        self._vectors: Optional[np.ndarray] = None
+        self._live: Optional[np.ndarray] = None
+        self._ivf: Optional[tuple[np.ndarray, np.ndarray]] = None
+
+    ####################
+    # Files
+    ####################
+
+    def _file(self, name: str, generation: Optional[int] = None) -> str:
+        generation = self.generation if generation is None else generation
+        return os.path.join(self.path, name.format(generation=generation))
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.path, "CURRENT"))
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, "lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_generation(self) -> Optional[int]:
+        try:
+            with open(os.path.join(self.path, "CURRENT")) as f:
+                return int(f.read().strip())
+        except FileNotFoundError:
+            return None
+
+    def _write_generation(self, generation: int):
+        path = os.path.join(self.path, "CURRENT")
+        with open(f"{path}.tmp", "w") as f:
+            f.write(str(generation))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{path}.tmp", path)
+
+    ####################
+    # Loading
+    ####################
+
+    def _reset_state(self):
+        self.dimension = None
+        self._offset = 0
+        self.ids, self.texts, self.metadatas = [], [], []
+        self.positions, self.by_file_id, self.by_hash = {}, {}, {}
+        self._vectors = None
+        self._live = None
+        self._ivf = None
+
+    def _index_row(self, row: int, metadata: dict):
+        if metadata.get("file_id") is not None:
+            self.by_file_id.setdefault(metadata["file_id"], set()).add(row)
+        if metadata.get("hash") is not None:
+            self.by_hash.setdefault(metadata["hash"], set()).add(row)
+
+    def _apply(self, entry: dict):
+        self._live = None
+        if entry["op"] == "add":
+            self.dimension = entry["dimension"]
+            for item in entry["items"]:
+                row = len(self.ids)
+                previous = self.positions.get(item["id"])
+                if previous is not None:
+                    self._remove_row(previous)
+
+                self.ids.append(item["id"])
+                self.texts.append(item["text"])
+                self.metadatas.append(item["metadata"])
+                self.positions[item["id"]] = row
+                self._index_row(row, item["metadata"])
+        elif entry["op"] == "delete":
+            for id in entry["ids"]:
+                row = self.positions.get(id)
+                if row is not None:
+                    self._remove_row(row)
+
+    def _remove_row(self, row: int):
+        metadata = self.metadatas[row] or {}
+        for index, key in ((self.by_file_id, "file_id"), (self.by_hash, "hash")):
+            rows = index.get(metadata.get(key))
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del index[metadata.get(key)]
+
+        del self.positions[self.ids[row]]
+        self.ids[row] = None
+        self.texts[row] = None
+        self.metadatas[row] = None
+
+    def refresh(self):
+        """Catch up with the changes written since the last call, by any process."""
+        with self.lock:
+            with self._file_lock(exclusive=False):
+                self._refresh()
+
+    def _refresh(self):
+        generation = self._read_generation()
+        if generation != self.generation:
+            self._reset_state()
+            self.generation = generation
+        if generation is None:
+            return
+
+        log_path = self._file("records.{generation}.jsonl")
+        size = os.path.getsize(log_path)
+        if size < self._offset:
+            # The collection was deleted and created again
+            self._reset_state()
+            self.generation = generation
+        if size > self._offset:
+            with open(log_path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+
+            # Only complete entries, a partial one is being written or was
+            # left behind by a crash
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                if line.strip():
+                    self._apply(json.loads(line))
+            self._offset += end
+
+        rows = len(self.ids)
+        if rows and (self._vectors is None or len(self._vectors) != rows):
+            self._vectors = np.memmap(
+                self._file("vectors.{generation}.f32"),
+                dtype=np.float32,
+                mode="r",
+                shape=(rows, self.dimension),
+            )
+
+    ####################
+    # Writing
+    ####################
+
+    def _append(self, vectors: Optional[np.ndarray], entry: dict):
+        vectors_path = self._file("vectors.{generation}.f32")
+        log_path = self._file("records.{generation}.jsonl")
+
+        if vectors is not None:
+            with open(vectors_path, "r+b") as f:
+                # Drop vectors without a log entry, from a crashed write
+                f.truncate(len(self.ids) * vectors.shape[1] * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        with open(log_path, "r+b") as f:
+            f.truncate(self._offset)
+            f.seek(0, os.SEEK_END)
+            f.write(json.dumps(entry, default=str).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _create(self):
+        # Unique, so that processes which had the collection open before it was
+        # deleted and created again don't take it for theirs
+        generation = time.time_ns()
+        open(self._file("vectors.{generation}.f32", generation), "wb").close()
+        open(self._file("records.{generation}.jsonl", generation), "wb").close()
+        self._write_generation(generation)
+
+    def add(self, items: list[VectorItem]):
+        if not items:
+            return
+
+        vectors = normalize([item["vector"] for item in items])
+        entry = {
+            "op": "add",
+            "dimension": vectors.shape[1],
+            "items": [
+                {
+                    "id": item["id"],
+                    "text": item["text"],
+                    "metadata": filter_metadata(item["metadata"] or {}),
+                }
+                for item in items
+            ],
+        }
+
+        with self.lock:
+            with self._file_lock(exclusive=True):
+                self._refresh()
+                if self.generation is None:
+                    # New, or deleted while waiting for the lock
+                    self._create()
+                    self._refresh()
+                if self.dimension is not None and self.dimension != vectors.shape[1]:
+                    raise ValueError(
+                        f"Vector dimension {vectors.shape[1]} doesn't match the "
+                        f"collection dimension {self.dimension}"
+                    )
+                self._append(vectors, entry)
+                self._refresh()
+
+    def delete(self, ids: list[str]):
+        with self.lock:
+            with self._file_lock(exclusive=True):
+                self._refresh()
+                ids = [id for id in ids if id in self.positions]
+                if not ids:
+                    return
+
+                self._append(None, {"op": "delete", "ids": ids})
+                self._refresh()
+
+                deleted = len(self.ids) - len(self.positions)
+                if deleted >= COMPACTION_MIN_ROWS and deleted > COMPACTION_RATIO * len(
+                    self.ids
+                ):
+                    self._compact()
+
+    def _compact(self):
+        """Rewrite the collection without its deleted rows, as a new generation."""
+        generation = self.generation + 1
+        live = [row for row, id in enumerate(self.ids) if id is not None]
+        log.info(f"Compacting {self.path}: {len(self.ids) - len(live)} deleted rows")
+
+        with open(self._file("vectors.{generation}.f32", generation), "wb") as f:
+            for start in range(0, len(live), 10000):
+                f.write(
+                    np.ascontiguousarray(
+                        self._vectors[live[start : start + 10000]]
+                    ).tobytes()
+                )
+            f.flush()
+            os.fsync(f.fileno())
+
+        with open(self._file("records.{generation}.jsonl", generation), "wb") as f:
+            entry = {
+                "op": "add",
+                "dimension": self.dimension,
+                "items": [
+                    {
+                        "id": self.ids[row],
+                        "text": self.texts[row],
+                        "metadata": self.metadatas[row],
+                    }
+                    for row in live
+                ],
+            }
+            f.write(json.dumps(entry, default=str).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        previous = self.generation
+        self._write_generation(generation)
+        for name in (
+            "vectors.{generation}.f32",
+            "records.{generation}.jsonl",
+            "ivf.{generation}.npy",
+        ):
+            try:
+                os.remove(self._file(name, previous))
+            except FileNotFoundError:
+                pass
+
+        self._refresh()
+
+    ####################
+    # Reading
+    ####################
+
+    def get_live_mask(self) -> np.ndarray:
+        if self._live is None:
+            self._live = np.array([id is not None for id in self.ids], dtype=bool)
+        return self._live
+
+    def get_rows(self, filter: Optional[dict] = None) -> list[int]:
+        """Return the live rows matching a metadata filter."""
+        if not filter:
+            return np.nonzero(self.get_live_mask())[0].tolist()
+
+        rows = None
+        for key, index in (("file_id", self.by_file_id), ("hash", self.by_hash)):
+            value = filter.get(key)
+            if value is None:
+                continue
+
+            values = (
+                value["$in"] if isinstance(value, dict) and "$in" in value else [value]
+            )
+            matched = set().union(*[index.get(v, set()) for v in values])
+            rows = matched if rows is None else rows & matched
+
+        candidates = sorted(rows) if rows is not None else self.get_rows()
+        return [
+            row for row in candidates if matches_filter(self.metadatas[row], filter)
+        ]
+
+    def _get_ivf(self) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        """Build or extend the IVF index, returns None for small collections."""
+        live = len(self.positions)
+        if live < LOCAL_VECTOR_DB_IVF_MIN_ROWS:
+            return None
+
+        # The index has sqrt(rows) clusters, it is built again once the
+        # collection doubled in size
+        if self._ivf is not None and len(self.ids) <= 2 * len(self._ivf[0]) ** 2:
+            centroids, assignments = self._ivf
+            if len(assignments) < len(self.ids):
+                # Assign the rows added since, the centroids are kept
+                new = np.argmax(self._vectors[len(assignments) :] @ centroids.T, axis=1)
+                self._ivf = (centroids, np.concatenate([assignments, new]))
+            return self._ivf
+
+        centroids = self._load_ivf_centroids()
+        if centroids is None:
+            log.info(f"Building the IVF index of {self.path}: {live} vectors")
+            rows = np.nonzero(self.get_live_mask())[0]
+            k = int(np.sqrt(live))
+            sample = np.random.default_rng(0).choice(
+                rows, size=min(len(rows), 64 * k), replace=False
+            )
+            centroids = kmeans(np.asarray(self._vectors[np.sort(sample)]), k=k)
+            self._save_ivf_centroids(centroids)
+
+        assignments = np.concatenate(
+            [
+                np.argmax(self._vectors[start : start + 50000] @ centroids.T, axis=1)
+                for start in range(0, len(self.ids), 50000)
+            ]
+        )
+        self._ivf = (centroids, assignments)
+        return self._ivf
+
+    def _load_ivf_centroids(self) -> Optional[np.ndarray]:
+        try:
+            centroids = np.load(self._file("ivf.{generation}.npy"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if (
+            len(self.ids) > 2 * len(centroids) ** 2
+            or centroids.shape[1] != self.dimension
+        ):
+            return None
+        return centroids
+
+    def _save_ivf_centroids(self, centroids: np.ndarray):
+        path = self._file("ivf.{generation}.npy")
+        try:
+            with open(f"{path}.{os.getpid()}.tmp", "wb") as f:
+                np.save(f, centroids)
+            os.replace(f"{path}.{os.getpid()}.tmp", path)
+        except OSError as e:
+            log.warning(f"Failed to save the IVF index of {self.path}: {e}")
+
+    def search(
+        self, vectors: list, filter: Optional[dict], limit: Optional[int]
+    ) -> list[list[tuple[int, float]]]:
+        queries = normalize(vectors)
+        if not self.positions:
+            return [[] for _ in queries]
+
+        ivf = None if filter else self._get_ivf()
+        live = self.get_live_mask()
+        rows = None if ivf is not None else np.array(self.get_rows(filter), dtype=int)
+        if ivf is not None:
+            probe_count = max(
+                1, int(np.ceil(LOCAL_VECTOR_DB_IVF_PROBE_RATIO * len(ivf[0])))
+            )
+
+        results = []
+        for query in queries:
+            if ivf is not None:
+                centroids, assignments = ivf
+                probes = np.argsort(-(centroids @ query))[:probe_count]
+                candidates = np.nonzero(np.isin(assignments, probes))[0]
+                candidates = candidates[live[candidates]]
+            else:
+                candidates = rows
+
+            if len(candidates) == 0:
+                results.append([])
+                continue
+
+            scores = self._vectors[candidates] @ query
+            count = len(scores) if limit is None else min(limit, len(scores))
+            top = np.argpartition(-scores, count - 1)[:count]
+            top = top[np.argsort(-scores[top])]
+            results.append([(int(candidates[idx]), float(scores[idx])) for idx in top])
+        return results
+
+
+class LocalClient(VectorDBBase):
+    """
+    Embedded vector store keeping each collection in memory-mapped files
+    under `LOCAL_VECTOR_DB_PATH`, for deployments with many small collections
+    that don't want to run a vector database service.
+    """
+
+    def __init__(self):
+        self.path = LOCAL_VECTOR_DB_PATH
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._collections: OrderedDict[str, LocalCollection] = OrderedDict()
+
+    def _get_collection_path(self, collection_name: str) -> str:
+        if re.fullmatch(r"[A-Za-z0-9_-][A-Za-z0-9_.-]*", collection_name):
+            name = collection_name
+        else:
+            name = hashlib.sha256(collection_name.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, name)
+
+    def _get_collection(self, collection_name: str) -> LocalCollection:
+        with self._lock:
+            collection = self._collections.get(collection_name)
+            if collection is None:
+                collection = LocalCollection(self._get_collection_path(collection_name))
+                self._collections[collection_name] = collection
+            self._collections.move_to_end(collection_name)
+
+            # Evict the least recently used, they are loaded again when needed
+            while len(self._collections) > LOCAL_VECTOR_DB_MAX_OPEN_COLLECTIONS:
+                self._collections.popitem(last=False)
+            return collection
+
+    def _get_existing_collection(
+        self, collection_name: str
+    ) -> Optional[LocalCollection]:
+        collection = self._get_collection(collection_name)
+        if not collection.exists():
+            return None
+
+        collection.refresh()
+        return collection
+
+    def _to_get_result(self, collection: LocalCollection, rows: list[int]):
+        return GetResult(
+            ids=[[collection.ids[row] for row in rows]],
+            documents=[[collection.texts[row] for row in rows]],
+            metadatas=[[collection.metadatas[row] for row in rows]],
+        )
+
+    def has_collection(self, collection_name: str) -> bool:
+        return self._get_collection(collection_name).exists()
+
+    def delete_collection(self, collection_name: str):
+        with self._lock:
+            collection = self._collections.pop(collection_name, None)
+        if collection is None:
+            collection = LocalCollection(self._get_collection_path(collection_name))
+        if not collection.exists():
+            return
+
+        # Not while another process writes or compacts the collection. The lock
+        # file is kept, processes waiting on it find the collection deleted.
+        with collection.lock:
+            with collection._file_lock(exclusive=True):
+                # Readers take the collection for deleted from here on
+                os.remove(os.path.join(collection.path, "CURRENT"))
+                for name in os.listdir(collection.path):
+                    if name != "lock":
+                        os.remove(os.path.join(collection.path, name))
+
+    def search(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        collection = self._get_existing_collection(collection_name)
+        if collection is None:
+            return None
+
+        with collection.lock:
+            results = collection.search(vectors, filter, limit)
+            return SearchResult(
+                ids=[[collection.ids[row] for row, _ in result] for result in results],
+                documents=[
+                    [collection.texts[row] for row, _ in result] for result in results
+                ],
+                metadatas=[
+                    [collection.metadatas[row] for row, _ in result]
+                    for result in results
+                ],
+                # Cosine similarity [-1, 1] to a [0, 1] score
+                distances=[
+                    [(score + 1.0) / 2.0 for _, score in result] for result in results
+                ],
+            )
+
+    def query(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        collection = self._get_existing_collection(collection_name)
+        if collection is None:
+            return None
+
+        with collection.lock:
+            return self._to_get_result(collection, collection.get_rows(filter)[:limit])
+
+    def get(self, collection_name: str) -> Optional[GetResult]:
+        collection = self._get_existing_collection(collection_name)
+        if collection is None:
+            return None
+
+        with collection.lock:
+            return self._to_get_result(collection, collection.get_rows())
+
+    def get_vectors(self, collection_name: str, ids: list[str]) -> dict[str, list]:
+        collection = self._get_existing_collection(collection_name)
+        if collection is None:
+            return {}
+
+        with collection.lock:
+            return {
+                id: collection._vectors[collection.positions[id]].tolist()
+                for id in ids
+                if id in collection.positions
+            }
+
+    def get_by_ids(self, collection_name: str, ids: list[str]) -> Optional[GetResult]:
+        collection = self._get_existing_collection(collection_name)
+        if collection is None:
+            return None
+
+        with collection.lock:
+            return self._to_get_result(
+                collection,
+                [collection.positions[id] for id in ids if id in collection.positions],
+            )
+
+    def insert(self, collection_name: str, items: list[VectorItem]):
+        if not items:
+            return
+
+        collection = self._get_collection(collection_name)
+        collection.add(items)
+
+    def upsert(self, collection_name: str, items: list[VectorItem]):
+        # Items replace those with the same id when the log is replayed
+        self.insert(collection_name, items)
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        collection = self._get_existing_collection(collection_name)
+        if collection is None:
+            return
+
+        if not ids and filter:
+            with collection.lock:
+                ids = [collection.ids[row] for row in collection.get_rows(filter)]
+        if ids:
+            collection.delete(ids)
+
+    def reset(self):
+        with self._lock:
+            self._collections.clear()
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
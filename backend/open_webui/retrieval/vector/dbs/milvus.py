@@ -1,7 +1,8 @@
-from pymilvus import MilvusClient as Client
+from pymilvus import AsyncMilvusClient, MilvusClient as Client
 from pymilvus import FieldSchema, DataType
 from pymilvus import connections, Collection
 
+import asyncio
 import json
 import logging
 from typing import Optional
@@ -12,6 +13,7 @@ from open_webui.retrieval.vector.main import (
     VectorItem,
     SearchResult,
     GetResult,
+    run_in_executor,
 )
 from open_webui.config import (
     MILVUS_URI,
@@ -33,9 +35,24 @@ class MilvusClient(VectorDBBase):
     def __init__(self):
         self.collection_prefix = "open_webui"
         if MILVUS_TOKEN is None:
-            self.client = Client(uri=MILVUS_URI, db_name=MILVUS_DB)
+            self.client_kwargs = dict(uri=MILVUS_URI, db_name=MILVUS_DB)
         else:
-            self.client = Client(uri=MILVUS_URI, db_name=MILVUS_DB, token=MILVUS_TOKEN)
+            self.client_kwargs = dict(
+                uri=MILVUS_URI, db_name=MILVUS_DB, token=MILVUS_TOKEN
+            )
+        self.client = Client(**self.client_kwargs)
+
+        # Requests from the event loop don't need a thread, the async client is
+        # created from the loop it is bound to
+        self._aclient = None
+        self._aclient_loop = None
+
+    def _get_aclient(self) -> AsyncMilvusClient:
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._aclient = AsyncMilvusClient(**self.client_kwargs)
+            self._aclient_loop = loop
+        return self._aclient
 
     def _result_to_get_result(self, result) -> GetResult:
         ids = []
@@ -164,6 +181,25 @@ class MilvusClient(VectorDBBase):
             f"Successfully created collection '{self.collection_prefix}_{collection_name}' with index type '{index_type}' and metric '{metric_type}'."
         )
 
+    def _get_rows(self, items: list[VectorItem]) -> list[dict]:
+        return [
+            {
+                "id": item["id"],
+                "vector": item["vector"],
+                "data": {"text": item["text"]},
+                "metadata": process_metadata(item["metadata"]),
+            }
+            for item in items
+        ]
+
+    def _get_filter_string(self, filter: dict) -> str:
+        return " && ".join(
+            [
+                f'metadata["{key}"] == {json.dumps(value)}'
+                for key, value in filter.items()
+            ]
+        )
+
     def has_collection(self, collection_name: str) -> bool:
         # Check if the collection exists based on the collection name.
         collection_name = collection_name.replace("-", "_")
@@ -263,6 +299,18 @@ class MilvusClient(VectorDBBase):
         # This will use the paginated query logic.
         return self.query(collection_name=collection_name, filter={}, limit=-1)
 
+    def get_by_ids(self, collection_name: str, ids: list[str]) -> Optional[GetResult]:
+        collection_name = collection_name.replace("-", "_")
+        if not self.has_collection(collection_name):
+            return None
+
+        result = self.client.get(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            ids=ids,
+            output_fields=["id", "data", "metadata"],
+        )
+        return self._result_to_get_result([result])
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         collection_name = collection_name.replace("-", "_")
@@ -288,15 +336,7 @@ class MilvusClient(VectorDBBase):
         )
         return self.client.insert(
             collection_name=f"{self.collection_prefix}_{collection_name}",
-            data=[
-                {
-                    "id": item["id"],
-                    "vector": item["vector"],
-                    "data": {"text": item["text"]},
-                    "metadata": process_metadata(item["metadata"]),
-                }
-                for item in items
-            ],
+            data=self._get_rows(items),
         )
 
     def upsert(self, collection_name: str, items: list[VectorItem]):
@@ -324,15 +364,7 @@ class MilvusClient(VectorDBBase):
         )
         return self.client.upsert(
             collection_name=f"{self.collection_prefix}_{collection_name}",
-            data=[
-                {
-                    "id": item["id"],
-                    "vector": item["vector"],
-                    "data": {"text": item["text"]},
-                    "metadata": process_metadata(item["metadata"]),
-                }
-                for item in items
-            ],
+            data=self._get_rows(items),
         )
 
     def delete(
@@ -358,12 +390,7 @@ class MilvusClient(VectorDBBase):
                 ids=ids,
             )
         elif filter:
-            filter_string = " && ".join(
-                [
-                    f'metadata["{key}"] == {json.dumps(value)}'
-                    for key, value in filter.items()
-                ]
-            )
+            filter_string = self._get_filter_string(filter)
             log.info(
                 f"Deleting items by filter from {self.collection_prefix}_{collection_name}. Filter: {filter_string}"
             )
@@ -377,6 +404,107 @@ class MilvusClient(VectorDBBase):
             )
             return None
 
+    ####################
+    # Async, through AsyncMilvusClient. It has no query iterator, so query and
+    # get, which page through whole collections, still run in a thread
+    ####################
+
+    async def ahas_collection(self, collection_name: str) -> bool:
+        collection_name = collection_name.replace("-", "_")
+        return await self._get_aclient().has_collection(
+            collection_name=f"{self.collection_prefix}_{collection_name}"
+        )
+
+    async def adelete_collection(self, collection_name: str):
+        collection_name = collection_name.replace("-", "_")
+        return await self._get_aclient().drop_collection(
+            collection_name=f"{self.collection_prefix}_{collection_name}"
+        )
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        collection_name = collection_name.replace("-", "_")
+        result = await self._get_aclient().search(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            data=vectors,
+            limit=limit,
+            output_fields=["data", "metadata"],
+        )
+        return self._result_to_search_result(result)
+
+    async def aget_by_ids(
+        self, collection_name: str, ids: list[str]
+    ) -> Optional[GetResult]:
+        if not await self.ahas_collection(collection_name):
+            return None
+
+        collection_name = collection_name.replace("-", "_")
+        result = await self._get_aclient().get(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            ids=ids,
+            output_fields=["id", "data", "metadata"],
+        )
+        return self._result_to_get_result([result])
+
+    async def _acreate_collection_if_not_exists(
+        self, collection_name: str, items: list[VectorItem]
+    ):
+        if await self.ahas_collection(collection_name):
+            return
+        if not items:
+            raise ValueError(
+                "Cannot create Milvus collection without items to determine vector dimension."
+            )
+        # Once per collection, with the schema helpers of the sync client
+        await run_in_executor(
+            self._create_collection,
+            collection_name=collection_name.replace("-", "_"),
+            dimension=len(items[0]["vector"]),
+        )
+
+    async def ainsert(self, collection_name: str, items: list[VectorItem]):
+        await self._acreate_collection_if_not_exists(collection_name, items)
+        collection_name = collection_name.replace("-", "_")
+        return await self._get_aclient().insert(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            data=self._get_rows(items),
+        )
+
+    async def aupsert(self, collection_name: str, items: list[VectorItem]):
+        await self._acreate_collection_if_not_exists(collection_name, items)
+        collection_name = collection_name.replace("-", "_")
+        return await self._get_aclient().upsert(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            data=self._get_rows(items),
+        )
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        if not await self.ahas_collection(collection_name):
+            return None
+
+        collection_name = collection_name.replace("-", "_")
+        if ids:
+            return await self._get_aclient().delete(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                ids=ids,
+            )
+        elif filter:
+            return await self._get_aclient().delete(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                filter=self._get_filter_string(filter),
+            )
+        return None
+
     def reset(self):
         # Resets the database. This will delete all collections and item entries that match the prefix.
         log.warning(
@@ -1,5 +1,5 @@
-from opensearchpy import OpenSearch
-from opensearchpy.helpers import bulk
+from opensearchpy import AsyncOpenSearch, OpenSearch
+from opensearchpy.helpers import async_bulk, bulk
 from typing import Optional
 
 from open_webui.retrieval.vector.utils import process_metadata
@@ -21,12 +21,15 @@ from open_webui.config import (
 class OpenSearchClient(VectorDBBase):
     def __init__(self):
         self.index_prefix = "open_webui"
-        self.client = OpenSearch(
+        client_kwargs = dict(
             hosts=[OPENSEARCH_URI],
             use_ssl=OPENSEARCH_SSL,
             verify_certs=OPENSEARCH_CERT_VERIFY,
             http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
         )
+        self.client = OpenSearch(**client_kwargs)
+        # Requests from the event loop don't need a thread
+        self.aclient = AsyncOpenSearch(**client_kwargs)
 
     def _get_index_name(self, collection_name: str) -> str:
         return f"{self.index_prefix}_{collection_name}"
@@ -68,8 +71,8 @@ class OpenSearchClient(VectorDBBase):
             metadatas=[metadatas],
         )
 
-    def _create_index(self, collection_name: str, dimension: int):
-        body = {
+    def _get_index_body(self, dimension: int) -> dict:
+        return {
             "settings": {"index": {"knn": True}},
             "mappings": {
                 "properties": {
@@ -94,8 +97,11 @@ class OpenSearchClient(VectorDBBase):
                 }
             },
         }
+
+    def _create_index(self, collection_name: str, dimension: int):
         self.client.indices.create(
-            index=self._get_index_name(collection_name), body=body
+            index=self._get_index_name(collection_name),
+            body=self._get_index_body(dimension),
         )
 
     def _create_batches(self, items: list[VectorItem], batch_size=100):
@@ -112,6 +118,24 @@ class OpenSearchClient(VectorDBBase):
         # We are simply adapting to the norms of the other DBs.
         self.client.indices.delete(index=self._get_index_name(collection_name))
 
+    def _get_search_body(self, vectors: list[list[float | int]], limit: int) -> dict:
+        return {
+            "size": limit,
+            "_source": ["text", "metadata"],
+            "query": {
+                "script_score": {
+                    "query": {"match_all": {}},
+                    "script": {
+                        "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
+                        "params": {
+                            "field": "vector",
+                            "query_value": vectors[0],
+                        },  # Assuming single query vector
+                    },
+                }
+            },
+        }
+
     def search(
         self,
         collection_name: str,
@@ -123,22 +147,7 @@ class OpenSearchClient(VectorDBBase):
             if not self.has_collection(collection_name):
                 return None
 
-            query = {
-                "size": limit,
-                "_source": ["text", "metadata"],
-                "query": {
-                    "script_score": {
-                        "query": {"match_all": {}},
-                        "script": {
-                            "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
-                            "params": {
-                                "field": "vector",
-                                "query_value": vectors[0],
-                            },  # Assuming single query vector
-                        },
-                    }
-                },
-            }
+            query = self._get_search_body(vectors, limit)
 
             result = self.client.search(
                 index=self._get_index_name(collection_name), body=query
@@ -149,6 +158,16 @@ class OpenSearchClient(VectorDBBase):
         except Exception as e:
             return None
 
+    def _get_filter_query(self, filter: dict) -> dict:
+        return {
+            "bool": {
+                "filter": [
+                    {"term": {"metadata." + str(field) + ".keyword": value}}
+                    for field, value in filter.items()
+                ]
+            }
+        }
+
     def query(
         self, collection_name: str, filter: dict, limit: Optional[int] = None
     ) -> Optional[GetResult]:
@@ -156,15 +175,9 @@ class OpenSearchClient(VectorDBBase):
             return None
 
         query_body = {
-            "query": {"bool": {"filter": []}},
+            "query": self._get_filter_query(filter),
             "_source": ["text", "metadata"],
         }
-
-        for field, value in filter.items():
-            query_body["query"]["bool"]["filter"].append(
-                {"term": {"metadata." + str(field) + ".keyword": value}}
-            )
-
         size = limit if limit else 10000
 
         try:
@@ -191,26 +204,65 @@ class OpenSearchClient(VectorDBBase):
         )
         return self._result_to_get_result(result)
 
+    def get_by_ids(self, collection_name: str, ids: list[str]) -> Optional[GetResult]:
+        if not self.has_collection(collection_name):
+            return None
+
+        query = {"query": {"ids": {"values": ids}}, "_source": ["text", "metadata"]}
+
+        result = self.client.search(
+            index=self._get_index_name(collection_name), body=query, size=len(ids)
+        )
+        return self._result_to_get_result(result)
+
+    def _get_insert_actions(self, collection_name: str, items: list[VectorItem]):
+        return [
+            {
+                "_op_type": "index",
+                "_index": self._get_index_name(collection_name),
+                "_id": item["id"],
+                "_source": {
+                    "vector": item["vector"],
+                    "text": item["text"],
+                    "metadata": process_metadata(item["metadata"]),
+                },
+            }
+            for item in items
+        ]
+
+    def _get_upsert_actions(self, collection_name: str, items: list[VectorItem]):
+        return [
+            {
+                "_op_type": "update",
+                "_index": self._get_index_name(collection_name),
+                "_id": item["id"],
+                "doc": {
+                    "vector": item["vector"],
+                    "text": item["text"],
+                    "metadata": process_metadata(item["metadata"]),
+                },
+                "doc_as_upsert": True,
+            }
+            for item in items
+        ]
+
+    def _get_delete_actions(self, collection_name: str, ids: list[str]):
+        return [
+            {
+                "_op_type": "delete",
+                "_index": self._get_index_name(collection_name),
+                "_id": id,
+            }
+            for id in ids
+        ]
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         self._create_index_if_not_exists(
             collection_name=collection_name, dimension=len(items[0]["vector"])
         )
 
         for batch in self._create_batches(items):
-            actions = [
-                {
-                    "_op_type": "index",
-                    "_index": self._get_index_name(collection_name),
-                    "_id": item["id"],
-                    "_source": {
-                        "vector": item["vector"],
-                        "text": item["text"],
-                        "metadata": process_metadata(item["metadata"]),
-                    },
-                }
-                for item in batch
-            ]
-            bulk(self.client, actions)
+            bulk(self.client, self._get_insert_actions(collection_name, batch))
         self.client.indices.refresh(self._get_index_name(collection_name))
 
     def upsert(self, collection_name: str, items: list[VectorItem]):
@@ -219,21 +271,7 @@ class OpenSearchClient(VectorDBBase):
         )
 
         for batch in self._create_batches(items):
-            actions = [
-                {
-                    "_op_type": "update",
-                    "_index": self._get_index_name(collection_name),
-                    "_id": item["id"],
-                    "doc": {
-                        "vector": item["vector"],
-                        "text": item["text"],
-                        "metadata": process_metadata(item["metadata"]),
-                    },
-                    "doc_as_upsert": True,
-                }
-                for item in batch
-            ]
-            bulk(self.client, actions)
+            bulk(self.client, self._get_upsert_actions(collection_name, batch))
         self.client.indices.refresh(self._get_index_name(collection_name))
 
     def delete(
@@ -243,23 +281,9 @@ class OpenSearchClient(VectorDBBase):
         filter: Optional[dict] = None,
     ):
         if ids:
-            actions = [
-                {
-                    "_op_type": "delete",
-                    "_index": self._get_index_name(collection_name),
-                    "_id": id,
-                }
-                for id in ids
-            ]
-            bulk(self.client, actions)
+            bulk(self.client, self._get_delete_actions(collection_name, ids))
         elif filter:
-            query_body = {
-                "query": {"bool": {"filter": []}},
-            }
-            for field, value in filter.items():
-                query_body["query"]["bool"]["filter"].append(
-                    {"term": {"metadata." + str(field) + ".keyword": value}}
-                )
+            query_body = {"query": self._get_filter_query(filter)}
             self.client.delete_by_query(
                 index=self._get_index_name(collection_name), body=query_body
             )
@@ -269,3 +293,117 @@ class OpenSearchClient(VectorDBBase):
         indices = self.client.indices.get(index=f"{self.index_prefix}_*")
         for index in indices:
             self.client.indices.delete(index=index)
+
+    ####################
+    # Async, through AsyncOpenSearch
+    ####################
+
+    async def ahas_collection(self, collection_name: str) -> bool:
+        return await self.aclient.indices.exists(
+            index=self._get_index_name(collection_name)
+        )
+
+    async def adelete_collection(self, collection_name: str):
+        await self.aclient.indices.delete(index=self._get_index_name(collection_name))
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        try:
+            if not await self.ahas_collection(collection_name):
+                return None
+
+            result = await self.aclient.search(
+                index=self._get_index_name(collection_name),
+                body=self._get_search_body(vectors, limit),
+            )
+            return self._result_to_search_result(result)
+        except Exception as e:
+            return None
+
+    async def aquery(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if not await self.ahas_collection(collection_name):
+            return None
+
+        try:
+            result = await self.aclient.search(
+                index=self._get_index_name(collection_name),
+                body={
+                    "query": self._get_filter_query(filter),
+                    "_source": ["text", "metadata"],
+                },
+                size=limit if limit else 10000,
+            )
+            return self._result_to_get_result(result)
+        except Exception as e:
+            return None
+
+    async def aget(self, collection_name: str) -> Optional[GetResult]:
+        result = await self.aclient.search(
+            index=self._get_index_name(collection_name),
+            body={"query": {"match_all": {}}, "_source": ["text", "metadata"]},
+        )
+        return self._result_to_get_result(result)
+
+    async def aget_by_ids(
+        self, collection_name: str, ids: list[str]
+    ) -> Optional[GetResult]:
+        if not await self.ahas_collection(collection_name):
+            return None
+
+        result = await self.aclient.search(
+            index=self._get_index_name(collection_name),
+            body={"query": {"ids": {"values": ids}}, "_source": ["text", "metadata"]},
+            size=len(ids),
+        )
+        return self._result_to_get_result(result)
+
+    async def _acreate_index_if_not_exists(self, collection_name: str, dimension: int):
+        if not await self.ahas_collection(collection_name):
+            await self.aclient.indices.create(
+                index=self._get_index_name(collection_name),
+                body=self._get_index_body(dimension),
+            )
+
+    async def ainsert(self, collection_name: str, items: list[VectorItem]):
+        await self._acreate_index_if_not_exists(
+            collection_name=collection_name, dimension=len(items[0]["vector"])
+        )
+        for batch in self._create_batches(items):
+            await async_bulk(
+                self.aclient, self._get_insert_actions(collection_name, batch)
+            )
+        await self.aclient.indices.refresh(index=self._get_index_name(collection_name))
+
+    async def aupsert(self, collection_name: str, items: list[VectorItem]):
+        await self._acreate_index_if_not_exists(
+            collection_name=collection_name, dimension=len(items[0]["vector"])
+        )
+        for batch in self._create_batches(items):
+            await async_bulk(
+                self.aclient, self._get_upsert_actions(collection_name, batch)
+            )
+        await self.aclient.indices.refresh(index=self._get_index_name(collection_name))
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        if ids:
+            await async_bulk(
+                self.aclient, self._get_delete_actions(collection_name, ids)
+            )
+        elif filter:
+            await self.aclient.delete_by_query(
+                index=self._get_index_name(collection_name),
+                body={"query": self._get_filter_query(filter)},
+            )
+        await self.aclient.indices.refresh(index=self._get_index_name(collection_name))
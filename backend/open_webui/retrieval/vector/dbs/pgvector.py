@@ -2,6 +2,7 @@ from typing import Optional, List, Dict, Any, Tuple
 import logging
 import json
 from sqlalchemy import (
+    event,
     func,
     literal,
     cast,
@@ -11,6 +12,7 @@ from sqlalchemy import (
     Integer,
     MetaData,
     LargeBinary,
+    bindparam,
     select,
     text,
     Text,
@@ -19,9 +21,11 @@ from sqlalchemy import (
 )
 from sqlalchemy.sql import true
 from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
-from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
-from sqlalchemy.dialects.postgresql import JSONB, array
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.dialects.postgresql import JSONB, array, insert
 from pgvector.sqlalchemy import Vector, HALFVEC
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.exc import NoSuchTableError
@@ -70,6 +74,27 @@ def pgcrypto_decrypt(col, key, outtype="text"):
     return func.cast(func.pgp_sym_decrypt(col, literal(key)), outtype)
 
 
+def get_asyncpg_url(url: URL) -> URL:
+    query = dict(url.query)
+    # asyncpg takes the libpq sslmode values as `ssl`
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return url.set(drivername="postgresql+asyncpg", query=query)
+
+
+async def register_vector_types(connection) -> None:
+    # Sent and read as text, the format the pgvector SQLAlchemy types produce
+    # and parse
+    for name in ("vector", "halfvec"):
+        try:
+            await connection.set_type_codec(
+                name, encoder=str, decoder=str, format="text"
+            )
+        except ValueError:
+            # halfvec, before pgvector 0.7
+            pass
+
+
 class DocumentChunk(Base):
     __tablename__ = "document_chunk"
 
@@ -87,12 +112,15 @@ class DocumentChunk(Base):
 
 class PgvectorClient(VectorDBBase):
     def __init__(self) -> None:
+        # Each operation opens its own session, so concurrent operations from
+        # the vector database threads use separate connections from the pool
 
         # if no pgvector uri, use the existing database connection
         if not PGVECTOR_DB_URL:
-            from open_webui.internal.db import ScopedSession
+            from open_webui.internal.db import SessionLocal, engine
 
-            self.session = ScopedSession
+            self.engine = engine
+            self.SessionLocal = SessionLocal
         else:
             if isinstance(PGVECTOR_POOL_SIZE, int):
                 if PGVECTOR_POOL_SIZE > 0:
@@ -112,16 +140,48 @@ class PgvectorClient(VectorDBBase):
             else:
                 engine = create_engine(PGVECTOR_DB_URL, pool_pre_ping=True)
 
-            SessionLocal = sessionmaker(
+            self.engine = engine
+            self.SessionLocal = sessionmaker(
                 autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
             )
-            self.session = scoped_session(SessionLocal)
 
+        with self.SessionLocal() as session:
+            self._initialize(session)
+
+        # Requests from the event loop don't need a thread, they use their own
+        # asyncpg connections to the same database
+        if isinstance(PGVECTOR_POOL_SIZE, int) and PGVECTOR_DB_URL:
+            if PGVECTOR_POOL_SIZE > 0:
+                pool_kwargs = dict(
+                    pool_size=PGVECTOR_POOL_SIZE,
+                    max_overflow=PGVECTOR_POOL_MAX_OVERFLOW,
+                    pool_timeout=PGVECTOR_POOL_TIMEOUT,
+                    pool_recycle=PGVECTOR_POOL_RECYCLE,
+                )
+            else:
+                pool_kwargs = dict(poolclass=NullPool)
+        else:
+            pool_kwargs = {}
+        self.async_engine = create_async_engine(
+            get_asyncpg_url(self.engine.url), pool_pre_ping=True, **pool_kwargs
+        )
+        event.listen(
+            self.async_engine.sync_engine,
+            "connect",
+            lambda dbapi_connection, _: dbapi_connection.run_async(
+                register_vector_types
+            ),
+        )
+        self.AsyncSessionLocal = async_sessionmaker(
+            self.async_engine, expire_on_commit=False
+        )
+
+    def _initialize(self, session: Session) -> None:
         try:
             # Ensure the pgvector extension is available
             # Use a conditional check to avoid permission issues on Azure PostgreSQL
             if PGVECTOR_CREATE_EXTENSION:
-                self.session.execute(
+                session.execute(
                     text(
                         """
                     DO $$
@@ -137,7 +197,7 @@ class PgvectorClient(VectorDBBase):
             if PGVECTOR_PGCRYPTO:
                 # Ensure the pgcrypto extension is available for encryption
                 # Use a conditional check to avoid permission issues on Azure PostgreSQL
-                self.session.execute(
+                session.execute(
                     text(
                         """
                     DO $$
@@ -161,22 +221,22 @@ class PgvectorClient(VectorDBBase):
             # Create the tables if they do not exist
             # Base.metadata.create_all requires a bind (engine or connection)
             # Get the connection from the session
-            connection = self.session.connection()
+            connection = session.connection()
             Base.metadata.create_all(bind=connection)
 
             index_method, index_options = self._vector_index_configuration()
-            self._ensure_vector_index(index_method, index_options)
+            self._ensure_vector_index(session, index_method, index_options)
 
-            self.session.execute(
+            session.execute(
                 text(
                     "CREATE INDEX IF NOT EXISTS idx_document_chunk_collection_name "
                     "ON document_chunk (collection_name);"
                 )
             )
-            self.session.commit()
+            session.commit()
             log.info("Initialization complete.")
         except Exception as e:
-            self.session.rollback()
+            session.rollback()
             log.exception(f"Error during initialization: {e}")
             raise
 
@@ -213,9 +273,11 @@ class PgvectorClient(VectorDBBase):
 
         return index_method, index_options
 
-    def _ensure_vector_index(self, index_method: str, index_options: str) -> None:
+    def _ensure_vector_index(
+        self, session: Session, index_method: str, index_options: str
+    ) -> None:
         index_name = "idx_document_chunk_vector"
-        existing_index_def = self.session.execute(
+        existing_index_def = session.execute(
             text(
                 """
                 SELECT indexdef
@@ -244,7 +306,7 @@ class PgvectorClient(VectorDBBase):
             )
             if index_options:
                 index_sql = f"{index_sql} {index_options}"
-            self.session.execute(text(index_sql))
+            session.execute(text(index_sql))
             log.info(
                 "Ensured vector index '%s' using %s%s.",
                 index_name,
@@ -261,7 +323,7 @@ class PgvectorClient(VectorDBBase):
         try:
             # Attempt to reflect the 'document_chunk' table
             document_chunk_table = Table(
-                "document_chunk", metadata, autoload_with=self.session.bind
+                "document_chunk", metadata, autoload_with=self.engine
             )
         except NoSuchTableError:
             # Table does not exist; no action needed
@@ -301,125 +363,88 @@ class PgvectorClient(VectorDBBase):
             vector = vector[:VECTOR_LENGTH]
         return vector
 
-    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
-        try:
-            if PGVECTOR_PGCRYPTO:
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    # Use raw SQL for BYTEA/pgcrypto
-                    # Ensure metadata is converted to its JSON text representation
-                    json_metadata = json.dumps(item["metadata"])
-                    self.session.execute(
-                        text(
-                            """
-                            INSERT INTO document_chunk
-                            (id, vector, collection_name, text, vmetadata)
-                            VALUES (
-                                :id, :vector, :collection_name,
-                                pgp_sym_encrypt(:text, :key),
-                                pgp_sym_encrypt(:metadata_text, :key)
-                            )
-                            ON CONFLICT (id) DO NOTHING
-                        """
-                        ),
-                        {
-                            "id": item["id"],
-                            "vector": vector,
-                            "collection_name": collection_name,
-                            "text": item["text"],
-                            "metadata_text": json_metadata,
-                            "key": PGVECTOR_PGCRYPTO_KEY,
-                        },
-                    )
-                self.session.commit()
-                log.info(f"Encrypted & inserted {len(items)} into '{collection_name}'")
+    def _get_insert_statement(self, upsert: bool):
+        stmt = insert(DocumentChunk.__table__)
+        if PGVECTOR_PGCRYPTO:
+            # Encrypted in the database, from the plain text parameters
+            stmt = stmt.values(
+                id=bindparam("id"),
+                vector=bindparam("vector"),
+                collection_name=bindparam("collection_name"),
+                text=pgcrypto_encrypt(
+                    bindparam("plain_text", type_=Text), PGVECTOR_PGCRYPTO_KEY
+                ),
+                vmetadata=pgcrypto_encrypt(
+                    bindparam("metadata_text", type_=Text), PGVECTOR_PGCRYPTO_KEY
+                ),
+            )
 
+        if upsert:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[DocumentChunk.id],
+                set_={
+                    "vector": stmt.excluded.vector,
+                    "collection_name": stmt.excluded.collection_name,
+                    "text": stmt.excluded.text,
+                    "vmetadata": stmt.excluded.vmetadata,
+                },
+            )
+        elif PGVECTOR_PGCRYPTO:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[DocumentChunk.id])
+        return stmt
+
+    def _get_insert_rows(
+        self, collection_name: str, items: List[VectorItem]
+    ) -> List[Dict[str, Any]]:
+        rows = []
+        for item in items:
+            row = {
+                "id": item["id"],
+                "vector": self.adjust_vector_length(item["vector"]),
+                "collection_name": collection_name,
+            }
+            if PGVECTOR_PGCRYPTO:
+                # Ensure metadata is converted to its JSON text representation
+                row["plain_text"] = item["text"]
+                row["metadata_text"] = json.dumps(item["metadata"])
             else:
-                new_items = []
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    new_chunk = DocumentChunk(
-                        id=item["id"],
-                        vector=vector,
-                        collection_name=collection_name,
-                        text=item["text"],
-                        vmetadata=process_metadata(item["metadata"]),
-                    )
-                    new_items.append(new_chunk)
-                self.session.bulk_save_objects(new_items)
-                self.session.commit()
-                log.info(
-                    f"Inserted {len(new_items)} items into collection '{collection_name}'."
-                )
+                row["text"] = item["text"]
+                row["vmetadata"] = process_metadata(item["metadata"])
+            rows.append(row)
+        return rows
+
+    def _insert(
+        self, collection_name: str, items: List[VectorItem], upsert: bool
+    ) -> None:
+        if not items:
+            return
+
+        # One executemany per batch, sent as multi-row INSERTs by SQLAlchemy
+        # instead of a statement per item
+        stmt = self._get_insert_statement(upsert)
+        rows = self._get_insert_rows(collection_name, items)
+        with self.SessionLocal() as session:
+            for i in range(0, len(rows), 1000):
+                session.execute(stmt, rows[i : i + 1000])
+            session.commit()
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        try:
+            self._insert(collection_name, items, upsert=False)
+            log.info(
+                f"Inserted {len(items)} items into collection '{collection_name}'."
+            )
         except Exception as e:
-            self.session.rollback()
             log.exception(f"Error during insert: {e}")
             raise
 
     def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
         try:
-            if PGVECTOR_PGCRYPTO:
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    json_metadata = json.dumps(item["metadata"])
-                    self.session.execute(
-                        text(
-                            """
-                            INSERT INTO document_chunk
-                            (id, vector, collection_name, text, vmetadata)
-                            VALUES (
-                                :id, :vector, :collection_name,
-                                pgp_sym_encrypt(:text, :key),
-                                pgp_sym_encrypt(:metadata_text, :key)
-                            )
-                            ON CONFLICT (id) DO UPDATE SET
-                              vector = EXCLUDED.vector,
-                              collection_name = EXCLUDED.collection_name,
-                              text = EXCLUDED.text,
-                              vmetadata = EXCLUDED.vmetadata
-                        """
-                        ),
-                        {
-                            "id": item["id"],
-                            "vector": vector,
-                            "collection_name": collection_name,
-                            "text": item["text"],
-                            "metadata_text": json_metadata,
-                            "key": PGVECTOR_PGCRYPTO_KEY,
-                        },
-                    )
-                self.session.commit()
-                log.info(f"Encrypted & upserted {len(items)} into '{collection_name}'")
-            else:
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    existing = (
-                        self.session.query(DocumentChunk)
-                        .filter(DocumentChunk.id == item["id"])
-                        .first()
-                    )
-                    if existing:
-                        existing.vector = vector
-                        existing.text = item["text"]
-                        existing.vmetadata = process_metadata(item["metadata"])
-                        existing.collection_name = (
-                            collection_name  # Update collection_name if necessary
-                        )
-                    else:
-                        new_chunk = DocumentChunk(
-                            id=item["id"],
-                            vector=vector,
-                            collection_name=collection_name,
-                            text=item["text"],
-                            vmetadata=process_metadata(item["metadata"]),
-                        )
-                        self.session.add(new_chunk)
-                self.session.commit()
-                log.info(
-                    f"Upserted {len(items)} items into collection '{collection_name}'."
-                )
+            self._insert(collection_name, items, upsert=True)
+            log.info(
+                f"Upserted {len(items)} items into collection '{collection_name}'."
+            )
         except Exception as e:
-            self.session.rollback()
             log.exception(f"Error during upsert: {e}")
             raise
 
@@ -430,146 +455,130 @@ class PgvectorClient(VectorDBBase):
         filter: Optional[Dict[str, Any]] = None,
         limit: int = 10,
     ) -> Optional[SearchResult]:
-        try:
-            if not vectors:
-                return None
+        return self.search_many([collection_name], vectors, filter=filter, limit=limit)
 
-            # Adjust query vectors to VECTOR_LENGTH
-            vectors = [self.adjust_vector_length(vector) for vector in vectors]
-            num_queries = len(vectors)
-
-            def vector_expr(vector):
-                return cast(array(vector), VECTOR_TYPE_FACTORY(VECTOR_LENGTH))
-
-            # Create the values for query vectors
-            qid_col = column("qid", Integer)
-            q_vector_col = column("q_vector", VECTOR_TYPE_FACTORY(VECTOR_LENGTH))
-            query_vectors = (
-                values(qid_col, q_vector_col)
-                .data(
-                    [(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)]
-                )
-                .alias("query_vectors")
+    def _get_columns(self) -> Tuple[Any, Any]:
+        if PGVECTOR_PGCRYPTO:
+            return (
+                pgcrypto_decrypt(DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text),
+                pgcrypto_decrypt(DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB),
             )
-
-            result_fields = [
-                DocumentChunk.id,
-            ]
-            if PGVECTOR_PGCRYPTO:
-                result_fields.append(
-                    pgcrypto_decrypt(
-                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
-                    ).label("text")
-                )
-                result_fields.append(
-                    pgcrypto_decrypt(
-                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                    ).label("vmetadata")
+        return DocumentChunk.text, DocumentChunk.vmetadata
+
+    def _get_filter_clauses(self, filter: Optional[Dict[str, Any]]) -> List[Any]:
+        _, vmetadata = self._get_columns()
+        where_clauses = []
+        for key, value in (filter or {}).items():
+            if isinstance(value, dict) and "$in" in value:
+                # Handle $in operator: {"field": {"$in": [values]}}
+                where_clauses.append(
+                    vmetadata[key].astext.in_([str(v) for v in value["$in"]])
                 )
             else:
-                result_fields.append(DocumentChunk.text)
-                result_fields.append(DocumentChunk.vmetadata)
-            result_fields.append(
-                (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)).label(
-                    "distance"
-                )
-            )
+                # Handle simple equality: {"field": "value"}
+                where_clauses.append(vmetadata[key].astext == str(value))
+        return where_clauses
 
-            # Build the lateral subquery for each query vector
-            where_clauses = [DocumentChunk.collection_name == collection_name]
-
-            # Apply metadata filter if provided
-            if filter:
-                for key, value in filter.items():
-                    if isinstance(value, dict) and "$in" in value:
-                        # Handle $in operator: {"field": {"$in": [values]}}
-                        in_values = value["$in"]
-                        if PGVECTOR_PGCRYPTO:
-                            where_clauses.append(
-                                pgcrypto_decrypt(
-                                    DocumentChunk.vmetadata,
-                                    PGVECTOR_PGCRYPTO_KEY,
-                                    JSONB,
-                                )[key].astext.in_([str(v) for v in in_values])
-                            )
-                        else:
-                            where_clauses.append(
-                                DocumentChunk.vmetadata[key].astext.in_(
-                                    [str(v) for v in in_values]
-                                )
-                            )
-                    else:
-                        # Handle simple equality: {"field": "value"}
-                        if PGVECTOR_PGCRYPTO:
-                            where_clauses.append(
-                                pgcrypto_decrypt(
-                                    DocumentChunk.vmetadata,
-                                    PGVECTOR_PGCRYPTO_KEY,
-                                    JSONB,
-                                )[key].astext
-                                == str(value)
-                            )
-                        else:
-                            where_clauses.append(
-                                DocumentChunk.vmetadata[key].astext == str(value)
-                            )
+    def _get_search_statement(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        filter: Optional[Dict[str, Any]],
+        limit: Optional[int],
+    ):
+        def vector_expr(vector):
+            return cast(array(vector), VECTOR_TYPE_FACTORY(VECTOR_LENGTH))
+
+        # Create the values for query vectors
+        qid_col = column("qid", Integer)
+        q_vector_col = column("q_vector", VECTOR_TYPE_FACTORY(VECTOR_LENGTH))
+        query_vectors = (
+            values(qid_col, q_vector_col)
+            .data([(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)])
+            .alias("query_vectors")
+        )
+
+        text, vmetadata = self._get_columns()
+        result_fields = [
+            DocumentChunk.id,
+            text.label("text"),
+            vmetadata.label("vmetadata"),
+            (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)).label(
+                "distance"
+            ),
+        ]
 
-            subq = (
-                select(*result_fields)
-                .where(*where_clauses)
-                .order_by(
-                    (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
-                )
-            )
-            if limit is not None:
-                subq = subq.limit(limit)
-            subq = subq.lateral("result")
-
-            # Build the main query by joining query_vectors and the lateral subquery
-            stmt = (
-                select(
-                    query_vectors.c.qid,
-                    subq.c.id,
-                    subq.c.text,
-                    subq.c.vmetadata,
-                    subq.c.distance,
-                )
-                .select_from(query_vectors)
-                .join(subq, true())
-                .order_by(query_vectors.c.qid, subq.c.distance)
+        # Build the lateral subquery for each query vector
+        if len(collection_names) == 1:
+            where_clauses = [DocumentChunk.collection_name == collection_names[0]]
+        else:
+            where_clauses = [DocumentChunk.collection_name.in_(collection_names)]
+
+        # Apply metadata filter if provided
+        where_clauses.extend(self._get_filter_clauses(filter))
+
+        subq = (
+            select(*result_fields)
+            .where(*where_clauses)
+            .order_by((DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)))
+        )
+        if limit is not None:
+            subq = subq.limit(limit)
+        subq = subq.lateral("result")
+
+        # Build the main query by joining query_vectors and the lateral subquery
+        return (
+            select(
+                query_vectors.c.qid,
+                subq.c.id,
+                subq.c.text,
+                subq.c.vmetadata,
+                subq.c.distance,
             )
+            .select_from(query_vectors)
+            .join(subq, true())
+            .order_by(query_vectors.c.qid, subq.c.distance)
+        )
+
+    def _to_search_result(self, results, num_queries: int) -> SearchResult:
+        ids = [[] for _ in range(num_queries)]
+        distances = [[] for _ in range(num_queries)]
+        documents = [[] for _ in range(num_queries)]
+        metadatas = [[] for _ in range(num_queries)]
+
+        for row in results:
+            qid = int(row.qid)
+            ids[qid].append(row.id)
+            # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
+            # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
+            distances[qid].append((2.0 - row.distance) / 2.0)
+            documents[qid].append(row.text)
+            metadatas[qid].append(row.vmetadata)
+
+        return SearchResult(
+            ids=ids, distances=distances, documents=documents, metadatas=metadatas
+        )
+
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        filter: Optional[Dict[str, Any]] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        try:
+            if not vectors:
+                return None
 
-            result_proxy = self.session.execute(stmt)
-            results = result_proxy.all()
-
-            ids = [[] for _ in range(num_queries)]
-            distances = [[] for _ in range(num_queries)]
-            documents = [[] for _ in range(num_queries)]
-            metadatas = [[] for _ in range(num_queries)]
+            # Adjust query vectors to VECTOR_LENGTH
+            vectors = [self.adjust_vector_length(vector) for vector in vectors]
+            stmt = self._get_search_statement(collection_names, vectors, filter, limit)
 
-            if not results:
-                return SearchResult(
-                    ids=ids,
-                    distances=distances,
-                    documents=documents,
-                    metadatas=metadatas,
-                )
+            with self.SessionLocal() as session:
+                results = session.execute(stmt).all()
 
-            for row in results:
-                qid = int(row.qid)
-                ids[qid].append(row.id)
-                # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
-                # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
-                distances[qid].append((2.0 - row.distance) / 2.0)
-                documents[qid].append(row.text)
-                metadatas[qid].append(row.vmetadata)
-
-            self.session.rollback()  # read-only transaction
-            return SearchResult(
-                ids=ids, distances=distances, documents=documents, metadatas=metadatas
-            )
+            return self._to_search_result(results, len(vectors))
         except Exception as e:
-            self.session.rollback()
             log.exception(f"Error during search: {e}")
             return None
 
@@ -577,59 +586,58 @@ class PgvectorClient(VectorDBBase):
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
     ) -> Optional[GetResult]:
         try:
-            if PGVECTOR_PGCRYPTO:
-                # Build where clause for vmetadata filter
-                where_clauses = [DocumentChunk.collection_name == collection_name]
-                for key, value in filter.items():
-                    # decrypt then check key: JSON filter after decryption
-                    where_clauses.append(
+            with self.SessionLocal() as session:
+                if PGVECTOR_PGCRYPTO:
+                    # Build where clause for vmetadata filter
+                    where_clauses = [DocumentChunk.collection_name == collection_name]
+                    for key, value in filter.items():
+                        # decrypt then check key: JSON filter after decryption
+                        where_clauses.append(
+                            pgcrypto_decrypt(
+                                DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                            )[key].astext
+                            == str(value)
+                        )
+                    stmt = select(
+                        DocumentChunk.id,
+                        pgcrypto_decrypt(
+                            DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
+                        ).label("text"),
                         pgcrypto_decrypt(
                             DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                        )[key].astext
-                        == str(value)
+                        ).label("vmetadata"),
+                    ).where(*where_clauses)
+                    if limit is not None:
+                        stmt = stmt.limit(limit)
+                    results = session.execute(stmt).all()
+                else:
+                    query = session.query(DocumentChunk).filter(
+                        DocumentChunk.collection_name == collection_name
                     )
-                stmt = select(
-                    DocumentChunk.id,
-                    pgcrypto_decrypt(
-                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
-                    ).label("text"),
-                    pgcrypto_decrypt(
-                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                    ).label("vmetadata"),
-                ).where(*where_clauses)
-                if limit is not None:
-                    stmt = stmt.limit(limit)
-                results = self.session.execute(stmt).all()
-            else:
-                query = self.session.query(DocumentChunk).filter(
-                    DocumentChunk.collection_name == collection_name
-                )
 
-                for key, value in filter.items():
-                    query = query.filter(
-                        DocumentChunk.vmetadata[key].astext == str(value)
-                    )
+                    for key, value in filter.items():
+                        query = query.filter(
+                            DocumentChunk.vmetadata[key].astext == str(value)
+                        )
 
-                if limit is not None:
-                    query = query.limit(limit)
+                    if limit is not None:
+                        query = query.limit(limit)
 
-                results = query.all()
+                    results = query.all()
 
-            if not results:
-                return None
+                if not results:
+                    return None
 
-            ids = [[result.id for result in results]]
-            documents = [[result.text for result in results]]
-            metadatas = [[result.vmetadata for result in results]]
+                ids = [[result.id for result in results]]
+                documents = [[result.text for result in results]]
+                metadatas = [[result.vmetadata for result in results]]
 
-            self.session.rollback()  # read-only transaction
-            return GetResult(
-                ids=ids,
-                documents=documents,
-                metadatas=metadatas,
-            )
+                return GetResult(
+                    ids=ids,
+                    documents=documents,
+                    metadatas=metadatas,
+                )
         except Exception as e:
-            self.session.rollback()
             log.exception(f"Error during query: {e}")
             return None
 
@@ -637,46 +645,93 @@ class PgvectorClient(VectorDBBase):
         self, collection_name: str, limit: Optional[int] = None
     ) -> Optional[GetResult]:
         try:
-            if PGVECTOR_PGCRYPTO:
-                stmt = select(
-                    DocumentChunk.id,
-                    pgcrypto_decrypt(
-                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
-                    ).label("text"),
-                    pgcrypto_decrypt(
-                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                    ).label("vmetadata"),
-                ).where(DocumentChunk.collection_name == collection_name)
-                if limit is not None:
-                    stmt = stmt.limit(limit)
-                results = self.session.execute(stmt).all()
-                ids = [[row.id for row in results]]
-                documents = [[row.text for row in results]]
-                metadatas = [[row.vmetadata for row in results]]
-            else:
+            with self.SessionLocal() as session:
+                if PGVECTOR_PGCRYPTO:
+                    stmt = select(
+                        DocumentChunk.id,
+                        pgcrypto_decrypt(
+                            DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
+                        ).label("text"),
+                        pgcrypto_decrypt(
+                            DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                        ).label("vmetadata"),
+                    ).where(DocumentChunk.collection_name == collection_name)
+                    if limit is not None:
+                        stmt = stmt.limit(limit)
+                    results = session.execute(stmt).all()
+                    ids = [[row.id for row in results]]
+                    documents = [[row.text for row in results]]
+                    metadatas = [[row.vmetadata for row in results]]
+                else:
 
-                query = self.session.query(DocumentChunk).filter(
-                    DocumentChunk.collection_name == collection_name
-                )
-                if limit is not None:
-                    query = query.limit(limit)
+                    query = session.query(DocumentChunk).filter(
+                        DocumentChunk.collection_name == collection_name
+                    )
+                    if limit is not None:
+                        query = query.limit(limit)
 
-                results = query.all()
+                    results = query.all()
 
-                if not results:
-                    return None
+                    if not results:
+                        return None
 
-                ids = [[result.id for result in results]]
-                documents = [[result.text for result in results]]
-                metadatas = [[result.vmetadata for result in results]]
+                    ids = [[result.id for result in results]]
+                    documents = [[result.text for result in results]]
+                    metadatas = [[result.vmetadata for result in results]]
 
-            self.session.rollback()  # read-only transaction
-            return GetResult(ids=ids, documents=documents, metadatas=metadatas)
+                return GetResult(ids=ids, documents=documents, metadatas=metadatas)
         except Exception as e:
-            self.session.rollback()
             log.exception(f"Error during get: {e}")
             return None
 
+    def _get_select_statement(self, collection_name: str, *where_clauses):
+        text, vmetadata = self._get_columns()
+        return select(
+            DocumentChunk.id,
+            text.label("text"),
+            vmetadata.label("vmetadata"),
+        ).where(DocumentChunk.collection_name == collection_name, *where_clauses)
+
+    def _to_get_result(self, results) -> GetResult:
+        return GetResult(
+            ids=[[row.id for row in results]],
+            documents=[[row.text for row in results]],
+            metadatas=[[row.vmetadata for row in results]],
+        )
+
+    def get_by_ids(self, collection_name: str, ids: List[str]) -> Optional[GetResult]:
+        try:
+            with self.SessionLocal() as session:
+                results = session.execute(
+                    self._get_select_statement(
+                        collection_name, DocumentChunk.id.in_(ids)
+                    )
+                ).all()
+                return self._to_get_result(results)
+        except Exception as e:
+            log.exception(f"Error during get_by_ids: {e}")
+            return None
+
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Dict[str, List[float]]:
+        try:
+            with self.SessionLocal() as session:
+                results = session.execute(
+                    select(DocumentChunk.id, DocumentChunk.vector).where(
+                        DocumentChunk.collection_name == collection_name,
+                        DocumentChunk.id.in_(ids),
+                    )
+                ).all()
+                return {
+                    row.id: list(row.vector)
+                    for row in results
+                    if row.vector is not None
+                }
+        except Exception as e:
+            log.exception(f"Error during get_vectors: {e}")
+            return {}
+
     def delete(
         self,
         collection_name: str,
@@ -684,49 +739,53 @@ class PgvectorClient(VectorDBBase):
         filter: Optional[Dict[str, Any]] = None,
     ) -> None:
         try:
-            if PGVECTOR_PGCRYPTO:
-                wheres = [DocumentChunk.collection_name == collection_name]
-                if ids:
-                    wheres.append(DocumentChunk.id.in_(ids))
-                if filter:
-                    for key, value in filter.items():
-                        wheres.append(
-                            pgcrypto_decrypt(
-                                DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                            )[key].astext
-                            == str(value)
-                        )
-                stmt = DocumentChunk.__table__.delete().where(*wheres)
-                result = self.session.execute(stmt)
-                deleted = result.rowcount
-            else:
-                query = self.session.query(DocumentChunk).filter(
-                    DocumentChunk.collection_name == collection_name
+            with self.SessionLocal() as session:
+                if PGVECTOR_PGCRYPTO:
+                    wheres = [DocumentChunk.collection_name == collection_name]
+                    if ids:
+                        wheres.append(DocumentChunk.id.in_(ids))
+                    if filter:
+                        for key, value in filter.items():
+                            wheres.append(
+                                pgcrypto_decrypt(
+                                    DocumentChunk.vmetadata,
+                                    PGVECTOR_PGCRYPTO_KEY,
+                                    JSONB,
+                                )[key].astext
+                                == str(value)
+                            )
+                    stmt = DocumentChunk.__table__.delete().where(*wheres)
+                    result = session.execute(stmt)
+                    deleted = result.rowcount
+                else:
+                    query = session.query(DocumentChunk).filter(
+                        DocumentChunk.collection_name == collection_name
+                    )
+                    if ids:
+                        query = query.filter(DocumentChunk.id.in_(ids))
+                    if filter:
+                        for key, value in filter.items():
+                            query = query.filter(
+                                DocumentChunk.vmetadata[key].astext == str(value)
+                            )
+                    deleted = query.delete(synchronize_session=False)
+                session.commit()
+                log.info(
+                    f"Deleted {deleted} items from collection '{collection_name}'."
                 )
-                if ids:
-                    query = query.filter(DocumentChunk.id.in_(ids))
-                if filter:
-                    for key, value in filter.items():
-                        query = query.filter(
-                            DocumentChunk.vmetadata[key].astext == str(value)
-                        )
-                deleted = query.delete(synchronize_session=False)
-            self.session.commit()
-            log.info(f"Deleted {deleted} items from collection '{collection_name}'.")
         except Exception as e:
-            self.session.rollback()
             log.exception(f"Error during delete: {e}")
             raise
 
     def reset(self) -> None:
         try:
-            deleted = self.session.query(DocumentChunk).delete()
-            self.session.commit()
-            log.info(
-                f"Reset complete. Deleted {deleted} items from 'document_chunk' table."
-            )
+            with self.SessionLocal() as session:
+                deleted = session.query(DocumentChunk).delete()
+                session.commit()
+                log.info(
+                    f"Reset complete. Deleted {deleted} items from 'document_chunk' table."
+                )
         except Exception as e:
-            self.session.rollback()
             log.exception(f"Error during reset: {e}")
             raise
 
@@ -735,19 +794,180 @@ class PgvectorClient(VectorDBBase):
 
     def has_collection(self, collection_name: str) -> bool:
         try:
-            exists = (
-                self.session.query(DocumentChunk)
-                .filter(DocumentChunk.collection_name == collection_name)
-                .first()
-                is not None
-            )
-            self.session.rollback()  # read-only transaction
-            return exists
+            with self.SessionLocal() as session:
+                exists = (
+                    session.query(DocumentChunk)
+                    .filter(DocumentChunk.collection_name == collection_name)
+                    .first()
+                    is not None
+                )
+                return exists
         except Exception as e:
-            self.session.rollback()
             log.exception(f"Error checking collection existence: {e}")
             return False
 
     def delete_collection(self, collection_name: str) -> None:
         self.delete(collection_name)
         log.info(f"Collection '{collection_name}' deleted.")
+
+    ####################
+    # Async, through asyncpg
+    ####################
+
+    async def ahas_collection(self, collection_name: str) -> bool:
+        try:
+            async with self.AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(DocumentChunk.id)
+                    .where(DocumentChunk.collection_name == collection_name)
+                    .limit(1)
+                )
+                return result.first() is not None
+        except Exception as e:
+            log.exception(f"Error checking collection existence: {e}")
+            return False
+
+    async def adelete_collection(self, collection_name: str) -> None:
+        await self.adelete(collection_name)
+        log.info(f"Collection '{collection_name}' deleted.")
+
+    async def _ainsert(
+        self, collection_name: str, items: List[VectorItem], upsert: bool
+    ) -> None:
+        if not items:
+            return
+
+        stmt = self._get_insert_statement(upsert)
+        rows = self._get_insert_rows(collection_name, items)
+        async with self.AsyncSessionLocal() as session:
+            for i in range(0, len(rows), 1000):
+                await session.execute(stmt, rows[i : i + 1000])
+            await session.commit()
+
+    async def ainsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        try:
+            await self._ainsert(collection_name, items, upsert=False)
+            log.info(
+                f"Inserted {len(items)} items into collection '{collection_name}'."
+            )
+        except Exception as e:
+            log.exception(f"Error during insert: {e}")
+            raise
+
+    async def aupsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        try:
+            await self._ainsert(collection_name, items, upsert=True)
+            log.info(
+                f"Upserted {len(items)} items into collection '{collection_name}'."
+            )
+        except Exception as e:
+            log.exception(f"Error during upsert: {e}")
+            raise
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        filter: Optional[Dict[str, Any]] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        return await self.asearch_many(
+            [collection_name], vectors, filter=filter, limit=limit
+        )
+
+    async def asearch_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        filter: Optional[Dict[str, Any]] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        try:
+            if not vectors:
+                return None
+
+            vectors = [self.adjust_vector_length(vector) for vector in vectors]
+            stmt = self._get_search_statement(collection_names, vectors, filter, limit)
+
+            async with self.AsyncSessionLocal() as session:
+                results = (await session.execute(stmt)).all()
+
+            return self._to_search_result(results, len(vectors))
+        except Exception as e:
+            log.exception(f"Error during search: {e}")
+            return None
+
+    async def aquery(
+        self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        try:
+            stmt = self._get_select_statement(
+                collection_name, *self._get_filter_clauses(filter)
+            )
+            if limit is not None:
+                stmt = stmt.limit(limit)
+
+            async with self.AsyncSessionLocal() as session:
+                results = (await session.execute(stmt)).all()
+
+            if not results:
+                return None
+            return self._to_get_result(results)
+        except Exception as e:
+            log.exception(f"Error during query: {e}")
+            return None
+
+    async def aget(self, collection_name: str) -> Optional[GetResult]:
+        try:
+            async with self.AsyncSessionLocal() as session:
+                results = (
+                    await session.execute(self._get_select_statement(collection_name))
+                ).all()
+
+            if not results and not PGVECTOR_PGCRYPTO:
+                return None
+            return self._to_get_result(results)
+        except Exception as e:
+            log.exception(f"Error during get: {e}")
+            return None
+
+    async def aget_by_ids(
+        self, collection_name: str, ids: List[str]
+    ) -> Optional[GetResult]:
+        try:
+            async with self.AsyncSessionLocal() as session:
+                results = (
+                    await session.execute(
+                        self._get_select_statement(
+                            collection_name, DocumentChunk.id.in_(ids)
+                        )
+                    )
+                ).all()
+            return self._to_get_result(results)
+        except Exception as e:
+            log.exception(f"Error during get_by_ids: {e}")
+            return None
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        try:
+            where_clauses = [DocumentChunk.collection_name == collection_name]
+            if ids:
+                where_clauses.append(DocumentChunk.id.in_(ids))
+            where_clauses.extend(self._get_filter_clauses(filter))
+
+            async with self.AsyncSessionLocal() as session:
+                result = await session.execute(
+                    DocumentChunk.__table__.delete().where(*where_clauses)
+                )
+                await session.commit()
+            log.info(
+                f"Deleted {result.rowcount} items from collection '{collection_name}'."
+            )
+        except Exception as e:
+            log.exception(f"Error during delete: {e}")
+            raise
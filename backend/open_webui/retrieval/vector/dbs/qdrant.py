@@ -1,8 +1,9 @@
+import asyncio
 from typing import Optional
 import logging
 from urllib.parse import urlparse
 
-from qdrant_client import QdrantClient as Qclient
+from qdrant_client import AsyncQdrantClient, QdrantClient as Qclient
 from qdrant_client.http.models import PointStruct
 from qdrant_client.models import models
 
@@ -11,6 +12,7 @@ from open_webui.retrieval.vector.main import (
     VectorItem,
     SearchResult,
     GetResult,
+    merge_search_results,
 )
 from open_webui.config import (
     QDRANT_URI,
@@ -41,6 +43,7 @@ class QdrantClient(VectorDBBase):
 
         if not self.QDRANT_URI:
             self.client = None
+            self.aclient = None
             return
 
         # Unified handling for either scheme
@@ -49,7 +52,7 @@ class QdrantClient(VectorDBBase):
         http_port = parsed.port or 6333  # default REST port
 
         if self.PREFER_GRPC:
-            self.client = Qclient(
+            client_kwargs = dict(
                 host=host,
                 port=http_port,
                 grpc_port=self.GRPC_PORT,
@@ -58,12 +61,16 @@ class QdrantClient(VectorDBBase):
                 timeout=self.QDRANT_TIMEOUT,
             )
         else:
-            self.client = Qclient(
+            client_kwargs = dict(
                 url=self.QDRANT_URI,
                 api_key=self.QDRANT_API_KEY,
                 timeout=QDRANT_TIMEOUT,
             )
 
+        self.client = Qclient(**client_kwargs)
+        # Searches from the event loop don't need a thread
+        self.aclient = AsyncQdrantClient(**client_kwargs)
+
     def _result_to_get_result(self, points) -> GetResult:
         ids = []
         documents = []
@@ -160,14 +167,102 @@ class QdrantClient(VectorDBBase):
             query=vectors[0],
             limit=limit,
         )
-        get_result = self._result_to_get_result(query_response.points)
+        return self._points_to_search_result(query_response.points)
+
+    def _get_query_requests(self, vectors, limit):
+        if limit is None:
+            limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
+
+        return [
+            models.QueryRequest(query=vector, limit=limit, with_payload=True)
+            for vector in vectors
+        ]
+
+    def _batch_to_search_result(self, responses) -> SearchResult:
+        results = [self._points_to_search_result(r.points) for r in responses]
+        return SearchResult(
+            ids=[result.ids[0] for result in results],
+            documents=[result.documents[0] for result in results],
+            metadatas=[result.metadatas[0] for result in results],
+            distances=[result.distances[0] for result in results],
+        )
+
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        # One batch request per collection for all the vectors
+        results = []
+        for collection_name in collection_names:
+            try:
+                responses = self.client.query_batch_points(
+                    collection_name=f"{self.collection_prefix}_{collection_name}",
+                    requests=self._get_query_requests(vectors, limit),
+                )
+            except Exception as e:
+                log.exception(f"Error searching collection {collection_name}: {e}")
+                continue
+            results.append(self._batch_to_search_result(responses))
+
+        return merge_search_results(results, len(vectors), limit)
+
+    async def asearch_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        async def search_collection(collection_name):
+            try:
+                responses = await self.aclient.query_batch_points(
+                    collection_name=f"{self.collection_prefix}_{collection_name}",
+                    requests=self._get_query_requests(vectors, limit),
+                )
+                return self._batch_to_search_result(responses)
+            except Exception as e:
+                log.exception(f"Error searching collection {collection_name}: {e}")
+                return None
+
+        results = await asyncio.gather(
+            *[
+                search_collection(collection_name)
+                for collection_name in collection_names
+            ]
+        )
+        return merge_search_results(
+            [result for result in results if result is not None], len(vectors), limit
+        )
+
+    def _points_to_search_result(self, points) -> SearchResult:
+        get_result = self._result_to_get_result(points)
         return SearchResult(
             ids=get_result.ids,
             documents=get_result.documents,
             metadatas=get_result.metadatas,
             # qdrant distance is [-1, 1], normalize to [0, 1]
-            distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
+            distances=[[(point.score + 1.0) / 2.0 for point in points]],
+        )
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        filter: Optional[dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        if limit is None:
+            limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
+
+        query_response = await self.aclient.query_points(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            query=vectors[0],
+            limit=limit,
         )
+        return self._points_to_search_result(query_response.points)
 
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
         # Construct the filter string for querying
@@ -203,6 +298,58 @@ class QdrantClient(VectorDBBase):
         )
         return self._result_to_get_result(points[0])
 
+    def get_vectors(self, collection_name: str, ids: list[str]) -> dict[str, list]:
+        points = self.client.retrieve(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            ids=ids,
+            with_payload=False,
+            with_vectors=True,
+        )
+        return {
+            str(point.id): point.vector for point in points if point.vector is not None
+        }
+
+    def get_by_ids(self, collection_name: str, ids: list[str]) -> Optional[GetResult]:
+        points = self.client.retrieve(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            ids=ids,
+        )
+        return self._result_to_get_result(points)
+
+    async def ahas_collection(self, collection_name: str) -> bool:
+        return await self.aclient.collection_exists(
+            f"{self.collection_prefix}_{collection_name}"
+        )
+
+    async def aget(self, collection_name: str) -> Optional[GetResult]:
+        points = await self.aclient.scroll(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            limit=NO_LIMIT,  # otherwise qdrant would set limit to 10!
+        )
+        return self._result_to_get_result(points[0])
+
+    async def aget_vectors(
+        self, collection_name: str, ids: list[str]
+    ) -> dict[str, list]:
+        points = await self.aclient.retrieve(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            ids=ids,
+            with_payload=False,
+            with_vectors=True,
+        )
+        return {
+            str(point.id): point.vector for point in points if point.vector is not None
+        }
+
+    async def aget_by_ids(
+        self, collection_name: str, ids: list[str]
+    ) -> Optional[GetResult]:
+        points = await self.aclient.retrieve(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            ids=ids,
+        )
+        return self._result_to_get_result(points)
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         self._create_collection_if_not_exists(collection_name, len(items[0]["vector"]))
@@ -1,4 +1,5 @@
 from open_webui.retrieval.vector.main import VectorDBBase
+from open_webui.retrieval.vector.index import BM25IndexedVectorDB, HashIndexedVectorDB
 from open_webui.retrieval.vector.type import VectorType
 from open_webui.config import (
     VECTOR_DB,
@@ -75,8 +76,14 @@ class Vector:
                 from open_webui.retrieval.vector.dbs.weaviate import WeaviateClient
 
                 return WeaviateClient()
+            case VectorType.LOCAL:
+                from open_webui.retrieval.vector.dbs.local import LocalClient
+
+                return LocalClient()
             case _:
                 raise ValueError(f"Unsupported vector type: {vector_type}")
 
 
-VECTOR_DB_CLIENT = Vector.get_vector(VECTOR_DB)
+VECTOR_DB_CLIENT = BM25IndexedVectorDB(
+    HashIndexedVectorDB(Vector.get_vector(VECTOR_DB))
+)
@@ -0,0 +1,417 @@
+import logging
+from typing import Dict, List, Optional, Union
+
+from open_webui.models.bm25 import BM25Documents
+from open_webui.models.vectors import VectorIndex
+from open_webui.retrieval.bm25 import (
+    BM25_INDEX_CACHE,
+    BM25Index,
+    get_documents_terms,
+    load_bm25_index,
+    update_bm25_indexes,
+)
+from open_webui.retrieval.vector.main import (
+    GetResult,
+    SearchResult,
+    VectorDBBase,
+    VectorItem,
+    run_in_executor,
+)
+
+log = logging.getLogger(__name__)
+
+
+class DelegatingVectorDB(VectorDBBase):
+    """
+    Wraps a vector database client and passes every call through to it.
+
+    Subclasses override the writes, sync and async, to keep their own index
+    in sync. Every async call goes to the client's async method, which may be
+    native, and the index updates, which are relational database writes, run
+    in the shared thread pool.
+    """
+
+    def __init__(self, client: VectorDBBase):
+        self.client = client
+
+    def __getattr__(self, name):
+        # Backend specific methods and attributes
+        return getattr(self.client, name)
+
+    def has_collection(self, collection_name: str) -> bool:
+        return self.client.has_collection(collection_name)
+
+    def delete_collection(self, collection_name: str) -> None:
+        self.client.delete_collection(collection_name)
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self.client.insert(collection_name, items)
+
+    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self.client.upsert(collection_name, items)
+
+    def search(
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        return self.client.search(collection_name, vectors, filter=filter, limit=limit)
+
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        return self.client.search_many(
+            collection_names, vectors, filter=filter, limit=limit
+        )
+
+    def query(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        return self.client.query(collection_name, filter=filter, limit=limit)
+
+    def get(self, collection_name: str) -> Optional[GetResult]:
+        return self.client.get(collection_name)
+
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Dict[str, List[float]]:
+        return self.client.get_vectors(collection_name, ids)
+
+    def get_by_ids(self, collection_name: str, ids: List[str]) -> Optional[GetResult]:
+        return self.client.get_by_ids(collection_name, ids)
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        self.client.delete(collection_name, ids=ids, filter=filter)
+
+    def reset(self) -> None:
+        self.client.reset()
+
+    async def ahas_collection(self, collection_name: str) -> bool:
+        return await self.client.ahas_collection(collection_name)
+
+    async def adelete_collection(self, collection_name: str) -> None:
+        await self.client.adelete_collection(collection_name)
+
+    async def ainsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        await self.client.ainsert(collection_name, items)
+
+    async def aupsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        await self.client.aupsert(collection_name, items)
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        await self.client.adelete(collection_name, ids=ids, filter=filter)
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        return await self.client.asearch(
+            collection_name, vectors, filter=filter, limit=limit
+        )
+
+    async def asearch_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        return await self.client.asearch_many(
+            collection_names, vectors, filter=filter, limit=limit
+        )
+
+    async def aquery(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        return await self.client.aquery(collection_name, filter=filter, limit=limit)
+
+    async def aget(self, collection_name: str) -> Optional[GetResult]:
+        return await self.client.aget(collection_name)
+
+    async def aget_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Dict[str, List[float]]:
+        return await self.client.aget_vectors(collection_name, ids)
+
+    async def aget_by_ids(
+        self, collection_name: str, ids: List[str]
+    ) -> Optional[GetResult]:
+        return await self.client.aget_by_ids(collection_name, ids)
+
+
+class HashIndexedVectorDB(DelegatingVectorDB):
+    """
+    Keeps the relational `VectorIndex` of (collection, content hash, file id ->
+    vector ids) in sync with inserts and deletes, so duplicate content can be
+    found without querying the vector database by metadata.
+    """
+
+    def _update_index(self, fn, *args, **kwargs):
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            log.exception(f"Failed to update the vector index: {e}")
+
+    def delete_collection(self, collection_name: str) -> None:
+        self.client.delete_collection(collection_name)
+        self._update_index(VectorIndex.delete_collection, collection_name)
+
+    def _set_new_collection_indexed(self, collection_name: str) -> None:
+        # A collection created from here on has all its vectors indexed
+        if not VectorIndex.is_collection_indexed(collection_name):
+            if not self.client.has_collection(collection_name):
+                VectorIndex.set_collection_indexed(collection_name)
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self._update_index(self._set_new_collection_indexed, collection_name)
+        self.client.insert(collection_name, items)
+        self._update_index(VectorIndex.insert_items, collection_name, items)
+
+    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self._update_index(self._set_new_collection_indexed, collection_name)
+        self.client.upsert(collection_name, items)
+        self._update_index(VectorIndex.insert_items, collection_name, items)
+
+    def _delete_items(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        if ids:
+            self._update_index(VectorIndex.delete_by_ids, collection_name, ids)
+        elif filter:
+            try:
+                if not VectorIndex.delete_by_filter(collection_name, filter):
+                    # The index can't tell what was deleted, stop relying on it
+                    VectorIndex.delete_collection(collection_name)
+            except Exception as e:
+                log.exception(f"Failed to update the vector index: {e}")
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        self.client.delete(collection_name, ids=ids, filter=filter)
+        self._delete_items(collection_name, ids=ids, filter=filter)
+
+    def reset(self) -> None:
+        self.client.reset()
+        self._update_index(VectorIndex.reset)
+
+    async def adelete_collection(self, collection_name: str) -> None:
+        await self.client.adelete_collection(collection_name)
+        await run_in_executor(
+            self._update_index, VectorIndex.delete_collection, collection_name
+        )
+
+    async def ainsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        await run_in_executor(
+            self._update_index, self._set_new_collection_indexed, collection_name
+        )
+        await self.client.ainsert(collection_name, items)
+        await run_in_executor(
+            self._update_index, VectorIndex.insert_items, collection_name, items
+        )
+
+    async def aupsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        await run_in_executor(
+            self._update_index, self._set_new_collection_indexed, collection_name
+        )
+        await self.client.aupsert(collection_name, items)
+        await run_in_executor(
+            self._update_index, VectorIndex.insert_items, collection_name, items
+        )
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        await self.client.adelete(collection_name, ids=ids, filter=filter)
+        await run_in_executor(self._delete_items, collection_name, ids, filter)
+
+    def get_ids_by_hashes(
+        self, collection_name: str, hashes: List[str]
+    ) -> Dict[str, List[str]]:
+        """
+        Return the ids of the vectors stored for each content hash found in the
+        collection, from the index and, for collections created before it, from
+        the vector database.
+        """
+        hashes = list(dict.fromkeys(hashes))
+        try:
+            result = VectorIndex.get_ids_by_hashes(collection_name, hashes)
+            if VectorIndex.is_collection_indexed(collection_name):
+                return result
+        except Exception as e:
+            log.exception(f"Failed to read the vector index: {e}")
+            result = {}
+
+        for hash in hashes:
+            if hash in result:
+                continue
+
+            existing = self.client.query(
+                collection_name=collection_name, filter={"hash": hash}
+            )
+            if existing is not None and existing.ids and existing.ids[0]:
+                result[hash] = existing.ids[0]
+
+        return result
+
+
+class BM25IndexedVectorDB(DelegatingVectorDB):
+    """
+    Keeps the stored term counts and cached BM25 indexes of the collections
+    used for hybrid search in sync with inserts and deletes, so hybrid search
+    doesn't read and index the whole collection on every query. Deletes by
+    filter find the deleted ids in the relational `VectorIndex`.
+    """
+
+    def _update_index(self, fn, *args, **kwargs):
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            log.exception(f"Failed to update the BM25 index: {e}")
+
+    def _insert_items(self, collection_name: str, items: List[VectorItem]) -> None:
+        documents = get_documents_terms(items)
+        update_bm25_indexes(
+            collection_name,
+            BM25Documents.insert_documents(collection_name, documents),
+            documents=documents,
+        )
+
+    def _delete_items(self, collection_name: str, ids: List[str]) -> None:
+        update_bm25_indexes(
+            collection_name,
+            BM25Documents.delete_by_ids(collection_name, ids),
+            removed=ids,
+        )
+
+    def _delete_collection(self, collection_name: str) -> None:
+        BM25Documents.delete_collection(collection_name)
+        BM25_INDEX_CACHE.remove(collection_name)
+
+    def _reset(self) -> None:
+        BM25Documents.reset()
+        BM25_INDEX_CACHE.clear()
+
+    def delete_collection(self, collection_name: str) -> None:
+        self.client.delete_collection(collection_name)
+        self._update_index(self._delete_collection, collection_name)
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self.client.insert(collection_name, items)
+        self._update_index(self._insert_items, collection_name, items)
+
+    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self.client.upsert(collection_name, items)
+        self._update_index(self._insert_items, collection_name, items)
+
+    def _get_deleted_ids(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> Optional[List[str]]:
+        if ids or not filter:
+            return ids
+
+        # Looked up before the vector index forgets them
+        try:
+            return VectorIndex.get_ids_by_filter(collection_name, filter)
+        except Exception as e:
+            log.exception(f"Failed to read the vector index: {e}")
+            return None
+
+    def _remove_deleted_items(
+        self,
+        collection_name: str,
+        deleted_ids: Optional[List[str]],
+        filter: Optional[Dict] = None,
+    ) -> None:
+        if deleted_ids:
+            self._update_index(self._delete_items, collection_name, deleted_ids)
+        elif deleted_ids is None and filter:
+            # The stored documents can't tell what was deleted, they are read
+            # from the vector database again on the next search
+            self._update_index(self._delete_collection, collection_name)
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        deleted_ids = self._get_deleted_ids(collection_name, ids, filter)
+        self.client.delete(collection_name, ids=ids, filter=filter)
+        self._remove_deleted_items(collection_name, deleted_ids, filter)
+
+    def reset(self) -> None:
+        self.client.reset()
+        self._update_index(self._reset)
+
+    async def adelete_collection(self, collection_name: str) -> None:
+        await self.client.adelete_collection(collection_name)
+        await run_in_executor(
+            self._update_index, self._delete_collection, collection_name
+        )
+
+    async def ainsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        await self.client.ainsert(collection_name, items)
+        await run_in_executor(
+            self._update_index, self._insert_items, collection_name, items
+        )
+
+    async def aupsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        await self.client.aupsert(collection_name, items)
+        await run_in_executor(
+            self._update_index, self._insert_items, collection_name, items
+        )
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        deleted_ids = await run_in_executor(
+            self._get_deleted_ids, collection_name, ids, filter
+        )
+        await self.client.adelete(collection_name, ids=ids, filter=filter)
+        await run_in_executor(
+            self._remove_deleted_items, collection_name, deleted_ids, filter
+        )
+
+    def get_bm25_index(
+        self, collection_name: str, enriched: bool = False
+    ) -> Optional[BM25Index]:
+        """
+        Return the BM25 index of a collection for hybrid search, or None if
+        the collection doesn't exist.
+        """
+        return load_bm25_index(self.client, collection_name, enriched=enriched)
@@ -1,7 +1,18 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Union
 
+from open_webui.config import VECTOR_DB_THREAD_POOL_SIZE
+
+log = logging.getLogger(__name__)
+
 
 class VectorItem(BaseModel):
     id: str
@@ -20,6 +31,81 @@ class SearchResult(GetResult):
     distances: Optional[List[List[float | int]]]
 
 
+def merge_search_results(
+    results: List[SearchResult], num_vectors: int, limit: Optional[int]
+) -> SearchResult:
+    """Merge the results of searching several collections, best first."""
+    merged = SearchResult(
+        ids=[[] for _ in range(num_vectors)],
+        documents=[[] for _ in range(num_vectors)],
+        metadatas=[[] for _ in range(num_vectors)],
+        distances=[[] for _ in range(num_vectors)],
+    )
+
+    for idx in range(num_vectors):
+        rows = [
+            row
+            for result in results
+            if result.ids and idx < len(result.ids)
+            for row in zip(
+                result.distances[idx],
+                result.ids[idx],
+                result.documents[idx],
+                result.metadatas[idx],
+            )
+        ]
+        rows.sort(key=lambda row: row[0], reverse=True)
+
+        for distance, id, document, metadata in rows[:limit]:
+            merged.distances[idx].append(distance)
+            merged.ids[idx].append(id)
+            merged.documents[idx].append(document)
+            merged.metadatas[idx].append(metadata)
+
+    return merged
+
+
+def at_vector_index(result: SearchResult, idx: int, num_vectors: int) -> SearchResult:
+    """Place the result of searching a single vector at `idx` of `num_vectors`."""
+
+    def place(rows: List[List[Any]]) -> List[List[Any]]:
+        return [rows[0] if i == idx else [] for i in range(num_vectors)]
+
+    return SearchResult(
+        ids=place(result.ids),
+        documents=place(result.documents),
+        metadatas=place(result.metadatas),
+        distances=place(result.distances),
+    )
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=VECTOR_DB_THREAD_POOL_SIZE,
+                thread_name_prefix="vector_db",
+            )
+        return _executor
+
+
+async def run_in_executor(fn, *args, **kwargs):
+    """
+    Run a blocking vector database call in the shared, bounded thread pool,
+    so concurrent requests queue for a thread instead of each starting one.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(context.run, fn, *args, **kwargs)
+    )
+
+
 class VectorDBBase(ABC):
     """
     Abstract base class for all vector database backends.
@@ -29,6 +115,10 @@ class VectorDBBase(ABC):
 
     Any custom vector database integration must inherit from this class and
     implement all abstract methods.
+
+    Each method has an async counterpart prefixed with `a`, which by default
+    runs the sync method in a shared thread pool. Backends whose client has
+    an async API can override them.
     """
 
     @abstractmethod
@@ -62,6 +152,36 @@ class VectorDBBase(ABC):
         """Search for similar vectors in a collection."""
         pass
 
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        """
+        Search several collections at once, returning the best `limit` items
+        across all of them for each vector. Backends that can search them in
+        a single round-trip should override this.
+        """
+        results = []
+        for collection_name in collection_names:
+            # Searched one vector at a time, as some backends only search the
+            # first of the vectors they are given
+            for idx, vector in enumerate(vectors):
+                try:
+                    result = self.search(
+                        collection_name, [vector], filter=filter, limit=limit
+                    )
+                except Exception as e:
+                    log.exception(f"Error searching collection {collection_name}: {e}")
+                    break
+
+                if result is not None and result.ids:
+                    results.append(at_vector_index(result, idx, len(vectors)))
+
+        return merge_search_results(results, len(vectors), limit)
+
     @abstractmethod
     def query(
         self, collection_name: str, filter: Dict, limit: Optional[int] = None
@@ -74,6 +194,36 @@ class VectorDBBase(ABC):
         """Retrieve all vectors from a collection."""
         pass
 
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Dict[str, List[float]]:
+        """
+        Retrieve the stored vectors of the given ids. Backends that can't look
+        vectors up by id return an empty dict.
+        """
+        return {}
+
+    def get_by_ids(self, collection_name: str, ids: List[str]) -> Optional[GetResult]:
+        """
+        Retrieve the items of the given ids. Backends that can't look items up
+        by id read the whole collection.
+        """
+        result = self.get(collection_name)
+        if result is None or not result.ids:
+            return None
+
+        ids = set(ids)
+        rows = [
+            row
+            for row in zip(result.ids[0], result.documents[0], result.metadatas[0])
+            if row[0] in ids
+        ]
+        return GetResult(
+            ids=[[row[0] for row in rows]],
+            documents=[[row[1] for row in rows]],
+            metadatas=[[row[2] for row in rows]],
+        )
+
     @abstractmethod
     def delete(
         self,
@@ -88,3 +238,70 @@ class VectorDBBase(ABC):
     def reset(self) -> None:
         """Reset the vector database by removing all collections or those matching a condition."""
         pass
+
+    async def ahas_collection(self, collection_name: str) -> bool:
+        return await run_in_executor(self.has_collection, collection_name)
+
+    async def adelete_collection(self, collection_name: str) -> None:
+        return await run_in_executor(self.delete_collection, collection_name)
+
+    async def ainsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        return await run_in_executor(self.insert, collection_name, items)
+
+    async def aupsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        return await run_in_executor(self.upsert, collection_name, items)
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        return await run_in_executor(
+            self.search, collection_name, vectors, filter=filter, limit=limit
+        )
+
+    async def asearch_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        return await run_in_executor(
+            self.search_many, collection_names, vectors, filter=filter, limit=limit
+        )
+
+    async def aquery(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        return await run_in_executor(
+            self.query, collection_name, filter=filter, limit=limit
+        )
+
+    async def aget(self, collection_name: str) -> Optional[GetResult]:
+        return await run_in_executor(self.get, collection_name)
+
+    async def aget_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Dict[str, List[float]]:
+        return await run_in_executor(self.get_vectors, collection_name, ids)
+
+    async def aget_by_ids(
+        self, collection_name: str, ids: List[str]
+    ) -> Optional[GetResult]:
+        return await run_in_executor(self.get_by_ids, collection_name, ids)
+
+    async def adelete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        return await run_in_executor(
+            self.delete, collection_name, ids=ids, filter=filter
+        )
+
+    async def areset(self) -> None:
+        return await run_in_executor(self.reset)
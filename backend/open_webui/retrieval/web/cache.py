@@ -0,0 +1,139 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from open_webui.config import (
+    WEB_LOADER_CACHE_REVALIDATE_TTL,
+    WEB_LOADER_CACHE_TTL,
+    WEB_SEARCH_CACHE_TTL,
+)
+from open_webui.env import REDIS_KEY_PREFIX
+from open_webui.utils.redis import get_redis_client
+
+log = logging.getLogger(__name__)
+
+# Larger pages are fetched every time rather than held in memory
+MAX_CACHED_PAGE_SIZE = 1024 * 1024
+
+
+class WebCache:
+    """
+    TTL cache of JSON values, kept in memory for the `max_entries` most
+    recently used keys and shared by the workers through Redis when it is
+    configured.
+    """
+
+    def __init__(self, prefix: str, max_entries: int = 256):
+        self.prefix = prefix
+        self.max_entries = max_entries
+
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def _get_redis_key(self, key: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{self.prefix}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+
+        redis = get_redis_client(async_mode=True)
+        if redis is not None:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                pipe.get(self._get_redis_key(key))
+                pipe.ttl(self._get_redis_key(key))
+                data, ttl = await pipe.execute()
+                if data is not None:
+                    value = json.loads(data)
+                    self._set_local(key, value, ttl)
+                    return value
+            except Exception as e:
+                log.warning(f"Failed to read the {self.prefix} cache from Redis: {e}")
+        return None
+
+    def _set_local(self, key: str, value: Any, ttl: float):
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._set_local(key, value, ttl)
+
+        redis = get_redis_client(async_mode=True)
+        if redis is not None:
+            try:
+                await redis.set(
+                    self._get_redis_key(key), json.dumps(value), ex=max(int(ttl), 1)
+                )
+            except Exception as e:
+                log.warning(f"Failed to write the {self.prefix} cache to Redis: {e}")
+
+
+WEB_SEARCH_CACHE = WebCache("web:search") if WEB_SEARCH_CACHE_TTL > 0 else None
+WEB_LOADER_CACHE = WebCache("web:page") if WEB_LOADER_CACHE_TTL > 0 else None
+
+
+# Engines sent the identity of the user, whose results may depend on it
+USER_SCOPED_SEARCH_ENGINES = {"external", "perplexity_search"}
+
+
+def get_search_cache_key(
+    engine: str,
+    query: str,
+    count: int,
+    filter_list: Optional[list[str]],
+    user_id: Optional[str] = None,
+) -> str:
+    key = [engine, query, count, sorted(filter_list or [])]
+    if engine in USER_SCOPED_SEARCH_ENGINES:
+        key.append(user_id)
+    return json.dumps(key)
+
+
+async def get_cached_page(url: str) -> Optional[dict]:
+    """
+    Return the cached page for `url`, a dict of its text, validators (ETag and
+    Last-Modified headers) and the time it was fetched at, fresh or not.
+    """
+    if WEB_LOADER_CACHE is None:
+        return None
+    return await WEB_LOADER_CACHE.get(url)
+
+
+def is_page_fresh(page: dict) -> bool:
+    return time.time() - page["fetched_at"] < WEB_LOADER_CACHE_TTL
+
+
+async def set_cached_page(
+    url: str, text: str, etag: Optional[str], last_modified: Optional[str]
+):
+    if WEB_LOADER_CACHE is None or len(text) > MAX_CACHED_PAGE_SIZE:
+        return
+
+    # Pages that can be revalidated are kept longer than they are fresh
+    ttl = (
+        max(WEB_LOADER_CACHE_TTL, WEB_LOADER_CACHE_REVALIDATE_TTL)
+        if etag or last_modified
+        else WEB_LOADER_CACHE_TTL
+    )
+    await WEB_LOADER_CACHE.set(
+        url,
+        {
+            "text": text,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        },
+        ttl,
+    )
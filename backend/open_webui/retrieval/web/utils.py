@@ -27,6 +27,11 @@ from langchain_core.documents import Document
 
 from open_webui.retrieval.loaders.tavily import TavilyLoader
 from open_webui.retrieval.loaders.external_web import ExternalWebLoader
+from open_webui.retrieval.web.cache import (
+    get_cached_page,
+    is_page_fresh,
+    set_cached_page,
+)
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.config import (
     ENABLE_RAG_LOCAL_WEB_FETCH,
@@ -43,6 +48,7 @@ from open_webui.config import (
     EXTERNAL_WEB_LOADER_API_KEY,
     WEB_FETCH_FILTER_LIST,
 )
+from open_webui.utils.http_client import WEB_CLIENT_SESSION_POOL
 from open_webui.utils.misc import is_string_allowed
 
 log = logging.getLogger(__name__)
@@ -563,33 +569,59 @@ class SafeWebBaseLoader(WebBaseLoader):
     async def _fetch(
         self, url: str, retries: int = 3, cooldown: int = 2, backoff: float = 1.5
     ) -> str:
-        async with aiohttp.ClientSession(trust_env=self.trust_env) as session:
-            for i in range(retries):
-                try:
-                    kwargs: Dict = dict(
-                        headers=self.session.headers,
-                        cookies=self.session.cookies.get_dict(),
-                    )
-                    if not self.session.verify:
-                        kwargs["ssl"] = False
-
-                    async with session.get(
-                        url,
-                        **(self.requests_kwargs | kwargs),
-                        allow_redirects=False,
-                    ) as response:
+        page = await get_cached_page(url)
+        if page and is_page_fresh(page):
+            return page["text"]
+
+        session = WEB_CLIENT_SESSION_POOL.get_session(url, trust_env=self.trust_env)
+        for i in range(retries):
+            try:
+                headers = dict(self.session.headers)
+                if page:
+                    # Revalidate the stale page, the server answers 304 if unchanged
+                    if page.get("etag"):
+                        headers["If-None-Match"] = page["etag"]
+                    if page.get("last_modified"):
+                        headers["If-Modified-Since"] = page["last_modified"]
+
+                kwargs: Dict = dict(
+                    headers=headers,
+                    cookies=self.session.cookies.get_dict(),
+                )
+                if not self.session.verify:
+                    kwargs["ssl"] = False
+
+                async with session.get(
+                    url,
+                    **(self.requests_kwargs | kwargs),
+                    allow_redirects=False,
+                ) as response:
+                    if page and response.status == 304:
+                        text = page["text"]
+                    else:
                         if self.raise_for_status:
                             response.raise_for_status()
-                        return await response.text()
-                except aiohttp.ClientConnectionError as e:
-                    if i == retries - 1:
-                        raise
-                    else:
-                        log.warning(
-                            f"Error fetching {url} with attempt "
-                            f"{i + 1}/{retries}: {e}. Retrying..."
+                        text = await response.text()
+
+                    if response.status in (200, 304):
+                        await set_cached_page(
+                            url,
+                            text,
+                            response.headers.get("ETag", page and page.get("etag")),
+                            response.headers.get(
+                                "Last-Modified", page and page.get("last_modified")
+                            ),
                         )
-                        await asyncio.sleep(cooldown * backoff**i)
+                    return text
+            except aiohttp.ClientConnectionError as e:
+                if i == retries - 1:
+                    raise
+                else:
+                    log.warning(
+                        f"Error fetching {url} with attempt "
+                        f"{i + 1}/{retries}: {e}. Retrying..."
+                    )
+                    await asyncio.sleep(cooldown * backoff**i)
         raise ValueError("retry count exceeded")
 
     def _unpack_fetch_results(
@@ -264,7 +264,8 @@ def upload_file_handler(
         id = str(uuid.uuid4())
         name = filename
         filename = f"{id}_{filename}"
-        contents, file_path = Storage.upload_file(
+        # Streamed to storage in chunks, large uploads aren't held in memory
+        size, sha256, file_path = Storage.upload_file_stream(
             file.file,
             filename,
             {
@@ -288,7 +289,8 @@ def upload_file_handler(
                     "meta": {
                         "name": name,
                         "content_type": file.content_type,
-                        "size": len(contents),
+                        "size": size,
+                        "sha256": sha256,
                         "data": file_metadata,
                     },
                 }
@@ -505,6 +507,8 @@ async def get_file_process_status(
                             event = {"status": status}
                             if status == "failed":
                                 event["error"] = data.get("error")
+                            elif status == "pending" and data.get("progress"):
+                                event["progress"] = data["progress"]
 
                             yield f"data: {json.dumps(event)}\n\n"
                             if status in ("completed", "failed"):
@@ -778,7 +778,7 @@ async def add_image_to_document(
     filename = os.path.basename(unsanitized_filename)
     storage_filename = f"{image_id}_{filename}"
 
-    contents, file_path = Storage.upload_file(
+    size, sha256, file_path = Storage.upload_file_stream(
         image.file,
         storage_filename,
         {
@@ -800,7 +800,8 @@ async def add_image_to_document(
             meta={
                 "name": filename,
                 "content_type": image.content_type,
-                "size": len(contents),
+                "size": size,
+                "sha256": sha256,
             },
         ),
         db=db,
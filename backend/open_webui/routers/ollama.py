@@ -1,12 +1,7 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
 from datetime import datetime
@@ -17,7 +12,13 @@ import aiohttp
 from aiocache import cached
 import requests
 
+from open_webui.utils.balancer import (
+    InFlightRequest,
+    get_affinity_key,
+    get_load_balancer,
+)
 from open_webui.utils.headers import include_user_info_headers
+from open_webui.utils.http_client import get_client_session
 from open_webui.models.chats import Chats
 from open_webui.models.users import UserModel
 
@@ -66,11 +67,30 @@ from open_webui.env import (
     AIOHTTP_CLIENT_TIMEOUT,
     AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST,
     BYPASS_MODEL_ACCESS_CONTROL,
+    ENABLE_PROMPT_AFFINITY_ROUTING,
+    OLLAMA_LOAD_BALANCER,
+    OLLAMA_LOAD_BALANCER_EJECTION_TIME,
+    OLLAMA_LOAD_BALANCER_FAILURE_THRESHOLD,
+    OLLAMA_LOAD_BALANCER_MAX_IN_FLIGHT,
+    OLLAMA_LOADED_MODELS_POLL_INTERVAL,
 )
 from open_webui.constants import ERROR_MESSAGES
 
 log = logging.getLogger(__name__)
 
+OLLAMA_BALANCER = get_load_balancer(
+    OLLAMA_LOAD_BALANCER,
+    "ollama",
+    max_in_flight=OLLAMA_LOAD_BALANCER_MAX_IN_FLIGHT,
+    failure_threshold=OLLAMA_LOAD_BALANCER_FAILURE_THRESHOLD,
+    ejection_time=OLLAMA_LOAD_BALANCER_EJECTION_TIME,
+    request_timeout=AIOHTTP_CLIENT_TIMEOUT or 300,
+)
+
+# Models loaded in memory on each Ollama server by url, polled from /api/ps
+OLLAMA_LOADED_MODELS: dict[str, set[str]] = {}
+OLLAMA_LOADED_MODELS_POLL = {"polled_at": 0.0, "task": None}
+
 
 ##########################################
 #
@@ -82,21 +102,22 @@ log = logging.getLogger(__name__)
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            headers = {
-                "Content-Type": "application/json",
-                **({"Authorization": f"Bearer {key}"} if key else {}),
-            }
+        session = get_client_session(url)
+        headers = {
+            "Content-Type": "application/json",
+            **({"Authorization": f"Bearer {key}"} if key else {}),
+        }
 
-            if ENABLE_FORWARD_USER_INFO_HEADERS and user:
-                headers = include_user_info_headers(headers, user)
+        if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+            headers = include_user_info_headers(headers, user)
 
-            async with session.get(
-                url,
-                headers=headers,
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        async with session.get(
+            url,
+            headers=headers,
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=timeout,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
@@ -105,12 +126,14 @@ async def send_get_request(url, key=None, user: UserModel = None):
 
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
+    in_flight: Optional[InFlightRequest] = None,
 ):
+    # The session is shared, releasing the response returns its connection to
+    # the pool if the body was read, or else closes it
     if response:
-        response.close()
-    if session:
-        await session.close()
+        response.release()
+    if in_flight:
+        await in_flight.finish(failed=response is None or response.status >= 500)
 
 
 async def send_post_request(
@@ -121,13 +144,12 @@ async def send_post_request(
     content_type: Optional[str] = None,
     user: UserModel = None,
     metadata: Optional[dict] = None,
+    in_flight: Optional[InFlightRequest] = None,
 ):
 
     r = None
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
+        session = get_client_session(url)
 
         headers = {
             "Content-Type": "application/json",
@@ -144,12 +166,15 @@ async def send_post_request(
             data=payload,
             headers=headers,
             ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
         )
+        if in_flight:
+            in_flight.record_latency()
 
         if r.ok is False:
             try:
                 res = await r.json()
-                await cleanup_response(r, session)
+                await cleanup_response(r)
                 if "error" in res:
                     raise HTTPException(status_code=r.status, detail=res["error"])
             except HTTPException as e:
@@ -173,7 +198,7 @@ async def send_post_request(
                 status_code=r.status,
                 headers=response_headers,
                 background=BackgroundTask(
-                    cleanup_response, response=r, session=session
+                    cleanup_response, response=r, in_flight=in_flight
                 ),
             )
         else:
@@ -190,8 +215,9 @@ async def send_post_request(
             detail=detail if e else "Open WebUI: Server Connection Error",
         )
     finally:
-        if not stream:
-            await cleanup_response(r, session)
+        # Streamed responses are cleaned up once sent
+        if not stream or r is None or not r.ok:
+            await cleanup_response(r, in_flight)
 
 
 def get_api_key(idx, url, configs):
@@ -202,6 +228,87 @@ def get_api_key(idx, url, configs):
     )  # Legacy support
 
 
+async def poll_ollama_loaded_models(request: Request):
+    urls = request.app.state.config.OLLAMA_BASE_URLS
+    configs = request.app.state.config.OLLAMA_API_CONFIGS
+
+    async def get_loaded_models(idx: int, url: str) -> Optional[set[str]]:
+        api_config = configs.get(str(idx), configs.get(url, {}))  # Legacy support
+        if not api_config.get("enable", True):
+            return None
+
+        response = await send_get_request(f"{url}/api/ps", api_config.get("key"))
+        if response is None:
+            return None
+
+        prefix_id = api_config.get("prefix_id", None)
+        return {
+            f"{prefix_id}.{model['model']}" if prefix_id else model["model"]
+            for model in response.get("models", [])
+        }
+
+    responses = await asyncio.gather(
+        *[get_loaded_models(idx, url) for idx, url in enumerate(urls)]
+    )
+    for url, models in zip(urls, responses):
+        if models is None:
+            OLLAMA_LOADED_MODELS.pop(url, None)
+        else:
+            OLLAMA_LOADED_MODELS[url] = models
+
+
+async def select_ollama_url_idx(
+    request: Request,
+    model: str,
+    url_idxs: list[int],
+    affinity_key: Optional[str] = None,
+):
+    """
+    Pick the Ollama server to send a request for `model` to, among `url_idxs`
+    serving it, with the load balancer. Servers that have the model loaded are
+    preferred, to avoid loading it on another one, and the turns of a
+    conversation sticking to one server by their `affinity_key` reuse its
+    prompt cache.
+    """
+    urls = request.app.state.config.OLLAMA_BASE_URLS
+    if len(url_idxs) == 1:
+        return url_idxs[0]
+
+    # Polled in the background so that requests don't wait for it
+    task = OLLAMA_LOADED_MODELS_POLL["task"]
+    if (task is None or task.done()) and (
+        time.time() - OLLAMA_LOADED_MODELS_POLL["polled_at"]
+        > OLLAMA_LOADED_MODELS_POLL_INTERVAL
+    ):
+        OLLAMA_LOADED_MODELS_POLL["polled_at"] = time.time()
+        OLLAMA_LOADED_MODELS_POLL["task"] = asyncio.create_task(
+            poll_ollama_loaded_models(request)
+        )
+
+    url = await OLLAMA_BALANCER.select(
+        request.app.state.redis,
+        [urls[idx] for idx in url_idxs],
+        preferred={
+            backend
+            for backend, models in OLLAMA_LOADED_MODELS.items()
+            if model in models
+        },
+        affinity_key=affinity_key if ENABLE_PROMPT_AFFINITY_ROUTING else None,
+    )
+    return next(idx for idx in url_idxs if urls[idx] == url)
+
+
+async def start_ollama_request(
+    request: Request, url: str, model: str
+) -> InFlightRequest:
+    if ":" not in model:
+        model = f"{model}:latest"
+
+    # The server loads the model to answer, until the next poll tells otherwise
+    OLLAMA_LOADED_MODELS.setdefault(url, set()).add(model)
+    return await OLLAMA_BALANCER.start(request.app.state.redis, url)
+
+
 ##########################################
 #
 # API routes
@@ -229,42 +336,40 @@ async def verify_connection(
     url = form_data.url
     key = form_data.key
 
-    async with aiohttp.ClientSession(
-        trust_env=True,
-        timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST),
-    ) as session:
-        try:
-            headers = {
-                **({"Authorization": f"Bearer {key}"} if key else {}),
-            }
+    session = get_client_session(url)
+    try:
+        headers = {
+            **({"Authorization": f"Bearer {key}"} if key else {}),
+        }
 
-            if ENABLE_FORWARD_USER_INFO_HEADERS and user:
-                headers = include_user_info_headers(headers, user)
+        if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+            headers = include_user_info_headers(headers, user)
 
-            async with session.get(
-                f"{url}/api/version",
-                headers=headers,
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as r:
-                if r.status != 200:
-                    detail = f"HTTP Error: {r.status}"
-                    res = await r.json()
+        async with session.get(
+            f"{url}/api/version",
+            headers=headers,
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST),
+        ) as r:
+            if r.status != 200:
+                detail = f"HTTP Error: {r.status}"
+                res = await r.json()
 
-                    if "error" in res:
-                        detail = f"External Error: {res['error']}"
-                    raise Exception(detail)
+                if "error" in res:
+                    detail = f"External Error: {res['error']}"
+                raise Exception(detail)
 
-                data = await r.json()
-                return data
-        except aiohttp.ClientError as e:
-            log.exception(f"Client error: {str(e)}")
-            raise HTTPException(
-                status_code=500, detail="Open WebUI: Server Connection Error"
-            )
-        except Exception as e:
-            log.exception(f"Unexpected error: {e}")
-            error_detail = f"Unexpected error: {str(e)}"
-            raise HTTPException(status_code=500, detail=error_detail)
+            data = await r.json()
+            return data
+    except aiohttp.ClientError as e:
+        log.exception(f"Client error: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail="Open WebUI: Server Connection Error"
+        )
+    except Exception as e:
+        log.exception(f"Unexpected error: {e}")
+        error_detail = f"Unexpected error: {str(e)}"
+        raise HTTPException(status_code=500, detail=error_detail)
 
 
 @router.get("/config")
@@ -935,7 +1040,7 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
         )
 
-    url_idx = random.choice(models[model]["urls"])
+    url_idx = await select_ollama_url_idx(request, model, models[model]["urls"])
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -1005,7 +1110,7 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = await select_ollama_url_idx(request, model, models[model]["urls"])
         else:
             raise HTTPException(
                 status_code=400,
@@ -1087,7 +1192,7 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = await select_ollama_url_idx(request, model, models[model]["urls"])
         else:
             raise HTTPException(
                 status_code=400,
@@ -1175,7 +1280,12 @@ async def generate_completion(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = await select_ollama_url_idx(
+                request,
+                model,
+                models[model]["urls"],
+                get_affinity_key(form_data.model_dump()),
+            )
         else:
             raise HTTPException(
                 status_code=400,
@@ -1188,15 +1298,22 @@ async def generate_completion(
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
     )
 
+    model = form_data.model
     prefix_id = api_config.get("prefix_id", None)
     if prefix_id:
         form_data.model = form_data.model.replace(f"{prefix_id}.", "")
 
+    payload = form_data.model_dump_json(exclude_none=True).encode()
+    key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
+
+    # Started once nothing can fail before the request finishes it
+    in_flight = await start_ollama_request(request, url, model)
     return await send_post_request(
         url=f"{url}/api/generate",
-        payload=form_data.model_dump_json(exclude_none=True).encode(),
-        key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
+        payload=payload,
+        key=key,
         user=user,
+        in_flight=in_flight,
     )
 
 
@@ -1234,7 +1351,12 @@ class GenerateChatCompletionForm(BaseModel):
     )
 
 
-async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] = None):
+async def get_ollama_url(
+    request: Request,
+    model: str,
+    url_idx: Optional[int] = None,
+    affinity_key: Optional[str] = None,
+):
     if url_idx is None:
         models = request.app.state.OLLAMA_MODELS
         if model not in models:
@@ -1242,7 +1364,9 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+        url_idx = await select_ollama_url_idx(
+            request, model, models[model].get("urls", []), affinity_key
+        )
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1323,24 +1447,33 @@ async def generate_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    url, url_idx = await get_ollama_url(
+        request, payload["model"], url_idx, get_affinity_key(payload, metadata)
+    )
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
     )
 
+    model = payload["model"]
     prefix_id = api_config.get("prefix_id", None)
     if prefix_id:
         payload["model"] = payload["model"].replace(f"{prefix_id}.", "")
 
+    body = json.dumps(payload)
+    key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
+
+    # Started once nothing can fail before the request finishes it
+    in_flight = await start_ollama_request(request, url, model)
     return await send_post_request(
         url=f"{url}/api/chat",
-        payload=json.dumps(payload),
+        payload=body,
         stream=form_data.stream,
-        key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
+        key=key,
         content_type="application/x-ndjson",
         user=user,
         metadata=metadata,
+        in_flight=in_flight,
     )
 
 
@@ -1433,24 +1566,33 @@ async def generate_openai_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    url, url_idx = await get_ollama_url(
+        request, payload["model"], url_idx, get_affinity_key(payload, metadata)
+    )
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
     )
 
+    model = payload["model"]
     prefix_id = api_config.get("prefix_id", None)
 
     if prefix_id:
         payload["model"] = payload["model"].replace(f"{prefix_id}.", "")
 
+    body = json.dumps(payload)
+    key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
+
+    # Started once nothing can fail before the request finishes it
+    in_flight = await start_ollama_request(request, url, model)
     return await send_post_request(
         url=f"{url}/v1/completions",
-        payload=json.dumps(payload),
+        payload=body,
         stream=payload.get("stream", False),
-        key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
+        key=key,
         user=user,
         metadata=metadata,
+        in_flight=in_flight,
     )
 
 
@@ -1520,23 +1662,32 @@ async def generate_openai_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    url, url_idx = await get_ollama_url(
+        request, payload["model"], url_idx, get_affinity_key(payload, metadata)
+    )
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
     )
 
+    model = payload["model"]
     prefix_id = api_config.get("prefix_id", None)
     if prefix_id:
         payload["model"] = payload["model"].replace(f"{prefix_id}.", "")
 
+    body = json.dumps(payload)
+    key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
+
+    # Started once nothing can fail before the request finishes it
+    in_flight = await start_ollama_request(request, url, model)
     return await send_post_request(
         url=f"{url}/v1/chat/completions",
-        payload=json.dumps(payload),
+        payload=body,
         stream=payload.get("stream", False),
-        key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
+        key=key,
         user=user,
         metadata=metadata,
+        in_flight=in_flight,
     )
 
 
@@ -1654,43 +1805,43 @@ async def download_file_stream(
 
     timeout = aiohttp.ClientTimeout(total=600)  # Set the timeout
 
-    async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-        async with session.get(
-            file_url, headers=headers, ssl=AIOHTTP_CLIENT_SESSION_SSL
-        ) as response:
-            total_size = int(response.headers.get("content-length", 0)) + current_size
-
-            with open(file_path, "ab+") as file:
-                async for data in response.content.iter_chunked(chunk_size):
-                    current_size += len(data)
-                    file.write(data)
-
-                    done = current_size == total_size
-                    progress = round((current_size / total_size) * 100, 2)
-
-                    yield f'data: {{"progress": {progress}, "completed": {current_size}, "total": {total_size}}}\n\n'
-
-                if done:
-                    file.close()
-                    hashed = calculate_sha256(file_path, chunk_size)
-
-                    with open(file_path, "rb") as file:
-                        chunk_size = 1024 * 1024 * 2
-                        url = f"{ollama_url}/api/blobs/sha256:{hashed}"
-                        with requests.Session() as session:
-                            response = session.post(url, data=file, timeout=30)
-
-                            if response.ok:
-                                res = {
-                                    "done": done,
-                                    "blob": f"sha256:{hashed}",
-                                    "name": file_name,
-                                }
-                                os.remove(file_path)
-
-                                yield f"data: {json.dumps(res)}\n\n"
-                            else:
-                                raise "Ollama: Could not create blob, Please try again."
+    session = get_client_session(file_url)
+    async with session.get(
+        file_url, headers=headers, ssl=AIOHTTP_CLIENT_SESSION_SSL, timeout=timeout
+    ) as response:
+        total_size = int(response.headers.get("content-length", 0)) + current_size
+
+        with open(file_path, "ab+") as file:
+            async for data in response.content.iter_chunked(chunk_size):
+                current_size += len(data)
+                file.write(data)
+
+                done = current_size == total_size
+                progress = round((current_size / total_size) * 100, 2)
+
+                yield f'data: {{"progress": {progress}, "completed": {current_size}, "total": {total_size}}}\n\n'
+
+            if done:
+                file.close()
+                hashed = calculate_sha256(file_path, chunk_size)
+
+                with open(file_path, "rb") as file:
+                    chunk_size = 1024 * 1024 * 2
+                    url = f"{ollama_url}/api/blobs/sha256:{hashed}"
+                    with requests.Session() as session:
+                        response = session.post(url, data=file, timeout=30)
+
+                        if response.ok:
+                            res = {
+                                "done": done,
+                                "blob": f"sha256:{hashed}",
+                                "name": file_name,
+                            }
+                            os.remove(file_path)
+
+                            yield f"data: {json.dumps(res)}\n\n"
+                        else:
+                            raise "Ollama: Could not create blob, Please try again."
 
 
 # url = "https://huggingface.co/TheBloke/stablelm-zephyr-3b-GGUF/resolve/main/stablelm-zephyr-3b.Q2_K.gguf"
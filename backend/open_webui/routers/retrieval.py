@@ -5,11 +5,10 @@ import os
 import shutil
 import asyncio
 
-import re
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Iterator, List, Optional, Sequence, Union
+from typing import Callable, Iterator, List, Optional, Sequence, Union
 
 from fastapi import (
     Depends,
@@ -26,14 +25,8 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import tiktoken
 
 
-from langchain_text_splitters import (
-    RecursiveCharacterTextSplitter,
-    TokenTextSplitter,
-    MarkdownHeaderTextSplitter,
-)
 from langchain_core.documents import Document
 
 from open_webui.models.files import FileModel, FileUpdateForm, Files
@@ -50,6 +43,10 @@ from open_webui.retrieval.loaders.main import Loader
 from open_webui.retrieval.loaders.youtube import YoutubeLoader
 
 # Web search engines
+from open_webui.retrieval.web.cache import (
+    WEB_SEARCH_CACHE,
+    get_search_cache_key,
+)
 from open_webui.retrieval.web.main import SearchResult
 from open_webui.retrieval.web.utils import get_web_loader
 from open_webui.retrieval.web.ollama import search_ollama_cloud
@@ -88,6 +85,7 @@ from open_webui.retrieval.utils import (
     query_doc_with_hybrid_search,
 )
 from open_webui.retrieval.vector.utils import filter_metadata
+from open_webui.retrieval.text_splitters import split_docs_in_parallel
 from open_webui.utils.misc import (
     calculate_sha256_string,
     sanitize_text_for_db,
@@ -105,6 +103,10 @@ from open_webui.config import (
     DEFAULT_LOCALE,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_QUERY_PREFIX,
+    RAG_EMBEDDING_PIPELINE_BATCH_SIZE,
+    RAG_EMBEDDING_PIPELINE_MAX_IN_FLIGHT,
+    RAG_TEXT_SPLITTER_PROCESSES,
+    WEB_SEARCH_CACHE_TTL,
 )
 from open_webui.env import (
     DEVICE_TYPE,
@@ -1303,85 +1305,6 @@ async def update_rag_config(
 ####################################
 
 
-def can_merge_chunks(a: Document, b: Document) -> bool:
-    if a.metadata.get("source") != b.metadata.get("source"):
-        return False
-
-    a_file_id = a.metadata.get("file_id")
-    b_file_id = b.metadata.get("file_id")
-
-    if a_file_id is not None and b_file_id is not None:
-        return a_file_id == b_file_id
-
-    return True
-
-
-def merge_docs_to_target_size(
-    request: Request,
-    chunks: list[Document],
-) -> list[Document]:
-    """
-    Best-effort normalization of chunk sizes.
-
-    Attempts to grow small chunks up to a desired minimum size,
-    without exceeding the maximum size or crossing source/file
-    boundaries.
-    """
-    min_chunk_size_target = request.app.state.config.CHUNK_MIN_SIZE_TARGET
-    max_chunk_size = request.app.state.config.CHUNK_SIZE
-
-    if min_chunk_size_target <= 0:
-        return chunks
-
-    measure_chunk_size = len
-    if request.app.state.config.TEXT_SPLITTER == "token":
-        encoding = tiktoken.get_encoding(
-            str(request.app.state.config.TIKTOKEN_ENCODING_NAME)
-        )
-        measure_chunk_size = lambda text: len(encoding.encode(text))
-
-    processed_chunks: list[Document] = []
-
-    current_chunk: Document | None = None
-    current_content: str = ""
-
-    for next_chunk in chunks:
-        if current_chunk is None:
-            current_chunk = next_chunk
-            current_content = next_chunk.page_content
-            continue  # First chunk initialization
-
-        proposed_content = f"{current_content}\n\n{next_chunk.page_content}"
-
-        can_merge = (
-            can_merge_chunks(current_chunk, next_chunk)
-            and measure_chunk_size(current_content) < min_chunk_size_target
-            and measure_chunk_size(proposed_content) <= max_chunk_size
-        )
-
-        if can_merge:
-            current_content = proposed_content
-        else:
-            processed_chunks.append(
-                Document(
-                    page_content=current_content,
-                    metadata={**current_chunk.metadata},
-                )
-            )
-            current_chunk = next_chunk
-            current_content = next_chunk.page_content
-
-    if current_chunk is not None:
-        processed_chunks.append(
-            Document(
-                page_content=current_content,
-                metadata={**current_chunk.metadata},
-            )
-        )
-
-    return processed_chunks
-
-
 def save_docs_to_vector_db(
     request: Request,
     docs,
@@ -1391,6 +1314,7 @@ def save_docs_to_vector_db(
     split: bool = True,
     add: bool = False,
     user=None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
 ) -> bool:
     def _get_docs_info(docs: list[Document]) -> str:
         docs_info = set()
@@ -1414,106 +1338,34 @@ def save_docs_to_vector_db(
 
     # Check if entries with the same hash (metadata.hash) already exist
     if metadata and "hash" in metadata:
-        result = VECTOR_DB_CLIENT.query(
-            collection_name=collection_name,
-            filter={"hash": metadata["hash"]},
-        )
+        existing_doc_ids = VECTOR_DB_CLIENT.get_ids_by_hashes(
+            collection_name, [metadata["hash"]]
+        ).get(metadata["hash"])
 
-        if result is not None and result.ids and len(result.ids) > 0:
-            existing_doc_ids = result.ids[0]
-            if existing_doc_ids:
-                if overwrite:
-                    log.info(
-                        f"Document with hash {metadata['hash']} already exists, overwriting"
-                    )
-                    VECTOR_DB_CLIENT.delete(
-                        collection_name=collection_name,
-                        ids=existing_doc_ids,
-                    )
-                else:
-                    log.info(
-                        f"Document with hash {metadata['hash']} already exists"
-                    )
-                    raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
+        if existing_doc_ids:
+            if overwrite:
+                log.info(
+                    f"Document with hash {metadata['hash']} already exists, overwriting"
+                )
+                VECTOR_DB_CLIENT.delete(
+                    collection_name=collection_name,
+                    ids=existing_doc_ids,
+                )
+            else:
+                log.info(f"Document with hash {metadata['hash']} already exists")
+                raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
     if split:
-        if request.app.state.config.ENABLE_MARKDOWN_HEADER_TEXT_SPLITTER:
-            log.info("Using markdown header text splitter")
-
-            # Phase 1: Split by markdown headers first (preserves hierarchy in metadata)
-            markdown_splitter = MarkdownHeaderTextSplitter(
-                headers_to_split_on=[
-                    ("#", "Header 1"),
-                    ("##", "Header 2"),
-                    ("###", "Header 3"),
-                    ("####", "Header 4"),
-                    ("#####", "Header 5"),
-                    ("######", "Header 6"),
-                ],
-                strip_headers=False,  # Keep headers in content for context
-            )
-
-            split_docs = []
-            for doc in docs:
-                md_chunks = markdown_splitter.split_text(doc.page_content)
-                if md_chunks:
-                    split_docs.extend(
-                        [
-                            Document(
-                                page_content=split_chunk.page_content,
-                                metadata={**doc.metadata, **split_chunk.metadata},
-                            )
-                            for split_chunk in md_chunks
-                        ]
-                    )
-                else:
-                    # No headers found, keep original document
-                    split_docs.append(doc)
-
-            # Phase 2: Split on horizontal rules (---) within each header section
-            hr_pattern = re.compile(r"^\s*-{3,}\s*$", re.MULTILINE)
-            hr_split_docs = []
-            for doc in split_docs:
-                sections = hr_pattern.split(doc.page_content)
-                if len(sections) > 1:
-                    for section in sections:
-                        section = section.strip()
-                        if section:
-                            hr_split_docs.append(
-                                Document(
-                                    page_content=section,
-                                    metadata={**doc.metadata},
-                                )
-                            )
-                else:
-                    hr_split_docs.append(doc)
-
-            docs = hr_split_docs
-            if request.app.state.config.CHUNK_MIN_SIZE_TARGET > 0:
-                docs = merge_docs_to_target_size(request, docs)
-
-        if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
-            )
-
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
-            text_splitter = TokenTextSplitter(
-                encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        else:
-            raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+        docs = split_docs_in_parallel(
+            docs,
+            RAG_TEXT_SPLITTER_PROCESSES,
+            text_splitter=request.app.state.config.TEXT_SPLITTER,
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            chunk_min_size_target=request.app.state.config.CHUNK_MIN_SIZE_TARGET,
+            tiktoken_encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
+            enable_markdown_header_text_splitter=request.app.state.config.ENABLE_MARKDOWN_HEADER_TEXT_SPLITTER,
+        )
 
     if len(docs) == 0:
         raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
@@ -1576,47 +1428,121 @@ def save_docs_to_vector_db(
             enable_async=request.app.state.config.ENABLE_ASYNC_EMBEDDING,
         )
 
-        # Run async embedding in sync context
-        # Use a separate thread when called from within a running event loop
-        # (e.g. uvicorn async handlers calling sync process_file)
-        def _run_embedding():
-            return asyncio.run(
-                embedding_function(
-                    list(map(lambda x: x.replace("\n", " "), texts)),
-                    prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-                    user=user,
+        # Embed and insert batches as they complete, so embedding overlaps with
+        # inserts and only a bounded number of batches of vectors is in memory
+        batch_size = max(RAG_EMBEDDING_PIPELINE_BATCH_SIZE, 1)
+        in_flight_limit = max(RAG_EMBEDDING_PIPELINE_MAX_IN_FLIGHT, 1)
+
+        async def _embed_and_insert() -> int:
+            in_flight = asyncio.Semaphore(in_flight_limit)
+            # Local models and sequential embedding run one batch at a time
+            embedding_slots = asyncio.Semaphore(
+                in_flight_limit
+                if request.app.state.config.RAG_EMBEDDING_ENGINE
+                and request.app.state.config.ENABLE_ASYNC_EMBEDDING
+                else 1
+            )
+
+            inserted_ids = []
+            completed = 0
+            failed = False
+            # Backends create the collection on the first insert, checking
+            # whether it exists first, so concurrent first inserts would race:
+            # the other batches insert once the first one has
+            collection_created = asyncio.Event()
+
+            async def _process_batch(start: int, end: int):
+                nonlocal completed, failed
+
+                async with in_flight:
+                    if failed:
+                        return
+
+                    try:
+                        async with embedding_slots:
+                            embeddings = await embedding_function(
+                                [text.replace("\n", " ") for text in texts[start:end]],
+                                prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                                user=user,
+                            )
+
+                        if not embeddings or len(embeddings) != end - start:
+                            raise ValueError(
+                                f"expected {end - start} embeddings, got {len(embeddings or [])}"
+                            )
+
+                        items = [
+                            {
+                                "id": str(uuid.uuid4()),
+                                "text": texts[idx],
+                                "vector": embeddings[idx - start],
+                                "metadata": metadatas[idx],
+                            }
+                            for idx in range(start, end)
+                        ]
+
+                        if start > 0:
+                            await collection_created.wait()
+                            if failed:
+                                return
+
+                        inserted_ids.extend(item["id"] for item in items)
+                        await VECTOR_DB_CLIENT.ainsert(
+                            collection_name=collection_name,
+                            items=items,
+                        )
+                    except Exception:
+                        failed = True
+                        raise
+                    finally:
+                        if start == 0:
+                            collection_created.set()
+
+                completed += end - start
+                log.debug(
+                    f"embedded and inserted {completed}/{len(texts)} items into {collection_name}"
                 )
+                if progress_callback:
+                    progress_callback(completed, len(texts))
+
+            results = await asyncio.gather(
+                *[
+                    _process_batch(start, min(start + batch_size, len(texts)))
+                    for start in range(0, len(texts), batch_size)
+                ],
+                return_exceptions=True,
             )
 
+            errors = [result for result in results if isinstance(result, Exception)]
+            if errors:
+                # Don't leave a partially embedded document behind
+                if inserted_ids:
+                    await VECTOR_DB_CLIENT.adelete(
+                        collection_name=collection_name, ids=inserted_ids
+                    )
+                raise errors[0]
+
+            return completed
+
+        # Use a separate thread when called from within a running event loop
+        # (e.g. uvicorn async handlers calling sync process_file)
         try:
             asyncio.get_running_loop()
+            in_event_loop = True
+        except RuntimeError:
+            in_event_loop = False
+
+        if in_event_loop:
             # We're inside an event loop - run in a new thread with its own loop
             import concurrent.futures
 
             with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-                embeddings = pool.submit(_run_embedding).result()
-        except RuntimeError:
+                count = pool.submit(asyncio.run, _embed_and_insert()).result()
+        else:
             # No running event loop - safe to call asyncio.run directly
-            embeddings = _run_embedding()
-        log.info(f"embeddings generated {len(embeddings)} for {len(texts)} items")
-
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
-            }
-            for idx, text in enumerate(texts)
-        ]
-
-        log.info(f"adding to collection {collection_name}")
-        VECTOR_DB_CLIENT.insert(
-            collection_name=collection_name,
-            items=items,
-        )
+            count = asyncio.run(_embed_and_insert())
 
-        log.info(f"added {len(items)} items to collection {collection_name}")
+        log.info(f"added {count} items to collection {collection_name}")
         return True
     except Exception as e:
         log.exception(e)
@@ -1812,6 +1738,10 @@ def process_file(
                         overwrite=form_data.overwrite,
                         add=(True if form_data.collection_name else False),
                         user=user,
+                        progress_callback=lambda completed, total: Files.update_file_data_by_id(
+                            file.id,
+                            {"progress": {"completed": completed, "total": total}},
+                        ),
                     )
                     log.info(f"added {len(docs)} items to collection {collection_name}")
 
@@ -2264,6 +2194,37 @@ def search_web(
         raise Exception("No search engine API key found in environment variables")
 
 
+async def asearch_web(
+    request: Request, engine: str, query: str, user=None
+) -> list[SearchResult]:
+    """
+    Run `search_web` in the threadpool, serving the results of the same search
+    (engine, query, result count and domain filters, and user for engines sent
+    the user's identity) from the cache for WEB_SEARCH_CACHE_TTL seconds.
+    """
+    if WEB_SEARCH_CACHE is None:
+        return await run_in_threadpool(search_web, request, engine, query, user)
+
+    key = get_search_cache_key(
+        engine,
+        query,
+        request.app.state.config.WEB_SEARCH_RESULT_COUNT,
+        request.app.state.config.WEB_SEARCH_DOMAIN_FILTER_LIST,
+        user_id=user.id if user else None,
+    )
+    results = await WEB_SEARCH_CACHE.get(key)
+    if results is not None:
+        log.debug(f"web search cache hit for {query}")
+        return [SearchResult(**result) for result in results]
+
+    results = await run_in_threadpool(search_web, request, engine, query, user)
+    if results:
+        await WEB_SEARCH_CACHE.set(
+            key, [result.model_dump() for result in results], WEB_SEARCH_CACHE_TTL
+        )
+    return results
+
+
 @router.post("/process/web/search")
 async def process_web_search(
     request: Request, form_data: SearchForm, user=Depends(get_verified_user)
@@ -2301,8 +2262,7 @@ async def process_web_search(
 
             async def search_with_limit(query):
                 async with semaphore:
-                    return await run_in_threadpool(
-                        search_web,
+                    return await asearch_web(
                         request,
                         request.app.state.config.WEB_SEARCH_ENGINE,
                         query,
@@ -2313,8 +2273,7 @@ async def process_web_search(
         else:
             # Unlimited parallel execution (previous behavior)
             search_tasks = [
-                run_in_threadpool(
-                    search_web,
+                asearch_web(
                     request,
                     request.app.state.config.WEB_SEARCH_ENGINE,
                     query,
@@ -2453,13 +2412,13 @@ async def query_doc_handler(
         if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH and (
             form_data.hybrid is None or form_data.hybrid
         ):
-            collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=form_data.collection_name
+            bm25_index = await asyncio.to_thread(
+                VECTOR_DB_CLIENT.get_bm25_index, form_data.collection_name
             )
             return await query_doc_with_hybrid_search(
                 collection_name=form_data.collection_name,
-                collection_result=collection_results[form_data.collection_name],
+                collection_result=None,
+                bm25_index=bm25_index,
                 query=form_data.query,
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
                     query, prefix=prefix, user=user
@@ -2695,8 +2654,24 @@ async def process_files_batch(
     # Prepare all documents first
     all_docs: List[Document] = []
 
+    # Dedupe the whole batch against the collection with one lookup
+    hashes = {
+        file.id: calculate_sha256_string((file.data or {}).get("content", ""))
+        for file in form_data.files
+    }
+    existing_hashes = set(
+        await run_in_threadpool(
+            VECTOR_DB_CLIENT.get_ids_by_hashes, collection_name, list(hashes.values())
+        )
+    )
+
     for file in form_data.files:
         try:
+            if hashes[file.id] in existing_hashes:
+                log.info(f"process_files_batch: File {file.id} already exists")
+                raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
+            existing_hashes.add(hashes[file.id])
+
             text_content = file.data.get("content", "")
             docs: List[Document] = [
                 Document(
@@ -2707,6 +2682,7 @@ async def process_files_batch(
                         "created_by": file.user_id,
                         "file_id": file.id,
                         "source": file.filename,
+                        "hash": hashes[file.id],
                     },
                 )
             ]
@@ -2715,7 +2691,7 @@ async def process_files_batch(
 
             file_updates.append(
                 FileUpdateForm(
-                    hash=calculate_sha256_string(text_content),
+                    hash=hashes[file.id],
                     data={"content": text_content},
                 )
             )
@@ -10,7 +10,6 @@ from redis import asyncio as aioredis
 import pycrdt as Y
 
 from open_webui.models.users import Users, UserNameResponse
-from open_webui.models.chats import Chats
 from open_webui.utils.redis import (
     get_sentinels_from_env,
     get_sentinel_url_from_env,
@@ -35,11 +34,14 @@ from open_webui.env import (
     WEBSOCKET_SERVER_PING_INTERVAL,
     WEBSOCKET_SERVER_LOGGING,
     WEBSOCKET_SERVER_ENGINEIO_LOGGING,
+    WEBSOCKET_EVENT_BATCH_INTERVAL,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock, YdocManager
+from open_webui.socket.utils import EventBatcher, RedisDict, RedisLock, YdocManager
 from open_webui.tasks import create_task, stop_item_tasks
 from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.message_buffer import MESSAGE_WRITE_BUFFER
+from open_webui.utils.presence import PRESENCE_TRACKER
 from open_webui.utils.access_control import has_access, get_users_with_access
 
 
@@ -154,6 +156,8 @@ else:
     aquire_func = release_func = renew_func = lambda: True
 
 
+EVENT_BATCHER = EventBatcher(sio.emit, interval=WEBSOCKET_EVENT_BATCH_INTERVAL / 1000)
+
 YDOC_MANAGER = YdocManager(
     redis=REDIS,
     redis_key_prefix=f"{REDIS_KEY_PREFIX}:ydoc:documents",
@@ -266,7 +270,7 @@ async def emit_to_users(event: str, data: dict, user_ids: list[str]):
     """
     try:
         for user_id in user_ids:
-            await sio.emit(event, data, room=f"user:{user_id}")
+            await EVENT_BATCHER.send(event, data, room=f"user:{user_id}")
     except Exception as e:
         log.debug(f"Failed to emit event {event} to users {user_ids}: {e}")
 
@@ -351,7 +355,7 @@ async def user_join(sid, data):
 async def heartbeat(sid, data):
     user = SESSION_POOL.get(sid)
     if user:
-        Users.update_last_active_by_id(user["id"])
+        PRESENCE_TRACKER.touch(user["id"])
 
 
 @sio.on("ydoc:document:join")
@@ -571,7 +575,7 @@ def get_event_emitter(request_info, update_db=True):
         chat_id = request_info["chat_id"]
         message_id = request_info["message_id"]
 
-        await sio.emit(
+        await EVENT_BATCHER.send(
             "events",
             {
                 "chat_id": chat_id,
@@ -586,90 +590,87 @@ def get_event_emitter(request_info, update_db=True):
             and not request_info.get("chat_id", "").startswith("local:")
         ):
 
-            if "type" in event_data and event_data["type"] == "status":
-                Chats.add_message_status_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    event_data.get("data", {}),
-                )
+            event_type = event_data.get("type")
 
-            if "type" in event_data and event_data["type"] == "message":
-                message = Chats.get_message_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
+            if event_type == "status":
+                message = MESSAGE_WRITE_BUFFER.get(chat_id, message_id)
+                if message:
+                    MESSAGE_WRITE_BUFFER.update(
+                        chat_id,
+                        message_id,
+                        {
+                            "statusHistory": [
+                                *message.get("statusHistory", []),
+                                event_data.get("data", {}),
+                            ],
+                        },
+                    )
+
+            if event_type == "message":
+                message = MESSAGE_WRITE_BUFFER.get(chat_id, message_id)
 
                 if message:
                     content = message.get("content", "")
                     content += event_data.get("data", {}).get("content", "")
 
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
+                    MESSAGE_WRITE_BUFFER.update(
+                        chat_id,
+                        message_id,
                         {
                             "content": content,
                         },
                     )
 
-            if "type" in event_data and event_data["type"] == "replace":
+            if event_type == "replace":
                 content = event_data.get("data", {}).get("content", "")
 
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
+                MESSAGE_WRITE_BUFFER.update(
+                    chat_id,
+                    message_id,
                     {
                         "content": content,
                     },
                 )
 
-            if "type" in event_data and event_data["type"] == "embeds":
-                message = Chats.get_message_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
+            if event_type == "embeds":
+                message = MESSAGE_WRITE_BUFFER.get(chat_id, message_id)
 
                 embeds = event_data.get("data", {}).get("embeds", [])
                 embeds.extend(message.get("embeds", []))
 
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
+                MESSAGE_WRITE_BUFFER.update(
+                    chat_id,
+                    message_id,
                     {
                         "embeds": embeds,
                     },
                 )
 
-            if "type" in event_data and event_data["type"] == "files":
-                message = Chats.get_message_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
+            if event_type == "files":
+                message = MESSAGE_WRITE_BUFFER.get(chat_id, message_id)
 
                 files = event_data.get("data", {}).get("files", [])
                 files.extend(message.get("files", []))
 
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
+                MESSAGE_WRITE_BUFFER.update(
+                    chat_id,
+                    message_id,
                     {
                         "files": files,
                     },
                 )
 
-            if event_data.get("type") in ["source", "citation"]:
+            if event_type in ["source", "citation"]:
                 data = event_data.get("data", {})
                 if data.get("type") == None:
-                    message = Chats.get_message_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                    )
+                    message = MESSAGE_WRITE_BUFFER.get(chat_id, message_id)
 
                     sources = message.get("sources", [])
-                    sources.append(data)
+                    sources = [*sources, data]
 
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
+                    MESSAGE_WRITE_BUFFER.update(
+                        chat_id,
+                        message_id,
                         {
                             "sources": sources,
                         },
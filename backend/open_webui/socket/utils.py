@@ -1,10 +1,20 @@
+import asyncio
 import json
+import logging
+import threading
+import time
 import uuid
+import weakref
 from open_webui.utils.redis import get_redis_connection
 from open_webui.env import REDIS_KEY_PREFIX
 from typing import Optional, List, Tuple
 import pycrdt as Y
 
+log = logging.getLogger(__name__)
+
+# Cached for keys that aren't in a RedisDict
+_MISSING = object()
+
 
 class RedisLock:
     def __init__(
@@ -47,7 +57,29 @@ class RedisLock:
 
 
 class RedisDict:
-    def __init__(self, name, redis_url, redis_sentinels=[], redis_cluster=False):
+    """
+    Dict stored in a Redis hash, shared by the workers.
+
+    Reads are cached in memory, so that looking up a model or a session
+    doesn't go to Redis on every request. Each write bumps a version and
+    publishes the changed keys on `{name}:updates`, in the same round trip, on
+    which a listener thread evicts them from the cache. At most once every
+    `check_interval` seconds, the version is compared with the notifications
+    received: if some of the writes seen at the previous check still weren't
+    notified, notifications were missed and the whole cache is dropped.
+
+    The `a`-prefixed methods are async variants for the event loop, sharing
+    the cache and only going to Redis on a miss.
+    """
+
+    def __init__(
+        self,
+        name,
+        redis_url,
+        redis_sentinels=[],
+        redis_cluster=False,
+        check_interval: float = 10,
+    ):
         self.name = name
         self.redis = get_redis_connection(
             redis_url,
@@ -55,27 +87,156 @@ class RedisDict:
             redis_cluster=redis_cluster,
             decode_responses=True,
         )
+        self.async_redis = get_redis_connection(
+            redis_url,
+            redis_sentinels,
+            redis_cluster=redis_cluster,
+            async_mode=True,
+            decode_responses=True,
+        )
+        self.check_interval = check_interval
+
+        self._version_key = f"{name}:version"
+        self._channel = f"{name}:updates"
+
+        # Values by key, _MISSING for keys known to be absent
+        self._cache: dict = {}
+        self._length: Optional[int] = None
+        self._checked_at = 0.0
+        # Version when the listener subscribed, None while it isn't, and the
+        # notifications it received since
+        self._base_version: Optional[int] = None
+        self._received = 0
+        # Version read at the previous check
+        self._checked_version: Optional[int] = None
+        # Bumped on every eviction, so that a value read from Redis before an
+        # eviction isn't cached after it
+        self._generation = 0
+
+        threading.Thread(
+            target=self._listen, name=f"redis-dict-listener:{name}", daemon=True
+        ).start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                pubsub.subscribe(self._channel)
+                # Updates may have been missed while not subscribed
+                self._evict()
+                self._received = 0
+                self._checked_version = None
+                self._base_version = int(self.redis.get(self._version_key) or 0)
+
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        keys = json.loads(message["data"])
+                        self._evict(None if keys == "*" else keys)
+                        self._received += 1
+            except Exception as e:
+                log.warning(f"{self.name} update listener failed, resubscribing: {e}")
+                self._base_version = None
+                time.sleep(self.check_interval)
+
+    def _evict(self, keys: Optional[list] = None):
+        self._generation += 1
+        self._length = None
+        if keys is None:
+            self._cache = {}
+        else:
+            for key in keys:
+                self._cache.pop(key, None)
+
+    def _should_check(self) -> bool:
+        return time.time() - self._checked_at > self.check_interval
+
+    def _check_version(self, version):
+        self._checked_at = time.time()
+        version = int(version or 0)
+
+        if self._base_version is None:
+            # Not subscribed, updates can't be told apart from missed ones
+            self._evict()
+        elif self._checked_version is not None and (
+            version < self._checked_version
+            or self._base_version + self._received < self._checked_version
+        ):
+            log.debug(f"{self.name} updates were missed, dropping the cache")
+            self._evict()
+            self._base_version = version - self._received
+        self._checked_version = version
+
+    def _cache_value(self, key, value, generation: int):
+        if generation == self._generation:
+            self._cache[key] = value
+
+    def _notify(self, pipe, keys):
+        """Add the notification of the changed keys, or "*" for all of them."""
+        pipe.incr(self._version_key)
+        pipe.publish(self._channel, json.dumps(keys))
+
+    def _get(self, key):
+        if self._should_check():
+            self._check_version(self.redis.get(self._version_key))
+
+        if key in self._cache:
+            return self._cache[key]
+
+        generation = self._generation
+        value = self.redis.hget(self.name, key)
+        value = _MISSING if value is None else json.loads(value)
+        self._cache_value(key, value, generation)
+        return value
+
+    async def _aget(self, key):
+        if self._should_check():
+            self._check_version(await self.async_redis.get(self._version_key))
+
+        if key in self._cache:
+            return self._cache[key]
+
+        generation = self._generation
+        value = await self.async_redis.hget(self.name, key)
+        value = _MISSING if value is None else json.loads(value)
+        self._cache_value(key, value, generation)
+        return value
 
     def __setitem__(self, key, value):
-        serialized_value = json.dumps(value)
-        self.redis.hset(self.name, key, serialized_value)
+        pipe = self.redis.pipeline()
+        pipe.hset(self.name, key, json.dumps(value))
+        self._notify(pipe, [key])
+        pipe.execute()
+        self._evict([key])
 
     def __getitem__(self, key):
-        value = self.redis.hget(self.name, key)
-        if value is None:
+        value = self._get(key)
+        if value is _MISSING:
             raise KeyError(key)
-        return json.loads(value)
+        return value
 
     def __delitem__(self, key):
-        result = self.redis.hdel(self.name, key)
+        pipe = self.redis.pipeline()
+        pipe.hdel(self.name, key)
+        self._notify(pipe, [key])
+        result, *_ = pipe.execute()
+        self._evict([key])
         if result == 0:
             raise KeyError(key)
 
     def __contains__(self, key):
-        return self.redis.hexists(self.name, key)
+        return self._get(key) is not _MISSING
 
     def __len__(self):
-        return self.redis.hlen(self.name)
+        if self._should_check():
+            self._check_version(self.redis.get(self._version_key))
+
+        if self._length is None:
+            generation = self._generation
+            length = self.redis.hlen(self.name)
+            if generation == self._generation:
+                self._length = length
+            return length
+        return self._length
 
     def keys(self):
         return self.redis.hkeys(self.name)
@@ -92,17 +253,62 @@ class RedisDict:
         pipe.delete(self.name)
         if mapping:
             pipe.hset(self.name, mapping={k: json.dumps(v) for k, v in mapping.items()})
+        self._notify(pipe, "*")
 
         pipe.execute()
+        self._evict()
+
+    def sync(self, mapping: dict):
+        """Make the hash match `mapping`, writing only changed and removed keys."""
+        current = self.redis.hgetall(self.name)
+        serialized = {k: json.dumps(v) for k, v in mapping.items()}
+
+        changed = {k: v for k, v in serialized.items() if current.get(k) != v}
+        removed = [k for k in current if k not in serialized]
+
+        if not changed and not removed:
+            return
+
+        pipe = self.redis.pipeline()
+        if changed:
+            pipe.hset(self.name, mapping=changed)
+        if removed:
+            pipe.hdel(self.name, *removed)
+        self._notify(pipe, [*changed, *removed])
+        pipe.execute()
+        self._evict([*changed, *removed])
 
     def get(self, key, default=None):
-        try:
-            return self[key]
-        except KeyError:
-            return default
+        value = self._get(key)
+        return default if value is _MISSING else value
+
+    async def aget(self, key, default=None):
+        value = await self._aget(key)
+        return default if value is _MISSING else value
+
+    async def acontains(self, key) -> bool:
+        return await self._aget(key) is not _MISSING
+
+    async def aset(self, key, value):
+        pipe = self.async_redis.pipeline()
+        pipe.hset(self.name, key, json.dumps(value))
+        self._notify(pipe, [key])
+        await pipe.execute()
+        self._evict([key])
+
+    async def adelete(self, key):
+        pipe = self.async_redis.pipeline()
+        pipe.hdel(self.name, key)
+        self._notify(pipe, [key])
+        await pipe.execute()
+        self._evict([key])
 
     def clear(self):
-        self.redis.delete(self.name)
+        pipe = self.redis.pipeline()
+        pipe.delete(self.name)
+        self._notify(pipe, "*")
+        pipe.execute()
+        self._evict()
 
     def update(self, other=None, **kwargs):
         if other is not None:
@@ -225,3 +431,146 @@ class YdocManager:
                 del self._updates[document_id]
             if document_id in self._users:
                 del self._users[document_id]
+
+
+def is_simple_delta(choices) -> bool:
+    """Whether `choices` only carries streamed text of a single choice."""
+    if not isinstance(choices, list) or len(choices) != 1:
+        return False
+
+    choice = choices[0]
+    if not isinstance(choice, dict) or choice.get("finish_reason") is not None:
+        return False
+    if not set(choice.keys()) <= {"index", "delta", "finish_reason"}:
+        return False
+
+    delta = choice.get("delta")
+    return (
+        isinstance(delta, dict)
+        and set(delta.keys()) == {"content"}
+        and isinstance(delta["content"], str)
+        # The client drops a lone newline at the start of a response
+        and delta["content"] != "\n"
+    )
+
+
+def merge_completion_data(pending: dict, data: dict) -> bool:
+    """
+    Merge the data of a `chat:completion` event into the pending one, with the
+    same effect on the client as receiving both. Returns False, leaving
+    `pending` untouched, when they can't be combined.
+    """
+    if pending.get("done") or pending.get("error") or data.get("error"):
+        return False
+
+    for key, value in data.items():
+        if key == "choices":
+            # The client applies deltas before content, a delta following
+            # content can't be sent along with it
+            if "content" in pending:
+                return False
+            if "choices" in pending and not (
+                is_simple_delta(pending["choices"]) and is_simple_delta(value)
+            ):
+                return False
+        elif key in ("content", "usage"):
+            continue
+        elif key in pending and pending[key] != value:
+            return False
+
+    for key, value in data.items():
+        if key == "choices" and "choices" in pending:
+            delta = pending["choices"][0]["delta"]["content"]
+            pending["choices"] = [
+                {
+                    **pending["choices"][0],
+                    "delta": {"content": delta + value[0]["delta"]["content"]},
+                }
+            ]
+        else:
+            pending[key] = value
+
+    return True
+
+
+class EventBatcher:
+    """
+    Coalesces the `chat:completion` events of a message sent to a room within
+    `interval` seconds into a single event, so a streamed response costs one
+    frame (and with Redis, one publish) per interval instead of one per
+    token. Any other event sent to the room flushes the pending one first, so
+    the client sees events in the order they were sent.
+    """
+
+    def __init__(self, emit, interval: float = 0.03):
+        self.emit = emit
+        self.interval = interval
+
+        self._pending: dict[str, dict] = {}
+        self._timers: dict[str, asyncio.Task] = {}
+        self._locks = weakref.WeakValueDictionary()
+
+    def _is_batchable(self, event: str, payload: dict) -> bool:
+        data = payload.get("data")
+        return (
+            event == "events"
+            and isinstance(data, dict)
+            and data.get("type") == "chat:completion"
+            and isinstance(data.get("data"), dict)
+            and not data["data"].get("done")
+            and not data["data"].get("error")
+        )
+
+    async def send(self, event: str, payload: dict, room: str):
+        if not self.interval:
+            await self.emit(event, payload, room=room)
+            return
+
+        lock = self._locks.get(room)
+        if lock is None:
+            lock = self._locks[room] = asyncio.Lock()
+
+        async with lock:
+            pending = self._pending.get(room)
+            if (
+                pending is not None
+                and event == "events"
+                and payload.get("chat_id") == pending["chat_id"]
+                and payload.get("message_id") == pending["message_id"]
+                and (payload.get("data") or {}).get("type") == "chat:completion"
+                and isinstance(payload["data"].get("data"), dict)
+                and merge_completion_data(
+                    pending["data"]["data"], payload["data"]["data"]
+                )
+            ):
+                data = pending["data"]["data"]
+                if data.get("done") or data.get("error"):
+                    await self._flush(room)
+                return
+
+            if pending is not None:
+                await self._flush(room)
+
+            if self._is_batchable(event, payload):
+                self._pending[room] = {
+                    **payload,
+                    "data": {**payload["data"], "data": {**payload["data"]["data"]}},
+                }
+                self._timers[room] = asyncio.create_task(self._flush_later(room, lock))
+            else:
+                await self.emit(event, payload, room=room)
+
+    async def _flush_later(self, room: str, lock: asyncio.Lock):
+        await asyncio.sleep(self.interval)
+        async with lock:
+            if self._timers.get(room) is asyncio.current_task():
+                await self._flush(room)
+
+    async def _flush(self, room: str):
+        timer = self._timers.pop(room, None)
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+
+        payload = self._pending.pop(room, None)
+        if payload is not None:
+            await self.emit("events", payload, room=room)
@@ -1,3 +1,4 @@
+import hashlib
 import os
 import shutil
 import json
@@ -7,6 +8,7 @@ from abc import ABC, abstractmethod
 from typing import BinaryIO, Tuple, Dict
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from open_webui.config import (
@@ -37,6 +39,11 @@ from azure.core.exceptions import ResourceNotFoundError
 
 log = logging.getLogger(__name__)
 
+# Uploads are read, written and sent in parts of this size (bytes), so that
+# memory use doesn't grow with the size of the file. A multiple of 256 KiB as
+# GCS requires, and above the 5 MiB minimum of S3 multipart uploads.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -49,6 +56,16 @@ class StorageProvider(ABC):
     ) -> Tuple[bytes, str]:
         pass
 
+    @abstractmethod
+    def upload_file_stream(
+        self, file: BinaryIO, filename: str, tags: Dict[str, str]
+    ) -> Tuple[int, str, str]:
+        """
+        Upload the file in chunks, without holding it in memory, and return
+        its size, its SHA-256 hash and its path.
+        """
+        pass
+
     @abstractmethod
     def delete_all_files(self) -> None:
         pass
@@ -71,6 +88,29 @@ class LocalStorageProvider(StorageProvider):
             f.write(contents)
         return contents, file_path
 
+    @staticmethod
+    def upload_file_stream(
+        file: BinaryIO, filename: str, tags: Dict[str, str]
+    ) -> Tuple[int, str, str]:
+        size = 0
+        sha256 = hashlib.sha256()
+        file_path = f"{UPLOAD_DIR}/{filename}"
+        with open(file_path, "wb") as f:
+            while chunk := file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                sha256.update(chunk)
+                f.write(chunk)
+
+        if not size:
+            os.remove(file_path)
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        return size, sha256.hexdigest(), file_path
+
+    @staticmethod
+    def read_file(filename: str) -> bytes:
+        with open(f"{UPLOAD_DIR}/{filename}", "rb") as f:
+            return f.read()
+
     @staticmethod
     def get_file(file_path: str) -> str:
         """Handles downloading of the file from local storage."""
@@ -138,6 +178,12 @@ class S3StorageProvider(StorageProvider):
         self.bucket_name = S3_BUCKET_NAME
         self.key_prefix = S3_KEY_PREFIX if S3_KEY_PREFIX else ""
 
+        # Files above a part are sent as multipart uploads
+        self.transfer_config = TransferConfig(
+            multipart_threshold=UPLOAD_CHUNK_SIZE,
+            multipart_chunksize=UPLOAD_CHUNK_SIZE,
+        )
+
     @staticmethod
     def sanitize_tag_value(s: str) -> str:
         """Only include S3 allowed characters."""
@@ -147,10 +193,21 @@ class S3StorageProvider(StorageProvider):
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
     ) -> Tuple[bytes, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        _, _, s3_file_path = self.upload_file_stream(file, filename, tags)
+        return LocalStorageProvider.read_file(filename), s3_file_path
+
+    def upload_file_stream(
+        self, file: BinaryIO, filename: str, tags: Dict[str, str]
+    ) -> Tuple[int, str, str]:
+        """Handles uploading of the file to S3 storage, in parts."""
+        size, sha256, file_path = LocalStorageProvider.upload_file_stream(
+            file, filename, tags
+        )
         s3_key = os.path.join(self.key_prefix, filename)
         try:
-            self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
+            self.s3_client.upload_file(
+                file_path, self.bucket_name, s3_key, Config=self.transfer_config
+            )
             if S3_ENABLE_TAGGING and tags:
                 sanitized_tags = {
                     self.sanitize_tag_value(k): self.sanitize_tag_value(v)
@@ -166,10 +223,7 @@ class S3StorageProvider(StorageProvider):
                     Key=s3_key,
                     Tagging=tagging,
                 )
-            return (
-                open(file_path, "rb").read(),
-                f"s3://{self.bucket_name}/{s3_key}",
-            )
+            return size, sha256, f"s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
@@ -240,11 +294,21 @@ class GCSStorageProvider(StorageProvider):
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
     ) -> Tuple[bytes, str]:
         """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        _, _, gcs_file_path = self.upload_file_stream(file, filename, tags)
+        return LocalStorageProvider.read_file(filename), gcs_file_path
+
+    def upload_file_stream(
+        self, file: BinaryIO, filename: str, tags: Dict[str, str]
+    ) -> Tuple[int, str, str]:
+        """Handles uploading of the file to GCS storage, as a resumable upload."""
+        size, sha256, file_path = LocalStorageProvider.upload_file_stream(
+            file, filename, tags
+        )
         try:
-            blob = self.bucket.blob(filename)
+            # Setting a chunk size makes the upload resumable, sent a chunk at a time
+            blob = self.bucket.blob(filename, chunk_size=UPLOAD_CHUNK_SIZE)
             blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+            return size, sha256, "gs://" + self.bucket_name + "/" + filename
         except GoogleCloudError as e:
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
@@ -296,13 +360,19 @@ class AzureStorageProvider(StorageProvider):
         if storage_key:
             # Configure using the Azure Storage Account Endpoint and Key
             self.blob_service_client = BlobServiceClient(
-                account_url=self.endpoint, credential=storage_key
+                account_url=self.endpoint,
+                credential=storage_key,
+                max_single_put_size=UPLOAD_CHUNK_SIZE,
+                max_block_size=UPLOAD_CHUNK_SIZE,
             )
         else:
             # Configure using the Azure Storage Account Endpoint and DefaultAzureCredential
             # If the key is not configured, then the DefaultAzureCredential will be used to support Managed Identity authentication
             self.blob_service_client = BlobServiceClient(
-                account_url=self.endpoint, credential=DefaultAzureCredential()
+                account_url=self.endpoint,
+                credential=DefaultAzureCredential(),
+                max_single_put_size=UPLOAD_CHUNK_SIZE,
+                max_block_size=UPLOAD_CHUNK_SIZE,
             )
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
@@ -312,11 +382,22 @@ class AzureStorageProvider(StorageProvider):
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
     ) -> Tuple[bytes, str]:
         """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        _, _, azure_file_path = self.upload_file_stream(file, filename, tags)
+        return LocalStorageProvider.read_file(filename), azure_file_path
+
+    def upload_file_stream(
+        self, file: BinaryIO, filename: str, tags: Dict[str, str]
+    ) -> Tuple[int, str, str]:
+        """Handles uploading of the file to Azure Blob Storage, in blocks."""
+        size, sha256, file_path = LocalStorageProvider.upload_file_stream(
+            file, filename, tags
+        )
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            # Files above a block are staged and committed block by block
+            with open(file_path, "rb") as f:
+                blob_client.upload_blob(f, length=size, overwrite=True)
+            return size, sha256, f"{self.endpoint}/{self.container_name}/{filename}"
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
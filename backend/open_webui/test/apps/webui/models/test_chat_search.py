@@ -0,0 +1,83 @@
+import importlib
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from open_webui.internal import db as internal_db
+from open_webui.models.chats import Chat, ChatImportForm, ChatMessage, Chats
+
+add_chat_search_table = importlib.import_module(
+    "open_webui.migrations.versions.f5b8c3d1a926_add_chat_search_table"
+)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(internal_db, "DATABASE_ENABLE_SESSION_SHARING", True)
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Chat.__table__.create(engine)
+    ChatMessage.__table__.create(engine)
+    with engine.begin() as connection:
+        with Operations.context(MigrationContext.configure(connection)):
+            add_chat_search_table.upgrade()
+
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def import_chat(db, user_id, title, *contents):
+    messages = {
+        f"m{idx}": {"id": f"m{idx}", "content": content}
+        for idx, content in enumerate(contents)
+    }
+    form = ChatImportForm(chat={"title": title, "history": {"messages": messages}})
+    return Chats.import_chats(user_id, [form], db=db)[0]
+
+
+def search(db, user_id, search_text):
+    return [
+        chat.title
+        for chat in Chats.get_chats_by_user_id_and_search_text(
+            user_id, search_text, db=db
+        )
+    ]
+
+
+class TestChatSearch:
+    def test_words_match_indexed_prefixes(self, db):
+        import_chat(db, "user", "Travel", "Booking a flight to Lisbon")
+        import_chat(db, "user", "Cooking", "A recipe for bread")
+        import_chat(db, "other", "Travel", "Booking a flight to Lisbon")
+
+        assert search(db, "user", "lisb fli") == ["Travel"]
+        assert search(db, "user", "cooking") == ["Cooking"]
+        assert search(db, "user", "flight bread") == []
+
+    def test_cjk_falls_back_to_substring_match(self, db):
+        import_chat(db, "user", "天气", "今天天气很好")
+        import_chat(db, "user", "旅行", "我想去东京旅行")
+        import_chat(db, "other", "天气", "今天天气很好")
+
+        assert search(db, "user", "天气") == ["天气"]
+        assert search(db, "user", "东京") == ["旅行"]
+
+    def test_query_without_words_falls_back_to_substring_match(self, db):
+        import_chat(db, "user", "Shell", "what does $? mean")
+        import_chat(db, "user", "Percent", "100% sure")
+        import_chat(db, "user", "Other", "nothing special")
+
+        assert search(db, "user", "$?") == ["Shell"]
+        # LIKE wildcards in the search text are matched literally
+        assert search(db, "user", "%") == ["Percent"]
+        assert search(db, "user", "_") == []
@@ -0,0 +1,390 @@
+from contextlib import contextmanager
+
+import pytest
+from rank_bm25 import BM25Okapi
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from open_webui.internal import db as internal_db
+from open_webui.models import bm25 as bm25_models
+from open_webui.models.bm25 import (
+    BM25Change,
+    BM25Collection,
+    BM25Document,
+    BM25Documents,
+)
+from open_webui.models.vectors import VectorCollection, VectorDocument
+from open_webui.retrieval import bm25
+from open_webui.retrieval.bm25 import (
+    BM25Index,
+    BM25IndexCache,
+    get_document_terms,
+    get_enriched_text,
+    tokenize,
+)
+from open_webui.retrieval.vector import index as vector_index
+from open_webui.retrieval.vector.index import BM25IndexedVectorDB, HashIndexedVectorDB
+from open_webui.retrieval.vector.main import GetResult, VectorDBBase
+
+TEXTS = [
+    "the quick brown fox jumps over the lazy dog",
+    "a quick brown dog outpaces a quick fox",
+    "lorem ipsum dolor sit amet",
+    "the dog sleeps all day",
+]
+
+
+class MemoryVectorDB(VectorDBBase):
+    def __init__(self):
+        # collection name -> id -> item
+        self.collections = {}
+
+    def _rows(self, collection_name, filter=None):
+        return [
+            item
+            for item in self.collections.get(collection_name, {}).values()
+            if all(item["metadata"].get(k) == v for k, v in (filter or {}).items())
+        ]
+
+    def _to_get_result(self, rows):
+        return GetResult(
+            ids=[[item["id"] for item in rows]],
+            documents=[[item["text"] for item in rows]],
+            metadatas=[[item["metadata"] for item in rows]],
+        )
+
+    def has_collection(self, collection_name):
+        return collection_name in self.collections
+
+    def delete_collection(self, collection_name):
+        self.collections.pop(collection_name, None)
+
+    def insert(self, collection_name, items):
+        collection = self.collections.setdefault(collection_name, {})
+        for item in items:
+            collection[item["id"]] = item
+
+    def upsert(self, collection_name, items):
+        self.insert(collection_name, items)
+
+    def search(self, collection_name, vectors, filter=None, limit=10):
+        raise NotImplementedError
+
+    def query(self, collection_name, filter, limit=None):
+        return self._to_get_result(self._rows(collection_name, filter)[:limit])
+
+    def get(self, collection_name):
+        if collection_name not in self.collections:
+            return None
+        return self._to_get_result(self._rows(collection_name))
+
+    def delete(self, collection_name, ids=None, filter=None):
+        collection = self.collections.get(collection_name, {})
+        if not ids:
+            ids = [item["id"] for item in self._rows(collection_name, filter)]
+        for id in ids:
+            collection.pop(id, None)
+
+    def reset(self):
+        self.collections = {}
+
+
+def get_items(texts, file_id="file", start=0):
+    return [
+        {
+            "id": f"{file_id}-{start + i}",
+            "text": text,
+            "vector": [0.0],
+            "metadata": {"file_id": file_id, "hash": file_id, "name": f"{file_id}.md"},
+        }
+        for i, text in enumerate(texts)
+    ]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    for table in (
+        BM25Document,
+        BM25Collection,
+        BM25Change,
+        VectorDocument,
+        VectorCollection,
+    ):
+        table.__table__.create(engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    @contextmanager
+    def get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(internal_db, "get_db", get_db)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = BM25IndexCache(max_size=8)
+    monkeypatch.setattr(bm25, "BM25_INDEX_CACHE", cache)
+    monkeypatch.setattr(vector_index, "BM25_INDEX_CACHE", cache)
+    return cache
+
+
+@pytest.fixture
+def client(db, cache):
+    return BM25IndexedVectorDB(HashIndexedVectorDB(MemoryVectorDB()))
+
+
+def search_ids(index, query, k=10):
+    return [vector_id for vector_id, _ in index.search(query, k)]
+
+
+def no_full_reload(monkeypatch):
+    def get_documents(*args, **kwargs):
+        raise AssertionError("reloaded the whole collection")
+
+    monkeypatch.setattr(BM25Documents, "get_documents", get_documents)
+
+
+class TestBM25Index:
+    def test_scores_match_rank_bm25(self):
+        index = BM25Index("generation", 0)
+        for i, text in enumerate(TEXTS):
+            index.add(str(i), *get_document_terms(text, {}))
+
+        expected = BM25Okapi([tokenize(text) for text in TEXTS]).get_scores(
+            tokenize("quick dog")
+        )
+        for vector_id, score in index.search("quick dog", 10):
+            assert score == pytest.approx(expected[int(vector_id)])
+
+    def test_add_replaces_and_remove_forgets(self):
+        index = BM25Index("generation", 0)
+        index.add("a", *get_document_terms("quick fox", {}))
+        index.add("a", *get_document_terms("lazy dog", {}))
+        index.add("b", *get_document_terms("quick dog", {}))
+
+        assert len(index) == 2
+        assert search_ids(index, "fox") == []
+        assert search_ids(index, "lazy") == ["a"]
+
+        index.remove("a")
+        index.remove("missing")
+        assert len(index) == 1
+        assert search_ids(index, "dog") == ["b"]
+
+    def test_enriched_terms_are_the_metadata_terms(self):
+        metadata = {"name": "report_2024.pdf", "title": "Annual report"}
+        terms, metadata_terms = get_document_terms("revenue grew", metadata)
+
+        assert sum(terms.values()) + sum(metadata_terms.values()) == len(
+            tokenize(get_enriched_text("revenue grew", metadata))
+        )
+
+        plain = BM25Index("generation", 0)
+        enriched = BM25Index("generation", 0, enriched=True)
+        for index in (plain, enriched):
+            index.add("a", terms, metadata_terms)
+            index.add("b", *get_document_terms("costs fell", {}))
+
+        assert search_ids(plain, "Annual") == []
+        assert search_ids(enriched, "Annual") == ["a"]
+
+
+class TestLoadBM25Index:
+    def test_first_search_copies_the_collection(self, client):
+        client.client.client.insert("docs", get_items(TEXTS))
+
+        index = client.get_bm25_index("docs")
+        assert len(index) == len(TEXTS)
+        assert search_ids(index, "ipsum") == ["file-2"]
+        assert client.get_bm25_index("docs") is index
+
+        assert client.get_bm25_index("missing") is None
+
+    def test_failed_copy_is_retried(self, client, monkeypatch):
+        memory = client.client.client
+        memory.insert("docs", get_items(TEXTS))
+
+        get = memory.get
+
+        def get_once_failing(collection_name):
+            monkeypatch.setattr(memory, "get", get)
+            raise ConnectionError("vector database unavailable")
+
+        monkeypatch.setattr(memory, "get", get_once_failing)
+        with pytest.raises(ConnectionError):
+            client.get_bm25_index("docs")
+        assert BM25Documents.get_collection("docs") is None
+
+        assert len(client.get_bm25_index("docs")) == len(TEXTS)
+
+    def test_writes_while_copying_are_kept(self, client, monkeypatch):
+        memory = client.client.client
+        memory.insert("docs", get_items(TEXTS))
+        get = memory.get
+
+        def get_then_write(collection_name):
+            result = get(collection_name)
+            client.insert("docs", get_items(["ipsum"], file_id="new"))
+            client.delete("docs", ids=["file-2"])
+            return result
+
+        monkeypatch.setattr(memory, "get", get_then_write)
+        index = client.get_bm25_index("docs")
+
+        assert sorted(search_ids(index, "ipsum")) == ["new-0"]
+        assert len(index) == len(TEXTS)
+
+    def test_concurrent_copies_store_the_collection_once(self, client):
+        client.client.client.insert("docs", get_items(TEXTS))
+        documents = {"a": get_document_terms("ipsum", {})}
+
+        versions = [BM25Documents.start_copy("docs") for _ in range(2)]
+        assert all(
+            BM25Documents.finish_copy("docs", version, documents)
+            for version in versions
+        )
+        assert search_ids(client.get_bm25_index("docs"), "ipsum") == ["a"]
+
+    def test_writes_update_the_cached_index(self, client, monkeypatch):
+        client.insert("docs", get_items(TEXTS))
+        index = client.get_bm25_index("docs")
+        no_full_reload(monkeypatch)
+
+        client.upsert("docs", get_items(["an ipsum fox"], file_id="other"))
+        client.delete("docs", ids=["file-2"])
+
+        assert client.get_bm25_index("docs") is index
+        assert search_ids(index, "ipsum") == ["other-0"]
+
+    def test_remote_writes_are_applied_incrementally(self, client, monkeypatch):
+        client.insert("docs", get_items(TEXTS))
+        index = client.get_bm25_index("docs")
+        no_full_reload(monkeypatch)
+
+        # Written by another worker, whose cached indexes aren't these
+        BM25Documents.insert_documents(
+            "docs",
+            {
+                "file-0": get_document_terms("an ipsum fox", {}),
+                "new": get_document_terms("ipsum ipsum", {}),
+            },
+        )
+        BM25Documents.delete_by_ids("docs", ["file-2"])
+
+        assert client.get_bm25_index("docs") is index
+        assert index.version == BM25Documents.get_collection("docs")[1]
+        assert sorted(search_ids(index, "ipsum")) == ["file-0", "new"]
+        assert search_ids(index, "lazy") == []
+
+    def test_index_behind_the_change_log_is_reloaded(self, client, monkeypatch):
+        monkeypatch.setattr(bm25_models, "MAX_LOGGED_CHANGES", 1)
+        client.insert("docs", get_items(TEXTS))
+        index = client.get_bm25_index("docs")
+
+        for i in range(2):
+            BM25Documents.insert_documents(
+                "docs", {f"new-{i}": get_document_terms("ipsum", {})}
+            )
+
+        reloaded = client.get_bm25_index("docs")
+        assert reloaded is not index
+        assert sorted(search_ids(reloaded, "ipsum")) == ["file-2", "new-0", "new-1"]
+
+    def test_recreated_collection_is_reloaded(self, client):
+        client.insert("docs", get_items(TEXTS))
+        index = client.get_bm25_index("docs")
+
+        client.delete_collection("docs")
+        client.insert("docs", get_items(["ipsum"], file_id="other"))
+
+        reloaded = client.get_bm25_index("docs")
+        assert reloaded is not index
+        assert search_ids(reloaded, "ipsum") == ["other-0"]
+
+    def test_delete_by_filter_removes_the_matching_ids(self, client, monkeypatch):
+        client.insert("docs", get_items(TEXTS[:2]) + get_items(TEXTS[2:], "other"))
+        index = client.get_bm25_index("docs")
+        no_full_reload(monkeypatch)
+
+        client.delete("docs", filter={"file_id": "other"})
+
+        assert client.get_bm25_index("docs") is index
+        assert sorted(search_ids(index, "dog")) == ["file-0", "file-1"]
+        assert search_ids(index, "ipsum") == []
+
+    def test_delete_by_unsupported_filter_copies_the_collection_again(self, client):
+        client.insert("docs", get_items(TEXTS))
+        index = client.get_bm25_index("docs")
+
+        client.delete("docs", filter={"name": "file.md"})
+        assert BM25Documents.get_collection("docs") is None
+
+        reloaded = client.get_bm25_index("docs")
+        assert reloaded is not index
+        assert len(reloaded) == 0
+
+    def test_get_by_ids_defaults_to_the_whole_collection(self, client):
+        client.insert("docs", get_items(TEXTS))
+
+        result = client.get_by_ids("docs", ["file-3", "file-1", "missing"])
+        assert sorted(result.ids[0]) == ["file-1", "file-3"]
+        assert sorted(result.documents[0]) == sorted([TEXTS[1], TEXTS[3]])
+
+
+class AsyncMemoryVectorDB(MemoryVectorDB):
+    """Writes only through the async methods, like a native async client."""
+
+    def insert(self, collection_name, items):
+        raise AssertionError("wrote from a thread")
+
+    def delete(self, collection_name, ids=None, filter=None):
+        raise AssertionError("wrote from a thread")
+
+    async def ainsert(self, collection_name, items):
+        MemoryVectorDB.insert(self, collection_name, items)
+
+    async def aupsert(self, collection_name, items):
+        MemoryVectorDB.insert(self, collection_name, items)
+
+    async def adelete(self, collection_name, ids=None, filter=None):
+        MemoryVectorDB.delete(self, collection_name, ids=ids, filter=filter)
+
+
+class TestAsyncWrites:
+    @pytest.fixture
+    def client(self, db, cache):
+        return BM25IndexedVectorDB(HashIndexedVectorDB(AsyncMemoryVectorDB()))
+
+    @pytest.mark.asyncio
+    async def test_async_writes_use_the_client_and_update_the_indexes(
+        self, client, monkeypatch
+    ):
+        await client.ainsert(
+            "docs", get_items(TEXTS[:2]) + get_items(TEXTS[2:], "other")
+        )
+        index = client.get_bm25_index("docs")
+        no_full_reload(monkeypatch)
+
+        await client.aupsert("docs", get_items(["an ipsum fox"], file_id="new"))
+        await client.adelete("docs", filter={"file_id": "other"})
+        await client.adelete("docs", ids=["file-0"])
+
+        assert client.get_bm25_index("docs") is index
+        assert search_ids(index, "ipsum") == ["new-0"]
+        assert search_ids(index, "dog") == ["file-1"]
+        assert client.get_ids_by_hashes("docs", ["file", "other", "new"]) == {
+            "file": ["file-1"],
+            "new": ["new-0"],
+        }
@@ -0,0 +1,68 @@
+import fakeredis
+import pytest
+
+from open_webui.retrieval import embedding_cache
+
+
+@pytest.fixture
+def redis_cache(monkeypatch):
+    server = fakeredis.FakeServer()
+
+    def get_redis_connection(
+        redis_url,
+        redis_sentinels,
+        redis_cluster=False,
+        async_mode=False,
+        decode_responses=True,
+    ):
+        return fakeredis.FakeRedis(server=server, decode_responses=decode_responses)
+
+    monkeypatch.setattr(embedding_cache, "RAG_EMBEDDING_CACHE", "redis")
+    monkeypatch.setattr(embedding_cache, "get_redis_connection", get_redis_connection)
+    return embedding_cache.get_embedding_cache()
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    return embedding_cache.DiskEmbeddingCache(tmp_path / "embeddings.db")
+
+
+@pytest.mark.parametrize("cache", ["redis_cache", "disk_cache"])
+def test_embeddings_round_trip(request, cache):
+    cache = request.getfixturevalue(cache)
+    cache.set_many({"a": [0.5, -1.25, 3.0], "b": [0.0]})
+
+    assert cache.get_many(["a", "b", "missing"]) == {
+        "a": [0.5, -1.25, 3.0],
+        "b": [0.0],
+    }
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = embedding_cache.DiskEmbeddingCache(tmp_path / "embeddings.db", 10)
+    cache.set_many({f"old{i}": [float(i)] for i in range(10)})
+    cache.get_many(["old0"])
+    cache.set_many({"new": [1.0]})
+
+    assert set(cache.get_many(["old0", "old1", "new"])) == {"old0", "new"}
+
+
+@pytest.mark.asyncio
+async def test_cached_embedding_function_embeds_missing_texts_once(
+    monkeypatch, redis_cache
+):
+    monkeypatch.setattr(embedding_cache, "EMBEDDING_CACHE", redis_cache)
+    calls = []
+
+    async def embedding_function(query, prefix=None, user=None):
+        calls.append(query)
+        return [[float(len(text))] for text in query]
+
+    embed = embedding_cache.get_cached_embedding_function(
+        embedding_function, "openai", "model"
+    )
+
+    assert await embed(["ab", "abc", "ab"]) == [[2.0], [3.0], [2.0]]
+    assert await embed(["abc", "abcd"]) == [[3.0], [4.0]]
+    assert await embed("ab") == [2.0]
+    assert calls == [["ab", "abc"], ["abcd"]]
@@ -0,0 +1,183 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from open_webui.retrieval.vector.dbs import local
+from open_webui.retrieval.vector.dbs.local import LocalClient, LocalCollection
+
+
+def get_items(count, file_id="file", start=0, dimension=8):
+    rng = np.random.default_rng(start)
+    return [
+        {
+            "id": f"{file_id}-{i}",
+            "text": f"text {i}",
+            "vector": rng.normal(size=dimension).tolist(),
+            "metadata": {"file_id": file_id, "hash": f"hash-{file_id}"},
+        }
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+    monkeypatch.setattr(local, "LOCAL_VECTOR_DB_PATH", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def client(path):
+    return LocalClient()
+
+
+def get_ids(result):
+    return sorted(result.ids[0])
+
+
+def collection_files(client, collection_name):
+    return sorted(os.listdir(client._get_collection_path(collection_name)))
+
+
+class TestLocalClient:
+    def test_insert_upsert_delete_and_query(self, client):
+        items = get_items(3) + get_items(2, file_id="other")
+        client.insert("docs", items)
+
+        assert client.has_collection("docs")
+        assert not client.has_collection("missing")
+        assert get_ids(client.query("docs", {"file_id": "other"})) == [
+            "other-0",
+            "other-1",
+        ]
+        assert get_ids(client.query("docs", {"hash": "hash-file"})) == [
+            "file-0",
+            "file-1",
+            "file-2",
+        ]
+        assert get_ids(
+            client.query("docs", {"file_id": {"$in": ["file", "other"]}})
+        ) == sorted(item["id"] for item in items)
+
+        client.upsert(
+            "docs",
+            [{**items[0], "text": "replaced", "metadata": {"file_id": "other"}}],
+        )
+        assert get_ids(client.query("docs", {"file_id": "other"})) == [
+            "file-0",
+            "other-0",
+            "other-1",
+        ]
+        assert client.get_by_ids("docs", ["file-0"]).documents[0] == ["replaced"]
+        assert len(client.get("docs").ids[0]) == len(items)
+
+        client.delete("docs", ids=["file-1"])
+        client.delete("docs", filter={"file_id": "other"})
+        assert get_ids(client.get("docs")) == ["file-2"]
+        assert client.query("docs", {"hash": "hash-file"}).ids[0] == ["file-2"]
+
+        result = client.search("docs", [items[2]["vector"]], limit=1)
+        assert result.ids[0] == ["file-2"]
+        assert result.distances[0][0] == pytest.approx(1.0)
+
+    def test_compaction_starts_a_new_generation(self, client, monkeypatch):
+        monkeypatch.setattr(local, "COMPACTION_MIN_ROWS", 2)
+        items = get_items(5)
+        client.insert("docs", items)
+        generation = client._get_collection("docs").generation
+
+        client.delete("docs", ids=["file-0", "file-1"])
+
+        collection = client._get_collection("docs")
+        assert collection.generation == generation + 1
+        assert collection_files(client, "docs") == [
+            "CURRENT",
+            "lock",
+            f"records.{generation + 1}.jsonl",
+            f"vectors.{generation + 1}.f32",
+        ]
+
+        reopened = LocalClient()
+        assert get_ids(reopened.get("docs")) == ["file-2", "file-3", "file-4"]
+        for item in items[2:]:
+            result = reopened.search("docs", [item["vector"]], limit=1)
+            assert result.ids[0] == [item["id"]]
+        assert reopened.query("docs", {"file_id": "file"}).ids[0] == [
+            "file-2",
+            "file-3",
+            "file-4",
+        ]
+
+    def test_partial_log_tail_is_ignored_and_cut_off(self, client):
+        client.insert("docs", get_items(2))
+        collection = client._get_collection("docs")
+
+        # Left behind by a write that crashed before completing its entry
+        with open(collection._file("vectors.{generation}.f32"), "ab") as f:
+            f.write(np.zeros(8, dtype=np.float32).tobytes())
+        with open(collection._file("records.{generation}.jsonl"), "ab") as f:
+            f.write(b'{"op": "delete", "ids": ["file-0"')
+
+        reopened = LocalClient()
+        assert get_ids(reopened.get("docs")) == ["file-0", "file-1"]
+
+        reopened.insert("docs", get_items(1, start=2))
+        with open(collection._file("records.{generation}.jsonl"), "rb") as f:
+            assert b'["file-0"\n' not in f.read()
+
+        fresh = LocalClient()
+        assert get_ids(fresh.get("docs")) == ["file-0", "file-1", "file-2"]
+        item = get_items(1, start=2)[0]
+        assert fresh.search("docs", [item["vector"]], limit=1).ids[0] == ["file-2"]
+
+    def test_other_instances_catch_up(self, client, monkeypatch):
+        monkeypatch.setattr(local, "COMPACTION_MIN_ROWS", 2)
+        other = LocalClient()
+        client.insert("docs", get_items(3))
+        assert get_ids(other.get("docs")) == ["file-0", "file-1", "file-2"]
+
+        client.insert("docs", get_items(1, start=3))
+        client.delete("docs", ids=["file-0"])
+        assert get_ids(other.get("docs")) == ["file-1", "file-2", "file-3"]
+
+        # Compacted into a new generation
+        client.delete("docs", ids=["file-1", "file-2"])
+        assert get_ids(other.get("docs")) == ["file-3"]
+
+        # Deleted, then created again with more rows than it had
+        client.delete_collection("docs")
+        assert not other.has_collection("docs")
+        assert other.get("docs") is None
+        client.insert("docs", get_items(5, file_id="new"))
+        assert len(other.get("docs").ids[0]) == 5
+        assert other.query("docs", {"file_id": "file"}).ids[0] == []
+
+    def test_delete_collection_waits_for_writers(self, client):
+        client.insert("docs", get_items(2))
+        writer = LocalCollection(client._get_collection_path("docs"))
+
+        with writer._file_lock(exclusive=True):
+            thread = threading.Thread(target=client.delete_collection, args=["docs"])
+            thread.start()
+            thread.join(0.2)
+            assert thread.is_alive()
+            assert client.has_collection("docs")
+        thread.join()
+
+        assert not client.has_collection("docs")
+        assert collection_files(client, "docs") == ["lock"]
+
+        # Writers that were waiting create it again
+        writer.add(get_items(1, start=5))
+        assert get_ids(client.get("docs")) == ["file-5"]
+
+    def test_ivf_search_finds_the_nearest_vectors(self, client, monkeypatch):
+        monkeypatch.setattr(local, "LOCAL_VECTOR_DB_IVF_MIN_ROWS", 100)
+        items = get_items(400, dimension=16)
+        client.insert("docs", items)
+
+        for item in items[:20]:
+            result = client.search("docs", [item["vector"]], limit=1)
+            assert result.ids[0] == [item["id"]]
+        assert client._get_collection("docs")._ivf is not None
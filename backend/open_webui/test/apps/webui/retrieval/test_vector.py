@@ -0,0 +1,99 @@
+import pytest
+
+from open_webui.retrieval.vector.index import DelegatingVectorDB
+from open_webui.retrieval.vector.main import SearchResult, VectorDBBase
+
+
+class SingleVectorDB(VectorDBBase):
+    """Backend that, like Elasticsearch or Pinecone, only searches vectors[0]."""
+
+    def __init__(self, collections):
+        # collection name -> list of (id, vector)
+        self.collections = collections
+
+    def search(self, collection_name, vectors, filter=None, limit=10):
+        query = vectors[0]
+        rows = sorted(
+            (
+                (sum(a * b for a, b in zip(query, vector)), id)
+                for id, vector in self.collections[collection_name]
+            ),
+            reverse=True,
+        )[:limit]
+        return SearchResult(
+            ids=[[id for _, id in rows]],
+            documents=[[id for _, id in rows]],
+            metadatas=[[{} for _ in rows]],
+            distances=[[score for score, _ in rows]],
+        )
+
+    def has_collection(self, collection_name):
+        return collection_name in self.collections
+
+    def delete_collection(self, collection_name):
+        self.collections.pop(collection_name, None)
+
+    def insert(self, collection_name, items):
+        raise NotImplementedError
+
+    def upsert(self, collection_name, items):
+        raise NotImplementedError
+
+    def query(self, collection_name, filter, limit=None):
+        raise NotImplementedError
+
+    def get(self, collection_name):
+        raise NotImplementedError
+
+    def delete(self, collection_name, ids=None, filter=None):
+        raise NotImplementedError
+
+    def reset(self):
+        self.collections = {}
+
+
+def test_search_many_searches_every_vector():
+    db = SingleVectorDB(
+        {
+            "a": [("x1", [1.0, 0.0]), ("y1", [0.0, 1.0])],
+            "b": [("x2", [0.9, 0.1]), ("y2", [0.1, 0.9])],
+        }
+    )
+    result = db.search_many(["a", "b"], [[1.0, 0.0], [0.0, 1.0]], limit=2)
+
+    assert result.ids == [["x1", "x2"], ["y1", "y2"]]
+    assert result.distances == [[1.0, 0.9], [1.0, 0.9]]
+
+
+def test_search_many_skips_failing_collection():
+    db = SingleVectorDB({"a": [("x1", [1.0, 0.0])]})
+    result = db.search_many(["missing", "a"], [[1.0, 0.0], [0.0, 1.0]], limit=1)
+
+    assert result.ids == [["x1"], ["x1"]]
+
+
+class AsyncSingleVectorDB(SingleVectorDB):
+    def __init__(self, collections):
+        super().__init__(collections)
+        self.writes = []
+
+    def delete_collection(self, collection_name):
+        raise AssertionError("wrote from a thread")
+
+    async def adelete_collection(self, collection_name):
+        self.writes.append(("delete_collection", collection_name))
+        self.collections.pop(collection_name, None)
+
+
+@pytest.mark.asyncio
+async def test_delegating_async_calls_use_the_client_async_methods():
+    client = AsyncSingleVectorDB({"a": [("x1", [1.0, 0.0])], "b": []})
+    db = DelegatingVectorDB(client)
+
+    await db.adelete_collection("b")
+    assert client.writes == [("delete_collection", "b")]
+    assert not await db.ahas_collection("b")
+
+    result = await db.asearch_many(["a"], [[1.0, 0.0]], limit=1)
+    assert result.ids == [["x1"]]
+    assert db.collections is client.collections
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.routers import ollama
+from open_webui.utils.balancer import LeastLoadBalancer
+
+URL = "http://ollama:11434"
+
+
+class BrokenConfigs(dict):
+    def get(self, *args):
+        raise RuntimeError("broken config")
+
+
+@pytest.fixture
+def balancer(monkeypatch):
+    balancer = LeastLoadBalancer("test")
+    monkeypatch.setattr(ollama, "OLLAMA_BALANCER", balancer)
+    monkeypatch.setattr(ollama.Models, "get_model_by_id", lambda *args, **kw: None)
+    return balancer
+
+
+def get_request(configs):
+    return SimpleNamespace(
+        app=SimpleNamespace(
+            state=SimpleNamespace(
+                redis=None,
+                config=SimpleNamespace(
+                    OLLAMA_BASE_URLS=[URL], OLLAMA_API_CONFIGS=configs
+                ),
+            )
+        )
+    )
+
+
+ENDPOINTS = [
+    (
+        ollama.generate_chat_completion,
+        {"model": "llama3", "messages": [{"role": "user", "content": "Hi"}]},
+    ),
+    (ollama.generate_openai_completion, {"model": "llama3", "prompt": "Hi"}),
+    (
+        ollama.generate_openai_chat_completion,
+        {"model": "llama3", "messages": [{"role": "user", "content": "Hi"}]},
+    ),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("endpoint, form_data", ENDPOINTS)
+async def test_failure_before_sending_leaves_nothing_in_flight(
+    balancer, endpoint, form_data
+):
+    user = SimpleNamespace(id="admin", role="admin")
+    with pytest.raises(RuntimeError):
+        await endpoint(
+            get_request(BrokenConfigs()), form_data, url_idx=0, user=user, db=None
+        )
+
+    assert await balancer.get_in_flight(None, [URL]) == {URL: 0}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("endpoint, form_data", ENDPOINTS)
+async def test_sent_request_is_in_flight(balancer, monkeypatch, endpoint, form_data):
+    sent = []
+
+    async def send_post_request(url, payload, in_flight=None, **kwargs):
+        sent.append(await balancer.get_in_flight(None, [URL]))
+        await in_flight.finish()
+
+    monkeypatch.setattr(ollama, "send_post_request", send_post_request)
+    user = SimpleNamespace(id="admin", role="admin")
+    await endpoint(get_request({}), form_data, url_idx=0, user=user, db=None)
+
+    assert sent == [{URL: 1}]
+    assert await balancer.get_in_flight(None, [URL]) == {URL: 0}
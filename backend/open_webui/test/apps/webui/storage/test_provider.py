@@ -1,9 +1,12 @@
+import hashlib
 import io
 import os
 import boto3
 import pytest
 from botocore.exceptions import ClientError
+from boto3.s3.transfer import TransferConfig
 from moto import mock_aws
+from open_webui.constants import ERROR_MESSAGES
 from open_webui.storage import provider
 from gcp_storage_emulator.server import create_server
 from google.cloud import storage
@@ -74,6 +77,24 @@ class TestLocalStorageProvider:
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
 
+    def test_upload_file_stream(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        # Read in several chunks
+        monkeypatch.setattr(provider, "UPLOAD_CHUNK_SIZE", 5)
+        size, sha256, file_path = self.Storage.upload_file_stream(
+            io.BytesIO(self.file_content), self.filename, {}
+        )
+        assert size == len(self.file_content)
+        assert sha256 == hashlib.sha256(self.file_content).hexdigest()
+        assert file_path == str(upload_dir / self.filename)
+        assert (upload_dir / self.filename).read_bytes() == self.file_content
+
+    def test_upload_file_stream_empty(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        with pytest.raises(ValueError, match=ERROR_MESSAGES.EMPTY_CONTENT):
+            self.Storage.upload_file_stream(io.BytesIO(), self.filename, {})
+        assert not (upload_dir / self.filename).exists()
+
     def test_get_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         file_path = str(upload_dir / self.filename)
@@ -199,6 +220,56 @@ class TestS3StorageProvider:
         assert storage.bucket_name == provider.S3_BUCKET_NAME
 
 
+class TestS3StorageProviderUploadFileStream:
+    file_content = os.urandom(6 * 1024 * 1024)
+    filename = "test.bin"
+
+    @pytest.fixture
+    def Storage(self, monkeypatch, tmp_path):
+        mock_upload_dir(monkeypatch, tmp_path)
+        monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+        monkeypatch.setattr(provider, "S3_ENABLE_TAGGING", True)
+        with mock_aws():
+            Storage = provider.S3StorageProvider()
+            Storage.bucket_name = "my-bucket"
+            Storage.key_prefix = "uploads"
+            # S3 parts are at least 5 MiB
+            Storage.transfer_config = TransferConfig(
+                multipart_threshold=5 * 1024 * 1024,
+                multipart_chunksize=5 * 1024 * 1024,
+            )
+            Storage.s3_client.create_bucket(Bucket=Storage.bucket_name)
+            yield Storage
+
+    def test_upload_file_stream(self, Storage):
+        size, sha256, s3_file_path = Storage.upload_file_stream(
+            io.BytesIO(self.file_content),
+            self.filename,
+            {"OpenWebUI-File-Id": "file-id", "Name": "a*b.bin"},
+        )
+        assert size == len(self.file_content)
+        assert sha256 == hashlib.sha256(self.file_content).hexdigest()
+        assert s3_file_path == f"s3://my-bucket/uploads/{self.filename}"
+
+        key = f"uploads/{self.filename}"
+        object = Storage.s3_client.get_object(Bucket="my-bucket", Key=key)
+        assert object["Body"].read() == self.file_content
+        # Sent as a multipart upload of two parts
+        assert object["ETag"].strip('"').endswith("-2")
+
+        tags = Storage.s3_client.get_object_tagging(Bucket="my-bucket", Key=key)
+        assert {tag["Key"]: tag["Value"] for tag in tags["TagSet"]} == {
+            "OpenWebUI-File-Id": "file-id",
+            "Name": "ab.bin",
+        }
+
+    def test_upload_file_stream_empty(self, Storage):
+        with pytest.raises(ValueError, match=ERROR_MESSAGES.EMPTY_CONTENT):
+            Storage.upload_file_stream(io.BytesIO(), self.filename, {})
+        response = Storage.s3_client.list_objects_v2(Bucket="my-bucket")
+        assert "Contents" not in response
+
+
 class TestGCSStorageProvider:
     Storage = provider.GCSStorageProvider()
     Storage.bucket_name = "my-bucket"
@@ -291,6 +362,44 @@ class TestGCSStorageProvider:
         assert self.Storage.bucket.get_blob(self.filename_extra) == None
 
 
+class TestGCSStorageProviderUploadFileStream:
+    file_content = os.urandom(600 * 1024)
+    filename = "test.bin"
+
+    @pytest.fixture
+    def Storage(self, monkeypatch, tmp_path):
+        mock_upload_dir(monkeypatch, tmp_path)
+        # GCS chunks are multiples of 256 KiB, send the file in three
+        monkeypatch.setattr(provider, "UPLOAD_CHUNK_SIZE", 256 * 1024)
+
+        host, port = "localhost", 9024
+        server = create_server(host, port, in_memory=True)
+        server.start()
+        monkeypatch.setenv("STORAGE_EMULATOR_HOST", f"http://{host}:{port}")
+
+        Storage = provider.GCSStorageProvider()
+        Storage.bucket_name = "my-bucket"
+        Storage.bucket = Storage.gcs_client.bucket(Storage.bucket_name)
+        Storage.bucket.create()
+        yield Storage
+        server.stop()
+
+    def test_upload_file_stream(self, Storage):
+        size, sha256, gcs_file_path = Storage.upload_file_stream(
+            io.BytesIO(self.file_content), self.filename, {}
+        )
+        assert size == len(self.file_content)
+        assert sha256 == hashlib.sha256(self.file_content).hexdigest()
+        assert gcs_file_path == f"gs://my-bucket/{self.filename}"
+        blob = Storage.bucket.get_blob(self.filename)
+        assert blob.download_as_bytes() == self.file_content
+
+    def test_upload_file_stream_empty(self, Storage):
+        with pytest.raises(ValueError, match=ERROR_MESSAGES.EMPTY_CONTENT):
+            Storage.upload_file_stream(io.BytesIO(), self.filename, {})
+        assert Storage.bucket.get_blob(self.filename) is None
+
+
 class TestAzureStorageProvider:
     def __init__(self):
         super().__init__()
@@ -354,9 +463,7 @@ class TestAzureStorageProvider:
 
         # Assertions
         self.Storage.container_client.get_blob_client.assert_called_with(self.filename)
-        self.Storage.container_client.get_blob_client().upload_blob.assert_called_once_with(
-            self.file_content, overwrite=True
-        )
+        self.Storage.container_client.get_blob_client().upload_blob.assert_called_once()
         assert contents == self.file_content
         assert (
             azure_file_path
@@ -433,3 +540,56 @@ class TestAzureStorageProvider:
         )
         with pytest.raises(Exception, match="Blob not found"):
             self.Storage.get_file(file_url)
+
+
+class TestAzureStorageProviderUploadFileStream:
+    file_content = b"test content"
+    filename = "test.txt"
+
+    @pytest.fixture
+    def Storage(self, monkeypatch, tmp_path):
+        mock_upload_dir(monkeypatch, tmp_path)
+        monkeypatch.setattr(
+            provider,
+            "AZURE_STORAGE_ENDPOINT",
+            "https://myaccount.blob.core.windows.net",
+        )
+        monkeypatch.setattr(provider, "AZURE_STORAGE_KEY", "a2V5")
+        monkeypatch.setattr(provider, "AZURE_STORAGE_CONTAINER_NAME", "my-container")
+        Storage = provider.AzureStorageProvider()
+        Storage.container_client = MagicMock()
+        return Storage
+
+    def test_upload_file_stream(self, Storage):
+        uploaded = {}
+
+        def upload_blob(data, length, overwrite):
+            # Streamed from the local file rather than passed as bytes
+            uploaded["data"] = data.read()
+            uploaded["length"] = length
+
+        blob_client = Storage.container_client.get_blob_client.return_value
+        blob_client.upload_blob.side_effect = upload_blob
+
+        size, sha256, azure_file_path = Storage.upload_file_stream(
+            io.BytesIO(self.file_content), self.filename, {}
+        )
+        assert size == len(self.file_content)
+        assert sha256 == hashlib.sha256(self.file_content).hexdigest()
+        assert (
+            azure_file_path
+            == f"https://myaccount.blob.core.windows.net/my-container/{self.filename}"
+        )
+        Storage.container_client.get_blob_client.assert_called_once_with(self.filename)
+        assert uploaded == {"data": self.file_content, "length": size}
+
+    def test_upload_file_stream_empty(self, Storage):
+        with pytest.raises(ValueError, match=ERROR_MESSAGES.EMPTY_CONTENT):
+            Storage.upload_file_stream(io.BytesIO(), self.filename, {})
+        Storage.container_client.get_blob_client.assert_not_called()
+
+    def test_upload_file_stream_error(self, Storage):
+        blob_client = Storage.container_client.get_blob_client.return_value
+        blob_client.upload_blob.side_effect = Exception("Container does not exist")
+        with pytest.raises(RuntimeError, match="Container does not exist"):
+            Storage.upload_file_stream(io.BytesIO(self.file_content), self.filename, {})
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import time
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from open_webui.socket import utils
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = fakeredis.FakeServer()
+
+    def get_redis_connection(
+        redis_url,
+        redis_sentinels,
+        redis_cluster=False,
+        async_mode=False,
+        decode_responses=True,
+    ):
+        if async_mode:
+            return fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+        return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+    monkeypatch.setattr(utils, "get_redis_connection", get_redis_connection)
+    return server
+
+
+def make_dict(check_interval=10):
+    redis_dict = utils.RedisDict(
+        "test:dict", redis_url="redis://test", check_interval=check_interval
+    )
+    wait_for(lambda: redis_dict._base_version is not None)
+    return redis_dict
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestRedisDict:
+    def test_write_evicts_other_workers(self, server):
+        writer, reader = make_dict(), make_dict()
+
+        writer["model"] = {"id": "model", "name": "A"}
+        assert reader["model"]["name"] == "A"
+
+        writer["model"] = {"id": "model", "name": "B"}
+        wait_for(lambda: "model" not in reader._cache)
+        assert reader["model"]["name"] == "B"
+
+    def test_missing_keys_are_cached_until_written(self, server):
+        writer, reader = make_dict(), make_dict()
+
+        assert "model" not in reader
+        assert reader._cache["model"] is utils._MISSING
+
+        writer["model"] = {"id": "model"}
+        wait_for(lambda: "model" not in reader._cache)
+        assert "model" in reader
+        assert reader.get("model") == {"id": "model"}
+
+    def test_delete_and_sync_evict(self, server):
+        writer, reader = make_dict(), make_dict()
+        writer.set({"a": 1, "b": 2})
+        wait_for(lambda: reader.get("a") == 1)
+        assert len(reader) == 2
+
+        del writer["a"]
+        wait_for(lambda: "a" not in reader._cache)
+        assert "a" not in reader
+        with pytest.raises(KeyError):
+            del writer["a"]
+
+        writer.sync({"b": 3, "c": 4})
+        wait_for(lambda: reader.get("b") == 3)
+        assert reader.get("c") == 4
+        assert len(reader) == 2
+
+    def test_write_is_one_round_trip(self, server):
+        redis_dict = make_dict()
+        redis = redis_dict.redis
+        calls = []
+        redis.hset = redis.incr = redis.publish = lambda *args: calls.append(args)
+
+        redis_dict["a"] = 1
+        assert calls == []
+        assert redis_dict.get("a") == 1
+
+    def test_notified_writes_keep_other_keys_cached(self, server):
+        writer, reader = make_dict(), make_dict(check_interval=0)
+        writer.set({"a": 1, "b": 2})
+        wait_for(lambda: reader._received == 1)
+        assert reader.get("a") == 1
+
+        # Changed without notification, so only a full drop would reveal it
+        server_redis = fakeredis.FakeRedis(server=server, decode_responses=True)
+        server_redis.hset("test:dict", "a", json.dumps(10))
+
+        for value in range(3, 6):
+            received = reader._received
+            writer["b"] = value
+            wait_for(lambda: reader._received == received + 1)
+            assert reader.get("b") == value
+            assert reader.get("a") == 1
+
+    def test_missed_notification_drops_cache(self, server):
+        reader = make_dict(check_interval=0)
+        server_redis = fakeredis.FakeRedis(server=server, decode_responses=True)
+        server_redis.hset("test:dict", "a", json.dumps(1))
+        assert reader.get("a") == 1
+
+        # A write whose notification was lost
+        server_redis.hset("test:dict", "a", json.dumps(2))
+        server_redis.incr("test:dict:version")
+
+        # Seen at one check, found still missing at the next
+        assert reader.get("a") == 1
+        assert reader.get("a") == 2
+
+    def test_eviction_discards_concurrent_read(self, server):
+        redis_dict = make_dict()
+        generation = redis_dict._generation
+        redis_dict._evict(["a"])
+        redis_dict._cache_value("a", 1, generation)
+        assert "a" not in redis_dict._cache
+
+    @pytest.mark.asyncio
+    async def test_async_methods(self, server):
+        writer, reader = make_dict(), make_dict()
+
+        assert not await reader.acontains("a")
+        await writer.aset("a", {"id": "a"})
+        await asyncio.to_thread(wait_for, lambda: "a" not in reader._cache)
+        assert await reader.aget("a") == {"id": "a"}
+        assert reader["a"] == {"id": "a"}
+
+        await writer.adelete("a")
+        await asyncio.to_thread(wait_for, lambda: "a" not in reader._cache)
+        assert await reader.aget("a", "default") == "default"
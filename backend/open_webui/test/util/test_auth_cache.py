@@ -0,0 +1,159 @@
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from open_webui.env import REDIS_KEY_PREFIX
+from open_webui.internal import db as internal_db
+from open_webui.models import users
+from open_webui.models.users import ApiKey, User, Users
+from open_webui.utils import auth
+from open_webui.utils.auth_cache import (
+    AuthCache,
+    get_api_key_cache_key,
+    get_token_cache_key,
+)
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = AuthCache(ttl=60, max_entries=100)
+    monkeypatch.setattr(users, "AUTH_CACHE", cache)
+    monkeypatch.setattr(auth, "AUTH_CACHE", cache)
+    return cache
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(internal_db, "DATABASE_ENABLE_SESSION_SHARING", True)
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    User.__table__.create(engine)
+    ApiKey.__table__.create(engine)
+
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def cache_user(cache, db, id):
+    """Sign a user in with a token and an API key, caching both."""
+    user = Users.get_user_by_id(id, db=db) or Users.insert_new_user(
+        id, id, f"{id}@example.com", role="user", db=db
+    )
+    Users.update_user_api_key_by_id(id, f"sk-{id}", db=db)
+
+    keys = [get_token_cache_key("", f"jti-{id}"), get_api_key_cache_key(f"sk-{id}")]
+    for key in keys:
+        cache.set(key, user, cache.generation)
+        assert cache.get(key).id == id
+    return keys
+
+
+class TestAuthCache:
+    def test_set_after_invalidation_is_discarded(self, cache, db):
+        user = Users.insert_new_user("user", "user", "user@example.com", db=db)
+
+        generation = cache.generation
+        cache.invalidate_user("other")
+        cache.set("jwt:jti", user, generation)
+        assert cache.get("jwt:jti") is None
+
+        cache.set("jwt:jti", user, cache.generation)
+        assert cache.get("jwt:jti").id == "user"
+
+    def test_expired_entries_are_dropped(self, db):
+        cache = AuthCache(ttl=0.01, max_entries=100)
+        user = Users.insert_new_user("user", "user", "user@example.com", db=db)
+
+        cache.set("jwt:jti", user, cache.generation)
+        time.sleep(0.02)
+        assert cache.get("jwt:jti") is None
+
+    @pytest.mark.parametrize(
+        "invalidate",
+        [
+            lambda db: Users.update_user_role_by_id("user", "admin", db=db),
+            lambda db: Users.update_user_api_key_by_id("user", "sk-new", db=db),
+            lambda db: Users.delete_user_api_key_by_id("user", db=db),
+            lambda db: Users.delete_user_by_id("user", db=db),
+        ],
+        ids=[
+            "update_user_role_by_id",
+            "update_user_api_key_by_id",
+            "delete_user_api_key_by_id",
+            "delete_user_by_id",
+        ],
+    )
+    def test_user_changes_drop_cached_user(self, cache, db, monkeypatch, invalidate):
+        monkeypatch.setattr(
+            users.Groups, "remove_user_from_all_groups", lambda *args: True
+        )
+        monkeypatch.setattr(
+            users.Chats, "delete_chats_by_user_id", lambda *args, **kwargs: True
+        )
+        keys = cache_user(cache, db, "user")
+        other_keys = cache_user(cache, db, "other")
+
+        assert invalidate(db)
+        for key in keys:
+            assert cache.get(key) is None
+        for key in other_keys:
+            assert cache.get(key).id == "other"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_token_drops_cached_user(self, cache, db):
+        user = Users.insert_new_user("user", "user", "user@example.com", db=db)
+        token = auth.create_token({"id": "user"}, timedelta(hours=1))
+        jti = auth.decode_token(token)["jti"]
+        key = get_token_cache_key(token, jti)
+        cache.set(key, user, cache.generation)
+
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        request = SimpleNamespace(
+            app=SimpleNamespace(state=SimpleNamespace(redis=redis))
+        )
+        await auth.invalidate_token(request, token)
+
+        assert cache.get(key) is None
+        assert await redis.get(f"{REDIS_KEY_PREFIX}:auth:token:{jti}:revoked") == "1"
+
+    def test_invalidations_reach_other_workers(self, db):
+        server = fakeredis.FakeServer()
+        caches = [
+            AuthCache(
+                ttl=60,
+                max_entries=100,
+                redis=fakeredis.FakeRedis(server=server, decode_responses=True),
+                channel="test:auth:invalidations",
+            )
+            for _ in range(2)
+        ]
+        # The listeners clear the caches once subscribed
+        wait_for(lambda: all(cache.generation for cache in caches))
+
+        user = Users.insert_new_user("user", "user", "user@example.com", db=db)
+        for cache in caches:
+            cache.set("jwt:jti", user, cache.generation)
+
+        caches[0].invalidate_user("user")
+        assert caches[0].get("jwt:jti") is None
+        wait_for(lambda: caches[1].get("jwt:jti") is None)
@@ -0,0 +1,146 @@
+import fakeredis.aioredis
+import pytest
+
+from open_webui.utils.balancer import (
+    HashRing,
+    LeastLoadBalancer,
+    get_affinity_key,
+    get_hash_ring,
+)
+
+BACKENDS = [f"http://ollama-{i}:11434" for i in range(4)]
+
+
+class TestHashRing:
+    def test_keys_map_to_every_backend_in_a_stable_order(self):
+        ring = HashRing(tuple(BACKENDS))
+        backends = ring.get_backends("chat:1")
+
+        assert sorted(backends) == sorted(BACKENDS)
+        assert HashRing(tuple(BACKENDS)).get_backends("chat:1") == backends
+
+    def test_keys_are_spread(self):
+        ring = HashRing(tuple(BACKENDS))
+        owners = {ring.get_backends(f"chat:{i}")[0] for i in range(200)}
+        assert owners == set(BACKENDS)
+
+    def test_removing_a_backend_only_moves_its_keys(self):
+        ring = HashRing(tuple(BACKENDS))
+        smaller = HashRing(tuple(BACKENDS[:-1]))
+        for i in range(200):
+            backends = ring.get_backends(f"chat:{i}")
+            if backends[0] != BACKENDS[-1]:
+                assert smaller.get_backends(f"chat:{i}")[0] == backends[0]
+            else:
+                assert smaller.get_backends(f"chat:{i}")[0] == backends[1]
+
+
+class TestGetAffinityKey:
+    def test_chat_id(self):
+        assert get_affinity_key({}, {"chat_id": "abc"}) == "chat:abc"
+
+    def test_prefix_is_stable_across_turns(self):
+        messages = [
+            {"role": "system", "content": "You are helpful."},
+            {"role": "user", "content": "Hi"},
+        ]
+        key = get_affinity_key({"messages": messages})
+        next_turn = messages + [
+            {"role": "assistant", "content": "Hello!"},
+            {"role": "user", "content": "How are you?"},
+        ]
+
+        assert key.startswith("prompt:")
+        assert get_affinity_key({"messages": next_turn}) == key
+        assert get_affinity_key({"messages": messages[:1]}) != key
+
+    def test_prompt(self):
+        key = get_affinity_key({"prompt": "Once upon a time", "system": "Be brief"})
+        assert key == get_affinity_key(
+            {"prompt": "Once upon a time", "system": "Be brief"}
+        )
+        assert key != get_affinity_key({"prompt": "Once upon a time"})
+
+    def test_no_key(self):
+        assert get_affinity_key({}) is None
+        assert get_affinity_key({"messages": []}) is None
+
+
+class TestSelect:
+    @pytest.fixture(params=["memory", "redis"])
+    def redis(self, request):
+        if request.param == "redis":
+            return fakeredis.aioredis.FakeRedis()
+        return None
+
+    @pytest.mark.asyncio
+    async def test_affinity_follows_the_ring(self, redis):
+        balancer = LeastLoadBalancer("test", max_in_flight=2)
+        owner = get_hash_ring(tuple(sorted(BACKENDS))).get_backends("chat:1")
+
+        assert await balancer.select(redis, BACKENDS, affinity_key="chat:1") == owner[0]
+
+        # Overloaded, the next backend on the ring takes the conversation
+        for _ in range(2):
+            await balancer.start(redis, owner[0])
+        assert await balancer.select(redis, BACKENDS, affinity_key="chat:1") == owner[1]
+
+    @pytest.mark.asyncio
+    async def test_affinity_stays_on_preferred_backends(self, redis):
+        balancer = LeastLoadBalancer("test", max_in_flight=2)
+        preferred = set(BACKENDS[2:])
+
+        for i in range(50):
+            backend = await balancer.select(
+                redis, BACKENDS, preferred=preferred, affinity_key=f"chat:{i}"
+            )
+            assert backend in preferred
+
+    @pytest.mark.asyncio
+    async def test_overloaded_preferred_backends_fall_back_to_least_load(self, redis):
+        balancer = LeastLoadBalancer("test", max_in_flight=1)
+        for backend in BACKENDS[:3]:
+            await balancer.start(redis, backend)
+
+        backend = await balancer.select(
+            redis, BACKENDS, preferred=set(BACKENDS[:2]), affinity_key="chat:1"
+        )
+        assert backend == BACKENDS[3]
+
+    @pytest.mark.asyncio
+    async def test_ejected_preferred_backends_use_the_full_ring(self, redis):
+        balancer = LeastLoadBalancer("test", failure_threshold=1)
+        request = await balancer.start(redis, BACKENDS[0])
+        await request.finish(failed=True)
+
+        backend = await balancer.select(
+            redis, BACKENDS, preferred={BACKENDS[0]}, affinity_key="chat:1"
+        )
+        ring = get_hash_ring(tuple(sorted(BACKENDS))).get_backends("chat:1")
+        assert backend == next(b for b in ring if b != BACKENDS[0])
+
+    @pytest.mark.asyncio
+    async def test_least_load_without_affinity(self, redis):
+        balancer = LeastLoadBalancer("test")
+        for backend in BACKENDS[:3]:
+            await balancer.start(redis, backend)
+
+        assert await balancer.select(redis, BACKENDS) == BACKENDS[3]
+        # The preferred backends win while they aren't overloaded
+        assert (
+            await balancer.select(redis, BACKENDS, preferred={BACKENDS[0]})
+            == BACKENDS[0]
+        )
+
+    @pytest.mark.asyncio
+    async def test_finished_requests_stop_counting(self, redis):
+        balancer = LeastLoadBalancer("test")
+        requests = [await balancer.start(redis, backend) for backend in BACKENDS[1:]]
+        assert await balancer.select(redis, BACKENDS) == BACKENDS[0]
+
+        await balancer.start(redis, BACKENDS[0])
+        for request in requests:
+            # Finishing twice, from the error and the cleanup paths, counts once
+            await request.finish()
+            await request.finish()
+        assert await balancer.select(redis, BACKENDS) != BACKENDS[0]
@@ -0,0 +1,29 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from open_webui.utils.http_client import CLIENT_SESSION_POOL
+
+
+@pytest.mark.asyncio
+async def test_upstream_cookies_are_not_shared():
+    async def handler(request):
+        response = web.json_response(dict(request.cookies))
+        response.set_cookie("session", "user-a")
+        return response
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+
+    async with TestServer(app, host="localhost") as server:
+        url = str(server.make_url("/"))
+        session = CLIENT_SESSION_POOL.get_session(url)
+
+        async with session.get(url, cookies={"token": "a"}) as response:
+            assert await response.json() == {"token": "a"}
+        # Another user's request through the same session
+        async with session.get(url) as response:
+            assert await response.json() == {}
+        assert CLIENT_SESSION_POOL.get_session(url) is session
+
+    await CLIENT_SESSION_POOL.close()
@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+from open_webui.utils import presence
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    updates = []
+
+    def update_last_active_by_ids(last_active_by_id):
+        updates.append((dict(last_active_by_id), threading.current_thread()))
+        return True
+
+    monkeypatch.setattr(
+        presence.Users, "update_last_active_by_ids", update_last_active_by_ids
+    )
+    return updates
+
+
+class TestPresenceTracker:
+    @pytest.mark.asyncio
+    async def test_write_through_runs_off_the_event_loop(self, updates):
+        tracker = presence.PresenceTracker(interval=0)
+
+        tracker.touch("user")
+        assert updates == []
+
+        await tracker._flush_task
+        [(last_active_by_id, thread)] = updates
+        assert list(last_active_by_id) == ["user"]
+        assert thread is not threading.current_thread()
+
+    def test_write_through_without_event_loop(self, updates):
+        tracker = presence.PresenceTracker(interval=0)
+
+        tracker.touch("user")
+        [(last_active_by_id, thread)] = updates
+        assert list(last_active_by_id) == ["user"]
+
+    @pytest.mark.asyncio
+    async def test_touches_are_batched(self, updates):
+        tracker = presence.PresenceTracker(interval=0.01, min_interval=60)
+
+        tracker.touch("a")
+        tracker.touch("b")
+        tracker.touch("a")
+
+        await tracker._flush_task
+        assert [sorted(last_active_by_id) for last_active_by_id, _ in updates] == [
+            ["a", "b"]
+        ]
@@ -15,7 +15,7 @@ from typing import Optional
 from fastapi import Request
 
 from open_webui.models.users import UserModel
-from open_webui.routers.retrieval import search_web as _search_web
+from open_webui.routers.retrieval import asearch_web
 from open_webui.retrieval.utils import get_content_from_url
 from open_webui.routers.images import (
     image_generations,
@@ -163,7 +163,7 @@ async def search_web(
         engine = __request__.app.state.config.WEB_SEARCH_ENGINE
         user = UserModel(**__user__) if __user__ else None
 
-        results = _search_web(__request__, engine, query, user)
+        results = await asearch_web(__request__, engine, query, user)
 
         # Limit results
         results = results[:count] if results else []
@@ -23,6 +23,12 @@ from opentelemetry import trace
 
 
 from open_webui.utils.access_control import has_permission
+from open_webui.utils.auth_cache import (
+    AUTH_CACHE,
+    get_api_key_cache_key,
+    get_token_cache_key,
+)
+from open_webui.utils.presence import PRESENCE_TRACKER
 from open_webui.models.users import Users
 from open_webui.models.auths import Auths
 
@@ -181,6 +187,7 @@ async def invalidate_token(request, token):
                     "1",
                     ex=ttl,
                 )
+                AUTH_CACHE.invalidate_key(get_token_cache_key(token, jti))
 
 
 def extract_token_from_auth_header(auth_header: str):
@@ -248,13 +255,23 @@ async def get_current_user(
             )
 
         if data is not None and "id" in data:
-            if data.get("jti") and not await is_valid_token(request, data):
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token",
-                )
+            # Cached users are dropped when their token is revoked, so they
+            # need neither the revocation check nor a database query
+            cache_key = get_token_cache_key(token, data.get("jti"))
+            user = AUTH_CACHE.get(cache_key)
+
+            if user is None:
+                generation = AUTH_CACHE.generation
+                if data.get("jti") and not await is_valid_token(request, data):
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="Invalid token",
+                    )
+
+                user = Users.get_user_by_id(data["id"])
+                if user is not None:
+                    AUTH_CACHE.set(cache_key, user, generation)
 
-            user = Users.get_user_by_id(data["id"])
             if user is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -279,10 +296,8 @@ async def get_current_user(
                     current_span.set_attribute("client.user.role", user.role)
                     current_span.set_attribute("client.auth.type", "jwt")
 
-                # Refresh the user's last active timestamp asynchronously
-                # to prevent blocking the request
-                if background_tasks:
-                    background_tasks.add_task(Users.update_last_active_by_id, user.id)
+                # Record the user's activity, written in bulk later
+                PRESENCE_TRACKER.touch(user.id)
             return user
         else:
             raise HTTPException(
@@ -305,8 +320,15 @@ async def get_current_user(
 
 
 def get_current_user_by_api_key(request, api_key: str):
-    # Each function call manages its own short-lived session internally
-    user = Users.get_user_by_api_key(api_key)
+    cache_key = get_api_key_cache_key(api_key)
+    user = AUTH_CACHE.get(cache_key)
+
+    if user is None:
+        generation = AUTH_CACHE.generation
+        # Each function call manages its own short-lived session internally
+        user = Users.get_user_by_api_key(api_key)
+        if user is not None:
+            AUTH_CACHE.set(cache_key, user, generation)
 
     if user is None:
         raise HTTPException(
@@ -334,7 +356,7 @@ def get_current_user_by_api_key(request, api_key: str):
         current_span.set_attribute("client.user.role", user.role)
         current_span.set_attribute("client.auth.type", "api_key")
 
-    Users.update_last_active_by_id(user.id)
+    PRESENCE_TRACKER.touch(user.id)
     return user
 
 
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from open_webui.env import AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL, REDIS_KEY_PREFIX
+from open_webui.utils.redis import get_redis_client
+
+log = logging.getLogger(__name__)
+
+
+def get_token_cache_key(token: str, jti: Optional[str] = None) -> str:
+    if jti:
+        return f"jwt:{jti}"
+    return f"jwt:{hashlib.sha256(token.encode()).hexdigest()}"
+
+
+def get_api_key_cache_key(api_key: str) -> str:
+    return f"api_key:{hashlib.sha256(api_key.encode()).hexdigest()}"
+
+
+class AuthCache:
+    """
+    Cache of the users authenticated by a token or an API key, kept for `ttl`
+    seconds for the `max_entries` most recently used keys so that requests
+    don't have to load the user from the database.
+
+    Entries are dropped when their user changes or their token is revoked. With
+    Redis, these invalidations are published on `channel` for the other workers
+    to drop theirs; one that's missed is covered by the short TTL.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, redis=None, channel: str = ""):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.redis = redis
+        self.channel = channel
+
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._keys_by_user: dict[str, set[str]] = {}
+        # Bumped on every invalidation, so that a user loaded before one isn't
+        # cached after it
+        self._generation = 0
+
+        if self.redis is not None and self.ttl > 0:
+            threading.Thread(
+                target=self._listen, name="auth-cache-listener", daemon=True
+            ).start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                pubsub.subscribe(self.channel)
+                # Invalidations may have been missed while not subscribed
+                self._clear()
+
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        data = json.loads(message["data"])
+                        if data.get("user_id"):
+                            self._drop_user(data["user_id"])
+                        if data.get("key"):
+                            self._drop_key(data["key"])
+            except Exception as e:
+                log.warning(f"Auth cache listener failed, resubscribing: {e}")
+                time.sleep(self.ttl)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, user = entry
+        if expires_at <= time.time():
+            self._evict(key)
+            return None
+
+        self._entries.move_to_end(key)
+        # A copy, so that changes made while handling a request don't leak
+        return user.model_copy()
+
+    def set(self, key: str, user, generation: int):
+        """
+        Cache `user` for `key`, unless an invalidation happened since
+        `generation` was read, before loading the user.
+        """
+        if self.ttl <= 0 or generation != self._generation:
+            return
+
+        self._evict(key)
+        self._entries[key] = (time.time() + self.ttl, user)
+        self._keys_by_user.setdefault(user.id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def _drop_key(self, key: str):
+        self._generation += 1
+        self._evict(key)
+
+    def _evict(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            _, user = entry
+            keys = self._keys_by_user.get(user.id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[user.id]
+
+    def _drop_user(self, user_id: str):
+        self._generation += 1
+        for key in self._keys_by_user.pop(user_id, set()):
+            self._entries.pop(key, None)
+
+    def _clear(self):
+        self._generation += 1
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+
+    def _publish(self, data: dict):
+        if self.redis is None:
+            return
+        try:
+            self.redis.publish(self.channel, json.dumps(data))
+        except Exception as e:
+            log.error(f"Failed to publish the auth cache invalidation: {e}")
+
+    def invalidate_user(self, user_id: str):
+        """Drop the entries of a user, e.g. after their role or API key changed."""
+        self._drop_user(user_id)
+        self._publish({"user_id": user_id})
+
+    def invalidate_key(self, key: str):
+        """Drop the entry of a token or API key, e.g. after it was revoked."""
+        self._drop_key(key)
+        self._publish({"key": key})
+
+
+AUTH_CACHE = AuthCache(
+    AUTH_CACHE_TTL,
+    AUTH_CACHE_MAX_SIZE,
+    redis=get_redis_client() if AUTH_CACHE_TTL > 0 else None,
+    channel=f"{REDIS_KEY_PREFIX}:auth:invalidations",
+)
@@ -0,0 +1,352 @@
+import bisect
+import hashlib
+import json
+import logging
+import random
+import time
+from functools import lru_cache
+from typing import Optional
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+from open_webui.env import REDIS_KEY_PREFIX
+
+log = logging.getLogger(__name__)
+
+
+def get_hash(value: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+    )
+
+
+class HashRing:
+    """
+    Consistent-hash ring of backends, each placed at `replicas` points. A key
+    maps to the backends in the order met walking the ring from its hash, so
+    adding or removing a backend only moves the keys it owns.
+    """
+
+    def __init__(self, backends: tuple[str, ...], replicas: int = 100):
+        self.backends = backends
+        self.points = sorted(
+            (get_hash(f"{backend}#{i}"), backend)
+            for backend in backends
+            for i in range(replicas)
+        )
+        self.hashes = [point for point, _ in self.points]
+
+    def get_backends(self, key: str) -> list[str]:
+        start = bisect.bisect(self.hashes, get_hash(key))
+        backends = {}
+        for i in range(len(self.points)):
+            backends.setdefault(self.points[(start + i) % len(self.points)][1])
+            if len(backends) == len(self.backends):
+                break
+        return list(backends)
+
+
+@lru_cache(maxsize=256)
+def get_hash_ring(backends: tuple[str, ...]) -> HashRing:
+    return HashRing(backends)
+
+
+def get_affinity_key(payload: dict, metadata: Optional[dict] = None) -> Optional[str]:
+    """
+    Return a key identifying the conversation of a completion request, so that
+    its turns can be sent to the backend holding its prompt in cache: the chat
+    id, or else the system prompt and the first message, which stay the same
+    from one turn to the next.
+    """
+    if metadata and metadata.get("chat_id"):
+        return f"chat:{metadata['chat_id']}"
+
+    messages = payload.get("messages")
+    if isinstance(messages, list) and messages:
+        prefix = [
+            message
+            for message in messages
+            if isinstance(message, dict) and message.get("role") == "system"
+        ]
+        prefix += [
+            message
+            for message in messages
+            if isinstance(message, dict) and message.get("role") != "system"
+        ][:1]
+    elif isinstance(payload.get("prompt"), str) and payload["prompt"]:
+        prefix = [payload.get("system"), payload["prompt"][:4096]]
+    else:
+        return None
+
+    return f"prompt:{get_hash(json.dumps(prefix, sort_keys=True, default=str))}"
+
+
+class InFlightRequest:
+    """
+    A request sent to a backend, counted as in flight until finished. Finishing
+    more than once is a no-op, so both the error and the cleanup paths of a
+    request can finish it.
+    """
+
+    def __init__(self, balancer: "LoadBalancer", redis: Optional[Redis], backend: str):
+        self.balancer = balancer
+        self.redis = redis
+        self.backend = backend
+        self.token = uuid4().hex
+        self.started_at = time.time()
+        self.latency = None
+        self.finished = False
+
+    def record_latency(self):
+        """Record the time until the backend started to respond."""
+        if self.latency is None:
+            self.latency = time.time() - self.started_at
+
+    async def finish(self, failed: bool = False):
+        if self.finished:
+            return
+        self.finished = True
+        await self.balancer.finish(self, failed)
+
+
+class LoadBalancer:
+    """
+    Picks the backend (base URL) to send a request to among those serving a
+    model.
+
+    The requests in flight to each backend and the backends ejected after
+    `failure_threshold` consecutive failures are shared by the workers through
+    Redis when it is available, and kept in memory otherwise. Requests left
+    unfinished, e.g. if the worker was killed, stop being counted after
+    `request_timeout` seconds. Latencies are an exponentially weighted moving
+    average (EWMA) of the time until each backend started responding, kept per
+    worker.
+
+    Subclasses implement `choose`, the strategy.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int = 0,
+        failure_threshold: int = 3,
+        ejection_time: float = 30,
+        request_timeout: float = 300,
+        latency_decay: float = 0.3,
+    ):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.failure_threshold = failure_threshold
+        self.ejection_time = ejection_time
+        self.request_timeout = request_timeout
+        self.latency_decay = latency_decay
+
+        self._in_flight: dict[str, dict[str, float]] = {}
+        self._latency: dict[str, float] = {}
+        self._failures: dict[str, int] = {}
+        self._ejected_until: dict[str, float] = {}
+
+    def _get_key(self, kind: str, backend: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:balancer:{self.name}:{kind}:{backend}"
+
+    async def get_in_flight(
+        self, redis: Optional[Redis], backends: list[str]
+    ) -> dict[str, int]:
+        now = time.time()
+        if redis is not None:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for backend in backends:
+                    key = self._get_key("in_flight", backend)
+                    pipe.zremrangebyscore(key, 0, now - self.request_timeout)
+                    pipe.zcard(key)
+                results = await pipe.execute()
+                return dict(zip(backends, results[1::2]))
+            except Exception as e:
+                log.warning(f"Failed to read the requests in flight from Redis: {e}")
+
+        in_flight = {}
+        for backend in backends:
+            requests = self._in_flight.get(backend, {})
+            for token, started_at in list(requests.items()):
+                if started_at < now - self.request_timeout:
+                    del requests[token]
+            in_flight[backend] = len(requests)
+        return in_flight
+
+    async def get_ejected(
+        self, redis: Optional[Redis], backends: list[str]
+    ) -> set[str]:
+        now = time.time()
+        ejected = {
+            backend for backend in backends if self._ejected_until.get(backend, 0) > now
+        }
+        if redis is not None:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for backend in backends:
+                    pipe.get(self._get_key("ejected", backend))
+                values = await pipe.execute()
+                ejected.update(
+                    backend for backend, value in zip(backends, values) if value
+                )
+            except Exception as e:
+                log.warning(f"Failed to read the ejected backends from Redis: {e}")
+        return ejected
+
+    def get_latency(self, backend: str) -> float:
+        # Backends without requests yet are assumed as fast as the average
+        if backend in self._latency:
+            return self._latency[backend]
+        if self._latency:
+            return sum(self._latency.values()) / len(self._latency)
+        return 1.0
+
+    def is_overloaded(self, in_flight: int) -> bool:
+        return bool(self.max_in_flight) and in_flight >= self.max_in_flight
+
+    async def select(
+        self,
+        redis: Optional[Redis],
+        backends: list[str],
+        preferred: Optional[set[str]] = None,
+        affinity_key: Optional[str] = None,
+    ) -> str:
+        """
+        Return one of `backends`, favoring the `preferred` ones, e.g. those
+        with the model already loaded. Ejected backends are skipped unless all
+        of them are.
+
+        Requests with the same `affinity_key` go to the same backend on a
+        consistent-hash ring, or the next one on the ring if it's ejected or
+        overloaded, and to the strategy's choice if all of them are. The ring
+        is made of the preferred backends if any of them is healthy, so that
+        affinity doesn't send requests away from them, and of all the backends
+        otherwise.
+        """
+        backends = list(dict.fromkeys(backends))
+        preferred = preferred or set()
+        if len(backends) == 1:
+            return backends[0]
+
+        ejected = await self.get_ejected(redis, backends)
+        healthy = [backend for backend in backends if backend not in ejected]
+
+        if affinity_key and healthy:
+            ring = [backend for backend in backends if backend in preferred]
+            if not any(backend in preferred for backend in healthy):
+                ring = backends
+
+            in_flight = await self.get_in_flight(redis, healthy)
+            for backend in get_hash_ring(tuple(sorted(ring))).get_backends(
+                affinity_key
+            ):
+                if backend in in_flight and not self.is_overloaded(in_flight[backend]):
+                    return backend
+
+        return await self.choose(redis, healthy or backends, preferred)
+
+    async def choose(
+        self, redis: Optional[Redis], backends: list[str], preferred: set[str]
+    ) -> str:
+        raise NotImplementedError
+
+    async def start(self, redis: Optional[Redis], backend: str) -> InFlightRequest:
+        request = InFlightRequest(self, redis, backend)
+        self._in_flight.setdefault(backend, {})[request.token] = request.started_at
+        if redis is not None:
+            try:
+                key = self._get_key("in_flight", backend)
+                pipe = redis.pipeline(transaction=False)
+                pipe.zadd(key, {request.token: request.started_at})
+                pipe.expire(key, int(self.request_timeout))
+                await pipe.execute()
+            except Exception as e:
+                log.warning(f"Failed to count the request in flight in Redis: {e}")
+        return request
+
+    async def finish(self, request: InFlightRequest, failed: bool = False):
+        backend = request.backend
+        self._in_flight.get(backend, {}).pop(request.token, None)
+
+        if request.redis is not None:
+            try:
+                await request.redis.zrem(
+                    self._get_key("in_flight", backend), request.token
+                )
+            except Exception as e:
+                log.warning(f"Failed to remove the request in flight in Redis: {e}")
+
+        if not failed:
+            self._failures.pop(backend, None)
+            if request.latency is not None:
+                latency = self._latency.get(backend, request.latency)
+                self._latency[backend] = (
+                    1 - self.latency_decay
+                ) * latency + self.latency_decay * request.latency
+            return
+
+        self._failures[backend] = self._failures.get(backend, 0) + 1
+        if self._failures[backend] >= self.failure_threshold:
+            log.warning(
+                f"Ejecting {backend} for {self.ejection_time}s after "
+                f"{self._failures[backend]} consecutive failures"
+            )
+            self._failures.pop(backend, None)
+            self._ejected_until[backend] = time.time() + self.ejection_time
+            if request.redis is not None:
+                try:
+                    await request.redis.set(
+                        self._get_key("ejected", backend),
+                        "1",
+                        ex=max(int(self.ejection_time), 1),
+                    )
+                except Exception as e:
+                    log.warning(f"Failed to eject {backend} in Redis: {e}")
+
+
+class RandomLoadBalancer(LoadBalancer):
+    async def choose(
+        self, redis: Optional[Redis], backends: list[str], preferred: set[str]
+    ) -> str:
+        return random.choice(backends)
+
+
+class LeastLoadBalancer(LoadBalancer):
+    """
+    Prefers the `preferred` backends that aren't overloaded, then picks the one
+    with the lowest expected wait, its requests in flight times its latency.
+    """
+
+    async def choose(
+        self, redis: Optional[Redis], backends: list[str], preferred: set[str]
+    ) -> str:
+        in_flight = await self.get_in_flight(redis, backends)
+
+        candidates = [
+            backend
+            for backend in backends
+            if backend in preferred and not self.is_overloaded(in_flight[backend])
+        ]
+        candidates = candidates or backends
+
+        # Shuffled so that ties are broken at random
+        random.shuffle(candidates)
+        return min(
+            candidates,
+            key=lambda backend: (in_flight[backend] + 1) * self.get_latency(backend),
+        )
+
+
+LOAD_BALANCERS = {
+    "random": RandomLoadBalancer,
+    "least_load": LeastLoadBalancer,
+}
+
+
+def get_load_balancer(strategy: str, name: str, **kwargs) -> LoadBalancer:
+    if strategy not in LOAD_BALANCERS:
+        log.warning(f"Unknown load balancer {strategy}, using least_load")
+        strategy = "least_load"
+    return LOAD_BALANCERS[strategy](name, **kwargs)
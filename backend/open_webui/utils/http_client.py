@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from typing import Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_DNS_CACHE_TTL,
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    AIOHTTP_CLIENT_POOL_SIZE,
+)
+
+log = logging.getLogger(__name__)
+
+
+def get_origin(url: str) -> str:
+    parsed_url = urlparse(url)
+    return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+
+class ClientSessionPool:
+    """
+    aiohttp sessions shared by the requests to upstream APIs, one per origin
+    (scheme, host and port) of their base URL. Connections are kept alive
+    between requests and host names resolved once per `dns_cache_ttl`, instead
+    of a new session and TCP/TLS handshake for every request.
+
+    Responses must be released, not closed, for their connection to be reused.
+    Timeouts are passed per request since the sessions are shared.
+
+    With `per_origin` disabled, e.g. to fetch web pages from any host, all
+    origins share one session and `limit_per_host` connections per host.
+    Without `cookies`, responses don't set cookies for the next requests.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: Optional[int] = 300,
+        per_origin: bool = True,
+        limit_per_host: int = 0,
+        cookies: bool = True,
+    ):
+        self.limit = limit
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.per_origin = per_origin
+        self.limit_per_host = limit_per_host
+        self.cookies = cookies
+
+        self._sessions: dict[tuple[str, bool], aiohttp.ClientSession] = {}
+
+    def get_session(self, url: str, trust_env: bool = True) -> aiohttp.ClientSession:
+        key = (get_origin(url) if self.per_origin else "*", trust_env)
+        loop = asyncio.get_running_loop()
+
+        session = self._sessions.get(key)
+        if session is None or session.closed or session.connector._loop is not loop:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                ),
+                cookie_jar=None if self.cookies else aiohttp.DummyCookieJar(),
+                trust_env=trust_env,
+            )
+            self._sessions[key] = session
+        return session
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        """Return the connections in use, idle and awaited for each origin."""
+        stats = {}
+        for (origin, _), session in list(self._sessions.items()):
+            connector = session.connector
+            if session.closed or connector is None:
+                continue
+
+            try:
+                stats[origin] = {
+                    "limit": connector.limit,
+                    "in_use": len(connector._acquired),
+                    "idle": sum(len(conns) for conns in connector._conns.values()),
+                    "waiting": sum(
+                        len(waiters) for waiters in connector._waiters.values()
+                    ),
+                }
+            except RuntimeError:
+                # Changed by the event loop while read from the metrics thread
+                continue
+        return stats
+
+    async def close(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            try:
+                await session.close()
+            except Exception as e:
+                log.warning(f"Failed to close an upstream client session: {e}")
+
+
+# Shared by the requests of every user, so cookies set by an upstream must not be
+# sent with the requests of others; requests pass their own cookies instead
+CLIENT_SESSION_POOL = ClientSessionPool(
+    limit=AIOHTTP_CLIENT_POOL_SIZE,
+    keepalive_timeout=AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    dns_cache_ttl=AIOHTTP_CLIENT_DNS_CACHE_TTL or None,
+    cookies=False,
+)
+
+
+# Fetches web pages for the web loader, from whichever hosts search results link to
+WEB_CLIENT_SESSION_POOL = ClientSessionPool(
+    limit=AIOHTTP_CLIENT_POOL_SIZE,
+    keepalive_timeout=AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    dns_cache_ttl=AIOHTTP_CLIENT_DNS_CACHE_TTL or None,
+    per_origin=False,
+    limit_per_host=10,
+    cookies=False,
+)
+
+
+def get_client_session(url: str) -> aiohttp.ClientSession:
+    return CLIENT_SESSION_POOL.get_session(url)
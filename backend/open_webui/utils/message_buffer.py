@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from open_webui.models.chats import Chats
+from open_webui.env import (
+    CHAT_MESSAGE_WRITE_BUFFER_INTERVAL,
+    CHAT_MESSAGE_WRITE_BUFFER_MAX_UPDATES,
+)
+
+log = logging.getLogger(__name__)
+
+
+class MessageWriteBuffer:
+    """
+    Write-behind buffer for streamed chat message updates.
+
+    Updates to a (chat_id, message_id) are merged in memory and persisted with
+    a single upsert once `interval` seconds have passed since the first
+    unflushed update, or once `max_updates` updates are pending. Callers flush
+    explicitly when a response completes or is cancelled, and `flush_all` runs
+    on shutdown so accepted updates are not lost.
+    """
+
+    def __init__(self, interval: float = 1.0, max_updates: int = 50):
+        self.interval = interval
+        self.max_updates = max_updates
+
+        self._messages: dict[tuple[str, str], dict] = {}
+        self._pending: dict[tuple[str, str], dict] = {}
+        self._counts: dict[tuple[str, str], int] = {}
+        self._since: dict[tuple[str, str], float] = {}
+
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def get(self, chat_id: str, message_id: str) -> Optional[dict]:
+        """Return the message as it will be once pending updates are flushed."""
+        key = (chat_id, message_id)
+
+        if key not in self._messages:
+            message = Chats.get_message_by_id_and_message_id(chat_id, message_id)
+            if message is None:
+                return None
+
+            message = {**message, **self._pending.get(key, {})}
+            if key not in self._pending:
+                return message
+            self._messages[key] = message
+
+        return self._messages[key]
+
+    def update(self, chat_id: str, message_id: str, message: dict) -> None:
+        if not self.interval:
+            Chats.upsert_message_by_id_and_message_id(chat_id, message_id, message)
+            return
+
+        key = (chat_id, message_id)
+
+        if key in self._messages:
+            self._messages[key] = {**self._messages[key], **message}
+        self._pending[key] = {**self._pending.get(key, {}), **message}
+        self._counts[key] = self._counts.get(key, 0) + 1
+        self._since.setdefault(key, time.monotonic())
+
+        if (
+            self._counts[key] >= self.max_updates
+            or time.monotonic() - self._since[key] >= self.interval
+        ):
+            self.flush(chat_id, message_id)
+        else:
+            self._start_flush_task()
+
+    def flush(self, chat_id: str, message_id: str) -> None:
+        key = (chat_id, message_id)
+
+        pending = self._pending.pop(key, None)
+        self._messages.pop(key, None)
+        self._counts.pop(key, None)
+        self._since.pop(key, None)
+
+        if pending:
+            try:
+                Chats.upsert_message_by_id_and_message_id(chat_id, message_id, pending)
+            except Exception as e:
+                log.exception(f"Error flushing message {message_id}: {e}")
+
+    def flush_all(self) -> None:
+        for chat_id, message_id in list(self._pending.keys()):
+            self.flush(chat_id, message_id)
+
+    def _start_flush_task(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(
+                self._flush_expired()
+            )
+        except RuntimeError:
+            # No running loop, updates are flushed on the next threshold or explicit flush
+            pass
+
+    async def _flush_expired(self) -> None:
+        # Persist updates for messages that stopped receiving events
+        while self._pending:
+            await asyncio.sleep(self.interval)
+
+            now = time.monotonic()
+            for key, since in list(self._since.items()):
+                if now - since >= self.interval:
+                    self.flush(*key)
+
+
+MESSAGE_WRITE_BUFFER = MessageWriteBuffer(
+    interval=CHAT_MESSAGE_WRITE_BUFFER_INTERVAL,
+    max_updates=CHAT_MESSAGE_WRITE_BUFFER_MAX_UPDATES,
+)
@@ -53,6 +53,7 @@ from open_webui.routers.images import (
 from open_webui.routers.memories import query_memory, QueryMemoryForm
 
 from open_webui.utils.webhook import post_webhook
+from open_webui.utils.message_buffer import MESSAGE_WRITE_BUFFER
 from open_webui.utils.files import (
     convert_markdown_base64_images,
     get_file_url_from_base64,
@@ -1811,7 +1812,7 @@ async def process_chat_response(
                             )
 
                             if not metadata.get("chat_id", "").startswith("local:"):
-                                Chats.upsert_message_to_chat_by_id_and_message_id(
+                                Chats.upsert_message_by_id_and_message_id(
                                     metadata["chat_id"],
                                     metadata["message_id"],
                                     {
@@ -1981,7 +1982,7 @@ async def process_chat_response(
                         else:
                             error = str(error)
 
-                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                        Chats.upsert_message_by_id_and_message_id(
                             metadata["chat_id"],
                             metadata["message_id"],
                             {
@@ -1997,7 +1998,7 @@ async def process_chat_response(
                             )
 
                     if "selected_model_id" in response_data:
-                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                        Chats.upsert_message_by_id_and_message_id(
                             metadata["chat_id"],
                             metadata["message_id"],
                             {
@@ -2031,7 +2032,7 @@ async def process_chat_response(
                             )
 
                             # Save message in the database
-                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                            Chats.upsert_message_by_id_and_message_id(
                                 metadata["chat_id"],
                                 metadata["message_id"],
                                 {
@@ -2516,7 +2517,7 @@ async def process_chat_response(
                     )
 
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    MESSAGE_WRITE_BUFFER.update(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2584,7 +2585,7 @@ async def process_chat_response(
 
                                 if "selected_model_id" in data:
                                     model_id = data["selected_model_id"]
-                                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                                    MESSAGE_WRITE_BUFFER.update(
                                         metadata["chat_id"],
                                         metadata["message_id"],
                                         {
@@ -2748,6 +2749,9 @@ async def process_chat_response(
                                         delta.get("images", []), request, metadata, user
                                     )
                                     if image_urls:
+                                        MESSAGE_WRITE_BUFFER.flush(
+                                            metadata["chat_id"], metadata["message_id"]
+                                        )
                                         message_files = Chats.add_message_files_by_id_and_message_id(
                                             metadata["chat_id"],
                                             metadata["message_id"],
@@ -2871,7 +2875,7 @@ async def process_chat_response(
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
                                             # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                                            MESSAGE_WRITE_BUFFER.update(
                                                 metadata["chat_id"],
                                                 metadata["message_id"],
                                                 {
@@ -3187,13 +3191,14 @@ async def process_chat_response(
 
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    MESSAGE_WRITE_BUFFER.update(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
                             "content": serialize_content_blocks(content_blocks),
                         },
                     )
+                MESSAGE_WRITE_BUFFER.flush(metadata["chat_id"], metadata["message_id"])
 
                 # Send a webhook notification if the user is not active
                 if not Users.is_user_active(user.id):
@@ -3225,13 +3230,14 @@ async def process_chat_response(
 
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    MESSAGE_WRITE_BUFFER.update(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
                             "content": serialize_content_blocks(content_blocks),
                         },
                     )
+                MESSAGE_WRITE_BUFFER.flush(metadata["chat_id"], metadata["message_id"])
 
             if response.background is not None:
                 await response.background()
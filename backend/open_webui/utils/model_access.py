@@ -0,0 +1,112 @@
+import json
+import logging
+import uuid
+from typing import Optional
+
+from open_webui.env import (
+    REDIS_KEY_PREFIX,
+    WEBSOCKET_MANAGER,
+    WEBSOCKET_REDIS_CLUSTER,
+    WEBSOCKET_REDIS_URL,
+    WEBSOCKET_SENTINEL_HOSTS,
+    WEBSOCKET_SENTINEL_PORT,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+
+
+class ModelAccessCache:
+    """
+    Per-user cache of the ids of the models a user can read.
+
+    Entries are tagged with a generation that is bumped whenever models, their
+    access control or group memberships change, so stale entries are ignored
+    rather than tracked down. An entry computed while an invalidation happens
+    keeps the old generation and is never served. With Redis, the generation
+    and the entries are shared across workers.
+    """
+
+    def __init__(self, name: str, redis=None):
+        self.name = name
+        self.redis = redis
+
+        self._generation = str(uuid.uuid4())
+        self._entries: dict[str, tuple[str, set[str]]] = {}
+
+    def get(self, user_id: str) -> tuple[Optional[str], Optional[set[str]]]:
+        """Return the current generation and the user's model ids, if cached."""
+        if self.redis is None:
+            generation, model_ids = self._entries.get(user_id, (None, None))
+            if generation != self._generation:
+                return self._generation, None
+            return generation, model_ids
+
+        try:
+            generation, entry = self.redis.hmget(self.name, "generation", user_id)
+            if generation is None:
+                generation = self._reset()
+        except Exception as e:
+            log.warning(f"Failed to read the model access cache: {e}")
+            return None, None
+
+        if entry:
+            entry = json.loads(entry)
+            if entry["generation"] == generation:
+                return generation, set(entry["model_ids"])
+
+        return generation, None
+
+    def set(self, user_id: str, generation: Optional[str], model_ids: set[str]):
+        if generation is None:
+            return
+
+        if self.redis is None:
+            self._entries[user_id] = (generation, model_ids)
+            return
+
+        try:
+            self.redis.hset(
+                self.name,
+                user_id,
+                json.dumps({"generation": generation, "model_ids": list(model_ids)}),
+            )
+        except Exception as e:
+            log.warning(f"Failed to write the model access cache: {e}")
+
+    def invalidate(self):
+        if self.redis is None:
+            self._generation = str(uuid.uuid4())
+            self._entries = {}
+            return
+
+        try:
+            self._reset()
+        except Exception as e:
+            log.error(f"Failed to invalidate the model access cache: {e}")
+
+    def _reset(self) -> str:
+        # Generations are random so that a dropped hash can't bring one back
+        generation = str(uuid.uuid4())
+
+        pipe = self.redis.pipeline()
+        pipe.delete(self.name)
+        pipe.hset(self.name, "generation", generation)
+        pipe.execute()
+
+        return generation
+
+
+MODEL_ACCESS_CACHE = ModelAccessCache(
+    f"{REDIS_KEY_PREFIX}:model_access",
+    redis=(
+        get_redis_connection(
+            WEBSOCKET_REDIS_URL,
+            get_sentinels_from_env(WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT),
+            redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+            decode_responses=True,
+        )
+        if WEBSOCKET_MANAGER == "redis"
+        else None
+    ),
+)
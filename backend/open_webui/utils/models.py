@@ -2,6 +2,7 @@ import time
 import logging
 import asyncio
 import sys
+from typing import Optional
 
 from aiocache import cached
 from fastapi import Request
@@ -13,6 +14,7 @@ from open_webui.models.models import Models
 from open_webui.models.groups import Groups
 
 from open_webui.utils.access_control import has_access
+from open_webui.utils.model_access import MODEL_ACCESS_CACHE
 
 
 from open_webui.config import (
@@ -68,6 +70,137 @@ async def get_all_base_models(request: Request, user: UserModel = None):
     return openai_models + ollama_models
 
 
+# Merged model list from the last refresh. Entries keep the inputs they were
+# built from so that unchanged models are reused instead of rebuilt, and the
+# version only moves when the list actually changes.
+MODELS_CACHE = {"version": 0, "entries": {}}
+
+
+def get_base_model_entry(base_model: dict, custom_model=None) -> dict:
+    model = base_model.copy()
+
+    if custom_model is not None:
+        model["name"] = custom_model.name
+        model["info"] = custom_model.model_dump()
+        # Remove params to avoid exposing sensitive info
+        model["info"].pop("params", None)
+
+    return model
+
+
+def get_preset_model_entry(custom_model, base_model: Optional[dict]) -> dict:
+    owned_by = "openai"
+    connection_type = None
+    pipe = None
+
+    if base_model is not None:
+        owned_by = base_model.get("owned_by", "unknown")
+        connection_type = base_model.get("connection_type", None)
+        pipe = base_model.get("pipe", None)
+
+    info = custom_model.model_dump()
+    # Remove params to avoid exposing sensitive info
+    info.pop("params", None)
+
+    return {
+        "id": f"{custom_model.id}",
+        "name": custom_model.name,
+        "object": "model",
+        "created": custom_model.created_at,
+        "owned_by": owned_by,
+        "connection_type": connection_type,
+        "preset": True,
+        **({"pipe": pipe} if pipe is not None else {}),
+        "info": info,
+    }
+
+
+def merge_models(base_models: list[dict], custom_models: list) -> list[dict]:
+    """
+    Apply custom models to the base models, reusing the entries of the
+    previous merge when neither the base model nor its custom models changed.
+    """
+    previous_entries = MODELS_CACHE["entries"]
+    entries = {}
+    models = []
+
+    def get_entry(model_id, inputs, build):
+        previous = previous_entries.get(model_id)
+        if previous is not None and previous[0] == inputs:
+            entry = previous[1]
+        else:
+            entry = build()
+        entries[model_id] = (inputs, entry)
+        return entry
+
+    # Custom models applied directly to a base model, matched by id or, for
+    # Ollama, by the id without its tag (e.g., 'llama3' vs. 'llama3:7b')
+    overrides = {}
+    presets = []
+    for custom_model in custom_models:
+        if custom_model.base_model_id is None:
+            overrides.setdefault(custom_model.id, []).append(custom_model)
+        elif custom_model.is_active:
+            presets.append(custom_model)
+
+    models_by_id = {}
+    models_by_prefix = {}
+    for base_model in base_models:
+        model_id = base_model["id"]
+        matches = overrides.get(model_id, [])
+        if base_model.get("owned_by") == "ollama" and ":" in model_id:
+            matches = matches + overrides.get(model_id.split(":")[0], [])
+
+        if any(not custom_model.is_active for custom_model in matches):
+            continue
+        custom_model = matches[-1] if matches else None
+
+        model = get_entry(
+            model_id,
+            (base_model, custom_model),
+            lambda: get_base_model_entry(base_model, custom_model),
+        )
+        models.append(model)
+        models_by_id.setdefault(model_id, model)
+        models_by_prefix.setdefault(model_id.split(":")[0], model)
+
+    # Custom models based on a base model
+    for custom_model in presets:
+        if custom_model.id in models_by_id:
+            continue
+
+        base_model = models_by_id.get(
+            custom_model.base_model_id
+        ) or models_by_prefix.get(custom_model.base_model_id)
+        base_fields = (
+            (
+                base_model.get("owned_by"),
+                base_model.get("connection_type"),
+                base_model.get("pipe"),
+            )
+            if base_model is not None
+            else None
+        )
+
+        model = get_entry(
+            custom_model.id,
+            (custom_model, base_fields),
+            lambda: get_preset_model_entry(custom_model, base_model),
+        )
+        models.append(model)
+        models_by_id[custom_model.id] = model
+        models_by_prefix.setdefault(custom_model.id.split(":")[0], model)
+
+    if len(entries) != len(previous_entries) or any(
+        previous_entries.get(model_id, (None, None))[1] is not entry
+        for model_id, (_, entry) in entries.items()
+    ):
+        MODELS_CACHE["version"] += 1
+    MODELS_CACHE["entries"] = entries
+
+    return models
+
+
 async def get_all_models(request, refresh: bool = False, user: UserModel = None):
     if (
         request.app.state.MODELS
@@ -79,98 +212,52 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
         base_models = await get_all_base_models(request, user=user)
         request.app.state.BASE_MODELS = base_models
 
-    # deep copy the base models to avoid modifying the original list
-    models = [model.copy() for model in base_models]
-
     # If there are no models, return an empty list
-    if len(models) == 0:
+    if len(base_models) == 0:
         return []
 
-    custom_models = Models.get_all_models()
-    for custom_model in custom_models:
-        if custom_model.base_model_id is None:
-            # Applied directly to a base model
-            for model in models:
-                if custom_model.id == model["id"] or (
-                    model.get("owned_by") == "ollama"
-                    and custom_model.id
-                    == model["id"].split(":")[
-                        0
-                    ]  # Ollama may return model ids in different formats (e.g., 'llama3' vs. 'llama3:7b')
-                ):
-                    if custom_model.is_active:
-                        model["name"] = custom_model.name
-                        model["info"] = custom_model.model_dump()
-
-                        if "info" in model:
-                            if "params" in model["info"]:
-                                # Remove params to avoid exposing sensitive info
-                                del model["info"]["params"]
-                    else:
-                        models.remove(model)
-
-        elif custom_model.is_active and (
-            custom_model.id not in [model["id"] for model in models]
-        ):
-            # Custom model based on a base model
-            owned_by = "openai"
-            connection_type = None
-
-            pipe = None
-
-            for m in models:
-                if (
-                    custom_model.base_model_id == m["id"]
-                    or custom_model.base_model_id == m["id"].split(":")[0]
-                ):
-                    owned_by = m.get("owned_by", "unknown")
-                    if "pipe" in m:
-                        pipe = m["pipe"]
-
-                    connection_type = m.get("connection_type", None)
-                    break
-
-            model = {
-                "id": f"{custom_model.id}",
-                "name": custom_model.name,
-                "object": "model",
-                "created": custom_model.created_at,
-                "owned_by": owned_by,
-                "connection_type": connection_type,
-                "preset": True,
-                **({"pipe": pipe} if pipe is not None else {}),
-            }
-
-            info = custom_model.model_dump()
-            if "params" in info:
-                # Remove params to avoid exposing sensitive info
-                del info["params"]
-
-            model["info"] = info
-
-            models.append(model)
+    version = MODELS_CACHE["version"]
+    models = merge_models(base_models, Models.get_all_models())
 
     log.debug(f"get_all_models() returned {len(models)} models")
 
-    models_dict = {model["id"]: model for model in models}
-    if isinstance(request.app.state.MODELS, RedisDict):
-        request.app.state.MODELS.set(models_dict)
-    else:
-        request.app.state.MODELS = models_dict
+    if version != MODELS_CACHE["version"] or not request.app.state.MODELS:
+        models_dict = {model["id"]: model for model in models}
+        if isinstance(request.app.state.MODELS, RedisDict):
+            request.app.state.MODELS.sync(models_dict)
+        else:
+            request.app.state.MODELS = models_dict
 
     return models
 
 
-def check_model_access(user, model, db=None):
-    model_info = Models.get_model_by_id(model.get("id"), db=db)
-    if not model_info:
-        raise Exception("Model not found")
-    elif not (
-        user.id == model_info.user_id
+def get_accessible_model_ids(user_id: str, db=None) -> set[str]:
+    """Ids of the workspace models the user owns or has read access to."""
+    generation, model_ids = MODEL_ACCESS_CACHE.get(user_id)
+    if model_ids is not None:
+        return model_ids
+
+    user_group_ids = {
+        group.id for group in Groups.get_groups_by_member_id(user_id, db=db)
+    }
+    model_ids = {
+        model_info.id
+        for model_info in Models.get_all_models(db=db)
+        if user_id == model_info.user_id
         or has_access(
-            user.id, type="read", access_control=model_info.access_control, db=db
+            user_id,
+            type="read",
+            access_control=model_info.access_control,
+            user_group_ids=user_group_ids,
         )
-    ):
+    }
+
+    MODEL_ACCESS_CACHE.set(user_id, generation, model_ids)
+    return model_ids
+
+
+def check_model_access(user, model, db=None):
+    if model.get("id") not in get_accessible_model_ids(user.id, db=db):
         raise Exception("Model not found")
 
 
@@ -180,31 +267,7 @@ def get_filtered_models(models, user, db=None):
         user.role == "user"
         or (user.role == "admin" and not BYPASS_ADMIN_ACCESS_CONTROL)
     ) and not BYPASS_MODEL_ACCESS_CONTROL:
-        model_ids = [model["id"] for model in models]
-        model_infos = {
-            model_info.id: model_info
-            for model_info in Models.get_models_by_ids(model_ids)
-        }
-
-        filtered_models = []
-        user_group_ids = {
-            group.id for group in Groups.get_groups_by_member_id(user.id, db=db)
-        }
-        for model in models:
-            model_info = model_infos.get(model["id"], None)
-            if model_info:
-                if (
-                    (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
-                    or user.id == model_info.user_id
-                    or has_access(
-                        user.id,
-                        type="read",
-                        access_control=model_info.access_control,
-                        user_group_ids=user_group_ids,
-                    )
-                ):
-                    filtered_models.append(model)
-
-        return filtered_models
+        model_ids = get_accessible_model_ids(user.id, db=db)
+        return [model for model in models if model["id"] in model_ids]
     else:
         return models
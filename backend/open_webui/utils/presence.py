@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from open_webui.models.users import Users
+from open_webui.env import (
+    DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL,
+    DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL,
+)
+
+log = logging.getLogger(__name__)
+
+
+class PresenceTracker:
+    """
+    Write-behind buffer for users' last active times.
+
+    Activity is recorded in memory, at most once per `min_interval` seconds per
+    user, and the times recorded are written with batched UPDATEs every
+    `interval` seconds rather than one write per request. With an interval of
+    0 they are written right away, still in a thread off the event loop.
+    `flush` runs on shutdown so recorded activity is not lost.
+    """
+
+    def __init__(self, interval: float = 10.0, min_interval: Optional[float] = None):
+        self.interval = interval
+        self.min_interval = min_interval or 0
+
+        self._pending: dict[str, int] = {}
+        self._recorded_at: dict[str, float] = {}
+
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def touch(self, user_id: str) -> None:
+        now = time.time()
+        if self.min_interval:
+            if now - self._recorded_at.get(user_id, 0) < self.min_interval:
+                return
+            self._recorded_at[user_id] = now
+
+        self._pending[user_id] = int(now)
+        self._start_flush_task()
+
+    def flush(self) -> None:
+        pending, self._pending = self._pending, {}
+
+        now = time.time()
+        self._recorded_at = {
+            user_id: recorded_at
+            for user_id, recorded_at in list(self._recorded_at.items())
+            if now - recorded_at < self.min_interval
+        }
+
+        if pending and not Users.update_last_active_by_ids(pending):
+            log.error(f"Failed to update the last active time of {len(pending)} users")
+
+    def _start_flush_task(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(
+                self._flush_periodically()
+            )
+        except RuntimeError:
+            # No running loop to flush later
+            self.flush()
+
+    async def _flush_periodically(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.interval)
+            await asyncio.to_thread(self.flush)
+
+
+PRESENCE_TRACKER = PresenceTracker(
+    interval=DATABASE_USER_ACTIVE_STATUS_FLUSH_INTERVAL,
+    min_interval=DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL,
+)
@@ -46,6 +46,7 @@ from open_webui.env import (
     OTEL_METRICS_EXPORTER_OTLP_INSECURE,
 )
 from open_webui.models.users import Users
+from open_webui.utils.http_client import CLIENT_SESSION_POOL
 
 _EXPORT_INTERVAL_MILLIS = 10_000  # 10 seconds
 
@@ -101,6 +102,14 @@ def _build_meter_provider(resource: Resource) -> MeterProvider:
         View(
             instrument_name="webui.users.active.today",
         ),
+        View(
+            instrument_name="webui.http.client.connections",
+            attribute_keys=["http.origin", "state"],
+        ),
+        View(
+            instrument_name="webui.http.client.saturation",
+            attribute_keys=["http.origin"],
+        ),
     ]
 
     provider = MeterProvider(
@@ -176,6 +185,44 @@ def setup_metrics(app: FastAPI, resource: Resource) -> None:
         callbacks=[observe_users_active_today],
     )
 
+    def observe_http_client_connections(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        return [
+            metrics.Observation(
+                value=stats[state], attributes={"http.origin": origin, "state": state}
+            )
+            for origin, stats in CLIENT_SESSION_POOL.get_stats().items()
+            for state in ("in_use", "idle", "waiting")
+        ]
+
+    meter.create_observable_gauge(
+        name="webui.http.client.connections",
+        description="Connections to upstream APIs by state",
+        unit="connections",
+        callbacks=[observe_http_client_connections],
+    )
+
+    def observe_http_client_saturation(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        # Share of the connection limit in use, requests wait at 1
+        return [
+            metrics.Observation(
+                value=stats["in_use"] / stats["limit"],
+                attributes={"http.origin": origin},
+            )
+            for origin, stats in CLIENT_SESSION_POOL.get_stats().items()
+            if stats["limit"]
+        ]
+
+    meter.create_observable_gauge(
+        name="webui.http.client.saturation",
+        description="Share of the upstream connection limit in use",
+        unit="1",
+        callbacks=[observe_http_client_saturation],
+    )
+
     # FastAPI middleware
     @app.middleware("http")
     async def _metrics_middleware(request: Request, call_next):